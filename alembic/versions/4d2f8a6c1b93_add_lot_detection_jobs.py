@@ -0,0 +1,69 @@
+"""add_lot_detection_jobs
+
+Revision ID: 4d2f8a6c1b93
+Revises: 7b3d9e2f6a18
+Create Date: 2026-10-16 13:00:00.000000
+
+Adds persisted batch lot detection jobs:
+- lot_detection_jobs (status, progress counters, runner lease)
+- lot_detection_job_items (one row per phase with its stored result)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d2f8a6c1b93'
+down_revision: Union[str, Sequence[str], None] = '7b3d9e2f6a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'lot_detection_jobs',
+        sa.Column('job_id', sa.String(50), primary_key=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending', comment='pending, running, completed, failed, cancelled'),
+        sa.Column('detection_method', sa.String(50), nullable=False, server_default='auto', comment='auto, yolo'),
+        sa.Column('parameters', sa.JSON(), nullable=True, comment='Detection parameters (min_area, confidence_threshold)'),
+        sa.Column('total_phases', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_phases', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_phases', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lots_detected', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0', comment='Times the job has been claimed'),
+        sa.Column('lease_owner', sa.String(100), nullable=True, comment='Runner ID currently executing the job'),
+        sa.Column('lease_expires_at', sa.TIMESTAMP(), nullable=True, comment='Lease expiry; extended while the job runs'),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index('ix_lot_detection_jobs_status', 'lot_detection_jobs', ['status'])
+    op.create_index('ix_lot_detection_jobs_lease_owner', 'lot_detection_jobs', ['lease_owner'])
+    op.create_index('ix_lot_detection_jobs_created_at', 'lot_detection_jobs', ['created_at'])
+
+    op.create_table(
+        'lot_detection_job_items',
+        sa.Column('job_id', sa.String(50), sa.ForeignKey('lot_detection_jobs.job_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('position', sa.Integer(), primary_key=True, comment='Order of the phase in the request'),
+        sa.Column('phase_id', mysql.BIGINT(unsigned=True), sa.ForeignKey('community_phases.id', ondelete='CASCADE'), nullable=False, comment='References community_phases.id'),
+        sa.Column('storage_path', sa.String(500), nullable=False, comment='Site plan key in object storage'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending', comment='pending, running, completed, failed, cancelled'),
+        sa.Column('lots_detected', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True, comment='Detected lots (lot_number, coordinates, area, confidence)'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index('ix_lot_detection_job_items_phase_id', 'lot_detection_job_items', ['phase_id'])
+    op.create_index('ix_lot_detection_job_items_job_status', 'lot_detection_job_items', ['job_id', 'status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lot_detection_job_items')
+    op.drop_table('lot_detection_jobs')
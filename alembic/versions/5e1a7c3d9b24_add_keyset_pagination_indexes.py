@@ -0,0 +1,38 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 5e1a7c3d9b24
+Revises: 4d2f8a6c1b93
+Create Date: 2026-10-16 15:00:00.000000
+
+Adds the (sort column, id) indexes behind cursor pagination:
+- properties: listed_at, price and bedrooms sorts of GET /v1/properties
+- collection_changes: newest-first review queue, with and without a status filter
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c3d9b24'
+down_revision: Union[str, Sequence[str], None] = '4d2f8a6c1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_properties_listed_at_id', 'properties', ['listed_at', 'id'])
+    op.create_index('ix_properties_price_id', 'properties', ['price', 'id'])
+    op.create_index('ix_properties_bedrooms_id', 'properties', ['bedrooms', 'id'])
+    op.create_index('ix_collection_changes_created_id', 'collection_changes', ['created_at', 'id'])
+    op.create_index('ix_collection_changes_status_created_id', 'collection_changes', ['status', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_collection_changes_status_created_id', table_name='collection_changes')
+    op.drop_index('ix_collection_changes_created_id', table_name='collection_changes')
+    op.drop_index('ix_properties_bedrooms_id', table_name='properties')
+    op.drop_index('ix_properties_price_id', table_name='properties')
+    op.drop_index('ix_properties_listed_at_id', table_name='properties')
@@ -0,0 +1,52 @@
+"""add_collection_job_scheduler_leases
+
+Revision ID: 5e2a7c1d9f40
+Revises: 0191c4bc21e0
+Create Date: 2026-10-16 09:00:00.000000
+
+Adds DB-backed leases for the collection job scheduler:
+- lease_owner / lease_expires_at / heartbeat_at on collection_jobs
+- Composite index used when claiming pending jobs by priority
+- collection_scheduler_locks table (seeded with the 'claim' row)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a7c1d9f40'
+down_revision: Union[str, Sequence[str], None] = '0191c4bc21e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('collection_jobs', sa.Column('lease_owner', sa.String(100), nullable=True, comment='Scheduler worker ID currently executing the job'))
+    op.add_column('collection_jobs', sa.Column('lease_expires_at', sa.TIMESTAMP(), nullable=True, comment='Lease expiry; extended by worker heartbeats'))
+    op.add_column('collection_jobs', sa.Column('heartbeat_at', sa.TIMESTAMP(), nullable=True, comment='Last heartbeat from the executing worker'))
+    op.create_index('ix_collection_jobs_lease_owner', 'collection_jobs', ['lease_owner'])
+    op.create_index(
+        'ix_collection_jobs_claim',
+        'collection_jobs',
+        ['status', 'entity_type', 'priority', 'created_at']
+    )
+
+    op.create_table(
+        'collection_scheduler_locks',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+    op.execute("INSERT INTO collection_scheduler_locks (name) VALUES ('claim')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('collection_scheduler_locks')
+    op.drop_index('ix_collection_jobs_claim', table_name='collection_jobs')
+    op.drop_index('ix_collection_jobs_lease_owner', table_name='collection_jobs')
+    op.drop_column('collection_jobs', 'heartbeat_at')
+    op.drop_column('collection_jobs', 'lease_expires_at')
+    op.drop_column('collection_jobs', 'lease_owner')
@@ -0,0 +1,31 @@
+"""add_updated_at_indexes_for_dedup_index
+
+Revision ID: 7b3d9e2f6a18
+Revises: 5e2a7c1d9f40
+Create Date: 2026-10-16 11:00:00.000000
+
+Indexes updated_at on builder_profiles and communities so the in-memory
+duplicate detection indexes can cheaply pick up recently changed rows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d9e2f6a18'
+down_revision: Union[str, Sequence[str], None] = '5e2a7c1d9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_builder_profiles_updated_at', 'builder_profiles', ['updated_at'])
+    op.create_index('ix_communities_updated_at', 'communities', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_communities_updated_at', table_name='communities')
+    op.drop_index('ix_builder_profiles_updated_at', table_name='builder_profiles')
@@ -0,0 +1,46 @@
+"""add_metrics_daily_rollups
+
+Revision ID: 8a4c6e1f3b57
+Revises: 6f3b9d2e7a15
+Create Date: 2026-10-16 23:30:00.000000
+
+Adds the daily rollups behind the admin dashboard (src/metrics_rollup.py):
+- metrics_daily_rollups (entity, day, segment) -> count; filled by the API's
+  background refresh on first start
+- created_at indexes on builder_profiles, communities and properties, so
+  recounting recent days reads an index range instead of the whole table
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4c6e1f3b57'
+down_revision: Union[str, Sequence[str], None] = '6f3b9d2e7a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'metrics_daily_rollups',
+        sa.Column('entity', sa.String(32), primary_key=True, comment='users, builders, communities, properties, posts, tours, documents'),
+        sa.Column('day', sa.Date(), primary_key=True, comment='DATE(created_at); 1970-01-01 for rows without created_at'),
+        sa.Column('segment', sa.String(32), primary_key=True, server_default='', comment="Role for users, '' otherwise"),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+    op.create_index('ix_builder_profiles_created_at', 'builder_profiles', ['created_at'])
+    op.create_index('ix_communities_created_at', 'communities', ['created_at'])
+    op.create_index('ix_properties_created_at', 'properties', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_properties_created_at', table_name='properties')
+    op.drop_index('ix_communities_created_at', table_name='communities')
+    op.drop_index('ix_builder_profiles_created_at', table_name='builder_profiles')
+    op.drop_table('metrics_daily_rollups')
@@ -0,0 +1,30 @@
+"""add_properties_updated_at_index
+
+Revision ID: 9d1f4b7c2e83
+Revises: 8a4c6e1f3b57
+Create Date: 2026-10-16 23:50:00.000000
+
+Indexes properties.updated_at so the search index refresh
+(src/search_index.py) reads recently changed rows from an index range
+instead of scanning the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1f4b7c2e83'
+down_revision: Union[str, Sequence[str], None] = '8a4c6e1f3b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_properties_updated_at', 'properties', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_properties_updated_at', table_name='properties')
@@ -0,0 +1,30 @@
+"""add_media_updated_at_index
+
+Revision ID: a2e8c5f1d764
+Revises: 9d1f4b7c2e83
+Create Date: 2026-10-17 00:05:00.000000
+
+Indexes media.updated_at so the perceptual hash index refresh
+(src/media_hash_index.py) reads recently changed rows from an index range
+instead of scanning the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e8c5f1d764'
+down_revision: Union[str, Sequence[str], None] = '9d1f4b7c2e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_media_updated_at', 'media', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_media_updated_at', table_name='media')
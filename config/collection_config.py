@@ -66,6 +66,69 @@ class CollectionConfig:
     # Enable auto-execution of pending jobs
     AUTO_EXECUTE_JOBS: bool = os.getenv('AUTO_EXECUTE_JOBS', 'true').lower() == 'true'
 
+    # Scheduler lease duration (seconds)
+    # A claimed job whose lease is not renewed within this window is treated
+    # as abandoned by a crashed worker and marked as failed
+    SCHEDULER_LEASE_SECONDS: int = int(os.getenv('SCHEDULER_LEASE_SECONDS', '120'))
+
+    # How often workers renew leases on the jobs they are running (seconds)
+    SCHEDULER_HEARTBEAT_INTERVAL: int = int(os.getenv('SCHEDULER_HEARTBEAT_INTERVAL', '30'))
+
+    # ============================================================================
+    # JOB TELEMETRY SETTINGS
+    # ============================================================================
+
+    # Buffered job logs/changes/progress are flushed to the database when this
+    # many entries are pending...
+    TELEMETRY_FLUSH_SIZE: int = int(os.getenv('TELEMETRY_FLUSH_SIZE', '50'))
+
+    # ...or when this many seconds have passed since the last flush
+    TELEMETRY_FLUSH_INTERVAL: float = float(os.getenv('TELEMETRY_FLUSH_INTERVAL', '5'))
+
+    # ============================================================================
+    # CLAUDE API SETTINGS
+    # ============================================================================
+
+    # Maximum in-flight Claude requests across all jobs in the process
+    CLAUDE_MAX_CONCURRENCY: int = int(os.getenv('CLAUDE_MAX_CONCURRENCY', '8'))
+
+    # Sustained Claude request rate (token bucket, bursting up to the
+    # concurrency limit)
+    CLAUDE_REQUESTS_PER_MINUTE: int = int(os.getenv('CLAUDE_REQUESTS_PER_MINUTE', '50'))
+
+    # Retries for rate-limited, overloaded or failed requests
+    CLAUDE_MAX_RETRIES: int = int(os.getenv('CLAUDE_MAX_RETRIES', '4'))
+
+    # Retry backoff (seconds) - doubles with each retry, with full jitter,
+    # capped at CLAUDE_RETRY_MAX_DELAY
+    CLAUDE_RETRY_BASE_DELAY: float = float(os.getenv('CLAUDE_RETRY_BASE_DELAY', '1.0'))
+    CLAUDE_RETRY_MAX_DELAY: float = float(os.getenv('CLAUDE_RETRY_MAX_DELAY', '30.0'))
+
+    # ============================================================================
+    # CLAUDE RESPONSE CACHE SETTINGS
+    # ============================================================================
+
+    # Cache parsed Claude responses keyed by prompt + model + max_tokens so
+    # retried jobs and backfills do not resend identical prompts
+    CLAUDE_CACHE_ENABLED: bool = os.getenv('CLAUDE_CACHE_ENABLED', 'true').lower() == 'true'
+
+    # Local SQLite file holding cached responses
+    CLAUDE_CACHE_PATH: str = os.getenv('CLAUDE_CACHE_PATH', '.cache/claude_responses.db')
+
+    # Cached responses older than this are ignored (seconds)
+    CLAUDE_CACHE_TTL_SECONDS: int = int(os.getenv('CLAUDE_CACHE_TTL_SECONDS', '86400'))  # 24 hours
+
+    # Least recently used responses are evicted above this size (MB)
+    CLAUDE_CACHE_MAX_MB: int = int(os.getenv('CLAUDE_CACHE_MAX_MB', '256'))
+
+    # ============================================================================
+    # DUPLICATE DETECTION SETTINGS
+    # ============================================================================
+
+    # How often the in-memory builder/community dedup indexes pick up rows
+    # changed by other processes (seconds, based on updated_at)
+    DEDUP_INDEX_REFRESH_SECONDS: int = int(os.getenv('DEDUP_INDEX_REFRESH_SECONDS', '30'))
+
     # ============================================================================
     # PRIORITY SETTINGS
     # ============================================================================
@@ -1,14 +1,151 @@
 # config/db.py
-from sqlalchemy import create_engine
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import sessionmaker
-from config.settings import DB_URL
+from sqlalchemy.pool import QueuePool
+from config.settings import (
+    DB_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT,
+)
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for connection pool usage.
+
+    Tracks how often connections are checked out and how long callers had
+    to wait for one, so the pool can be sized against the number of
+    concurrent collection jobs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.timeouts = 0
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait_seconds / self.waits if self.waits else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
 
-engine = create_engine(DB_URL, pool_pre_ping=True, future=True)
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def build_engine(url: str = DB_URL):
+    """
+    Create an engine with the configured pool settings and metrics hooks.
+
+    SQLite URLs (used by tests) keep SQLAlchemy's default pool since the
+    size/overflow options do not apply to it.
+    """
+    kwargs = {"pool_pre_ping": True, "future": True}
+    if not url.startswith("sqlite"):
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+
+    new_engine = create_engine(url, **kwargs)
+    event.listen(new_engine, "checkout", lambda *args: pool_metrics.record_checkout())
+    event.listen(new_engine, "checkin", lambda *args: pool_metrics.record_checkin())
+    return new_engine
+
+
+# Process-wide engine and session factory. Background threads (collection
+# jobs, job monitor) must use SessionLocal instead of creating their own
+# engines, otherwise every thread opens a pool that is never disposed.
+engine = build_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+
+def get_pool_stats() -> dict:
+    """Return current pool occupancy, configuration and checkout metrics."""
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    stats.update(pool_metrics.snapshot())
+    return stats
+
+
+def database_now(db) -> datetime:
+    """
+    Current time on the database clock.
+
+    Incremental syncs that filter on server-set updated_at columns take their
+    watermark from here, so app/database clock skew cannot skip rows.
+    """
+    return db.scalar(select(func.current_timestamp()))
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -2,17 +2,14 @@
 
 from typing import Optional, Iterable, Callable
 from fastapi import Depends, HTTPException, Request, status
-from jose import jwt
-from jose.exceptions import JWTError, ExpiredSignatureError
+import jwt
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from datetime import timedelta
 
 from config.db import get_db
-from config.settings import JWT_SECRET, JWT_ALG, JWT_ISS  # ensure these exist
+from config.security import Principal, decode_token, get_principal
 from model.user import Users
 
-_LEEWAY = 10  # seconds of clock-skew tolerance
 
 def _get_bearer_token(request: Request) -> str:
     auth = request.headers.get("authorization") or request.headers.get("Authorization")
@@ -24,28 +21,20 @@ def _get_bearer_token(request: Request) -> str:
     return auth.split(" ", 1)[1].strip()
 
 def _decode_access_token(token: str) -> dict:
+    # Shared decoder and decode cache (config/security.py); checks issuer and token type
     try:
-        options = {"verify_aud": False}
-        # Disable aud verification unless you explicitly set/expect it
-        payload = jwt.decode(
-            token,
-            JWT_SECRET,
-            algorithms=[JWT_ALG],
-            issuer=JWT_ISS if JWT_ISS else None,
-            options=options,
-        )
-    except ExpiredSignatureError:
+        return decode_token(token)
+    except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
-    except JWTError:
+    except jwt.InvalidIssuerError:
+        raise HTTPException(status_code=401, detail="Invalid token issuer")
+    except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    # Optional issuer/type checks (match your token minting)
-    if JWT_ISS and payload.get("iss") != JWT_ISS:
-        raise HTTPException(status_code=401, detail="Invalid token issuer")
-    typ = payload.get("typ")
-    if typ not in ("access", "bearer", None):
-        raise HTTPException(status_code=401, detail="Invalid token type")
-    return payload
+def _role_key(user) -> Optional[str]:
+    # users.role is the role key string (older rows/objects may carry a Role)
+    role = getattr(user, "role", None)
+    return role if isinstance(role, str) or role is None else getattr(role, "key", None)
 
 def _load_user_from_claims(payload: dict, db: Session) -> Users:
     public_id: Optional[str] = payload.get("sub")
@@ -54,7 +43,7 @@ def _load_user_from_claims(payload: dict, db: Session) -> Users:
     if uid is not None:
         user = db.get(Users, uid)
     elif public_id:
-        user = db.scalar(select(Users).where(Users.public_id == public_id))
+        user = db.scalar(select(Users).where(Users.user_id == public_id))
     else:
         user = None
 
@@ -68,6 +57,14 @@ def require_user(request: Request, db: Session = Depends(get_db)) -> Users:
     payload = _decode_access_token(token)
     return _load_user_from_claims(payload, db)
 
+def require_principal(request: Request, db: Session = Depends(get_db)) -> Principal:
+    """Like require_user, but returns the cached principal: no query on a cache hit."""
+    payload = _decode_access_token(_get_bearer_token(request))
+    principal = get_principal(db, payload.get("sub")) if payload.get("sub") else None
+    if principal is None or not principal.is_active:
+        raise HTTPException(status_code=401, detail="User not found or inactive")
+    return principal
+
 # Optional helpers
 
 def current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[Users]:
@@ -82,13 +79,21 @@ def require_roles(roles: Iterable[str]) -> Callable:
     """Factory that returns a dependency enforcing one of the given role keys."""
     role_set = set(roles)
     def _dep(user: Users = Depends(require_user)) -> Users:
-        user_role_key = getattr(getattr(user, "role", None), "key", None)
-        if user_role_key not in role_set:
+        if _role_key(user) not in role_set:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
     return _dep
 
+def require_principal_roles(roles: Iterable[str]) -> Callable:
+    """require_roles for routes that only need the caller's id and role (no query on a cache hit)."""
+    role_set = set(roles)
+    def _dep(principal: Principal = Depends(require_principal)) -> Principal:
+        if principal.role not in role_set:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return principal
+    return _dep
+
 def require_admin(user: Users = Depends(require_user)) -> Users:
-    if getattr(getattr(user, "role", None), "key", None) != "admin":
+    if _role_key(user) != "admin":
         raise HTTPException(status_code=403, detail="Admin required")
-    return user
\ No newline at end of file
+    return user
@@ -87,6 +87,12 @@ class MediaConfig:
     MEDIUM_QUALITY: int = 85
     LARGE_QUALITY: int = 90
 
+    # Formats each uploaded image variant is stored in (JPEG is always
+    # produced; WEBP/AVIF are skipped if Pillow lacks the encoder)
+    IMAGE_VARIANT_FORMATS: List[str] = [
+        fmt.strip().upper() for fmt in os.getenv('IMAGE_VARIANT_FORMATS', 'JPEG,WEBP,AVIF').split(',') if fmt.strip()
+    ]
+
     # ============================================================================
     # STORAGE PATH STRUCTURE
     # ============================================================================
@@ -166,6 +172,15 @@ class MediaConfig:
     # Higher value = more lenient (similar images)
     DUPLICATE_HASH_THRESHOLD: int = 5
 
+    # What entity uploads do with a near-duplicate of the entity's existing
+    # media: 'reject' (409), 'flag' (store, moderation_status=flagged) or 'off'
+    DUPLICATE_UPLOAD_ACTION: str = os.getenv('DUPLICATE_UPLOAD_ACTION', 'flag').lower()
+
+    # Perceptual hash index snapshot (empty = rebuild from the media table
+    # on every start) and how often other processes' writes are picked up
+    MEDIA_HASH_INDEX_PATH: str = os.getenv('MEDIA_HASH_INDEX_PATH', '.cache/media_hash_index.json.gz')
+    MEDIA_HASH_INDEX_REFRESH_SECONDS: int = int(os.getenv('MEDIA_HASH_INDEX_REFRESH_SECONDS', '60'))
+
     # ============================================================================
     # VIDEO PROCESSING SETTINGS
     # ============================================================================
@@ -206,6 +221,16 @@ class MediaConfig:
     # Maximum concurrent uploads
     MAX_CONCURRENT_UPLOADS: int = 5
 
+    # ============================================================================
+    # PROCESSING WORKERS
+    # ============================================================================
+
+    # Worker processes for image decode/resize (0 = run on the I/O thread pool)
+    MEDIA_CPU_WORKERS: int = int(os.getenv('MEDIA_CPU_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+    # Threads for blocking storage writes/uploads and ffprobe/ffmpeg calls
+    MEDIA_IO_WORKERS: int = int(os.getenv('MEDIA_IO_WORKERS', '16'))
+
     # ============================================================================
     # CONTENT MODERATION SETTINGS
     # ============================================================================
@@ -4,95 +4,270 @@ config.security
 Centralized authentication helpers for FastAPI routes.
 
 This module defines:
-- JWT handling utilities (encode/decode)
+- JWT handling utilities (encode/decode), on the single PyJWT codec in src/utils.py
 - get_current_user()  → requires auth
 - get_current_user_optional()  → returns user or None if not logged in
+- get_token_claims()  → verified token claims only, no database access
+- get_current_principal()  → cached (id, user_id, email, role, status) of the caller
+
+Decoded tokens are kept in a small LRU keyed by the token string, so a client
+reusing its access token skips signature verification (expiry is still
+checked on every request). Principals are kept in a TTL/LRU cache that is
+invalidated when a Users row is committed (profile edits, role changes,
+suspension) and on logout; other worker processes see such changes within
+AUTH_PRINCIPAL_TTL_SECONDS.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
 
 from config.db import get_db
+from config.settings import (
+    ACCESS_TTL_MIN,
+    AUTH_PRINCIPAL_CACHE_SIZE,
+    AUTH_PRINCIPAL_TTL_SECONDS,
+    AUTH_TOKEN_CACHE_SIZE,
+    JWT_ALG,
+    JWT_ISS,
+    JWT_SECRET,
+)
 from model.user import Users  # adjust path if user model is elsewhere
-from jose import JWTError, jwt
-import os
-import logging
-from dotenv import load_dotenv
-from config.settings import JWT_SECRET, JWT_ALG, JWT_ISS
+from src.utils import decode_access_token, gen_token_urlsafe
 
 logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 # JWT CONFIG
 # ---------------------------------------------------------------------------
-load_dotenv()
 SECRET_KEY = JWT_SECRET
 ALGORITHM = JWT_ALG
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 * 24 * 7))  # 7 days default
+ACCESS_TOKEN_EXPIRE_MINUTES = ACCESS_TTL_MIN
 
 bearer_scheme = HTTPBearer(auto_error=True)
 bearer_scheme_optional = HTTPBearer(auto_error=False)
 
 
+# ---------------------------------------------------------------------------
+# CACHES
+# ---------------------------------------------------------------------------
+class _LRUCache:
+    """Thread-safe LRU with an optional per-entry TTL.
+
+    `version` increases on every invalidation; put() with a version read
+    before a database load is dropped if an invalidation happened meanwhile,
+    so a slow load cannot re-cache data that was just invalidated.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value, version: Optional[int] = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self.version += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+_claims_cache = _LRUCache(AUTH_TOKEN_CACHE_SIZE)
+_principal_cache = _LRUCache(AUTH_PRINCIPAL_CACHE_SIZE, AUTH_PRINCIPAL_TTL_SECONDS)
+
+
+def clear_auth_caches() -> None:
+    """Drop every cached token and principal (tests, key rotation)."""
+    _claims_cache.clear()
+    _principal_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # TOKEN HELPERS
 # ---------------------------------------------------------------------------
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    to_encode = {"typ": "access", "iat": int(now.timestamp()), "nbf": int(now.timestamp()),
+                 "jti": gen_token_urlsafe(18), **data}
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode["exp"] = int(expire.timestamp())
     if JWT_ISS:
         to_encode.setdefault("iss", JWT_ISS)
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-# verify_token() expects a JWT created by create_access_token() using the same SECRET_KEY and ALGORITHM
-def verify_token(token: str) -> str:
+def decode_token(token: str) -> Dict[str, Any]:
     """
-    Decode JWT and return the subject (user id).
-    Raise HTTP 401 for any auth problem.
+    Verified claims of an access token.
+
+    Tokens already verified by this process come from the decode cache;
+    their expiry and not-before times are re-checked on every call.
+
+    Raises:
+        jwt.PyJWTError: Invalid signature, expired, malformed, wrong issuer/type
     """
+    claims = _claims_cache.get(token)
+    if claims is None:
+        claims = decode_access_token(token, verify_iss=bool(JWT_ISS))
+        _claims_cache.put(token, claims)
+        return claims
+    now = time.time()
+    if claims["exp"] <= now:
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    if claims["nbf"] > now:
+        raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    return claims
+
+
+def _verified_claims(token: str) -> Dict[str, Any]:
+    """decode_token(), raising HTTP 401 for any auth problem."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Ensure these exist in your module:
-        # SECRET_KEY: str = "..." and ALGORITHM: str = "HS256" (or your algo)
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if JWT_ISS and payload.get("iss") != JWT_ISS:
-            raise credentials_exception
-        user_id = payload.get("sub")
-        if not user_id:
-            raise credentials_exception
-        return user_id
-    except JWTError:
+        claims = decode_token(token)
+    except jwt.PyJWTError:
         # Invalid signature, expired token, or malformed token
         raise credentials_exception
     except Exception as e:
         logging.getLogger("security").warning("JWT decode error: %s", e)
         raise credentials_exception
+    if not claims.get("sub"):
+        raise credentials_exception
+    return claims
+
+
+# verify_token() expects a JWT created by make_access_token()/create_access_token()
+def verify_token(token: str) -> str:
+    """
+    Decode JWT and return the subject (user id).
+    Raise HTTP 401 for any auth problem.
+    """
+    return _verified_claims(token)["sub"]
+
+
+# ---------------------------------------------------------------------------
+# PRINCIPALS
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as much as most authorization checks need."""
+    id: int
+    user_id: str
+    email: str
+    role: Optional[str]
+    status: str
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+
+def get_principal(db: Session, user_id: str) -> Optional[Principal]:
+    """Principal for a user's public id (users.user_id), cached; None if no such user."""
+    principal = _principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    version = _principal_cache.version
+    row = db.execute(
+        select(Users.id, Users.user_id, Users.email, Users.role, Users.status).where(Users.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    principal = Principal(*row)
+    _principal_cache.put(user_id, principal, version)
+    return principal
+
+
+def invalidate_principal(user_id: str) -> None:
+    """Forget a cached principal, e.g. on logout (committed Users updates do this automatically)."""
+    _principal_cache.invalidate(user_id)
+
+
+# Users changes are collected at flush time and applied once the session
+# commits, so a concurrent request cannot re-cache the pre-commit row for long.
+_PENDING_KEY = "auth_principal_pending"
+
+
+@event.listens_for(Users, "after_update")
+@event.listens_for(Users, "after_delete")
+def _queue_principal_invalidation(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals_after_commit(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_principal_invalidations_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
 
 # ---------------------------------------------------------------------------
 # DEPENDENCIES
 # ---------------------------------------------------------------------------
+def _user_from_claims(db: Session, claims: Dict[str, Any]) -> Optional[Users]:
+    uid = claims.get("uid")
+    if uid is not None:
+        user = db.get(Users, uid)
+        if user is not None and user.user_id == claims["sub"]:
+            return user
+        return None
+    return db.scalar(select(Users).where(Users.user_id == claims["sub"]))
+
+
 def get_current_user(db: Session = Depends(get_db), creds: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> Users:
     """Require valid JWT and return the user."""
-    token = creds.credentials
-    user_id = verify_token(token)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user = db.scalar(select(Users).where(Users.user_id == user_id))
+    user = _user_from_claims(db, _verified_claims(creds.credentials))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -106,12 +281,31 @@ def get_current_user_optional(
     if not creds:
         return None
 
-    token = creds.credentials
-    user_id = verify_token(token)
-    if not user_id:
-        return None
+    return _user_from_claims(db, _verified_claims(creds.credentials))
+
+
+def get_token_claims(creds: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> Dict[str, Any]:
+    """Require valid JWT and return its claims (sub, uid, email, ...) without touching the database."""
+    return _verified_claims(creds.credentials)
 
-    return db.scalar(select(Users).where(Users.user_id == user_id))
+
+def get_current_principal(
+    db: Session = Depends(get_db), creds: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> Principal:
+    """Require valid JWT and return the caller's principal (database only on a cache miss)."""
+    principal = get_principal(db, verify_token(creds.credentials))
+    if principal is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return principal
+
+
+def get_current_principal_optional(
+    db: Session = Depends(get_db), creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme_optional)
+) -> Optional[Principal]:
+    """Return the caller's principal if the token is valid, otherwise None."""
+    if not creds:
+        return None
+    return get_principal(db, verify_token(creds.credentials))
 
 
 # ---------------------------------------------------------------------------
@@ -130,23 +324,17 @@ def require_admin_or_self(
     if not creds:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    token = creds.credentials
-    caller_public_id = verify_token(token)
-    caller = db.scalar(select(Users).where(Users.public_id == caller_public_id))
+    caller = get_principal(db, verify_token(creds.credentials))
     if not caller:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid auth")
 
-    # Determine admin via role key, if relationship is present
-    role_key = getattr(getattr(caller, "role", None), "key", None)
-    is_admin = role_key == "admin"
-
     # If a target public_id is provided (from route path params), allow when self or admin
     if public_id is not None:
-        if is_admin or caller.public_id == str(public_id):
+        if caller.is_admin or caller.user_id == str(public_id):
             return True
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
     # No target id provided: only admins may proceed
-    if is_admin:
+    if caller.is_admin:
         return True
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin required")
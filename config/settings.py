@@ -1,5 +1,6 @@
 # config/settings.py
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -25,3 +26,103 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 # School Data API configuration
 # Using GreatSchools API (10,000 requests/month free)
 GREATSCHOOLS_API_KEY = os.getenv("GREATSCHOOLS_API_KEY", "")
+
+# Database connection pool configuration
+# One engine is shared per process by the API, the collection job executor
+# and background threads. Size it against MAX_TOTAL_CONCURRENT_JOBS plus the
+# expected number of concurrent API requests.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))    # seconds to wait for a connection
+
+# YOLO lot detection (services/yolo_registry.py)
+# Weights files to load and warm up at startup (comma-separated; empty = load on first use)
+YOLO_WARMUP_MODELS = [p.strip() for p in os.getenv("YOLO_WARMUP_MODELS", "").split(",") if p.strip()]
+YOLO_MAX_BATCH = int(os.getenv("YOLO_MAX_BATCH", 8))        # images per forward pass
+YOLO_MAX_WAIT_MS = int(os.getenv("YOLO_MAX_WAIT_MS", 20))   # how long a request waits for a batch to fill
+# Tiled inference for large site plans (services/tiled_inference.py); tile overlap
+# should exceed the largest lot so every lot lies wholly inside some tile
+YOLO_TILE_SIZE = int(os.getenv("YOLO_TILE_SIZE", 1024))
+YOLO_TILE_OVERLAP = int(os.getenv("YOLO_TILE_OVERLAP", 256))
+
+# Assignment of OCR lot numbers to detected boundaries (services/lot_matching.py):
+# "greedy" (each boundary in turn takes its best number) or "optimal" (Hungarian)
+LOT_MATCHING_MODE = os.getenv("LOT_MATCHING_MODE", "greedy")
+
+# Threads for per-contour feature extraction in MLSupervisedDetector.predict
+ML_FEATURE_WORKERS = int(os.getenv("ML_FEATURE_WORKERS", 1))
+
+# Few-shot lot patterns (services/few_shot_detector.py): one directory of .npz
+# pattern files per phase, and how many phases' detectors stay loaded
+FEW_SHOT_PATTERNS_DIR = os.getenv(
+    "FEW_SHOT_PATTERNS_DIR", os.path.join(tempfile.gettempdir(), "artitec_patterns")
+)
+FEW_SHOT_PHASE_CACHE_SIZE = int(os.getenv("FEW_SHOT_PHASE_CACHE_SIZE", 32))
+
+# Batch lot detection jobs (services/detection_jobs.py)
+DETECTION_JOBS_AUTOSTART = os.getenv("DETECTION_JOBS_AUTOSTART", "true").lower() == "true"
+DETECTION_JOB_WORKERS = int(os.getenv("DETECTION_JOB_WORKERS", 2))            # detection processes (0 = one thread)
+DETECTION_PREFETCH_WORKERS = int(os.getenv("DETECTION_PREFETCH_WORKERS", 4))  # concurrent site plan downloads
+DETECTION_JOB_POLL_INTERVAL = int(os.getenv("DETECTION_JOB_POLL_INTERVAL", 5))       # seconds
+DETECTION_JOB_LEASE_SECONDS = int(os.getenv("DETECTION_JOB_LEASE_SECONDS", 300))
+DETECTION_JOB_MAX_ATTEMPTS = int(os.getenv("DETECTION_JOB_MAX_ATTEMPTS", 3))         # claims before a stalled job fails
+DETECTION_JOB_EVENT_INTERVAL = float(os.getenv("DETECTION_JOB_EVENT_INTERVAL", 1.0))  # SSE progress poll (seconds)
+
+# PDF site plan rasterization (services/pdf_raster.py)
+PDF_RASTER_WORKERS = int(os.getenv("PDF_RASTER_WORKERS", 2))  # render processes (0 = render in the calling thread)
+PDF_RASTER_CACHE_DIR = os.getenv(
+    "PDF_RASTER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "artitec_raster_cache")
+)
+PDF_RASTER_CACHE_MAX_MB = int(os.getenv("PDF_RASTER_CACHE_MAX_MB", 4096))
+PDF_PREVIEW_MAX_SIDE = int(os.getenv("PDF_PREVIEW_MAX_SIDE", 1600))  # longest side of preview renders (pixels)
+
+# Lot number OCR (services/ocr_engine.py): raw tesseract output is cached by
+# image hash + preprocessing, so confidence/pattern changes never re-run OCR
+OCR_ROI_MODE = os.getenv("OCR_ROI_MODE", "full")  # "full" (whole image) or "regions" (packed text regions)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 2))       # tesseract processes per image in regions mode
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "artitec_ocr_cache"))
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", 256))
+
+# Full-text search (src/search_index.py): SQLite FTS5 index of communities,
+# builders and properties, kept in sync from ORM commits and updated_at
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(tempfile.gettempdir(), "artitec_search.db"))
+SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", 30))  # re-read rows changed elsewhere
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", 1000))  # ranked matches a list endpoint pages through
+SEARCH_FACET_LIMIT = int(os.getenv("SEARCH_FACET_LIMIT", 20))    # values per city/state facet
+SEARCH_PRICE_BANDS = [int(v) for v in os.getenv("SEARCH_PRICE_BANDS", "300000,500000,750000,1000000").split(",")]
+
+# Map search (src/geo.py): radius/viewport filters over the geohash columns of
+# properties and communities, with per-zoom marker clustering
+GEO_MAX_RADIUS_KM = float(os.getenv("GEO_MAX_RADIUS_KM", 200))
+GEO_MAX_CELLS = int(os.getenv("GEO_MAX_CELLS", 16))            # geohash cells (index ranges) per area filter
+GEO_MAX_RESULTS = int(os.getenv("GEO_MAX_RESULTS", 5000))      # nearest matches a list endpoint pages through
+GEO_CLUSTER_CELLS_PER_TILE = int(os.getenv("GEO_CLUSTER_CELLS_PER_TILE", 4))  # cluster cells across a 256px tile
+
+# Auth caches (config/security.py): verified access tokens and user principals
+# (id, role, status); principals are dropped on commit of a Users change and on
+# logout, and expire after the TTL so other workers pick changes up
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", 10000))
+AUTH_PRINCIPAL_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_TTL_SECONDS", 60))
+
+# Password hashing (src/password_hashing.py): a bounded pool off the request
+# threads; hashes at another scheme/cost are upgraded on the next login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")      # "bcrypt" or "argon2"
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", 12))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 3))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", 65536))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 4))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 16))  # running + queued; beyond this 429
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))   # seconds, Retry-After on 429
+
+# Admin dashboard statistics (src/metrics_rollup.py): daily per-entity rollups,
+# recounted for recent days by a background thread and rebuilt in full
+# periodically (so deletions of older rows are reflected)
+METRICS_ROLLUP_ENABLED = os.getenv("METRICS_ROLLUP_ENABLED", "true").lower() == "true"
+METRICS_ROLLUP_REFRESH_SECONDS = int(os.getenv("METRICS_ROLLUP_REFRESH_SECONDS", 60))
+METRICS_ROLLUP_RECENT_DAYS = int(os.getenv("METRICS_ROLLUP_RECENT_DAYS", 2))          # days recounted per refresh
+METRICS_ROLLUP_FULL_REBUILD_HOURS = int(os.getenv("METRICS_ROLLUP_FULL_REBUILD_HOURS", 24))
+METRICS_CACHE_TTL_SECONDS = int(os.getenv("METRICS_CACHE_TTL_SECONDS", 30))          # dashboard responses
@@ -1,5 +1,6 @@
 def load_all_models():
     import model.user                                    # noqa: F401
+    import model.password_reset                          # noqa: F401
     import model.profiles.buyer                          # noqa: F401
     import model.profiles.builder                        # noqa: F401
     import model.profiles.community                      # noqa: F401
@@ -10,4 +11,6 @@ def load_all_models():
     import model.followers                               # noqa: F401
     import model.media                                   # noqa: F401
     import model.collection                              # noqa: F401
+    import model.detection_job                           # noqa: F401
+    import model.metrics                                 # noqa: F401
     from src.collection.status_management.history import StatusHistory  # noqa: F401
\ No newline at end of file
@@ -6,7 +6,7 @@ Tracks collection jobs, detected changes, entity matches, and data sources.
 """
 from sqlalchemy import (
     Column, String, Integer, Float, Text, Boolean,
-    TIMESTAMP, JSON, ForeignKey, Enum as SQLEnum
+    TIMESTAMP, JSON, ForeignKey, Index, Enum as SQLEnum
 )
 from sqlalchemy.dialects.mysql import BIGINT as MyBIGINT
 from sqlalchemy.sql import func
@@ -154,6 +154,20 @@ class CollectionJob(Base):
         comment="Error details if job failed"
     )
 
+    # Scheduler lease (set when a worker claims the job)
+    lease_owner = Column(
+        String(100), nullable=True, index=True,
+        comment="Scheduler worker ID currently executing the job"
+    )
+    lease_expires_at = Column(
+        TIMESTAMP, nullable=True,
+        comment="Lease expiry; extended by worker heartbeats"
+    )
+    heartbeat_at = Column(
+        TIMESTAMP, nullable=True,
+        comment="Last heartbeat from the executing worker"
+    )
+
     # Metadata
     initiated_by = Column(
         String(50), nullable=True,
@@ -183,6 +197,32 @@ class CollectionJob(Base):
         return f"<CollectionJob(job_id='{self.job_id}', entity_type='{self.entity_type}', status='{self.status}')>"
 
 
+# ===================================================================
+# CollectionSchedulerLock Model
+# ===================================================================
+
+class CollectionSchedulerLock(Base):
+    """
+    Named row locks used to serialize job claiming across API processes.
+
+    The job scheduler locks the 'claim' row with SELECT ... FOR UPDATE while
+    it counts running jobs and claims pending ones, so per-entity-type
+    concurrency limits hold even when several uvicorn workers are running.
+    """
+    __tablename__ = "collection_scheduler_locks"
+
+    name = Column(String(50), primary_key=True)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<CollectionSchedulerLock(name='{self.name}')>"
+
+
 # ===================================================================
 # CollectionChange Model
 # ===================================================================
@@ -297,6 +337,12 @@ class CollectionChange(Base):
         TIMESTAMP, server_default=func.current_timestamp(), nullable=False
     )
 
+    __table_args__ = (
+        # Keyset pagination of the review queue, newest first (all / by status)
+        Index("ix_collection_changes_created_id", "created_at", "id"),
+        Index("ix_collection_changes_status_created_id", "status", "created_at", "id"),
+    )
+
     def __repr__(self):
         if self.is_new_entity:
             return f"<CollectionChange(entity_type='{self.entity_type}', new_entity, status='{self.status}')>"
@@ -0,0 +1,90 @@
+# model/detection_job.py
+"""
+SQLAlchemy models for batch lot detection jobs.
+
+A job runs lot detection over the site plans of several community phases
+(see services/detection_jobs.py). Each phase is one item whose result is
+stored as soon as it finishes, so progress survives restarts and can be
+polled or streamed while the job runs.
+"""
+from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, JSON, ForeignKey, Index
+from sqlalchemy.dialects.mysql import BIGINT as MyBIGINT
+from sqlalchemy.sql import func
+from model.base import Base
+import uuid
+import time
+
+
+def generate_detection_job_id() -> str:
+    """Generate unique detection job ID: DET-1732473600-ABC123"""
+    timestamp = int(time.time())
+    random_suffix = uuid.uuid4().hex[:6].upper()
+    return f"DET-{timestamp}-{random_suffix}"
+
+
+class LotDetectionJob(Base):
+    """Batch lot detection over the site plans of several phases."""
+    __tablename__ = "lot_detection_jobs"
+
+    job_id = Column(String(50), primary_key=True, default=generate_detection_job_id)
+
+    status = Column(
+        String(20), nullable=False, default='pending', index=True,
+        comment="pending, running, completed, failed, cancelled"
+    )
+    detection_method = Column(String(50), nullable=False, default='auto', comment="auto, yolo")
+    parameters = Column(JSON, nullable=True, comment="Detection parameters (min_area, confidence_threshold)")
+
+    # Progress
+    total_phases = Column(Integer, nullable=False, default=0)
+    completed_phases = Column(Integer, nullable=False, default=0)
+    failed_phases = Column(Integer, nullable=False, default=0)
+    lots_detected = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text, nullable=True)
+
+    # Runner lease (a job whose lease expires is picked up again)
+    attempts = Column(Integer, nullable=False, default=0, comment="Times the job has been claimed")
+    lease_owner = Column(String(100), nullable=True, index=True, comment="Runner ID currently executing the job")
+    lease_expires_at = Column(TIMESTAMP, nullable=True, comment="Lease expiry; extended while the job runs")
+
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp(), index=True)
+    started_at = Column(TIMESTAMP, nullable=True)
+    completed_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<LotDetectionJob(job_id='{self.job_id}', status='{self.status}', phases={self.total_phases})>"
+
+
+class LotDetectionJobItem(Base):
+    """Detection of one phase's site plan within a batch job."""
+    __tablename__ = "lot_detection_job_items"
+    __table_args__ = (
+        Index('ix_lot_detection_job_items_job_status', 'job_id', 'status'),
+    )
+
+    job_id = Column(
+        String(50), ForeignKey('lot_detection_jobs.job_id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    position = Column(Integer, primary_key=True, comment="Order of the phase in the request")
+    phase_id = Column(
+        MyBIGINT(unsigned=True),
+        ForeignKey("community_phases.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="References community_phases.id"
+    )
+    storage_path = Column(String(500), nullable=False, comment="Site plan key in object storage")
+
+    status = Column(
+        String(20), nullable=False, default='pending',
+        comment="pending, running, completed, failed, cancelled"
+    )
+    lots_detected = Column(Integer, nullable=True)
+    result = Column(JSON, nullable=True, comment="Detected lots (lot_number, coordinates, area, confidence)")
+    error_message = Column(Text, nullable=True)
+    started_at = Column(TIMESTAMP, nullable=True)
+    completed_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<LotDetectionJobItem(job_id='{self.job_id}', phase_id={self.phase_id}, status='{self.status}')>"
@@ -96,6 +96,8 @@ class Media(Base):
         Index('idx_media_uploaded_by', 'uploaded_by'),
         Index('idx_media_created_at', 'created_at'),
         Index('idx_media_public_id', 'public_id'),
+        # Perceptual hash index refresh (src/media_hash_index.py) re-reads recently changed rows
+        Index('idx_media_updated_at', 'updated_at'),
     )
 
     def __repr__(self):
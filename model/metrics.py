@@ -0,0 +1,26 @@
+# model/metrics.py
+"""
+SQLAlchemy model for the admin dashboard's daily rollups.
+
+One row counts the rows of an entity (users, builders, communities, ...)
+created on one day, per segment (the role for users, '' otherwise). The
+dashboard's totals and growth series are sums over these rows; see
+src/metrics_rollup.py for how they are kept current.
+"""
+from sqlalchemy import Column, String, Integer, Date, TIMESTAMP
+from sqlalchemy.sql import func
+from model.base import Base
+
+
+class MetricsDailyRollup(Base):
+    """Rows of one entity/segment created on one day."""
+    __tablename__ = "metrics_daily_rollups"
+
+    entity = Column(String(32), primary_key=True, comment="users, builders, communities, properties, posts, tours, documents")
+    day = Column(Date, primary_key=True, comment="DATE(created_at); 1970-01-01 for rows without created_at")
+    segment = Column(String(32), primary_key=True, default="", comment="Role for users, '' otherwise")
+    count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
+
+    def __repr__(self):
+        return f"<MetricsDailyRollup(entity='{self.entity}', day={self.day}, segment='{self.segment}', count={self.count})>"
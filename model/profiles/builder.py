@@ -106,12 +106,16 @@ class BuilderProfile(Base):
     inactivated_at = Column(TIMESTAMP, nullable=True)
     inactivation_reason = Column(String(255), nullable=True)
 
-    created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), nullable=False)
+    created_at = Column(
+        TIMESTAMP, server_default=func.current_timestamp(), nullable=False,
+        index=True  # dashboard rollups recount recently created rows
+    )
     updated_at = Column(
         TIMESTAMP,
         server_default=func.current_timestamp(),
         onupdate=func.current_timestamp(),
         nullable=False,
+        index=True,  # dedup index refresh scans recently changed rows
     )
 
     # Relationships
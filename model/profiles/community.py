@@ -3,9 +3,10 @@ from sqlalchemy import (
     Column, String, Integer, Text, Boolean, ForeignKey, TIMESTAMP, Date, JSON, Float, UniqueConstraint
 )
 from sqlalchemy.dialects.mysql import BIGINT as MyBIGINT
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from model.base import Base
+from src.geo import encode_geohash
 from model.profiles.builder import builder_communities
 
 
@@ -41,6 +42,7 @@ class Community(Base):
     total_acres = Column(Float)  # Total acreage of the community
     latitude = Column(Float)  # Latitude coordinate
     longitude = Column(Float)  # Longitude coordinate
+    geohash = Column(String(12), index=True)  # of latitude/longitude, kept by validate_coordinates (map search)
 
     # Finance
     community_dues = Column(String(64))
@@ -97,9 +99,13 @@ class Community(Base):
     data_source = Column(String(50), server_default='manual', nullable=False)  # Source of data: manual, collected, collected_manual
     data_confidence = Column(Float, server_default='1.0', nullable=False)  # Confidence score for collected data
 
-    created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), nullable=False)
+    created_at = Column(
+        TIMESTAMP, server_default=func.current_timestamp(), nullable=False,
+        index=True  # dashboard rollups recount recently created rows
+    )
     updated_at = Column(
-        TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
+        TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False,
+        index=True  # dedup index refresh scans recently changed rows
     )
 
     # Relationships
@@ -132,6 +138,14 @@ class Community(Base):
         lazy="selectin",
     )
 
+    @validates("latitude", "longitude")
+    def validate_coordinates(self, key, value):
+        """Keep geohash in step with the coordinates whenever either is set."""
+        latitude = value if key == "latitude" else self.latitude
+        longitude = value if key == "longitude" else self.longitude
+        self.geohash = encode_geohash(latitude, longitude)
+        return value
+
 
 # ---------- Related Tables ----------
 
@@ -1,12 +1,13 @@
 # model/property.py
 from sqlalchemy import (
-    Column, String, Integer, Float, Text, JSON, TIMESTAMP, ForeignKey, Numeric, Boolean
+    Column, String, Integer, Float, Text, JSON, TIMESTAMP, ForeignKey, Numeric, Boolean, Index
 )
 from sqlalchemy.dialects.mysql import BIGINT as MyBIGINT
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 from model.base import Base
+from src.geo import encode_geohash
 # Import association table from builder module (no circular import back from builder)
 from model.profiles.builder import builder_portfolio
 
@@ -37,6 +38,7 @@ class Property(Base):
     postal_code = Column(String(20), nullable=False)
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(String(12))  # of latitude/longitude, kept by validate_coordinates (map search)
 
     # Specs
     price = Column(Numeric(12, 2), nullable=False)
@@ -162,6 +164,27 @@ class Property(Base):
     primary_builder = relationship("BuilderProfile", foreign_keys=[builder_id], lazy="selectin", viewonly=True)
     community = relationship("Community", foreign_keys=[community_id], lazy="selectin", viewonly=True)
 
+    __table_args__ = (
+        # Keyset pagination: one (sort column, id) index per list_properties sort
+        Index("ix_properties_listed_at_id", "listed_at", "id"),
+        Index("ix_properties_price_id", "price", "id"),
+        Index("ix_properties_bedrooms_id", "bedrooms", "id"),
+        # Radius/viewport map search (src/geo.py)
+        Index("ix_properties_geohash", "geohash"),
+        # Dashboard rollups (src/metrics_rollup.py) recount recently created rows
+        Index("ix_properties_created_at", "created_at"),
+        # Search index refresh (src/search_index.py) re-reads recently changed rows
+        Index("ix_properties_updated_at", "updated_at"),
+    )
+
+    @validates('latitude', 'longitude')
+    def validate_coordinates(self, key, value):
+        """Keep geohash in step with the coordinates whenever either is set."""
+        latitude = value if key == 'latitude' else self.latitude
+        longitude = value if key == 'longitude' else self.longitude
+        self.geohash = encode_geohash(latitude, longitude)
+        return value
+
     @validates('builder_id')
     def validate_builder_id(self, key, value):
         """
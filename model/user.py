@@ -95,7 +95,7 @@ class UserCredential(Base):
 
     user_id = Column(MyBIGINT(unsigned=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     password_hash = Column(String(255), nullable=False)
-    password_algo = Column(SAEnum("bcrypt", name="password_algo"), nullable=False, default="bcrypt")
+    password_algo = Column(SAEnum("bcrypt", "argon2", name="password_algo"), nullable=False, default="bcrypt")
     last_password_change = Column(SADateTime)
 
     user = relationship("Users", back_populates="creds")
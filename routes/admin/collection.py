@@ -3,22 +3,23 @@ Admin Collection Routes
 
 API endpoints for managing data collection jobs.
 """
+import asyncio
 import logging
 import time
 import uuid
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
-from config.db import get_db
+from config.db import get_db, get_pool_stats
 from model.collection import CollectionJob, CollectionChange, EntityMatch, CollectionJobLog
 from model.property.property import Property
 from model.media import Media
 from schema.media import MediaOut
+from src.pagination import KeysetColumn, paginate, set_next_cursor
 from src.collection.job_executor import (
-    JobExecutor,
     create_community_collection_job,
     create_builder_collection_job,
     create_property_inventory_job,
@@ -676,6 +677,78 @@ async def get_collection_stats(
     )
 
 
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    # current_user = Depends(get_current_admin_user)
+):
+    """
+    Get database connection pool statistics.
+
+    Reports pool occupancy, checkout counts and wait times for the shared
+    engine used by the API and collection jobs, alongside the configured
+    job concurrency limit so the pool can be sized against it.
+    """
+    from config.collection_config import CollectionConfig
+
+    stats = get_pool_stats()
+    stats["max_total_concurrent_jobs"] = CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS
+    stats["pool_capacity"] = stats["pool_size"] + stats["max_overflow"]
+    return stats
+
+
+@router.get("/scheduler")
+async def get_scheduler_status(
+    # current_user = Depends(get_current_admin_user)
+):
+    """
+    Get collection job scheduler status for this API process.
+
+    Returns the worker ID, the jobs this process is executing and
+    claim/completion counters.
+    """
+    from src.collection.job_scheduler import get_job_scheduler
+
+    return get_job_scheduler().status()
+
+
+@router.get("/claude-cache")
+async def get_claude_cache_stats(
+    # current_user = Depends(get_current_admin_user)
+):
+    """
+    Get Claude response cache and request pipeline statistics for this API
+    process.
+
+    Per-job hit/miss/latency figures are written to each job's logs when it
+    finishes ("Claude usage" entry).
+    """
+    from src.collection.claude_cache import get_claude_cache
+    from src.collection.claude_pipeline import get_claude_pipeline
+
+    pipeline = get_claude_pipeline().status()
+    cache = get_claude_cache()
+    if cache is None:
+        return {"enabled": False, "pipeline": pipeline}
+
+    return {"enabled": True, "pipeline": pipeline, **cache.status()}
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_stats(
+    # current_user = Depends(get_current_admin_user)
+):
+    """
+    Get password hashing pool statistics for this API process.
+
+    Reports the configured scheme, pool size and queue bound, the hashes
+    currently running or queued, hash latency, queue wait and how many
+    calls were shed with 429.
+    """
+    from src.password_hashing import get_password_hasher
+
+    return get_password_hasher().status()
+
+
 @router.get("/jobs/{job_id}", response_model=CollectionJobResponse)
 async def get_collection_job(
     job_id: str,
@@ -793,21 +866,36 @@ async def execute_collection_job(
     # current_user = Depends(get_current_admin_user)
 ):
     """
-    Execute a collection job immediately.
+    Execute a pending collection job immediately.
 
-    Runs the collection job synchronously and returns the result.
+    The job is claimed by this process's job scheduler (with a lease, so no
+    other worker runs it too) and the request waits for it to finish.
+    Returns 400 if the job is not pending.
     """
+    from src.collection.job_scheduler import get_job_scheduler
+
     try:
-        executor = JobExecutor(db)
-        executor.execute_job(job_id)
+        run = await asyncio.to_thread(get_job_scheduler().claim_job, job_id)
+        if run is None:
+            job = db.query(CollectionJob).filter(CollectionJob.job_id == job_id).first()
+            if not job:
+                raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot execute job with status '{job.status}'. Only pending jobs can be executed."
+            )
+        await asyncio.wrap_future(run)
 
         # Reload job to get updated status
+        db.expire_all()
         job = db.query(CollectionJob).filter(
             CollectionJob.job_id == job_id
         ).first()
 
         return CollectionJobResponse.from_orm(job)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to execute job {job_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -843,58 +931,16 @@ async def start_job(
                 detail=f"Cannot start job with status '{job.status}'. Only pending jobs can be started."
             )
 
-        # Mark as running immediately
-        job.status = "running"
-        job.started_at = datetime.utcnow()
-        db.commit()
-
-        logger.info(f"⏳ Starting job {job_id} in background")
-
-        # Execute job in background thread
-        def execute_job_background():
-            """Execute job in background with proper error handling"""
-            from sqlalchemy import create_engine
-            from sqlalchemy.orm import sessionmaker
-            from config.settings import DB_URL
-
-            # Create new DB session for background thread
-            engine = create_engine(DB_URL, pool_pre_ping=True)
-            SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-            bg_db = SessionLocal()
-
-            try:
-                executor = JobExecutor(bg_db)
-                logger.info(f"🔵 Executing job {job_id} in background")
-                executor.execute_job(job_id)
-                logger.info(f"✅ Job {job_id} completed successfully")
-            except Exception as e:
-                error_message = str(e)
-                logger.error(f"❌ Job {job_id} failed: {error_message}", exc_info=True)
-
-                # Mark job as failed in database
-                try:
-                    failed_job = bg_db.query(CollectionJob).filter(
-                        CollectionJob.job_id == job_id
-                    ).first()
+        # Claimed by the job scheduler with a lease; it runs on the scheduler's pool
+        from src.collection.job_scheduler import get_job_scheduler
+        if get_job_scheduler().claim_job(job_id) is None:
+            db.refresh(job)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot start job with status '{job.status}'. Only pending jobs can be started."
+            )
 
-                    if failed_job and failed_job.status == "running":
-                        failed_job.status = "failed"
-                        failed_job.error_message = f"Execution failed: {error_message}"
-                        failed_job.completed_at = datetime.utcnow()
-                        bg_db.commit()
-                        logger.info(f"🔧 Marked job {job_id} as failed in database")
-                except Exception as db_err:
-                    logger.error(f"Failed to update job status for {job_id}: {db_err}")
-                    bg_db.rollback()
-            finally:
-                bg_db.close()
-                logger.info(f"🏁 Background thread finished for job {job_id}")
-
-        # Use threading to execute in background
-        import threading
-        thread = threading.Thread(target=execute_job_background)
-        thread.daemon = True
-        thread.start()
+        logger.info(f"⏳ Started job {job_id} in background")
 
         # Refresh job to get updated data
         db.refresh(job)
@@ -1169,19 +1215,22 @@ async def reset_stuck_jobs(
 
 @router.get("/changes", response_model=List[CollectionChangeResponse])
 async def list_changes(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status (pending, approved, rejected)"),
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
     is_new_entity: Optional[bool] = Query(None, description="Filter by new entity flag"),
     reviewed_by: Optional[str] = Query(None, description="Filter by reviewer user_id"),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
     # current_user = Depends(get_current_admin_user)
 ):
     """
     List detected changes for review.
 
-    Returns paginated list of changes that need admin review.
+    Returns paginated list of changes that need admin review, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     query = db.query(CollectionChange)
 
@@ -1194,9 +1243,13 @@ async def list_changes(
     if reviewed_by:
         query = query.filter(CollectionChange.reviewed_by == reviewed_by)
 
-    changes = query.order_by(
-        CollectionChange.created_at.desc()
-    ).limit(limit).offset(offset).all()
+    # (status, created_at, id) / (created_at, id) indexes back this order
+    changes, next_cursor = paginate(
+        query,
+        [KeysetColumn(CollectionChange.created_at, descending=True), KeysetColumn(CollectionChange.id, descending=True)],
+        "created_at_desc", limit, cursor=cursor, offset=offset,
+    )
+    set_next_cursor(response, next_cursor)
 
     return [CollectionChangeResponse.from_orm_with_db(change, db) for change in changes]
 
@@ -1620,7 +1673,6 @@ async def review_change(
                         logger.info(f"Using builder location for search: {search_query}")
                     # Last resort: Try to extract from address
                     elif address:
-                        import re
                         addr_match = re.search(r',\s*([A-Za-z\s]+),?\s*([A-Z]{2})', address)
                         if addr_match:
                             search_query = f"{addr_match.group(1).strip()}, {addr_match.group(2).strip()}"
@@ -1645,34 +1697,13 @@ async def review_change(
                         db.flush()
 
                         if community_job:
-                            # Commit the job to database first
                             db.commit()
 
-                            # Start the job immediately in background with a new DB session
-                            import threading
-                            from sqlalchemy.orm import sessionmaker
-                            from config.settings import DB_URL
-                            from sqlalchemy import create_engine
-
-                            def run_job():
-                                try:
-                                    # Create a new database session for the background thread
-                                    engine = create_engine(DB_URL)
-                                    SessionLocal = sessionmaker(bind=engine)
-                                    thread_db = SessionLocal()
-
-                                    try:
-                                        from src.collection.job_executor import JobExecutor
-                                        executor = JobExecutor(thread_db)
-                                        executor.execute_job(community_job.job_id)
-                                    finally:
-                                        thread_db.close()
-                                        engine.dispose()
-                                except Exception as e:
-                                    logger.error(f"Community discovery job failed: {e}")
-
-                            thread = threading.Thread(target=run_job, daemon=True)
-                            thread.start()
+                            # Start it now (claimed with a lease, like /jobs/{id}/start), even
+                            # when the scheduler is not auto-executing jobs. None means a
+                            # running scheduler already claimed it.
+                            from src.collection.job_scheduler import get_job_scheduler
+                            get_job_scheduler().claim_job(community_job.job_id)
 
                             logger.info(f"Started community discovery job {community_job.job_id} for orphaned builder")
 
@@ -2649,74 +2680,23 @@ async def execute_pending_jobs(
                 "message": "No pending jobs to execute"
             }
 
-        job_ids = []
-
-        # Start single job in background
-        for job in pending_jobs:
-            job_id = job.job_id
-            job_ids.append(job_id)
-
-            # Mark as running immediately
-            job.status = "running"
-            job.started_at = datetime.utcnow()
-
-            logger.info(f"⏳ Starting background execution for job {job_id} (sequential mode)")
-
-        db.commit()
-
-        # Execute jobs in background (after response is sent)
-        def execute_jobs_background():
-            """Execute jobs in background thread with proper error handling"""
-            from sqlalchemy import create_engine
-            from sqlalchemy.orm import sessionmaker
-            from config.settings import DB_URL
-
-            # Create new DB session for background thread
-            engine = create_engine(DB_URL, pool_pre_ping=True)
-            SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-            bg_db = SessionLocal()
-
-            try:
-                executor = JobExecutor(bg_db)
-                for job_id in job_ids:
-                    job_failed = False
-                    error_message = None
-
-                    try:
-                        logger.info(f"🔵 Executing job {job_id} in background")
-                        executor.execute_job(job_id)
-                        logger.info(f"✅ Job {job_id} completed successfully")
-                    except Exception as e:
-                        job_failed = True
-                        error_message = str(e)
-                        logger.error(f"❌ Background job {job_id} failed: {error_message}", exc_info=True)
-
-                        # Mark job as failed in database
-                        try:
-                            failed_job = bg_db.query(CollectionJob).filter(
-                                CollectionJob.job_id == job_id
-                            ).first()
-
-                            if failed_job and failed_job.status == "running":
-                                failed_job.status = "failed"
-                                failed_job.error_message = f"Background execution failed: {error_message}"
-                                failed_job.completed_at = datetime.utcnow()
-                                bg_db.commit()
-                                logger.info(f"🔧 Marked job {job_id} as failed in database")
-                        except Exception as db_err:
-                            logger.error(f"Failed to update job status for {job_id}: {db_err}")
-                            bg_db.rollback()
-            except Exception as thread_err:
-                logger.error(f"❌ Background thread crashed: {str(thread_err)}", exc_info=True)
-            finally:
-                bg_db.close()
-                logger.info(f"🏁 Background thread finished processing {len(job_ids)} job(s)")
-
-        # Use threading to execute in background
-        import threading
-        thread = threading.Thread(target=execute_jobs_background)
-        thread.daemon = True
-        thread.start()
+        # Claimed by the job scheduler with a lease; it runs on the scheduler's pool.
+        # If a dispatcher got to it first, it is already running there.
+        from src.collection.job_scheduler import get_job_scheduler
+        job_ids = [
+            job.job_id for job in pending_jobs
+            if get_job_scheduler().claim_job(job.job_id) is not None
+        ]
+        if not job_ids:
+            return {
+                "total_pending": db.query(CollectionJob).filter(
+                    CollectionJob.status == "pending"
+                ).count(),
+                "started": 0,
+                "job_ids": [],
+                "message": "Next pending job was already claimed by the job scheduler"
+            }
+        logger.info(f"⏳ Started job {job_ids[0]} in background (sequential mode)")
 
         total_pending = db.query(CollectionJob).filter(
             CollectionJob.status == "pending"
@@ -2846,13 +2826,8 @@ async def backfill_community_builders(
     """
     try:
         from sqlalchemy import text
-        from anthropic import Anthropic
+        from src.collection.claude_pipeline import ClaudeRequest, get_claude_pipeline
         from src.collection.prompts import generate_community_builders_prompt
-        import os
-        import json
-
-        # Initialize Claude client
-        anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
         # Check for existing pending builder discovery jobs to avoid duplicates
         pending_jobs = db.query(CollectionJob).filter(
@@ -2899,34 +2874,34 @@ async def backfill_community_builders(
         communities_processed = 0
         communities_with_errors = 0
 
+        # Ask Claude about all communities concurrently (bounded by the
+        # pipeline's concurrency and rate limits), then process in order
+        locations = [
+            f"{row.city}, {row.state}" if row.city and row.state else None
+            for row in communities_to_process
+        ]
+        for row, location in zip(communities_to_process, locations):
+            logger.info(f"Backfill: Discovering builders for {row.name} ({location})")
+
+        claude_results = await get_claude_pipeline().call_many_async([
+            ClaudeRequest(
+                generate_community_builders_prompt(row.name, location or ""),
+                max_tokens=4000,
+                temperature=0
+            )
+            for row, location in zip(communities_to_process, locations)
+        ])
+
         # Process each community
-        for row in communities_to_process:
+        for row, location, claude_result in zip(communities_to_process, locations, claude_results):
             community_name = row.name
-            location = f"{row.city}, {row.state}" if row.city and row.state else None
-
-            logger.info(f"Backfill: Discovering builders for {community_name} ({location})")
 
             try:
-                # Call Claude to find builders in this community
-                prompt = generate_community_builders_prompt(community_name, location or "")
-
-                message = anthropic_client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
-                    max_tokens=4000,
-                    temperature=0,
-                    messages=[{"role": "user", "content": prompt}]
-                )
+                if isinstance(claude_result, BaseException):
+                    raise claude_result
 
-                # Parse Claude's response
-                response_text = message.content[0].text
-
-                # Extract JSON from response
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response_text[json_start:json_end]
-                    collected_data = json.loads(json_str)
-                else:
+                collected_data = claude_result.data
+                if not isinstance(collected_data, dict) or "raw_response" in collected_data:
                     logger.warning(f"No JSON found in Claude response for {community_name}")
                     collected_data = {"builders": []}
 
@@ -18,7 +18,7 @@ from schema.auth import (
 )
 from src.schemas import RegisterIn, LoginIn, AuthOut, UserOut, RoleSelectionOut, OrgParseOut
 
-from src.utils import gen_public_id, gen_token_hex, hash_password, verify_password, make_access_token
+from src.utils import gen_public_id, gen_token_hex, hash_password, make_access_token, password_algo, verify_and_rehash_password
 from config.dependencies import require_user
 
 
@@ -42,6 +42,7 @@ router = APIRouter()
         401: {"description": "Unauthorized"},
         409: {"description": "Conflict - Email already in use"},
         422: {"description": "Unprocessable Entity - Validation error"},
+        429: {"description": "Too Many Requests - Password hashing is busy, retry later"},
         500: {"description": "Internal Server Error - Default user type not seeded or unexpected error"}
     },
     openapi_extra={"security": []}
@@ -84,9 +85,11 @@ def register(body: RegisterIn, request: Request, db: Session = Depends(get_db)):
     db.flush()
     logger.info("User created with id=%s, user_id=%s", u.id, u.user_id)
 
+    password_hash = hash_password(body.password)
     creds = UserCredential(
         user_id=u.id,
-        password_hash=hash_password(body.password),
+        password_hash=password_hash,
+        password_algo=password_algo(password_hash),
         last_password_change=datetime.utcnow()
     )
     db.add(creds)
@@ -156,6 +159,7 @@ def register(body: RegisterIn, request: Request, db: Session = Depends(get_db)):
         400: {"description": "Bad Request"},
         401: {"description": "Unauthorized - Invalid email or password"},
         422: {"description": "Unprocessable Entity - Validation error"},
+        429: {"description": "Too Many Requests - Password hashing is busy, retry later"},
         500: {"description": "Internal Server Error"}
     },
     openapi_extra={"security": []}
@@ -164,9 +168,15 @@ def login(body: LoginIn, request: Request, db: Session = Depends(get_db)):
     logger.info("Login attempt for email=%s", body.email)
     logger.debug("Handling /login request body: %s", body.dict(exclude={'password'}))
     u = db.query(Users).filter(Users.email == body.email, Users.status == "active").one_or_none()
-    if not u or not u.creds or not verify_password(body.password, u.creds.password_hash):
+    valid, new_hash = verify_and_rehash_password(body.password, u.creds.password_hash) if u and u.creds else (False, None)
+    if not valid:
         logger.warning("Invalid login attempt for email=%s", body.email)
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # Stored hash predates the configured scheme/cost; committed with the session below
+        u.creds.password_hash = new_hash
+        u.creds.password_algo = password_algo(new_hash)
+        logger.info("Rehashed password for user id=%s", u.id)
 
     refresh = gen_token_hex(32)
     sess = SessionToken(
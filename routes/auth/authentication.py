@@ -8,10 +8,11 @@ from sqlalchemy.orm import Session
 import logging
 
 from config.db import get_db
+from config.security import Principal, get_current_principal, invalidate_principal
 from config.settings import REFRESH_TTL_DAYS
 from model.user import Users, SessionToken, get_role_display_name
-from src.schemas import LoginIn, AuthOut, UserOut
-from src.utils import gen_token_hex, verify_password, make_access_token
+from src.schemas import LoginIn, LogoutIn, AuthOut, UserOut
+from src.utils import gen_token_hex, make_access_token, password_algo, verify_and_rehash_password
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ router = APIRouter()
         400: {"description": "Bad Request"},
         401: {"description": "Unauthorized - Invalid email or password"},
         422: {"description": "Unprocessable Entity - Validation error"},
+        429: {"description": "Too Many Requests - Password hashing is busy, retry later"},
         500: {"description": "Internal Server Error"}
     },
     openapi_extra={"security": []}
@@ -33,9 +35,15 @@ def login(body: LoginIn, request: Request, db: Session = Depends(get_db)):
     logger.info("Login attempt for email=%s", body.email)
     logger.debug("Handling /login request body: %s", body.dict(exclude={'password'}))
     u = db.query(Users).filter(Users.email == body.email, Users.status == "active").one_or_none()
-    if not u or not u.creds or not verify_password(body.password, u.creds.password_hash):
+    valid, new_hash = verify_and_rehash_password(body.password, u.creds.password_hash) if u and u.creds else (False, None)
+    if not valid:
         logger.warning("Invalid login attempt for email=%s", body.email)
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # Stored hash predates the configured scheme/cost; committed with the session below
+        u.creds.password_hash = new_hash
+        u.creds.password_algo = password_algo(new_hash)
+        logger.info("Rehashed password for user id=%s", u.id)
 
     refresh = gen_token_hex(32)
     sess = SessionToken(
@@ -74,3 +82,26 @@ def login(body: LoginIn, request: Request, db: Session = Depends(get_db)):
         refresh_token=refresh,
         requires_email_verification=not u.is_email_verified
     )
+
+
+@router.post(
+    "/logout",
+    status_code=204,
+    responses={
+        204: {"description": "Logged out"},
+        401: {"description": "Unauthorized"},
+    },
+)
+def logout(body: LogoutIn, principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
+    """
+    Revoke the given refresh session (or all of the caller's sessions) and
+    drop the caller's cached principal. Access tokens already issued stay
+    valid until they expire (ACCESS_TTL_MIN).
+    """
+    q = db.query(SessionToken).filter(SessionToken.user_id == principal.id, SessionToken.revoked_at.is_(None))
+    if body.refresh_token:
+        q = q.filter(SessionToken.refresh_token == body.refresh_token)
+    revoked = q.update({SessionToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    invalidate_principal(principal.user_id)
+    logger.info("Logout for user id=%s revoked %d session(s)", principal.id, revoked)
@@ -11,7 +11,7 @@ from config.db import get_db
 from config.settings import REFRESH_TTL_DAYS
 from model.user import Users, UserCredential, EmailVerification, SessionToken, Role, get_role_display_name
 from src.schemas import RegisterIn, AuthOut, UserOut
-from src.utils import gen_public_id, gen_token_hex, hash_password, make_access_token
+from src.utils import gen_public_id, gen_token_hex, hash_password, make_access_token, password_algo
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,7 @@ router = APIRouter()
         401: {"description": "Unauthorized"},
         409: {"description": "Conflict - Email already in use"},
         422: {"description": "Unprocessable Entity - Validation error"},
+        429: {"description": "Too Many Requests - Password hashing is busy, retry later"},
         500: {"description": "Internal Server Error - Default user type not seeded or unexpected error"}
     },
     openapi_extra={"security": []}
@@ -68,9 +69,11 @@ def register(body: RegisterIn, request: Request, db: Session = Depends(get_db)):
     db.flush()
     logger.info("User created with id=%s, user_id=%s", u.id, u.user_id)
 
+    password_hash = hash_password(body.password)
     creds = UserCredential(
         user_id=u.id,
-        password_hash=hash_password(body.password),
+        password_hash=password_hash,
+        password_algo=password_algo(password_hash),
         last_password_change=datetime.utcnow()
     )
     db.add(creds)
@@ -4,16 +4,19 @@ Provides dedicated routes for uploading media to different entity types with pro
 """
 
 import io
+from pathlib import Path
 from typing import Optional, List
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
 from sqlalchemy.orm import Session
 
 from config.db import get_db
+from config.media_config import MediaConfig
 from config.security import get_current_user
 from model.media import Media, MediaType, StorageType, ModerationStatus
 from model.user import Users
 from schema.media import MediaOut, MediaUploadResponse
 from src.id_generator import generate_public_id
+from src.media_hash_index import find_duplicate_media
 from src.media_processor import (
     MediaValidator,
     ImageProcessorEnhanced,
@@ -111,7 +114,7 @@ def validate_entity_access(
         return False
 
 
-def process_and_save_media(
+async def process_and_save_media(
     db: Session,
     file: UploadFile,
     entity_type: str,
@@ -167,6 +170,7 @@ def process_and_save_media(
     width, height = None, None
     image_hash = None
     metadata_json = {}
+    moderation_status = ModerationStatus.APPROVED
 
     if media_type_str == "image":
         # Process image
@@ -182,8 +186,23 @@ def process_and_save_media(
         if not is_valid_dims:
             raise HTTPException(status_code=400, detail=error_msg)
 
+        # Near-duplicate of this entity's existing media?
+        if MediaConfig.DUPLICATE_UPLOAD_ACTION != 'off':
+            duplicates = find_duplicate_media(db, image_hash, entity_type, entity_id)
+            if duplicates:
+                existing, distance = duplicates[0]
+                if MediaConfig.DUPLICATE_UPLOAD_ACTION == 'reject':
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Image is a near-duplicate of existing media {existing.public_id}"
+                    )
+                logger.info(f"Flagging near-duplicate of {existing.public_id} (distance {distance})")
+                metadata_json['duplicate_of'] = existing.public_id
+                metadata_json['duplicate_distance'] = distance
+                moderation_status = ModerationStatus.FLAGGED
+
         # Upload original
-        _, original_url = storage.save(
+        _, original_url = await storage.save(
             processed['original'],
             unique_filename,
             content_type,
@@ -194,7 +213,7 @@ def process_and_save_media(
         # Upload thumbnail
         if processed['thumbnail']:
             thumb_filename = f"{Path(unique_filename).stem}_thumb.jpg"
-            _, thumbnail_url = storage.save(
+            _, thumbnail_url = await storage.save(
                 processed['thumbnail'],
                 thumb_filename,
                 "image/jpeg",
@@ -205,7 +224,7 @@ def process_and_save_media(
         # Upload medium
         if processed['medium']:
             medium_filename = f"{Path(unique_filename).stem}_medium.jpg"
-            _, medium_url = storage.save(
+            _, medium_url = await storage.save(
                 processed['medium'],
                 medium_filename,
                 "image/jpeg",
@@ -216,7 +235,7 @@ def process_and_save_media(
         # Upload large
         if processed['large']:
             large_filename = f"{Path(unique_filename).stem}_large.jpg"
-            _, large_url = storage.save(
+            _, large_url = await storage.save(
                 processed['large'],
                 large_filename,
                 "image/jpeg",
@@ -228,7 +247,7 @@ def process_and_save_media(
         # For now, just upload the video as-is
         # TODO: Add video processing (thumbnails, compression)
         file_io = io.BytesIO(file_data)
-        _, original_url = storage.save(
+        _, original_url = await storage.save(
             file_io,
             unique_filename,
             content_type,
@@ -266,11 +285,11 @@ def process_and_save_media(
         caption=caption,
         is_primary=is_primary,
         tags=tags,
-        metadata=metadata_json,
+        file_metadata=metadata_json,
         uploaded_by=current_user['public_id'],
         is_public=True,
         is_approved=True,
-        moderation_status=ModerationStatus.APPROVED
+        moderation_status=moderation_status
     )
 
     db.add(media)
@@ -299,7 +318,7 @@ async def upload_user_avatar(
 
     logger.info(f"Uploading avatar for user {user_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "user", user_id, "avatar", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -331,7 +350,7 @@ async def upload_user_cover(
 
     logger.info(f"Uploading cover photo for user {user_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "user", user_id, "cover", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -361,7 +380,7 @@ async def upload_property_photos(
     """
     logger.info(f"Uploading photo for property {property_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "property", property_id, "gallery", current_user,
         alt_text=alt_text,
         caption=caption,
@@ -400,7 +419,7 @@ async def upload_builder_portfolio(
     # Parse tags
     tag_list = [t.strip() for t in tags.split(',')] if tags else None
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "builder", builder_id, "gallery", current_user,
         alt_text=alt_text,
         caption=caption,
@@ -461,7 +480,7 @@ async def upload_home_plan_photos(
 
     # Store home plan ID in the entity_id field using the media system
     # We'll use entity_type="home_plan" and entity_id=plan_id
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "home_plan", plan_id, "gallery", current_user,
         alt_text=alt_text or f"{home_plan.name} - {photo_type or 'photo'}",
         caption=caption,
@@ -495,7 +514,7 @@ async def upload_builder_logo(
 
     logger.info(f"Uploading logo for builder {builder_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "builder", builder_id, "avatar", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -526,7 +545,7 @@ async def upload_builder_cover(
 
     logger.info(f"Uploading cover photo for builder {builder_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "builder", builder_id, "cover", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -558,7 +577,7 @@ async def upload_community_logo(
 
     logger.info(f"Uploading logo for community {community_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "community", community_id, "avatar", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -589,7 +608,7 @@ async def upload_community_cover(
 
     logger.info(f"Uploading cover photo for community {community_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "community", community_id, "cover", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -622,7 +641,7 @@ async def upload_community_photos(
 
     logger.info(f"Uploading photo for community {community_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "community", community_id, "gallery", current_user,
         alt_text=alt_text,
         caption=caption,
@@ -657,7 +676,7 @@ async def upload_amenity_photos(
 
     logger.info(f"Uploading photo for amenity {amenity_id} in community {community_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "amenity", amenity_id, "gallery", current_user,
         alt_text=alt_text,
         caption=caption
@@ -689,7 +708,7 @@ async def upload_sales_rep_avatar(
 
     logger.info(f"Uploading avatar for sales rep {rep_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "sales_rep", rep_id, "avatar", current_user,
         alt_text=alt_text,
         is_primary=True
@@ -718,7 +737,7 @@ async def upload_post_media(
     """
     logger.info(f"Uploading media for post {post_id}")
 
-    media = process_and_save_media(
+    media = await process_and_save_media(
         db, file, "post", post_id, "gallery", current_user,
         alt_text=alt_text,
         caption=caption
@@ -759,7 +778,7 @@ async def batch_upload_media(
 
     for idx, file in enumerate(files):
         try:
-            media = process_and_save_media(
+            media = await process_and_save_media(
                 db, file, entity_type, entity_id, entity_field, current_user,
                 is_primary=(idx == 0)  # First image is primary
             )
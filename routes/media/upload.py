@@ -2,6 +2,8 @@
 Media upload endpoints - Handle file uploads and processing
 """
 
+import asyncio
+import io
 import uuid
 import os
 from pathlib import Path
@@ -17,6 +19,9 @@ from src.id_generator import generate_public_id
 from config.security import get_current_user
 from src.storage import get_storage_backend
 from src.media_processing import ImageProcessor, VideoProcessor
+from src.media_offload import process_image_variants, probe_video, run_cpu, run_io
+from src.image_variants import FORMATS as IMAGE_FORMATS
+from config.media_config import MediaConfig
 import logging
 
 logger = logging.getLogger(__name__)
@@ -132,6 +137,7 @@ def media_to_out(db: Session, media: Media) -> MediaOut:
         "caption": media.caption,
         "sort_order": media.sort_order,
         "source_url": media.source_url,
+        "metadata": media.file_metadata,
         "uploaded_by": media.uploaded_by,
         "is_public": media.is_public,
         "is_approved": media.is_approved,
@@ -200,113 +206,65 @@ async def upload_media(
         entity_field_value = entity_field.value if entity_field else None
 
         # Initialize URLs
-        original_url = None
-        thumbnail_url = None
-        medium_url = None
-        large_url = None
         video_processed_url = None
         width, height, duration = None, None, None
 
-        # Process based on type
+        # Process based on type. Decoding/resizing runs on the media process
+        # pool and ffprobe/ffmpeg on the I/O pool; the original and its
+        # variants are then uploaded concurrently.
         if is_image:
             logger.info("🖼️  Processing image...")
-            import io
 
-            # Get dimensions
-            width, height = ImageProcessor.get_image_dimensions(io.BytesIO(file_data))
+            # Get dimensions and generate all sizes (JPEG plus WebP/AVIF alternates)
+            processed = await run_cpu(process_image_variants, file_data, MediaConfig.IMAGE_VARIANT_FORMATS)
+            width, height = processed['width'], processed['height']
 
-            # Process image (generate all sizes)
-            processed = ImageProcessor.process_image(io.BytesIO(file_data), base_name)
+            uploads = {'original': (io.BytesIO(file_data), unique_filename, content_type)}
+            for variant, suffix in (('thumbnail', 'thumb'), ('medium', 'medium'), ('large', 'large')):
+                if processed[variant]:
+                    uploads[variant] = (io.BytesIO(processed[variant]), f"{base_name}_{suffix}.jpg", "image/jpeg")
+                for fmt, data in processed['alternates'].get(variant, {}).items():
+                    ext, mime = IMAGE_FORMATS[fmt]
+                    uploads[(variant, ext)] = (io.BytesIO(data), f"{base_name}_{suffix}.{ext}", mime)
 
-            # Upload original with organized path
-            storage_path, original_url = await storage.save(
-                processed['original'],
-                unique_filename,
-                content_type,
+        elif is_video:
+            logger.info("🎥 Processing video...")
+
+            # Get video metadata and thumbnail frame
+            probed = await run_io(probe_video, file_data, Path(file.filename).suffix)
+            width = probed['width']
+            height = probed['height']
+            duration = probed['duration']
+
+            uploads = {'original': (io.BytesIO(file_data), unique_filename, content_type)}
+            if probed['thumbnail']:
+                uploads['thumbnail'] = (io.BytesIO(probed['thumbnail']), f"{base_name}_thumb.jpg", "image/jpeg")
+
+            # TODO: Optionally compress video in background task
+            # For now, we'll just use the original
+
+        saved = await asyncio.gather(*(
+            storage.save(
+                data,
+                filename,
+                upload_content_type,
                 profile_id=profile_id,
                 entity_field=entity_field_value
             )
+            for data, filename, upload_content_type in uploads.values()
+        ))
+        saved = dict(zip(uploads, saved))
 
-            # Upload thumbnail
-            if processed['thumbnail']:
-                thumb_filename = f"{base_name}_thumb.jpg"
-                _, thumbnail_url = await storage.save(
-                    processed['thumbnail'],
-                    thumb_filename,
-                    "image/jpeg",
-                    profile_id=profile_id,
-                    entity_field=entity_field_value
-                )
-
-            # Upload medium
-            if processed['medium']:
-                medium_filename = f"{base_name}_medium.jpg"
-                _, medium_url = await storage.save(
-                    processed['medium'],
-                    medium_filename,
-                    "image/jpeg",
-                    profile_id=profile_id,
-                    entity_field=entity_field_value
-                )
-
-            # Upload large
-            if processed['large']:
-                large_filename = f"{base_name}_large.jpg"
-                _, large_url = await storage.save(
-                    processed['large'],
-                    large_filename,
-                    "image/jpeg",
-                    profile_id=profile_id,
-                    entity_field=entity_field_value
-                )
+        storage_path, original_url = saved['original']
+        thumbnail_url = saved['thumbnail'][1] if 'thumbnail' in saved else None
+        medium_url = saved['medium'][1] if 'medium' in saved else None
+        large_url = saved['large'][1] if 'large' in saved else None
 
-        elif is_video:
-            logger.info("🎥 Processing video...")
-            import tempfile
-
-            # Save video to temp file for processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_video:
-                temp_video.write(file_data)
-                temp_video_path = temp_video.name
-
-            try:
-                # Get video metadata
-                metadata = VideoProcessor.get_video_metadata(temp_video_path)
-                width = metadata.get('width')
-                height = metadata.get('height')
-                duration = metadata.get('duration')
-
-                # Upload original video with organized path
-                import io
-                storage_path, original_url = await storage.save(
-                    io.BytesIO(file_data),
-                    unique_filename,
-                    content_type,
-                    profile_id=profile_id,
-                    entity_field=entity_field_value
-                )
-
-                # Generate video thumbnail
-                thumb_filename = f"{base_name}_thumb.jpg"
-                temp_thumb_path = f"/tmp/{thumb_filename}"
-
-                if VideoProcessor.generate_video_thumbnail(temp_video_path, temp_thumb_path):
-                    with open(temp_thumb_path, 'rb') as thumb_file:
-                        _, thumbnail_url = await storage.save(
-                            thumb_file,
-                            thumb_filename,
-                            "image/jpeg",
-                            profile_id=profile_id,
-                            entity_field=entity_field_value
-                        )
-                    os.remove(temp_thumb_path)
-
-                # TODO: Optionally compress video in background task
-                # For now, we'll just use the original
-
-            finally:
-                # Clean up temp file
-                os.remove(temp_video_path)
+        # URLs of the WebP/AVIF alternates: {"medium": {"webp": url, ...}}
+        variant_formats = {}
+        for key, (_, url) in saved.items():
+            if isinstance(key, tuple):
+                variant_formats.setdefault(key[0], {})[key[1]] = url
 
         # Create media record in database
         media = Media(
@@ -325,6 +283,7 @@ async def upload_media(
             medium_url=medium_url,
             large_url=large_url,
             video_processed_url=video_processed_url,
+            file_metadata={'variant_formats': variant_formats} if variant_formats else None,
             entity_type=entity_type.value,
             entity_id=entity_id,
             entity_field=entity_field.value if entity_field else None,
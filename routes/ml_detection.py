@@ -3,6 +3,7 @@ ML Detection API Endpoints
 Provides endpoints for lot detection using various ML and CV methods
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Form, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
@@ -10,10 +11,13 @@ from pydantic import BaseModel, Field
 import cv2
 import numpy as np
 import io
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import tempfile
 
 from config.db import SessionLocal
+from config.settings import FEW_SHOT_PATTERNS_DIR, FEW_SHOT_PHASE_CACHE_SIZE
 from services.ocr_service import OCRService, LotNumberResult
 from services.boundary_detection import BoundaryDetectionService, BoundaryResult
 from services.line_lot_detector import LineLotDetector, LotPolygon
@@ -394,17 +398,30 @@ async def visualize_auto_detect(
 
 # ===== Few-Shot Learning Endpoints =====
 
-# Store for few-shot detectors (in production, use database or persistent storage)
-_few_shot_detectors: Dict[str, FewShotDetector] = {}
+# Few-shot detectors of recently used phases; the least recently used is
+# evicted (its patterns stay on disk and are reloaded on next use)
+_few_shot_detectors: "OrderedDict[str, FewShotDetector]" = OrderedDict()
+_few_shot_lock = threading.Lock()
 
 def get_few_shot_detector(phase_id: str) -> FewShotDetector:
     """Get or create few-shot detector for phase"""
-    if phase_id not in _few_shot_detectors:
-        patterns_dir = Path(tempfile.gettempdir()) / "artitec_patterns" / phase_id
-        _few_shot_detectors[phase_id] = FewShotDetector(
-            patterns_dir=str(patterns_dir),
-        )
-    return _few_shot_detectors[phase_id]
+    with _few_shot_lock:
+        detector = _few_shot_detectors.get(phase_id)
+        if detector is not None:
+            _few_shot_detectors.move_to_end(phase_id)
+            return detector
+
+    # Load the phase's patterns outside the lock
+    detector = FewShotDetector(
+        patterns_dir=str(Path(FEW_SHOT_PATTERNS_DIR) / phase_id),
+    )
+
+    with _few_shot_lock:
+        detector = _few_shot_detectors.setdefault(phase_id, detector)
+        _few_shot_detectors.move_to_end(phase_id)
+        while len(_few_shot_detectors) > FEW_SHOT_PHASE_CACHE_SIZE:
+            _few_shot_detectors.popitem(last=False)
+    return detector
 
 
 @router.post("/few-shot/train")
@@ -678,6 +695,7 @@ async def detect_lots_with_yolo(
     confidence_threshold: float = 0.25,
     min_area: float = 500.0,
     max_area: float = 50000.0,
+    tile_size: int = 0,
 ):
     """
     Detect lots using YOLOv8 deep learning segmentation
@@ -689,6 +707,8 @@ async def detect_lots_with_yolo(
         confidence_threshold: Minimum detection confidence (0-1)
         min_area: Minimum lot area in pixels
         max_area: Maximum lot area in pixels
+        tile_size: Detect in overlapping tiles of this size (0 = whole image);
+            use for large site plans with small lots
 
     Returns:
         Detected lots with high accuracy segmentation
@@ -702,7 +722,11 @@ async def detect_lots_with_yolo(
             max_area=max_area,
         )
 
-        result = detector.detect_from_array(image, confidence_threshold)
+        # Off the event loop, so concurrent requests share forward passes
+        if tile_size:
+            result = await run_in_threadpool(detector.detect_tiled, image, confidence_threshold, tile_size)
+        else:
+            result = await run_in_threadpool(detector.detect_from_array, image, confidence_threshold)
 
         return {
             "total_detections": result.total_detections,
@@ -742,6 +766,7 @@ async def detect_lots_yolo_from_minio(
     confidence_threshold: float = Form(0.25),
     min_area: float = Form(500.0),
     max_area: float = Form(50000.0),
+    tile_size: int = Form(0),
 ):
     """
     Detect lots from MinIO storage using YOLO
@@ -751,6 +776,8 @@ async def detect_lots_yolo_from_minio(
         confidence_threshold: Minimum confidence (0-1)
         min_area: Minimum lot area
         max_area: Maximum lot area
+        tile_size: Detect in overlapping tiles of this size (0 = whole image);
+            PDFs are then rendered tile by tile instead of as one 300 DPI page
 
     Returns:
         Detected lots
@@ -762,7 +789,9 @@ async def detect_lots_yolo_from_minio(
             max_area=max_area,
         )
 
-        result = detector.detect_from_minio(minio_path, confidence_threshold)
+        result = await run_in_threadpool(
+            detector.detect_from_minio, minio_path, confidence_threshold, tile_size or None
+        )
 
         return {
             "total_detections": result.total_detections,
@@ -818,7 +847,8 @@ async def visualize_yolo_detection(
             max_area=max_area,
         )
 
-        result = detector.detect_from_array(image, confidence_threshold)
+        # Off the event loop, so concurrent requests share forward passes
+        result = await run_in_threadpool(detector.detect_from_array, image, confidence_threshold)
 
         # Draw results on image
         vis_image = image.copy()
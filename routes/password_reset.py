@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from config.db import get_db
-from src.utils import hash_password
+from src.utils import hash_password, password_algo
 from model.user import Users, UserCredential
 from model.password_reset import PasswordResetToken
 from schema.password_reset import (
@@ -260,13 +260,14 @@ def reset_password(
 
     if user_cred:
         user_cred.password_hash = new_password_hash
+        user_cred.password_algo = password_algo(new_password_hash)
         user_cred.last_password_change = datetime.utcnow()
     else:
         # Create credentials if they don't exist (edge case)
         user_cred = UserCredential(
             user_id=user.id,
             password_hash=new_password_hash,
-            password_algo="bcrypt",
+            password_algo=password_algo(new_password_hash),
             last_password_change=datetime.utcnow()
         )
         db.add(user_cred)
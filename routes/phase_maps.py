@@ -3,7 +3,8 @@ Phase Map Detection API Endpoints
 Provides ML/AI lot detection endpoints for phase site plans
 Integrates with existing community phase endpoints
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Form, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Form, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
@@ -22,6 +23,13 @@ from services.auto_detect_service import AutoDetectService
 from services.yolo_detector import YOLODetector
 from services.ocr_service import OCRService
 from services.batch_processor import BatchProcessor, DetectionMethod
+from services.detection_jobs import (
+    cancel_detection_job,
+    create_detection_job,
+    get_detection_job_runner,
+    job_events,
+    job_snapshot,
+)
 from src.storage_service import storage_service
 
 
@@ -259,7 +267,7 @@ async def auto_detect_lots(
                 confidence_threshold=confidence_threshold,
                 min_area=min_area,
             )
-            result = detector.detect_from_array(image, confidence_threshold)
+            result = await run_in_threadpool(detector.detect_from_array, image, confidence_threshold)
             detected_lots = result.lots
 
         elif detection_method == "auto":
@@ -418,21 +426,24 @@ async def auto_detect_with_grid(
         )
 
 
-@router.post("/batch/auto-detect")
+@router.post("/batch/auto-detect", status_code=status.HTTP_202_ACCEPTED)
 async def batch_auto_detect(
     phase_ids: List[int] = Form(...),
     detection_method: str = Form("auto"),
     min_area: int = Form(1000),
     confidence_threshold: float = Form(0.25),
-    background_tasks: BackgroundTasks = None,
     db: Session = Depends(get_db),
 ):
     """
     Batch auto-detect lots across multiple phases
 
-    Returns job ID for tracking progress
+    Queues a detection job and returns its ID right away. Follow progress
+    with GET /batch/jobs/{job_id} or the event stream at
+    GET /batch/jobs/{job_id}/events.
     """
     try:
+        phase_ids = list(dict.fromkeys(phase_ids))
+
         # Verify all phases exist and have site plans
         phases = db.query(CommunityPhase).filter(CommunityPhase.id.in_(phase_ids)).all()
 
@@ -451,67 +462,87 @@ async def batch_auto_detect(
                 detail=f"Phases without site plans: {phases_without_maps}"
             )
 
-        # Create batch job
-        # Note: This is a simplified implementation
-        # In production, you'd use Celery or similar task queue
-
-        results = []
-        for phase in phases:
-            try:
-                # Download image
-                image_data = storage_service.download_file(phase.original_file_path or phase.site_plan_image_url.split('/')[-1])
-                nparr = np.frombuffer(image_data, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-                if image is None:
-                    results.append({
-                        "phase_id": phase.id,
-                        "status": "failed",
-                        "error": "Could not decode image"
-                    })
-                    continue
-
-                # Run detection
-                if detection_method == "yolo":
-                    detector = YOLODetector(
-                        confidence_threshold=confidence_threshold,
-                        min_area=min_area,
-                    )
-                    result = detector.detect_from_array(image, confidence_threshold)
-                    detected_lots = result.lots
-                else:
-                    service = AutoDetectService(min_area=min_area)
-                    detected_lots = service.detect_lots(image, use_ocr=True)
-
-                results.append({
-                    "phase_id": phase.id,
-                    "status": "success",
-                    "lots_detected": len(detected_lots)
-                })
-
-            except Exception as e:
-                results.append({
-                    "phase_id": phase.id,
-                    "status": "failed",
-                    "error": str(e)
-                })
+        phases_by_id = {p.id: p for p in phases}
+        job = create_detection_job(
+            db,
+            [
+                (phase_id, phases_by_id[phase_id].original_file_path
+                 or phases_by_id[phase_id].site_plan_image_url.split('/')[-1])
+                for phase_id in phase_ids
+            ],
+            detection_method="yolo" if detection_method == "yolo" else "auto",
+            parameters={"min_area": min_area, "confidence_threshold": confidence_threshold},
+        )
+
+        # Claimed by a runner started with DETECTION_JOBS_AUTOSTART, in this
+        # process or another; the request never starts one itself
+        get_detection_job_runner().notify()
 
         return {
-            "status": "completed",
+            "status": "pending",
+            "job_id": job.job_id,
             "total_phases": len(phase_ids),
-            "results": results,
             "detection_method": detection_method,
+            "status_url": f"/v1/phase-maps/batch/jobs/{job.job_id}",
+            "events_url": f"/v1/phase-maps/batch/jobs/{job.job_id}/events",
         }
 
     except HTTPException:
         raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch detection failed: {str(e)}"
         )
 
 
+@router.get("/batch/jobs/{job_id}")
+async def get_batch_job(
+    job_id: str,
+    include_lots: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Get batch detection job progress and per-phase results
+
+    Set include_lots to also return the detected lots of finished phases.
+    """
+    snapshot = job_snapshot(db, job_id, include_results=include_lots)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Detection job {job_id} not found"
+        )
+    return snapshot
+
+
+@router.get("/batch/jobs/{job_id}/events")
+async def stream_batch_job(job_id: str):
+    """
+    Stream batch detection job progress (server-sent events)
+
+    Emits a "phase" event per finished phase, "progress" events as the job
+    counters change, and a final "done" event.
+    """
+    return StreamingResponse(
+        job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch/jobs/{job_id}/cancel")
+async def cancel_batch_job(job_id: str, db: Session = Depends(get_db)):
+    """Cancel a pending or running batch detection job"""
+    if not cancel_detection_job(db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Detection job {job_id} not found or already finished"
+        )
+    return {"status": "cancelled", "job_id": job_id}
+
+
 # ===== Export Endpoint =====
 
 @router.get("/{phase_id}/export")
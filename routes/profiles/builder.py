@@ -10,9 +10,9 @@ Routes follow the buyer profile pattern: /{user_id} where user_id is the public_
 """
 from __future__ import annotations
 
-from typing import List, Optional, Sequence, Set
+from typing import List, Optional, Set
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import func, or_, text
 from sqlalchemy.orm import Session, selectinload
 from model.profiles.builder import (
@@ -28,6 +28,8 @@ except Exception:
 from model.user import Users
 from config.db import get_db
 from config.security import get_current_user_optional
+from src.pagination import KeysetColumn, paginate, paginate_ranked, set_next_cursor
+from src.search_index import BUILDER, ranked_search_ids, ranking_name
 
 try:
     from model.social.models import Follow  # for follower metrics
@@ -181,25 +183,28 @@ def list_my_builder_profiles(
 @router.get("/", response_model=List[BuilderProfileOut])
 def list_builder_profiles(
     *,
+    response: Response,
     db: Session = Depends(get_db),
     include: Optional[str] = Query(
         None,
         description="Comma-separated includes: properties,communities",
         examples=["properties,communities"],
     ),
-    q: Optional[str] = Query(None, description="Free-text search across common fields"),
+    q: Optional[str] = Query(None, description="Free-text search across common fields, best matches first"),
     specialty: Optional[str] = Query(None, description="Filter by a specialty tag"),
     city: Optional[str] = Query(None, description="Filter by city"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     current_user=Depends(get_current_user_optional),
 ):
     includes = _parse_include(include)
     query = db.query(BuilderModel)
     query = _apply_includes(query, includes)
 
-    # Text search across typical columns where available
-    if q:
+    # Ranked full-text search; ILIKE across typical columns until the search index is built
+    ranked = ranked_search_ids(BUILDER, q) if q else None
+    if q and ranked is None:
         ors = []
         for col_name in ("name", "about"):
             if hasattr(BuilderModel, col_name):
@@ -215,7 +220,15 @@ def list_builder_profiles(
     if city and hasattr(BuilderModel, "city"):
         query = query.filter(BuilderModel.city.ilike(f"%{city}%"))
 
-    rows: Sequence[BuilderModel] = query.offset(offset).limit(limit).all()
+    if ranked is not None:
+        rows, next_cursor = paginate_ranked(
+            query, BuilderModel.id, ranked, ranking_name(BUILDER, q), limit, cursor=cursor, offset=offset
+        )
+    else:
+        rows, next_cursor = paginate(
+            query, [KeysetColumn(BuilderModel.id)], "id_asc", limit, cursor=cursor, offset=offset
+        )
+    set_next_cursor(response, next_cursor)
     return [BuilderProfileOut.model_validate(r) for r in rows]
 
 
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Optional, Set, Sequence
+from typing import List, Optional, Set
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import or_
 from sqlalchemy.orm import Session, selectinload
 
 from config.db import get_db
 from config.security import get_current_user_optional
+from config.settings import GEO_MAX_RADIUS_KM
 from model.user import Users
 from model.profiles.community_admin_profile import CommunityAdminProfile
 from schema.user import UserOut
+from src.geo import area_from_params, cluster_markers, distance_ranking_name, geo_filter, nearest_ids
+from src.pagination import KeysetColumn, paginate, paginate_ranked, set_next_cursor
+from src.search_index import COMMUNITY, ranked_search_ids, ranking_name
 
 # --- SQLAlchemy models -------------------------------------------------------
 try:
@@ -112,20 +116,31 @@ def _apply_includes(q, include: Set[str]):
 @router.get("/", response_model=List[CommunityOut])
 def list_communities(
     *,
+    response: Response,
     db: Session = Depends(get_db),
     include: Optional[str] = Query(None, description="Comma-separated includes: amenities,events,builder_cards,admins,awards,threads,phases,builders"),
-    q: Optional[str] = Query(None, description="Search across name/about/city"),
+    q: Optional[str] = Query(None, description="Search across name/about/location, best matches first"),
     city: Optional[str] = Query(None, description="Filter by city"),
     postal_code: Optional[str] = Query(None, description="Filter by postal code"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Radius search center latitude"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Radius search center longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, le=GEO_MAX_RADIUS_KM, description="Radius search distance"),
+    bbox: Optional[str] = Query(None, description="Viewport as min_lat,min_lng,max_lat,max_lng"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     current_user=Depends(get_current_user_optional),
 ):
+    """
+    List communities: best matches first with `q`, nearest first with a radius
+    (`lat`/`lng`/`radius_km`) or viewport (`bbox`), otherwise by id.
+    """
     includes = _parse_include(include)
     query = db.query(CommunityModel)
-    query = _apply_includes(query, includes)
 
-    if q:
+    # Ranked full-text search; ILIKE until the search index is built
+    ranked = ranked_search_ids(COMMUNITY, q) if q else None
+    if q and ranked is None:
         ors = []
         for col in ("name", "about", "city"):
             if hasattr(CommunityModel, col):
@@ -138,10 +153,53 @@ def list_communities(
     if postal_code and hasattr(CommunityModel, "postal_code"):
         query = query.filter(CommunityModel.postal_code.ilike(f"%{postal_code}%"))
 
-    rows: Sequence[CommunityModel] = query.offset(offset).limit(limit).all()
+    nearest = None
+    area, center, radius = area_from_params(lat, lng, radius_km, bbox)
+    if area is not None:
+        query = query.filter(geo_filter(CommunityModel.geohash, CommunityModel.latitude, CommunityModel.longitude, area))
+        if ranked is None or radius is not None:
+            nearest = nearest_ids(query, CommunityModel.id, CommunityModel.latitude, CommunityModel.longitude,
+                                  center, radius)
+        if ranked is not None and radius is not None:
+            query = query.filter(CommunityModel.id.in_(nearest))  # inside the circle, not just its box
+
+    query = _apply_includes(query, includes)
+    if ranked is not None:
+        rows, next_cursor = paginate_ranked(
+            query, CommunityModel.id, ranked, ranking_name(COMMUNITY, q), limit, cursor=cursor, offset=offset
+        )
+    elif nearest is not None:
+        rows, next_cursor = paginate_ranked(
+            query, CommunityModel.id, nearest, distance_ranking_name(center, radius, area), limit,
+            cursor=cursor, offset=offset
+        )
+    else:
+        rows, next_cursor = paginate(
+            query, [KeysetColumn(CommunityModel.id)], "id_asc", limit, cursor=cursor, offset=offset
+        )
+    set_next_cursor(response, next_cursor)
     return [CommunityOut.model_validate(r) for r in rows]
 
 
+@router.get("/clusters")
+def cluster_communities(
+    *,
+    db: Session = Depends(get_db),
+    bbox: str = Query(..., description="Viewport as min_lat,min_lng,max_lat,max_lng"),
+    zoom: int = Query(..., ge=0, le=22, description="Web map zoom level"),
+):
+    """
+    Community map markers for a viewport, grouped into clusters sized to the zoom
+    level (geohash cell, count, mean position, and the id of single-community clusters).
+    """
+    area, _, _ = area_from_params(None, None, None, bbox)
+    query = db.query(CommunityModel).filter(
+        geo_filter(CommunityModel.geohash, CommunityModel.latitude, CommunityModel.longitude, area)
+    )
+    return cluster_markers(query, CommunityModel.id, CommunityModel.latitude, CommunityModel.longitude,
+                           CommunityModel.geohash, zoom)
+
+
 @router.get("/for-user/{user_id}", response_model=CommunityOut)
 def get_community_for_user(
     *,
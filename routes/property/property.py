@@ -1,10 +1,15 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session, selectinload
 
 from config.db import get_db
-from config.security import get_current_user
+from config.security import Principal, get_current_principal
+from config.settings import GEO_MAX_RADIUS_KM
+from src.geo import area_from_params, cluster_markers, distance_ranking_name, geo_filter, nearest_ids
+from src.pagination import KeysetColumn, paginate, paginate_ranked, set_next_cursor
+from src.search_index import PROPERTY, ranked_search_ids, ranking_name
 
 # Schemas (Pydantic)
 from schema.property import (
@@ -18,7 +23,6 @@ from schema.property import (
 
 # Models (SQLAlchemy)
 from model.property.property import Property  # correct import path
-from model.user import Users
 
 # Optional models (only used if present in your codebase)
 try:  # favorites/saves are optional; guarded to avoid import errors if not yet created
@@ -36,7 +40,7 @@ router = APIRouter()
 def create_property(
     payload: PropertyCreate,
     db: Session = Depends(get_db),
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Create a new property listing owned by the current user."""
     prop = Property(**payload.model_dump(exclude_none=True), owner_id=current_user.id)
@@ -49,11 +53,36 @@ def create_property(
 # ----------------------------------------------------------------------------
 # Read (list with filters)
 # ----------------------------------------------------------------------------
+def _apply_filters(q, city, state, min_price, max_price, min_beds, min_baths, builder_id, community_id, has_pool):
+    if city:
+        q = q.filter(Property.city.ilike(f"%{city}%"))
+    if state:
+        q = q.filter(Property.state.ilike(f"%{state}%"))
+    if min_price is not None:
+        q = q.filter(Property.price >= min_price)
+    if max_price is not None:
+        q = q.filter(Property.price <= max_price)
+    if min_beds is not None:
+        q = q.filter(Property.bedrooms >= min_beds)
+    if min_baths is not None:
+        q = q.filter(Property.bathrooms >= min_baths)
+    if builder_id is not None:
+        q = q.filter(Property.builder_id == builder_id)
+    if community_id is not None:
+        q = q.filter(Property.community_id == community_id)
+    if has_pool is not None:
+        q = q.filter(Property.has_pool == has_pool)
+    return q
+
+
 @router.get("/", response_model=List[PropertyOut])
 def list_properties(
+    response: Response,
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = Query(20, le=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    search: Optional[str] = Query(None, alias="q", description="Free-text search across title, description and address"),
     # Common filters
     city: Optional[str] = None,
     state: Optional[str] = None,
@@ -64,47 +93,113 @@ def list_properties(
     builder_id: Optional[int] = None,
     community_id: Optional[int] = None,
     has_pool: Optional[bool] = None,
-    sort: str = Query("listed_at_desc", pattern=r"^(listed_at|price|beds)_(asc|desc)$"),
+    # Map search: a radius around a point, or a viewport
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Radius search center latitude"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Radius search center longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, le=GEO_MAX_RADIUS_KM, description="Radius search distance"),
+    bbox: Optional[str] = Query(None, description="Viewport as min_lat,min_lng,max_lat,max_lng"),
+    sort: Optional[str] = Query(None, pattern=r"^(relevance|distance|(listed_at|price|beds)_(asc|desc))$"),
 ):
     """List properties with basic search and filters.
 
     Sort options: `listed_at_desc` (default), `listed_at_asc`, `price_asc`, `price_desc`,
-    `beds_asc`, `beds_desc`.
+    `beds_asc`, `beds_desc`. Ties are broken by id, so every sort is a stable total order.
+    With `q`, results default to `relevance` (best matches first); the other sorts
+    order the best SEARCH_MAX_RESULTS matches instead.
+
+    Map search: `lat`/`lng`/`radius_km` or `bbox` limit results to an area, nearest
+    first (`distance`, from the point or the viewport's center) unless `q` or another
+    sort is given. With a radius, the other sorts order the nearest GEO_MAX_RESULTS.
+
+    Pagination: pass the previous response's `X-Next-Cursor` header as `cursor`
+    (the header is omitted on the last page). `skip` still works for older clients.
     """
     q = db.query(Property)
 
-    if city:
-        q = q.filter(Property.city.ilike(f"%{city}%"))
-    if state:
-        q = q.filter(Property.state.ilike(f"%{state}%"))
-    if min_price is not None:
-        q = q.filter(Property.price >= min_price)
-    if max_price is not None:
-        q = q.filter(Property.price <= max_price)
-    if min_beds is not None:
-        q = q.filter(Property.bedrooms >= min_beds)
-    if min_baths is not None:
-        q = q.filter(Property.bathrooms >= min_baths)
-    if builder_id is not None:
-        q = q.filter(Property.builder_id == builder_id)
-    if community_id is not None:
-        q = q.filter(Property.community_id == community_id)
-    if has_pool is not None:
-        q = q.filter(Property.has_pool == has_pool)
+    ranked = None
+    if search:
+        ranked = ranked_search_ids(PROPERTY, search)
+        if ranked is None:  # search index not built yet
+            q = q.filter(or_(Property.title.ilike(f"%{search}%"), Property.description.ilike(f"%{search}%"),
+                             Property.city.ilike(f"%{search}%")))
+        elif sort not in (None, "relevance"):
+            q = q.filter(Property.id.in_(ranked))
+
+    area, center, radius = area_from_params(lat, lng, radius_km, bbox)
+    if area is None and sort == "distance":
+        raise HTTPException(status_code=400, detail="sort=distance needs lat/lng/radius_km or bbox")
+    sort = sort or ("relevance" if search else "distance" if area else "listed_at_desc")
+
+    q = _apply_filters(q, city, state, min_price, max_price, min_beds, min_baths, builder_id, community_id, has_pool)
+    if area is not None:
+        # Geohash index ranges over the area's box, then exact bounds
+        q = q.filter(geo_filter(Property.geohash, Property.latitude, Property.longitude, area))
+        if sort == "distance" or radius is not None:
+            nearest = nearest_ids(q, Property.id, Property.latitude, Property.longitude, center, radius)
+            if sort == "distance":
+                items, next_cursor = paginate_ranked(
+                    q, Property.id, nearest, distance_ranking_name(center, radius, area), limit,
+                    cursor=cursor, offset=skip
+                )
+                set_next_cursor(response, next_cursor)
+                return items
+            q = q.filter(Property.id.in_(nearest))  # inside the circle, not just its box
+
+    if sort == "relevance":
+        if ranked is not None:
+            items, next_cursor = paginate_ranked(
+                q, Property.id, ranked, ranking_name(PROPERTY, search), limit, cursor=cursor, offset=skip
+            )
+            set_next_cursor(response, next_cursor)
+            return items
+        sort = "listed_at_desc"
 
     field, direction = sort.rsplit("_", 1)
-    order_col = {
-        "listed_at": getattr(Property, "listed_at", getattr(Property, "created_at")),
-        "price": Property.price,
-        "beds": Property.bedrooms,
+    descending = direction == "desc"
+    sort_col = {
+        "listed_at": KeysetColumn(getattr(Property, "listed_at", getattr(Property, "created_at")), descending, nullable=True),
+        "price": KeysetColumn(Property.price, descending),
+        "beds": KeysetColumn(Property.bedrooms, descending),
     }[field]
-    if direction == "desc":
-        order_col = order_col.desc()
 
-    items = q.order_by(order_col).offset(skip).limit(limit).all()
+    # Each sort is backed by a (sort column, id) index on properties
+    items, next_cursor = paginate(
+        q, [sort_col, KeysetColumn(Property.id, descending)], sort, limit, cursor=cursor, offset=skip
+    )
+    set_next_cursor(response, next_cursor)
     return items
 
 
+# ----------------------------------------------------------------------------
+# Read (map marker clusters)
+# ----------------------------------------------------------------------------
+@router.get("/clusters")
+def cluster_properties(
+    db: Session = Depends(get_db),
+    bbox: str = Query(..., description="Viewport as min_lat,min_lng,max_lat,max_lng"),
+    zoom: int = Query(..., ge=0, le=22, description="Web map zoom level"),
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_beds: Optional[int] = None,
+    min_baths: Optional[float] = None,
+    builder_id: Optional[int] = None,
+    community_id: Optional[int] = None,
+    has_pool: Optional[bool] = None,
+):
+    """Property map markers for a viewport, grouped into clusters sized to the zoom level.
+
+    Each cluster has its geohash cell, property count, mean position, and the
+    property id when it holds a single property. Takes the list endpoint's filters.
+    """
+    area, _, _ = area_from_params(None, None, None, bbox)
+    q = _apply_filters(db.query(Property), city, state, min_price, max_price, min_beds, min_baths,
+                       builder_id, community_id, has_pool)
+    q = q.filter(geo_filter(Property.geohash, Property.latitude, Property.longitude, area))
+    return cluster_markers(q, Property.id, Property.latitude, Property.longitude, Property.geohash, zoom)
+
+
 # ----------------------------------------------------------------------------
 # Read (by id)
 # ----------------------------------------------------------------------------
@@ -156,7 +251,7 @@ def update_property(
     property_id: int,
     payload: PropertyUpdate,
     db: Session = Depends(get_db),
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     prop = db.query(Property).filter(Property.id == property_id).first()
     if not prop:
@@ -181,7 +276,7 @@ def update_property(
 def delete_property(
     property_id: int,
     db: Session = Depends(get_db),
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     prop = db.query(Property).filter(Property.id == property_id).first()
     if not prop:
@@ -203,7 +298,7 @@ if FavoriteProperty is not None:  # type: ignore
     def toggle_favorite_property(
         property_id: int,
         db: Session = Depends(get_db),
-        current_user: Users = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_principal),
     ):
         prop = db.query(Property).filter(Property.id == property_id).first()
         if not prop:
@@ -230,7 +325,7 @@ if FavoriteProperty is not None:  # type: ignore
     @router.get("/me/favorites", response_model=List[PropertyOut])
     def list_my_favorite_properties(
         db: Session = Depends(get_db),
-        current_user: Users = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_principal),
     ):
         # Join FavoriteProperty -> Property
         subq = (
@@ -0,0 +1,53 @@
+# routes/search.py
+"""
+Search API Routes
+
+Ranked full-text search over communities, builders and properties, served
+from the search index (src/search_index.py) with facet counts for filters.
+"""
+
+from dataclasses import asdict
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from config.settings import SEARCH_INDEX_ENABLED
+from src.search_index import KINDS, get_search_index, search_ready
+
+router = APIRouter()
+
+
+@router.get("")
+def search(
+    q: str = Query(..., min_length=1, description="Search text; terms match as prefixes and tolerate typos"),
+    kind: str = Query("community", pattern=f"^({'|'.join(KINDS)})$", description="What to search"),
+    city: Optional[str] = Query(None, description="Only results in this city (facet value)"),
+    state: Optional[str] = Query(None, description="Only results in this state (facet value)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    facets: bool = Query(True, description="Include city/state/price band counts"),
+):
+    """
+    Search communities, builders or properties, best matches first.
+
+    Returns the matching entities (id, public id, name, location, price), the
+    total match count, facet counts over all matches, and any typo corrections
+    that were applied.
+
+    Example:
+        GET /v1/search?q=higlands austin&kind=community&facets=true
+    """
+    if not SEARCH_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="Search is disabled")
+    index = get_search_index()
+    if not search_ready(kind, index):
+        raise HTTPException(status_code=503, detail="Search index is still being built; try again shortly")
+
+    result = index.search(kind, q, limit=limit, offset=offset, city=city, state=state, facets=facets)
+    return {
+        "kind": kind,
+        "total": result.total,
+        "results": [asdict(hit) for hit in result.hits],
+        "facets": result.facets,
+        "corrections": result.corrections,
+    }
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from config.db import get_db
 from schema.social import PostCreate, PostResponse, CommentCreate, CommentResponse
 from model.social import Post, Comment, Like, Follow
-from config.security import get_current_user
-from model.user import Users
+from config.security import Principal, get_current_principal
+from src.pagination import KeysetColumn, paginate, set_next_cursor
 
 router = APIRouter(
     prefix="/v1/social",
@@ -18,7 +18,7 @@ router = APIRouter(
 # --------------------------
 
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
-def create_post(payload: PostCreate, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def create_post(payload: PostCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """Create a new post."""
     post = Post(
         user_id=current_user.user_id,
@@ -32,9 +32,20 @@ def create_post(payload: PostCreate, db: Session = Depends(get_db), current_user
 
 
 @router.get("/posts", response_model=List[PostResponse])
-def list_posts(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
-    """List recent posts."""
-    posts = db.query(Post).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+def list_posts(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """List recent posts, newest first. Pass X-Next-Cursor back as `cursor` for the next page."""
+    posts, next_cursor = paginate(
+        db.query(Post),
+        [KeysetColumn(Post.created_at, descending=True), KeysetColumn(Post.id, descending=True)],
+        "created_at_desc", limit, cursor=cursor, offset=skip,
+    )
+    set_next_cursor(response, next_cursor)
     return posts
 
 
@@ -48,7 +59,7 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(post_id: int, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def delete_post(post_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """Delete a post."""
     post = db.query(Post).filter(Post.id == post_id, Post.user_id == current_user.user_id).first()
     if not post:
@@ -63,7 +74,7 @@ def delete_post(post_id: int, db: Session = Depends(get_db), current_user: Users
 # --------------------------
 
 @router.post("/posts/{post_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
-def create_comment(post_id: int, payload: CommentCreate, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def create_comment(post_id: int, payload: CommentCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """Comment on a post."""
     post = db.query(Post).filter(Post.id == post_id).first()
     if not post:
@@ -91,7 +102,7 @@ def list_comments(post_id: int, db: Session = Depends(get_db)):
 # --------------------------
 
 @router.post("/posts/{post_id}/like", status_code=status.HTTP_200_OK)
-def like_post(post_id: int, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def like_post(post_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """Like or unlike a post."""
     post = db.query(Post).filter(Post.id == post_id).first()
     if not post:
@@ -115,7 +126,7 @@ def like_post(post_id: int, db: Session = Depends(get_db), current_user: Users =
 # --------------------------
 
 @router.post("/users/{user_id}/follow", status_code=status.HTTP_200_OK)
-def follow_user(user_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def follow_user(user_id: str, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """Follow or unfollow a user."""
     if current_user.user_id == user_id:
         raise HTTPException(status_code=400, detail="You cannot follow yourself")
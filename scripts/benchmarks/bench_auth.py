@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark Auth Dependencies
+
+Times the per-request cost of authenticating a bearer token. The old path is
+a python-jose decode followed by a SELECT of the Users row. The new paths
+are the dependencies in config/security.py: get_current_user (cached decode
+plus the row load), get_current_principal (cached decode and principal; no
+query on a hit) and get_token_claims (claims only, no database). The cold
+principal case clears the principal cache before every request. Runs on a
+seeded users table in a scratch SQLite file, cycling through --tokens users.
+
+Usage:
+    python scripts/benchmarks/bench_auth.py
+    python scripts/benchmarks/bench_auth.py --users 100000 --tokens 500 --requests 20000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt as jose_jwt
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from config.security import (
+    _principal_cache,
+    clear_auth_caches,
+    get_current_principal,
+    get_current_user,
+    get_token_claims,
+)
+from config.settings import JWT_ALG, JWT_ISS, JWT_SECRET
+from model import load_all_models
+from model.user import Users
+from src.utils import make_access_token
+
+load_all_models()
+
+
+def seed(engine, users: int):
+    with engine.begin() as conn:
+        conn.execute(CreateTable(Users.__table__, if_not_exists=True))
+        # Principal lookups go through the unique user_id index, as on MySQL
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_user_id ON users (user_id)"))
+        if conn.execute(select(func.count(Users.id))).scalar() == users:
+            return
+        conn.execute(Users.__table__.delete())
+        conn.execute(Users.__table__.insert(), [
+            {"id": i, "user_id": f"USR-{i:08d}", "email": f"user{i}@example.com", "first_name": "First",
+             "last_name": "Last", "role": "admin" if i % 50 == 0 else "buyer", "status": "active"}
+            for i in range(1, users + 1)
+        ])
+
+
+def old_require_user(db, token):
+    """config/dependencies.require_user before the shared auth layer."""
+    payload = jose_jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG], issuer=JWT_ISS or None,
+                              options={"verify_aud": False})
+    return db.get(Users, payload["uid"])
+
+
+def run(name, fn, creds, requests):
+    fn(creds[0])  # warm up
+    start = time.perf_counter()
+    for i in range(requests):
+        fn(creds[i % len(creds)])
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34} {elapsed / requests * 1e6:9.1f} us/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="Rows in the users table")
+    parser.add_argument("--tokens", type=int, default=500, help="Distinct callers (tokens) to cycle through")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests timed per path")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Directory for the scratch SQLite file")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{Path(args.dir) / f'artitec_bench_auth_{args.users}.db'}")
+    seed(engine, args.users)
+    step = max(args.users // args.tokens, 1)
+    creds = [
+        HTTPAuthorizationCredentials(scheme="Bearer",
+                                     credentials=make_access_token(f"USR-{i:08d}", i, f"user{i}@example.com"))
+        for i in range(1, args.users + 1, step)
+    ][:args.tokens]
+
+    print(f"{args.users:,} users, {len(creds)} callers, {args.requests:,} requests per path\n")
+    # A fresh session per request, as get_db() gives each request its own
+    Session = sessionmaker(bind=engine)
+
+    def per_request(dep):
+        def call(c):
+            with Session() as db:
+                return dep(db, c)
+        return call
+
+    clear_auth_caches()
+    run("before: jose decode + SELECT user", per_request(lambda db, c: old_require_user(db, c.credentials)),
+        creds, args.requests)
+    run("get_current_user", per_request(lambda db, c: get_current_user(db=db, creds=c)), creds, args.requests)
+
+    def cold_principal(db, c):
+        _principal_cache.clear()
+        return get_current_principal(db=db, creds=c)
+
+    run("get_current_principal (cold)", per_request(cold_principal), creds, args.requests)
+    run("get_current_principal (cached)", per_request(lambda db, c: get_current_principal(db=db, creds=c)),
+        creds, args.requests)
+    run("get_token_claims (no DB)", lambda c: get_token_claims(creds=c), creds, args.requests)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
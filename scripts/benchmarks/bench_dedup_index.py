@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark Duplicate Detection Index
+
+Compares fuzzy builder matching through the in-memory trigram index against
+the full-table scan duplicate detection used to do, on synthetic builder
+sets (10k / 100k / 1M by default). No database is needed: the scan baseline
+runs the same location check and SequenceMatcher scoring over every row.
+
+Usage:
+    python scripts/benchmarks/bench_dedup_index.py
+    python scripts/benchmarks/bench_dedup_index.py --sizes 10000 100000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.collection.dedup_index import DedupEntry, DedupIndex
+from src.collection.duplicate_detection import (
+    _location_candidates,
+    _rank_fuzzy,
+    calculate_similarity,
+)
+
+PREFIXES = ["Perry", "Highland", "Coventry", "David Weekley", "Toll", "Lennar", "Pulte", "Taylor",
+            "Ashton", "Drees", "Chesmar", "Newmark", "Brightland", "Tri Pointe", "Shea", "Meritage",
+            "Castle", "Oak", "Cedar", "River", "Summit", "Legacy", "Heritage", "Stone", "Eagle"]
+SUFFIXES = ["Homes", "Builders", "Custom Homes", "Construction", "Residential", "Communities",
+            "Design Build", "Group", "Homes LLC", "Home Co"]
+STATES = ["TX", "CA", "FL", "AZ", "NC", "GA", "CO", "TN", "NV", "WA", "OH", "VA", "UT", "SC", "ID"]
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 8))).capitalize()
+
+
+def make_entries(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    cities = {state: [_random_word(rng) for _ in range(40)] for state in STATES}
+    entries = []
+    for i in range(1, count + 1):
+        state = rng.choice(STATES)
+        name = f"{rng.choice(PREFIXES)} {_random_word(rng)} {rng.choice(SUFFIXES)}"
+        entries.append(DedupEntry(
+            i, name, rng.choice(cities[state]), state,
+            website=f"https://{name.lower().replace(' ', '')}.com",
+            phone=f"512555{i:07d}",
+        ))
+    return entries
+
+
+def make_queries(entries, count: int, seed: int = 2):
+    """Half near-duplicates of existing names (one typo), half new names."""
+    rng = random.Random(seed)
+    queries = []
+    for n in range(count):
+        entry = rng.choice(entries)
+        if n % 2 == 0:
+            pos = rng.randrange(len(entry.name))
+            name = entry.name[:pos] + rng.choice(string.ascii_lowercase) + entry.name[pos + 1:]
+        else:
+            name = f"{rng.choice(PREFIXES)} {_random_word(rng)} {rng.choice(SUFFIXES)}"
+        queries.append((name, entry.city.title(), entry.state))
+    return queries
+
+
+def scan_lookup(entries, name, city, state, threshold=0.85):
+    """The previous implementation: score every builder that serves the location."""
+    best_id, best_score = None, 0.0
+    for entry in entries:
+        if entry.city != city.lower() and entry.state != state.upper():
+            continue
+        score = calculate_similarity(name, entry.name)
+        if entry.city == city.lower():
+            score += 0.05
+        if entry.state == state.upper():
+            score += 0.05
+        score = min(score, 1.0)
+        if score > best_score and score >= threshold:
+            best_id, best_score = entry.id, score
+    return best_id
+
+
+def index_lookup(index, name, city, state, threshold=0.85):
+    candidate_ids = _location_candidates(index, name, city, state, (), 0.3)
+    ranked = _rank_fuzzy(index, name, city, state, candidate_ids, threshold)
+    return ranked[0][1] if ranked else None
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples) * 1000, p95 * 1000
+
+
+def run(size: int, queries: int, scan_queries: int):
+    entries = make_entries(size)
+    query_set = make_queries(entries, queries)
+
+    start = time.perf_counter()
+    index = DedupIndex()
+    index.bulk_load(entries)
+    build_seconds = time.perf_counter() - start
+
+    index_times, mismatches = [], 0
+    scan_times = []
+    for i, (name, city, state) in enumerate(query_set):
+        t0 = time.perf_counter()
+        found = index_lookup(index, name, city, state)
+        index_times.append(time.perf_counter() - t0)
+
+        if i < scan_queries:
+            t0 = time.perf_counter()
+            expected = scan_lookup(entries, name, city, state)
+            scan_times.append(time.perf_counter() - t0)
+            mismatches += int(found != expected)
+
+    index_p50, index_p95 = _percentiles(index_times)
+    scan_p50, scan_p95 = _percentiles(scan_times) if scan_times else (float("nan"),) * 2
+    print(f"{size:>9,} | build {build_seconds:6.2f}s | index p50 {index_p50:8.2f}ms p95 {index_p95:8.2f}ms "
+          f"| scan p50 {scan_p50:9.1f}ms p95 {scan_p95:9.1f}ms | speedup {scan_p50 / index_p50:7.1f}x "
+          f"| mismatches {mismatches}/{len(scan_times)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200, help="Index lookups per size")
+    parser.add_argument("--scan-queries", type=int, default=20,
+                        help="Lookups also run through the full scan (slow at 1M)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("DUPLICATE DETECTION INDEX BENCHMARK (fuzzy builder match, threshold 0.85)")
+    print("=" * 80)
+    for size in args.sizes:
+        run(size, args.queries, args.scan_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark Image Variant Generation
+
+Measures CPU time and peak RSS per 24MP phone photo for the image variant
+code paths, before and after the single-decode variant engine
+(src/image_variants.py):
+
+- legacy-enhanced: ImageProcessorEnhanced.process_image_complete as it was
+  (full decode, img.copy() + LANCZOS thumbnail() from full resolution per size)
+- legacy-processor: ImageProcessor.process_image as it was (re-opens and
+  decodes the file for every size)
+- enhanced / processor: the same entry points on the variant engine (JPEG)
+- upload: the upload route's worker function (JPEG + WebP + AVIF)
+
+Each mode runs in its own subprocess so peak RSS is not shared.
+
+Usage:
+    python scripts/benchmarks/bench_image_variants.py
+    python scripts/benchmarks/bench_image_variants.py --runs 5 --size 6000x4000 --orientation 1
+"""
+
+import argparse
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image
+
+MODES = ["legacy-enhanced", "enhanced", "legacy-processor", "processor", "upload"]
+
+
+# ===================================================================
+# Pre-engine implementations (baseline)
+# ===================================================================
+
+def _fix_orientation(img):
+    try:
+        orientation = img._getexif().get(274)
+        if orientation == 3:
+            img = img.rotate(180, expand=True)
+        elif orientation == 6:
+            img = img.rotate(270, expand=True)
+        elif orientation == 8:
+            img = img.rotate(90, expand=True)
+    except (AttributeError, KeyError, IndexError, TypeError):
+        pass
+    return img
+
+
+def _to_rgb(img):
+    if img.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+        img = background
+    return img
+
+
+def _crop_square(img):
+    width, height = img.size
+    if width > height:
+        left = (width - height) / 2
+        img = img.crop((left, 0, left + height, height))
+    elif height > width:
+        top = (height - width) / 2
+        img = img.crop((0, top, width, top + width))
+    return img
+
+
+def _save(img, quality):
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def legacy_enhanced(data: bytes):
+    import imagehash
+    from src.media_processor import ImageProcessorEnhanced
+
+    img = Image.open(io.BytesIO(data))
+    width, height = img.size
+    ImageProcessorEnhanced.extract_exif_data(img)
+    str(imagehash.average_hash(img))
+
+    outputs = []
+    thumb = _crop_square(_to_rgb(_fix_orientation(img.copy())))
+    thumb.thumbnail((150, 150), Image.Resampling.LANCZOS)
+    outputs.append(_save(thumb, 80))
+    for box, minimum, quality in (((150, 150), 150, 85), ((400, 400), 400, 85), ((800, 800), 800, 90)):
+        if width > minimum or height > minimum:
+            resized = _to_rgb(_fix_orientation(img.copy()))
+            resized.thumbnail(box, Image.Resampling.LANCZOS)
+            outputs.append(_save(resized, quality))
+    return outputs
+
+
+def legacy_processor(data: bytes):
+    img = Image.open(io.BytesIO(data))
+    width, height = img.size
+
+    outputs = []
+    thumb = _crop_square(_to_rgb(_fix_orientation(Image.open(io.BytesIO(data)))))
+    thumb.thumbnail((150, 150), Image.Resampling.LANCZOS)
+    outputs.append(_save(thumb, 80))
+    for box, quality in (((800, 800), 85), ((1600, 1600), 90)):
+        if width > box[0] or height > box[1]:
+            resized = _to_rgb(_fix_orientation(Image.open(io.BytesIO(data))))
+            resized.thumbnail(box, Image.Resampling.LANCZOS)
+            outputs.append(_save(resized, quality))
+    return outputs
+
+
+def run_mode(mode: str, data: bytes):
+    if mode == "legacy-enhanced":
+        return legacy_enhanced(data)
+    if mode == "legacy-processor":
+        return legacy_processor(data)
+    if mode == "enhanced":
+        from src.media_processor import ImageProcessorEnhanced
+        return ImageProcessorEnhanced.process_image_complete(io.BytesIO(data))
+    if mode == "processor":
+        from src.media_processing import ImageProcessor
+        return ImageProcessor.process_image(io.BytesIO(data), "photo")
+    if mode == "upload":
+        from src.media_offload import process_image_variants
+        return process_image_variants(data, ["JPEG", "WEBP", "AVIF"])
+    raise ValueError(mode)
+
+
+# ===================================================================
+# Harness
+# ===================================================================
+
+def make_photo(width: int, height: int, orientation: int) -> bytes:
+    """Noisy photo-sized JPEG with an EXIF orientation tag, like a phone capture."""
+    img = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 40).convert("RGB")
+    img = Image.blend(img, noise, 0.5)
+
+    exif = Image.Exif()
+    exif[274] = orientation
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=92, exif=exif.tobytes())
+    return output.getvalue()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process image (VmHWM; ru_maxrss survives exec on Linux)."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(mode: str, photo_path: str, runs: int):
+    data = Path(photo_path).read_bytes()
+    # Import everything the mode needs before taking the RSS baseline
+    run_mode(mode, make_photo(64, 48, 1))
+    base_rss = peak_rss_mb()
+
+    cpu = []
+    wall = []
+    for _ in range(runs):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        run_mode(mode, data)
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+
+    peak_rss = peak_rss_mb()
+    print(json.dumps({
+        "cpu": sorted(cpu)[len(cpu) // 2],
+        "wall": sorted(wall)[len(wall) // 2],
+        "peak_mb": peak_rss - base_rss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image variant generation")
+    parser.add_argument("--size", default="6000x4000", help="Photo size WxH (default: 24MP)")
+    parser.add_argument("--orientation", type=int, default=6, help="EXIF orientation (phones: 6)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode (median reported)")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--photo", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.photo, args.runs)
+        return
+
+    import tempfile
+
+    width, height = (int(v) for v in args.size.split("x"))
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as photo:
+        photo.write(make_photo(width, height, args.orientation))
+        photo.flush()
+        print(f"Photo {width}x{height} ({Path(photo.name).stat().st_size / 1e6:.1f} MB, "
+              f"orientation {args.orientation}), median of {args.runs} runs")
+
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, "--photo", photo.name, "--runs", str(args.runs)],
+                cwd=str(project_root), capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            print(f"{mode:17} | CPU {result['cpu'] * 1000:7.0f}ms | wall {result['wall'] * 1000:7.0f}ms"
+                  f" | peak RSS +{result['peak_mb']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
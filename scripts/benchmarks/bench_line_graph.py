@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark Line Lot Detector Line Graph
+
+Times the two line-graph stages of LineLotDetector on synthetic site plan
+grids (street grids drawn as jittered, broken segments, as HoughLinesP
+returns them):
+
+- merge: _merge_collinear_lines (group collinear segments, join each group)
+- intersect: _find_intersections on the merged lines (pairwise search plus
+  removal of points within 10 px of each other)
+
+for the original pairwise loops (legacy) and the services.line_graph engine
+(vectorized), and checks that both produce identical lines and points.
+The legacy loops are quadratic, so they only run up to --legacy-max
+segments.
+
+Usage:
+    python scripts/benchmarks/bench_line_graph.py
+    python scripts/benchmarks/bench_line_graph.py --sizes 1000 5000 20000 --legacy-max 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial import distance
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.line_graph import collinear_groups, segment_intersections  # noqa: E402
+
+# LineLotDetector defaults
+ANGLE_THRESHOLD = 10.0
+MAX_LINE_GAP = 10
+
+
+def make_segments(target: int, seed: int = 0) -> list:
+    """Broken, jittered street grid with about `target` segments, in random order."""
+    rng = np.random.default_rng(seed)
+    cells = max(2, int(round(np.sqrt(target / 4))))
+    cell_size, piece = 120, 60
+    extent = cells * cell_size
+    segments = []
+    for k in range(cells + 1):
+        offset = k * cell_size
+        for start in range(0, extent, piece):
+            end = min(start + piece + int(rng.integers(-8, 8)), extent)
+            jitter = rng.integers(-2, 3, 2)
+            segments.append((start, offset + int(jitter[0]), end, offset + int(jitter[1])))
+            segments.append((offset + int(jitter[0]), start, offset + int(jitter[1]), end))
+    order = rng.permutation(len(segments))
+    segments = [segments[k] for k in order]
+    for k in np.flatnonzero(rng.random(len(segments)) < 0.5):
+        x1, y1, x2, y2 = segments[k]
+        segments[k] = (x2, y2, x1, y1)
+    return [(x1, y1, x2, y2, float(np.degrees(np.arctan2(y2 - y1, x2 - x1)))) for x1, y1, x2, y2 in segments]
+
+
+def join_group(group: list) -> tuple:
+    """Join a group of segments into one (the geometry of _merge_collinear_lines)."""
+    if len(group) == 1:
+        return group[0]
+    all_points = []
+    for x1, y1, x2, y2, _ in group:
+        all_points.extend([(x1, y1), (x2, y2)])
+    avg_angle = np.mean([line[4] for line in group])
+    projection_axis = np.array([np.cos(np.radians(avg_angle)), np.sin(np.radians(avg_angle))])
+    projections = [np.dot(point, projection_axis) for point in all_points]
+    x1, y1 = all_points[np.argmin(projections)]
+    x2, y2 = all_points[np.argmax(projections)]
+    return (int(x1), int(y1), int(x2), int(y2), avg_angle)
+
+
+# ===================================================================
+# Original pairwise loops
+# ===================================================================
+
+def legacy_merge(lines: list) -> list:
+    merged = []
+    used = set()
+    for i, line1 in enumerate(lines):
+        if i in used:
+            continue
+        similar_lines = [line1]
+        for j, line2 in enumerate(lines):
+            if j <= i or j in used:
+                continue
+            angle_diff = abs(line1[4] - line2[4])
+            if angle_diff > 180:
+                angle_diff = 360 - angle_diff
+            if angle_diff < ANGLE_THRESHOLD:
+                dist = min(
+                    distance.euclidean((line1[0], line1[1]), (line2[0], line2[1])),
+                    distance.euclidean((line1[0], line1[1]), (line2[2], line2[3])),
+                    distance.euclidean((line1[2], line1[3]), (line2[0], line2[1])),
+                    distance.euclidean((line1[2], line1[3]), (line2[2], line2[3])),
+                )
+                if dist < MAX_LINE_GAP * 2:
+                    similar_lines.append(line2)
+                    used.add(j)
+        merged.append(join_group(similar_lines))
+        used.add(i)
+    return merged
+
+
+def legacy_intersections(lines: list) -> list:
+    intersections = []
+    for i, (x1, y1, x2, y2, _) in enumerate(lines):
+        for j, (x3, y3, x4, y4, _) in enumerate(lines):
+            if j <= i:
+                continue
+            denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+            if abs(denom) < 1e-10:
+                continue
+            t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+            u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
+            if -0.1 <= t <= 1.1 and -0.1 <= u <= 1.1:
+                intersections.append((int(x1 + t * (x2 - x1)), int(y1 + t * (y2 - y1))))
+    unique_intersections = []
+    for point in intersections:
+        if all(distance.euclidean(point, existing) >= 10 for existing in unique_intersections):
+            unique_intersections.append(point)
+    return unique_intersections
+
+
+# ===================================================================
+# Line graph engine
+# ===================================================================
+
+def vectorized_merge(lines: list) -> list:
+    segments = np.array([line[:4] for line in lines], dtype=np.int64)
+    angles = np.array([line[4] for line in lines], dtype=np.float64)
+    groups = collinear_groups(segments, angles, ANGLE_THRESHOLD, MAX_LINE_GAP * 2)
+    return [join_group([lines[k] for k in group]) for group in groups]
+
+
+def vectorized_intersections(lines: list) -> list:
+    return segment_intersections(np.array([line[:4] for line in lines], dtype=np.int64))
+
+
+def run(merge_fn, intersect_fn, lines: list):
+    start = time.perf_counter()
+    merged = merge_fn(lines)
+    merge_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    points = intersect_fn(merged)
+    intersect_ms = (time.perf_counter() - start) * 1000
+    return merged, points, merge_ms, intersect_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LineLotDetector line merging and intersections")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000, 20000],
+                        help="Segment counts (default: 1000 2000 5000 10000 20000)")
+    parser.add_argument("--legacy-max", type=int, default=2000,
+                        help="Largest size to run the legacy loops on (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Grid jitter seed (default: 0)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s); times in ms")
+    print(f"{'segments':>8} | {'lines':>6} | {'points':>6} | {'mode':10} | {'merge':>9} | {'intersect':>9} | {'total':>9}")
+
+    for size in args.sizes:
+        lines = make_segments(size, args.seed)
+        merged, points, merge_ms, intersect_ms = run(vectorized_merge, vectorized_intersections, lines)
+        results = [("vectorized", merge_ms, intersect_ms)]
+
+        identical = ""
+        if len(lines) <= args.legacy_max:
+            legacy_merged, legacy_points, merge_ms, intersect_ms = run(legacy_merge, legacy_intersections, lines)
+            results.insert(0, ("legacy", merge_ms, intersect_ms))
+            identical = "identical" if (legacy_merged, legacy_points) == (merged, points) else "MISMATCH"
+
+        for mode, merge_ms, intersect_ms in results:
+            print(f"{len(lines):8} | {len(merged):6} | {len(points):6} | {mode:10} | "
+                  f"{merge_ms:9.1f} | {intersect_ms:9.1f} | {merge_ms + intersect_ms:9.1f}")
+        if identical:
+            print(f"{'':8}   output {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark Lot Number to Boundary Matching
+
+Times AutoDetectService._match_lots_to_boundaries' assignment step on
+synthetic phase plans (irregular lots on a street grid, with jittered,
+missing and stray OCR lot numbers):
+
+- legacy: the original loop over every boundary x every lot number
+  (per-pair ray casting and scipy distance.euclidean, greedy assignment)
+- greedy: services.lot_matching (KD-tree candidates, vectorized
+  point-in-polygon), same greedy assignment
+- optimal: services.lot_matching Hungarian assignment
+
+Checks that greedy gives the same assignment as legacy and reports how
+many boundaries each mode matched. The legacy loop is quadratic, so it
+only runs up to --legacy-max lots.
+
+Usage:
+    python scripts/benchmarks/bench_lot_matching.py
+    python scripts/benchmarks/bench_lot_matching.py --lots 500 2000 --legacy-max 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial import distance
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.lot_matching import GREEDY, OPTIMAL, match_lot_numbers  # noqa: E402
+
+# AutoDetectService default
+MATCHING_MAX_DISTANCE = 100
+
+
+def make_phase(lots: int, seed: int = 0, lot_size: int = 80):
+    """About `lots` irregular lots with lot numbers (15% missing, 10% stray)."""
+    rng = np.random.default_rng(seed)
+    cols = max(1, int(round(np.sqrt(lots * 1.5))))
+    rows = max(1, int(np.ceil(lots / cols)))
+    polygons, positions = [], []
+    for r in range(rows):
+        for c in range(cols):
+            if len(polygons) == lots:
+                break
+            x, y = c * lot_size, r * lot_size
+            corners = [(x, y), (x + lot_size // 2, y + int(rng.integers(-6, 6))), (x + lot_size, y),
+                       (x + lot_size, y + lot_size), (x, y + lot_size)]
+            polygons.append([(int(px + rng.integers(-4, 4)), int(py + rng.integers(-4, 4))) for px, py in corners])
+            if rng.random() < 0.85:
+                positions.append((int(x + lot_size / 2 + rng.normal(0, lot_size / 4)),
+                                  int(y + lot_size / 2 + rng.normal(0, lot_size / 4))))
+    for _ in range(lots // 10):
+        positions.append((int(rng.integers(0, cols * lot_size)), int(rng.integers(0, rows * lot_size))))
+    order = rng.permutation(len(positions))
+    return polygons, [positions[k] for k in order]
+
+
+def point_in_polygon(point, polygon) -> bool:
+    x, y = point
+    n = len(polygon)
+    inside = False
+    p1x, p1y = polygon[0]
+    for i in range(1, n + 1):
+        p2x, p2y = polygon[i % n]
+        if y > min(p1y, p2y):
+            if y <= max(p1y, p2y):
+                if x <= max(p1x, p2x):
+                    if p1y != p2y:
+                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+                    if p1x == p2x or x <= xinters:
+                        inside = not inside
+        p1x, p1y = p2x, p2y
+    return inside
+
+
+def legacy_match(polygons, positions, max_distance):
+    used = set()
+    assignment = []
+    for polygon in polygons:
+        centroid = (sum(p[0] for p in polygon) / len(polygon), sum(p[1] for p in polygon) / len(polygon))
+        best_match, best_distance = None, float('inf')
+        for i, position in enumerate(positions):
+            if i in used:
+                continue
+            dist = distance.euclidean(centroid, position)
+            if point_in_polygon(position, polygon):
+                dist *= 0.1
+            if dist < best_distance and dist < max_distance:
+                best_distance, best_match = dist, i
+        if best_match is not None:
+            used.add(best_match)
+        assignment.append(best_match)
+    return assignment
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lot number to boundary matching")
+    parser.add_argument("--lots", type=int, nargs="+", default=[100, 500, 1000, 5000, 20000],
+                        help="Lots per phase (default: 100 500 1000 5000 20000)")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="Largest phase to run the legacy loop on (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Layout seed (default: 0)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s); max distance {MATCHING_MAX_DISTANCE}px")
+    print(f"{'lots':>6} | {'numbers':>7} | {'mode':8} | {'ms':>9} | {'matched':>7}")
+
+    for lots in args.lots:
+        polygons, positions = make_phase(lots, args.seed)
+        rows = []
+
+        greedy, greedy_ms = timed(match_lot_numbers, polygons, positions, MATCHING_MAX_DISTANCE, mode=GREEDY)
+        optimal, optimal_ms = timed(match_lot_numbers, polygons, positions, MATCHING_MAX_DISTANCE, mode=OPTIMAL)
+
+        identical = ""
+        if lots <= args.legacy_max:
+            legacy, legacy_ms = timed(legacy_match, polygons, positions, MATCHING_MAX_DISTANCE)
+            rows.append(("legacy", legacy_ms, legacy))
+            identical = "identical" if legacy == greedy else "MISMATCH"
+        rows += [("greedy", greedy_ms, greedy), ("optimal", optimal_ms, optimal)]
+
+        for mode, ms, assignment in rows:
+            matched = sum(match is not None for match in assignment)
+            print(f"{lots:6} | {len(positions):7} | {mode:8} | {ms:9.1f} | {matched:7}")
+        if identical:
+            print(f"{'':6}   greedy assignment {identical} to legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Load Test Media Uploads
+
+Measures the latency of an unrelated endpoint (GET /ping) on the same
+uvicorn worker while large image uploads to POST /upload are in flight,
+with media work offloaded (process/thread pools, the current code) and
+inline on the event loop (how upload_media used to run).
+
+The server runs in a subprocess with the real upload router; the database
+(SQLite), storage (local temp dir) and auth are swapped for local stand-ins.
+
+Usage:
+    python scripts/benchmarks/bench_media_upload.py
+    python scripts/benchmarks/bench_media_upload.py --uploaders 4 --duration 20 --size 4000x3000
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+# ===================================================================
+# Server (subprocess)
+# ===================================================================
+
+def serve(mode: str, port: int, upload_dir: str):
+    import uvicorn
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import routes.media.upload as upload
+    import src.storage as storage_module
+    from config.db import get_db
+    from config.security import get_current_user
+    from model import load_all_models
+    from model.media import Media
+    from src.media_offload import shutdown_media_pools
+
+    load_all_models()
+
+    engine = create_engine(
+        f"sqlite:///{os.path.join(upload_dir, 'bench.db')}",
+        connect_args={"check_same_thread": False}
+    )
+    Media.__table__.create(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    upload.storage = storage_module.LocalFileStorage(base_dir=upload_dir)
+
+    if mode == "inline":
+        # Reproduce the old behavior: all media work on the event loop
+        async def inline(fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+        upload.run_cpu = upload.run_io = storage_module.run_io = inline
+
+    app = FastAPI()
+    app.add_event_handler("shutdown", shutdown_media_pools)
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[get_current_user] = lambda: {"public_id": "USR-bench"}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ===================================================================
+# Client
+# ===================================================================
+
+def make_image(width: int, height: int) -> bytes:
+    from PIL import Image
+
+    img = Image.effect_noise((width, height), 64).convert("RGB")
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def load(url: str, image: bytes, uploaders: int, duration: float):
+    import httpx
+
+    latencies = []
+    uploads = []
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        async def pinger():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get("/ping")
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.02)
+
+        async def uploader():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/upload",
+                    files={"file": ("photo.jpg", image, "image/jpeg")},
+                    data={"entity_type": "property", "entity_id": "1", "entity_field": "gallery"},
+                )
+                response.raise_for_status()
+                uploads.append(time.perf_counter() - start)
+
+        await asyncio.gather(pinger(), *(uploader() for _ in range(uploaders)))
+
+    return latencies, uploads
+
+
+def run_mode(mode: str, image: bytes, uploaders: int, duration: float):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        server = subprocess.Popen(
+            [sys.executable, __file__, "--serve", mode, "--port", str(port), "--upload-dir", upload_dir],
+            cwd=str(project_root)
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            _wait_ready(url)
+            idle, _ = asyncio.run(load(url, image, 0, 3))
+            busy, uploads = asyncio.run(load(url, image, uploaders, duration))
+        finally:
+            server.terminate()
+            server.wait(10)
+
+    print(
+        f"{mode:8} | idle p99 {percentile(idle, 99):7.1f}ms"
+        f" | under load p50 {percentile(busy, 50):7.1f}ms p99 {percentile(busy, 99):8.1f}ms"
+        f" max {max(busy):8.1f}ms"
+        f" | uploads {len(uploads):3d} (mean {statistics.mean(uploads):5.2f}s)"
+    )
+
+
+def _wait_ready(url: str, timeout: float = 30):
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/ping").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("benchmark server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test media uploads")
+    parser.add_argument("--uploaders", type=int, default=2, help="Concurrent upload clients")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of load per mode")
+    parser.add_argument("--size", default="4000x3000", help="Uploaded image size (WxH)")
+    parser.add_argument("--modes", nargs="+", default=["inline", "offload"], choices=["inline", "offload"])
+    parser.add_argument("--serve", choices=["inline", "offload"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--upload-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.upload_dir)
+        return
+
+    width, height = (int(v) for v in args.size.split("x"))
+    image = make_image(width, height)
+    print(f"Image {width}x{height} ({len(image) / 1e6:.1f} MB), {args.uploaders} uploaders, "
+          f"{args.duration:.0f}s per mode, {os.cpu_count()} CPU(s)")
+
+    for mode in args.modes:
+        run_mode(mode, image, args.uploaders, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark MLSupervisedDetector.predict
+
+Times lot classification for site plans with thousands of contours:
+
+- legacy: the original per-contour loop (full-image mask and Canny per
+  contour, one scaler.transform / predict / predict_proba call each)
+- batched: MLSupervisedDetector.predict (shared edge map, ROI masks, one
+  feature matrix and one classifier pass), single-threaded
+- threaded: the same with --workers feature extraction threads
+
+Checks that batched and threaded return the same lots as legacy. Requires
+opencv-python and scikit-learn.
+
+Usage:
+    python scripts/benchmarks/bench_ml_predict.py
+    python scripts/benchmarks/bench_ml_predict.py --contours 1000 5000 --workers 4
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_site_plan(contours: int, seed: int = 0):
+    """Scanned-looking site plan with about `contours` outlined lots, and their contours."""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    cols = max(1, int(round(np.sqrt(contours * 1.5))))
+    rows = max(1, int(np.ceil(contours / cols)))
+    lot_w, lot_h = 60, 40
+    image = rng.integers(215, 250, (rows * lot_h + 20, cols * lot_w + 20, 3), dtype=np.uint8)
+    for r in range(rows):
+        for c in range(cols):
+            x, y = 10 + c * lot_w, 10 + r * lot_h
+            inset = int(rng.integers(3, 8))
+            cv2.rectangle(image, (x + inset, y + inset), (x + lot_w - inset, y + lot_h - inset), (40, 40, 40), 1)
+            if rng.random() < 0.5:
+                cv2.putText(image, str(r * cols + c), (x + 15, y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.35, (20, 20, 20), 1)
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    found, _ = cv2.findContours(cv2.dilate(edges, np.ones((3, 3), np.uint8)), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    return image, [c for c in found if cv2.contourArea(c) >= 50]
+
+
+def legacy_predict(detector, contours, image):
+    """predict before batching (features and classifier calls per contour)."""
+    import cv2
+
+    from services.ml_supervised_detector import MLLotCandidate
+
+    def features_of(contour):
+        area = cv2.contourArea(contour)
+        perimeter = cv2.arcLength(contour, True)
+        x, y, w, h = cv2.boundingRect(contour)
+        aspect_ratio = float(w) / h if h > 0 else 0
+        extent = area / (w * h) if w * h > 0 else 0
+        hull_area = cv2.contourArea(cv2.convexHull(contour))
+        solidity = area / hull_area if hull_area > 0 else 0
+        num_vertices = len(cv2.approxPolyDP(contour, 0.02 * perimeter, True))
+        circularity = (4 * np.pi * area) / (perimeter ** 2) if perimeter > 0 else 0
+        mask = np.zeros(image.shape[:2], dtype=np.uint8)
+        cv2.drawContours(mask, [contour], -1, 255, -1)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = cv2.countNonZero(cv2.bitwise_and(edges, edges, mask=mask)) / area if area > 0 else 0
+        pixels = gray[mask > 0]
+        mean_intensity = np.mean(pixels) if len(pixels) > 0 else 0
+        std_intensity = np.std(pixels) if len(pixels) > 0 else 0
+        return np.array([area, perimeter, aspect_ratio, extent, solidity, num_vertices,
+                         circularity, edge_density, mean_intensity, std_intensity], dtype=np.float32)
+
+    candidates = []
+    for contour in contours:
+        features = features_of(contour)
+        scaled = detector.scaler.transform(features.reshape(1, -1))
+        prediction = detector.classifier.predict(scaled)[0]
+        confidence = detector.classifier.predict_proba(scaled)[0][prediction]
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        candidates.append(MLLotCandidate(
+            coordinates=[(int(p[0][0]), int(p[0][1])) for p in approx],
+            area=cv2.contourArea(contour),
+            confidence=float(confidence),
+            features=features,
+            prediction=int(prediction),
+        ))
+    lots = [c for c in candidates if c.prediction == 1]
+    lots.sort(key=lambda x: x.confidence, reverse=True)
+    return lots
+
+
+def summary(lots):
+    return [(lot.coordinates, lot.confidence) for lot in lots]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MLSupervisedDetector.predict")
+    parser.add_argument("--contours", type=int, nargs="+", default=[1000, 3000, 6000],
+                        help="Approximate contours per site plan (default: 1000 3000 6000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Feature extraction threads for the threaded mode (default: CPU count)")
+    parser.add_argument("--legacy-max", type=int, default=3000,
+                        help="Largest contour count to run the legacy loop on (default: 3000)")
+    parser.add_argument("--estimators", type=int, default=100, help="Random forest trees (default: 100)")
+    args = parser.parse_args()
+
+    if not (importlib.util.find_spec("cv2") and importlib.util.find_spec("sklearn")):
+        sys.exit("opencv-python and scikit-learn are required")
+
+    from services.ml_supervised_detector import MLSupervisedDetector, TrainingExample
+
+    print(f"{os.cpu_count()} CPU(s), {args.estimators} trees, {args.workers} worker(s) for threaded mode")
+    print(f"{'contours':>8} | {'mode':8} | {'seconds':>8} | {'contours/s':>10} | {'lots':>5}")
+
+    for target in args.contours:
+        image, contours = make_site_plan(target)
+
+        # Train on a labelled sample (larger rectangles are lots)
+        detector = MLSupervisedDetector(n_estimators=args.estimators)
+        sample = contours[:: max(1, len(contours) // 200)]
+        features = detector.extract_features_batch(sample, image, workers=1)
+        detector.train(
+            [TrainingExample(features=f, label=int(f[0] > 1200)) for f in features],
+            save_model=False,
+        )
+
+        runs = []
+        if len(contours) <= args.legacy_max:
+            runs.append(("legacy", lambda: legacy_predict(detector, contours, image)))
+        runs.append(("batched", lambda: detector.predict(contours, image, workers=1)))
+        runs.append(("threaded", lambda: detector.predict(contours, image, workers=args.workers)))
+
+        reference = None
+        for mode, run in runs:
+            start = time.perf_counter()
+            lots = run()
+            elapsed = time.perf_counter() - start
+            status = ""
+            if reference is None:
+                reference = summary(lots)
+            elif summary(lots) != reference:
+                status = "  MISMATCH"
+            print(f"{len(contours):8} | {mode:8} | {elapsed:8.2f} | {len(contours) / elapsed:10.0f} | "
+                  f"{len(lots):5}{status}")
+
+
+if __name__ == "__main__":
+    main()
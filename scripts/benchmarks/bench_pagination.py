@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark Keyset Pagination
+
+Times fetching page N of the properties list with skip/offset against the
+cursor (keyset) path used by GET /v1/properties, on a seeded properties table
+(1M rows by default) with the (sort column, id) indexes from migration
+5e1a7c3d9b24. Runs on a scratch SQLite file; the seeded table and database
+file are reused across runs with the same --rows.
+
+Usage:
+    python scripts/benchmarks/bench_pagination.py
+    python scripts/benchmarks/bench_pagination.py --rows 200000 --pages 1 100 5000 --sorts price_desc
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from model import load_all_models
+from model.property.property import Property
+from src.pagination import KeysetColumn, encode_cursor, paginate
+
+load_all_models()
+
+SORT_COLUMNS = {"listed_at": Property.listed_at, "price": Property.price, "beds": Property.bedrooms}
+COLUMNS = (Property.id, Property.title, Property.city, Property.price, Property.bedrooms, Property.listed_at)
+
+
+def seed(engine, rows: int, seed_value: int = 1):
+    Property.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        if conn.execute(func.count(Property.id).select()).scalar() == rows:
+            return False
+
+    Property.__table__.drop(engine)
+    Property.__table__.create(engine)
+    rng = random.Random(seed_value)
+    start = datetime(2020, 1, 1)
+    cities = ["Austin", "Round Rock", "Georgetown", "Leander", "Pflugerville", "Cedar Park", "Kyle"]
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, rows + 1):
+            batch.append({
+                "id": i, "title": f"Home {i}", "address1": f"{i} Main St", "city": rng.choice(cities),
+                "state": "TX", "postal_code": "78701", "builder_id": rng.randint(1, 500),
+                "community_id": rng.randint(1, 2000), "price": rng.randrange(250_000, 1_500_000, 5_000),
+                "bedrooms": rng.randint(2, 6), "bathrooms": 2.5,
+                "listed_at": None if i % 50 == 0 else start + timedelta(minutes=rng.randint(0, 3_000_000)),
+            })
+            if len(batch) == 50_000:
+                conn.execute(Property.__table__.insert(), batch)
+                batch.clear()
+        if batch:
+            conn.execute(Property.__table__.insert(), batch)
+    return True
+
+
+def _keys(sort: str):
+    field, direction = sort.rsplit("_", 1)
+    descending = direction == "desc"
+    return [KeysetColumn(SORT_COLUMNS[field], descending, nullable=field == "listed_at"),
+            KeysetColumn(Property.id, descending)]
+
+
+def offset_page(db, sort, page, limit):
+    rows, _ = paginate(db.query(*COLUMNS), _keys(sort), sort, limit, offset=(page - 1) * limit)
+    return rows
+
+
+def cursor_page(db, sort, cursor, limit):
+    rows, _ = paginate(db.query(*COLUMNS), _keys(sort), sort, limit, cursor=cursor)
+    return rows
+
+
+def _time(fn, repeats):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, result
+
+
+def run(db, sort, pages, limit, repeats):
+    keys = _keys(sort)
+    for page in pages:
+        # The cursor a client holds after scrolling to page N-1
+        cursor = None
+        if page > 1:
+            previous = offset_page(db, sort, page - 1, limit)
+            if not previous:
+                continue
+            cursor = encode_cursor(sort, [getattr(previous[-1], k.name) for k in keys])
+
+        offset_ms, by_offset = _time(lambda: offset_page(db, sort, page, limit), repeats)
+        cursor_ms, by_cursor = _time(lambda: cursor_page(db, sort, cursor, limit), repeats)
+        same = [r.id for r in by_offset] == [r.id for r in by_cursor]
+        print(f"{sort:>14} | page {page:>7,} | offset {offset_ms:9.2f}ms | cursor {cursor_ms:7.2f}ms "
+              f"| speedup {offset_ms / cursor_ms:8.1f}x | {'same rows' if same else 'MISMATCH'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000, 49_000])
+    parser.add_argument("--sorts", nargs="+", default=["listed_at_desc", "price_asc", "beds_desc"])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db", default=str(Path(tempfile.gettempdir()) / "artitec_bench_pagination.db"),
+                        help="SQLite file for the seeded table")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    t0 = time.perf_counter()
+    seeded = seed(engine, args.rows)
+    db = sessionmaker(bind=engine)()
+
+    print("=" * 80)
+    print(f"PAGINATION BENCHMARK ({args.rows:,} properties, {args.limit} per page, "
+          f"{'seeded in %.1fs' % (time.perf_counter() - t0) if seeded else 'reused table'})")
+    print("=" * 80)
+    for sort in args.sorts:
+        run(db, sort, args.pages, args.limit, args.repeats)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
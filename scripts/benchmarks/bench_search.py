@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark Full-Text Search
+
+Times a properties search through the current ILIKE '%q%' filter (the
+fallback list_properties uses before the index is built) against the search
+index in src/search_index.py: the ranked ids plus row load used by
+GET /v1/properties?q=..., and GET /v1/search with facet counts. Runs on a
+seeded properties table (100k and 1M rows by default) in scratch SQLite files;
+seeded tables and built indexes are reused across runs with the same --rows.
+
+Usage:
+    python scripts/benchmarks/bench_search.py
+    python scripts/benchmarks/bench_search.py --rows 100000 --queries "oak ridge" "higlands"
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, func, or_
+from sqlalchemy.orm import sessionmaker
+
+from model import load_all_models
+from model.property.property import Property
+from src.search_index import PROPERTY, SearchIndex, build_search_index
+
+load_all_models()
+
+COLUMNS = (Property.id, Property.title, Property.city, Property.price)
+# ~1,200 community-style names ("Oak Ridge", "Cedar Highlands", ...)
+NAMES = [f"{a} {b}" for a in ["Oak", "Cedar", "Willow", "Stone", "River", "Lake", "Sunset", "Heritage", "Brushy",
+                              "Pecan", "Falcon", "Mesa", "Eagle", "Deer", "Hidden", "Silver", "Golden", "Maple",
+                              "Pine", "Spring", "Canyon", "Prairie", "Bluff", "Meadow", "Vista", "Crystal",
+                              "Shadow", "Summit", "Timber", "Rolling", "Blue", "Red", "Highland", "Mayfield",
+                              "Cypress", "Magnolia", "Juniper", "Sage", "Hill", "Valley"]
+         for b in ["Ridge", "Hollow", "Creek", "Canyon", "Bend", "View", "Oaks", "Grove", "Pointe", "Verde",
+                   "Highlands", "Park", "Trails", "Crossing", "Landing", "Meadows", "Springs", "Estates", "Ranch",
+                   "Hills", "Village", "Heights", "Commons", "Preserve", "Reserve", "Woods", "Falls", "Shores",
+                   "Terrace", "Station"]]
+WORDS = ["open", "kitchen", "island", "covered", "patio", "vaulted", "ceilings", "study", "media", "room",
+         "quartz", "counters", "primary", "suite", "walk", "closet", "greenbelt", "corner", "lot", "pool",
+         "energy", "efficient", "spray", "foam", "tankless", "water", "heater", "mudroom", "flex", "space"]
+CITIES = ["Austin", "Round Rock", "Georgetown", "Leander", "Pflugerville", "Cedar Park", "Kyle", "Buda"]
+
+
+def seed(engine, rows: int, seed_value: int = 1):
+    Property.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        if conn.execute(func.count(Property.id).select()).scalar() == rows:
+            return False
+
+    Property.__table__.drop(engine)
+    Property.__table__.create(engine)
+    rng = random.Random(seed_value)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, rows + 1):
+            batch.append({
+                "id": i, "title": f"The {rng.choice(NAMES)} {rng.randint(1800, 4200)} plan",
+                "description": " ".join(rng.choices(WORDS, k=25)),
+                "address1": f"{i} {rng.choice(NAMES)} Dr", "city": rng.choice(CITIES), "state": "TX",
+                "postal_code": "78701", "builder_id": rng.randint(1, 500), "community_id": rng.randint(1, 2000),
+                "price": rng.randrange(250_000, 1_500_000, 5_000), "bedrooms": rng.randint(2, 6), "bathrooms": 2.5,
+            })
+            if len(batch) == 50_000:
+                conn.execute(Property.__table__.insert(), batch)
+                batch.clear()
+        if batch:
+            conn.execute(Property.__table__.insert(), batch)
+    return True
+
+
+def ilike_search(db, q, limit):
+    return db.query(*COLUMNS).filter(or_(
+        Property.title.ilike(f"%{q}%"), Property.description.ilike(f"%{q}%"), Property.city.ilike(f"%{q}%")
+    )).order_by(Property.id.desc()).limit(limit).all()
+
+
+def ilike_count(db, q):
+    return db.query(func.count(Property.id)).filter(or_(
+        Property.title.ilike(f"%{q}%"), Property.description.ilike(f"%{q}%"), Property.city.ilike(f"%{q}%")
+    )).scalar()
+
+
+def index_search(db, index, q, limit):
+    ranked = index.ranked_ids(PROPERTY, q)
+    page = ranked[:limit]
+    by_id = {row.id: row for row in db.query(*COLUMNS).filter(Property.id.in_(page))}
+    return [by_id[i] for i in page if i in by_id]
+
+
+def _time(fn, repeats):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, result
+
+
+def run(rows, queries, limit, repeats, workdir):
+    engine = create_engine(f"sqlite:///{workdir / f'artitec_bench_search_{rows}.db'}")
+    t0 = time.perf_counter()
+    seeded = seed(engine, rows)
+    db = sessionmaker(bind=engine)()
+
+    index_path = workdir / f"artitec_bench_search_{rows}.idx"
+    if seeded and index_path.exists():
+        index_path.unlink()
+    index = SearchIndex(str(index_path))
+    built = index.count(PROPERTY) != rows
+    t1 = time.perf_counter()
+    if built:
+        build_search_index(db, index, [PROPERTY])
+
+    print("=" * 96)
+    print(f"SEARCH BENCHMARK ({rows:,} properties, {limit} per page; "
+          f"{'seeded in %.1fs' % (t1 - t0) if seeded else 'reused table'}, "
+          f"{'index built in %.1fs' % (time.perf_counter() - t1) if built else 'reused index'})")
+    print("=" * 96)
+    for q in queries:
+        ilike_ms, _ = _time(lambda: ilike_search(db, q, limit), repeats)
+        count_ms, ilike_total = _time(lambda: ilike_count(db, q), repeats)
+        ranked_ms, _ = _time(lambda: index_search(db, index, q, limit), repeats)
+        facet_ms, result = _time(lambda: index.search(PROPERTY, q, limit=limit), repeats)
+        print(f"{q!r:>16} | ILIKE page {ilike_ms:8.2f}ms + count {count_ms:8.2f}ms ({ilike_total:>7,}) "
+              f"| index page {ranked_ms:6.2f}ms | /v1/search+facets {facet_ms:7.2f}ms ({result.total:>7,})"
+              f"{' corrected ' + str(result.corrections) if result.corrections else ''}")
+    index.close()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", nargs="+",
+                        default=["oak ridge", "mayfield highlands", "stone canyon pool", "higlands", "tankless heater"])
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Directory for the scratch SQLite files")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.queries, args.limit, args.repeats, Path(args.dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark YOLO Lot Detection Throughput
+
+Measures lots/sec and site plans/sec on CPU for concurrent /yolo/detect-style
+requests (YOLODetector.detect_from_array from several client threads):
+
+- per-request: a YOLO model is loaded for every request (how the detection
+  endpoints used to run)
+- single: the shared registry model, one image per forward pass
+  (YOLO_MAX_BATCH=1)
+- batched: the shared registry model with micro-batching
+  (YOLO_MAX_BATCH=--max-batch, YOLO_MAX_WAIT_MS=--max-wait-ms)
+
+Each mode runs in its own subprocess. Requires ultralytics (and opencv);
+use --model with trained lot weights for meaningful lot counts.
+
+Usage:
+    python scripts/benchmarks/bench_yolo_batching.py
+    python scripts/benchmarks/bench_yolo_batching.py --model runs/segment/artitec_lot_detector/weights/best.pt --clients 8 --duration 30
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+MODES = ["per-request", "single", "batched"]
+
+
+def make_site_plan(width: int, height: int, seed: int):
+    """Synthetic site plan: a street grid of outlined, numbered lots."""
+    import random
+
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (245, 245, 240))
+    draw = ImageDraw.Draw(img)
+    lot_w, lot_h = width // 12, height // 8
+    number = 1
+    for row in range(8):
+        for col in range(12):
+            if rng.random() < 0.15:
+                continue  # open space / street
+            x, y = col * lot_w, row * lot_h
+            draw.rectangle((x + 4, y + 4, x + lot_w - 4, y + lot_h - 4), outline=(40, 40, 40), width=3)
+            draw.text((x + lot_w // 2 - 6, y + lot_h // 2 - 6), str(number), fill=(20, 20, 20))
+            number += 1
+    return np.array(img)
+
+
+def worker(mode: str, model_path: str, clients: int, duration: float, size: str):
+    from services.yolo_detector import YOLODetector
+
+    width, height = (int(v) for v in size.split("x"))
+    images = [make_site_plan(width, height, seed) for seed in range(clients)]
+
+    if mode == "per-request":
+        from ultralytics import YOLO
+
+        def detect(detector, image):
+            # Pre-registry behaviour: load the weights, then predict alone
+            model = YOLO(model_path)
+            results = model.predict(image, conf=detector.confidence_threshold, verbose=False)
+            return detector._build_result(results, (image.shape[1], image.shape[0]), detector.confidence_threshold)
+    else:
+        def detect(detector, image):
+            return detector.detect_from_array(image)
+
+    detector = YOLODetector(model_path=model_path, min_area=100.0, max_area=1e9)
+    detect(detector, images[0])  # load weights / first-call setup outside the timing
+
+    counts = {"images": 0, "lots": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(image):
+        while time.perf_counter() < deadline:
+            result = detect(detector, image)
+            with lock:
+                counts["images"] += 1
+                counts["lots"] += result.lots_detected
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(image,)) for image in images]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    from services.yolo_registry import get_yolo_registry
+    batchers = get_yolo_registry().status()["batchers"]
+    average_batch = next(iter(batchers.values()))["average_batch"] if batchers else 1.0
+
+    print(json.dumps({
+        "images_per_sec": counts["images"] / elapsed,
+        "lots_per_sec": counts["lots"] / elapsed,
+        "average_batch": average_batch,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YOLO detection throughput (CPU)")
+    parser.add_argument("--model", default="yolov8n-seg.pt", help="YOLO weights file (default: yolov8n-seg.pt)")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent request threads (default: 8)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per mode (default: 20)")
+    parser.add_argument("--size", default="2048x1536", help="Site plan size WxH (default: 2048x1536)")
+    parser.add_argument("--max-batch", type=int, default=8, help="YOLO_MAX_BATCH for batched mode (default: 8)")
+    parser.add_argument("--max-wait-ms", type=int, default=20, help="YOLO_MAX_WAIT_MS for batched mode (default: 20)")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.model, args.clients, args.duration, args.size)
+        return
+
+    if importlib.util.find_spec("ultralytics") is None:
+        sys.exit("ultralytics is not installed (pip install ultralytics)")
+
+    print(f"Model {args.model}, {args.clients} clients, {args.size} site plans, "
+          f"{args.duration:.0f}s per mode, {os.cpu_count()} CPU(s)")
+
+    for mode in args.modes:
+        env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+        env["YOLO_MAX_BATCH"] = str(args.max_batch if mode == "batched" else 1)
+        env["YOLO_MAX_WAIT_MS"] = str(args.max_wait_ms if mode == "batched" else 0)
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", mode, "--model", args.model, "--clients", str(args.clients),
+             "--duration", str(args.duration), "--size", args.size],
+            cwd=str(project_root), env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(f"{mode:11} | {result['lots_per_sec']:8.1f} lots/s | {result['images_per_sec']:6.2f} plans/s"
+              f" | avg batch {result['average_batch']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
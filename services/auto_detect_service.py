@@ -5,13 +5,18 @@ Automatically matches lot numbers to detected boundaries
 """
 import cv2
 import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass
 from scipy.spatial import distance
 
+from config.settings import LOT_MATCHING_MODE
 from services.ocr_service import OCRService, LotNumberResult
 from services.boundary_detection import BoundaryDetectionService, BoundaryResult
 from services.line_lot_detector import LineLotDetector, LotPolygon
+from services.lot_matching import MATCHING_MODES, match_lot_numbers
+from services.tiled_inference import ArrayTileSource, TileWindow, merge_tiled, run_tiled
 
 
 @dataclass
@@ -46,6 +51,7 @@ class AutoDetectService:
         ocr_min_confidence: float = 60.0,
         matching_max_distance: int = 100,
         use_line_fallback: bool = True,
+        matching_mode: str = LOT_MATCHING_MODE,
     ):
         """
         Initialize auto-detect service
@@ -56,11 +62,17 @@ class AutoDetectService:
             ocr_min_confidence: Minimum OCR confidence score
             matching_max_distance: Maximum distance to match lot number to boundary
             use_line_fallback: Use line detection if boundary detection fails
+            matching_mode: Lot number assignment, "greedy" (each boundary in
+                turn takes its best number) or "optimal" (Hungarian assignment)
         """
+        if matching_mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode: {matching_mode}")
+
         self.min_area = min_area
         self.max_area = max_area
         self.matching_max_distance = matching_max_distance
         self.use_line_fallback = use_line_fallback
+        self.matching_mode = matching_mode
 
         # Initialize detection services
         self.ocr_service = OCRService(min_confidence=ocr_min_confidence)
@@ -144,6 +156,57 @@ class AutoDetectService:
 
         return detected_lots
 
+    def detect_lots_tiled(
+        self,
+        source,
+        use_ocr: bool = True,
+        tile_size: int = 2048,
+        overlap: int = 512,
+        workers: Optional[int] = None,
+    ) -> List[DetectedLot]:
+        """
+        Detect lots in overlapping tiles of a large site plan
+
+        Boundary detection and OCR run per tile (in parallel across
+        workers threads; OpenCV and Tesseract release the GIL), then lots
+        seen by more than one tile are merged.
+
+        Args:
+            source: Image array, or a tile source (e.g.
+                PDFProcessor.page_tile_source, which renders tiles without
+                rasterizing the whole page)
+            use_ocr: Extract lot numbers using OCR
+            tile_size: Tile edge in pixels
+            overlap: Overlap between tiles; should exceed the largest lot
+            workers: Tiles processed at once (default: CPU count, 1 = inline)
+
+        Returns:
+            List of detected lots in page coordinates
+        """
+        if isinstance(source, np.ndarray):
+            source = ArrayTileSource(source)
+        overlap = min(overlap, tile_size // 2)
+        workers = workers or os.cpu_count() or 1
+
+        def detect_tile(tile: np.ndarray, window: TileWindow) -> List[DetectedLot]:
+            lots = self.detect_lots(tile, use_ocr=use_ocr)
+            for lot in lots:
+                lot.coordinates = [(x + window.x, y + window.y) for x, y in lot.coordinates]
+            return lots
+
+        if workers <= 1:
+            detections = run_tiled(source, detect_tile, tile_size, overlap)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-detect-tile") as executor:
+                detections = run_tiled(
+                    source, detect_tile, tile_size, overlap,
+                    executor=executor, max_in_flight=2 * workers
+                )
+
+        detected_lots = merge_tiled(detections)
+        detected_lots.sort(key=lambda x: x.confidence, reverse=True)
+        return detected_lots
+
     def _match_lots_to_boundaries(
         self,
         boundaries: List[BoundaryResult],
@@ -161,44 +224,18 @@ class AutoDetectService:
         Returns:
             List of matched lots
         """
-        detected_lots = []
-
-        # Track which lot numbers have been used
-        used_lot_numbers = set()
-
-        for boundary in boundaries:
-            # Calculate polygon centroid
-            centroid = self._calculate_centroid(boundary.coordinates)
-
-            # Find closest lot number to this boundary
-            best_match = None
-            best_distance = float('inf')
-
-            for i, lot_num in enumerate(lot_numbers):
-                if i in used_lot_numbers:
-                    continue
-
-                # Check if lot number is inside or near polygon
-                dist = distance.euclidean(centroid, lot_num.position)
-
-                # Also check if point is inside polygon
-                is_inside = self._point_in_polygon(
-                    lot_num.position,
-                    boundary.coordinates,
-                )
-
-                # Prefer inside matches, otherwise use distance
-                if is_inside:
-                    dist *= 0.1  # Strong preference for inside matches
-
-                if dist < best_distance and dist < self.matching_max_distance:
-                    best_distance = dist
-                    best_match = (i, lot_num, dist)
+        assignment = match_lot_numbers(
+            [boundary.coordinates for boundary in boundaries],
+            [lot_num.position for lot_num in lot_numbers],
+            self.matching_max_distance,
+            mode=self.matching_mode,
+        )
 
+        detected_lots = []
+        for boundary, match in zip(boundaries, assignment):
             # Create detected lot
-            if best_match:
-                idx, lot_num, dist = best_match
-                used_lot_numbers.add(idx)
+            if match is not None:
+                lot_num = lot_numbers[match]
 
                 # Calculate combined confidence
                 # Higher weight to boundary confidence, OCR confidence as bonus
@@ -278,39 +315,6 @@ class AutoDetectService:
 
         return perimeter
 
-    def _point_in_polygon(
-        self,
-        point: Tuple[int, int],
-        polygon: List[Tuple[int, int]],
-    ) -> bool:
-        """
-        Check if point is inside polygon using ray casting algorithm
-
-        Args:
-            point: Point (x, y)
-            polygon: Polygon vertices
-
-        Returns:
-            True if point is inside polygon
-        """
-        x, y = point
-        n = len(polygon)
-        inside = False
-
-        p1x, p1y = polygon[0]
-        for i in range(1, n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-
-        return inside
-
     def visualize_results(
         self,
         image: np.ndarray,
@@ -0,0 +1,752 @@
+"""
+Lot Detection Jobs
+Runs batch site-plan detection as jobs persisted in the database
+
+- create_detection_job() stores a job with one item per phase; the request
+  that created it returns immediately with the job ID
+- DetectionJobRunner claims pending jobs (DB lease, as the collection job
+  scheduler does), downloads a job's site plans on a small thread pool while
+  earlier ones are being detected, and runs detection on a process pool
+  whose workers load the detector models once at start
+- Each phase's result is committed as soon as it finishes, so progress can
+  be polled (job_snapshot) or streamed as server-sent events (job_events),
+  and a job picked up again after its runner died skips phases already done
+- Stopping a runner hands its job back to the queue rather than failing it
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.db import SessionLocal
+from config.settings import (
+    DETECTION_JOB_EVENT_INTERVAL,
+    DETECTION_JOB_LEASE_SECONDS,
+    DETECTION_JOB_MAX_ATTEMPTS,
+    DETECTION_JOB_POLL_INTERVAL,
+    DETECTION_JOB_WORKERS,
+    DETECTION_PREFETCH_WORKERS,
+    YOLO_WARMUP_MODELS,
+)
+from model.detection_job import LotDetectionJob, LotDetectionJobItem
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+# ===================================================================
+# Jobs
+# ===================================================================
+
+def create_detection_job(
+    db: Session,
+    phases: Sequence[Tuple[int, str]],
+    detection_method: str = "auto",
+    parameters: Optional[Dict] = None,
+) -> LotDetectionJob:
+    """
+    Store a pending detection job (committed).
+
+    Args:
+        db: Database session
+        phases: (phase_id, site plan storage path) per phase, in order
+        detection_method: "yolo" or "auto" (boundary/line detection + OCR)
+        parameters: Detection parameters (min_area, confidence_threshold)
+
+    Returns:
+        The new job
+    """
+    job = LotDetectionJob(
+        status=PENDING,
+        detection_method=detection_method,
+        parameters=parameters or {},
+        total_phases=len(phases),
+        completed_phases=0,
+        failed_phases=0,
+        lots_detected=0,
+        attempts=0,
+    )
+    db.add(job)
+    db.flush()
+    db.add_all([
+        LotDetectionJobItem(
+            job_id=job.job_id, position=position, phase_id=phase_id,
+            storage_path=storage_path, status=PENDING,
+        )
+        for position, (phase_id, storage_path) in enumerate(phases)
+    ])
+    db.commit()
+    return job
+
+
+def cancel_detection_job(db: Session, job_id: str) -> bool:
+    """
+    Cancel a pending or running job.
+
+    The runner stops at its next check; phases already being detected
+    finish, but their results are not stored.
+
+    Returns:
+        False if the job does not exist or has already finished
+    """
+    cancelled = db.query(LotDetectionJob).filter(
+        LotDetectionJob.job_id == job_id,
+        LotDetectionJob.status.in_([PENDING, RUNNING])
+    ).update({
+        LotDetectionJob.status: CANCELLED,
+        LotDetectionJob.completed_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return bool(cancelled)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def job_snapshot(db: Session, job_id: str, include_results: bool = False) -> Optional[Dict]:
+    """
+    Current state of a job and its phases.
+
+    Args:
+        db: Database session
+        job_id: Job identifier
+        include_results: Include the detected lots of finished phases
+
+    Returns:
+        Job status dict, or None if the job does not exist
+    """
+    job = db.get(LotDetectionJob, job_id)
+    if job is None:
+        return None
+
+    columns = [
+        LotDetectionJobItem.position, LotDetectionJobItem.phase_id, LotDetectionJobItem.status,
+        LotDetectionJobItem.lots_detected, LotDetectionJobItem.error_message,
+    ]
+    if include_results:
+        columns.append(LotDetectionJobItem.result)
+    rows = db.query(*columns).filter(
+        LotDetectionJobItem.job_id == job_id
+    ).order_by(LotDetectionJobItem.position).all()
+
+    phases = []
+    for row in rows:
+        phase = {
+            "phase_id": row.phase_id,
+            "status": row.status,
+            "lots_detected": row.lots_detected,
+            "error": row.error_message,
+        }
+        if include_results:
+            phase["lots"] = (row.result or {}).get("lots")
+        phases.append(phase)
+
+    finished = job.completed_phases + job.failed_phases
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "detection_method": job.detection_method,
+        "total_phases": job.total_phases,
+        "completed_phases": job.completed_phases,
+        "failed_phases": job.failed_phases,
+        "lots_detected": job.lots_detected,
+        "progress": finished / job.total_phases if job.total_phases else 1.0,
+        "error": job.error_message,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "completed_at": _iso(job.completed_at),
+        "results": phases,
+    }
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _read_snapshot(session_factory, job_id: str) -> Optional[Dict]:
+    db = session_factory()
+    try:
+        return job_snapshot(db, job_id)
+    finally:
+        db.close()
+
+
+async def job_events(
+    job_id: str,
+    session_factory=SessionLocal,
+    interval: float = DETECTION_JOB_EVENT_INTERVAL,
+) -> AsyncIterator[str]:
+    """
+    Stream a job's progress as server-sent events.
+
+    Reads the job from the database every `interval` seconds (the runner may
+    live in another process) and emits:
+    - "phase" once per finished phase (phase_id, status, lots_detected, error)
+    - "progress" whenever the job counters change
+    - "done" with the final job state, after which the stream ends
+    """
+    seen = set()
+    last_progress = None
+    while True:
+        snapshot = await asyncio.to_thread(_read_snapshot, session_factory, job_id)
+        if snapshot is None:
+            yield _sse("error", {"job_id": job_id, "error": "Job not found"})
+            return
+
+        for position, phase in enumerate(snapshot["results"]):
+            if position not in seen and phase["status"] in FINISHED:
+                seen.add(position)
+                yield _sse("phase", phase)
+
+        progress = {key: snapshot[key] for key in (
+            "job_id", "status", "total_phases", "completed_phases", "failed_phases", "lots_detected", "progress"
+        )}
+        if progress != last_progress:
+            last_progress = progress
+            yield _sse("progress", progress)
+
+        if snapshot["status"] in FINISHED:
+            snapshot.pop("results")
+            yield _sse("done", snapshot)
+            return
+
+        await asyncio.sleep(interval)
+
+
+# ===================================================================
+# Detection (runs in the worker processes)
+# ===================================================================
+
+_auto_services: Dict[int, Any] = {}
+
+
+def _init_detection_worker(warmup_models: Sequence[str]):
+    """Process pool initializer: load detector models before the first phase arrives."""
+    if warmup_models:
+        from services.yolo_registry import get_yolo_registry
+        get_yolo_registry().warm_up(warmup_models)
+    try:
+        _auto_service(1000)
+    except Exception as e:
+        logger.warning(f"Could not preload auto-detect service: {e}")
+
+
+def _auto_service(min_area: int):
+    service = _auto_services.get(min_area)
+    if service is None:
+        from services.auto_detect_service import AutoDetectService
+        service = _auto_services[min_area] = AutoDetectService(min_area=min_area)
+    return service
+
+
+def detect_site_plan(data: bytes, detection_method: str, parameters: Dict) -> Dict:
+    """
+    Decode a site plan and detect its lots.
+
+    Takes the encoded file rather than a decoded image so only compressed
+    bytes cross the process boundary.
+
+    Returns:
+        {"lots_detected": n, "lots": [...]} with plain JSON types
+    """
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image")
+
+    min_area = parameters.get("min_area", 1000)
+    if detection_method == "yolo":
+        from services.yolo_detector import YOLODetector
+
+        confidence = parameters.get("confidence_threshold", 0.25)
+        detector = YOLODetector(confidence_threshold=confidence, min_area=min_area)
+        lots = detector.detect_from_arrays([image], confidence)[0].lots
+    else:
+        lots = _auto_service(min_area).detect_lots(image, use_ocr=True)
+
+    return {
+        "lots_detected": len(lots),
+        "lots": [
+            {
+                "lot_number": lot.lot_number,
+                "coordinates": [[int(x), int(y)] for x, y in lot.coordinates],
+                "area": float(lot.area),
+                "confidence": float(lot.confidence),
+                "detection_method": lot.detection_method,
+            }
+            for lot in lots
+        ],
+    }
+
+
+def _download_site_plan(storage_path: str) -> bytes:
+    from src.storage_service import storage_service
+    return storage_service.download_file(storage_path)
+
+
+# ===================================================================
+# Runner
+# ===================================================================
+
+class DetectionJobRunner:
+    """
+    Claims detection jobs from the database and runs them one at a time.
+
+    Within a job, up to `prefetch_workers` site plans are downloaded while
+    the detection pool works on earlier ones, so the pool is not left idle
+    waiting on storage. Several runners (one per API process) can share the
+    jobs table; each job is claimed by one runner at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        workers: Optional[int] = None,
+        prefetch_workers: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        download: Callable[[str], bytes] = _download_site_plan,
+        detect: Callable[[bytes, str, Dict], Dict] = detect_site_plan,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new database session
+            workers: Detection processes (0 = one thread in this process)
+            prefetch_workers: Concurrent site plan downloads
+            poll_interval: Max seconds between claim attempts
+            lease_seconds: Lease duration; renewed while the job runs
+            max_attempts: Claims after which a job whose lease keeps expiring fails
+            download: Called with a storage path, returns the file bytes
+            detect: Module-level function called as detect(data, method, parameters)
+        """
+        self.session_factory = session_factory
+        self.workers = DETECTION_JOB_WORKERS if workers is None else workers
+        self.prefetch_workers = max(1, prefetch_workers or DETECTION_PREFETCH_WORKERS)
+        self.poll_interval = poll_interval or DETECTION_JOB_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or DETECTION_JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or DETECTION_JOB_MAX_ATTEMPTS
+        self.download = download
+        self.detect = detect
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._pool: Optional[Executor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        # Resolved by stop(); waited on alongside in-flight phases
+        self._stopping: Future = Future()
+        self._lock = threading.Lock()
+        self.stats = {"jobs": 0, "phases": 0, "failed_phases": 0, "leases_expired": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the dispatcher thread in the background."""
+        with self._lock:
+            if self._dispatcher and self._dispatcher.is_alive():
+                return
+            self._stop.clear()
+            if self._stopping.done():
+                self._stopping = Future()
+            self._dispatcher = threading.Thread(target=self.run, name="detection-jobs", daemon=True)
+            self._dispatcher.start()
+        logger.info(f"🚀 Started detection job runner {self.worker_id} "
+                    f"({self.workers or 'in-process'} workers, {self.prefetch_workers} downloads)")
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop claiming jobs and shut down the detection pool.
+
+        A job in progress is requeued (phases already stored are kept) so
+        another runner picks it up; the pool is shut down only once the
+        dispatcher has let go of it.
+
+        Args:
+            timeout: Max seconds to wait for the dispatcher to requeue its job
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if not self._stopping.done():
+            self._stopping.set_result(None)
+        dispatcher = self._dispatcher
+        if dispatcher and dispatcher is not threading.current_thread():
+            dispatcher.join(timeout)
+        self._reset_pool()
+
+    def notify(self):
+        """Wake the dispatcher so it claims new jobs immediately."""
+        self._wakeup.set()
+
+    def run(self, max_iterations: int = 0):
+        """
+        Run the claim loop in the calling thread.
+
+        Args:
+            max_iterations: Maximum claim attempts (0 = until stop() is called)
+        """
+        iteration = 0
+        while not self._stop.is_set() and (max_iterations == 0 or iteration < max_iterations):
+            iteration += 1
+            self._wakeup.clear()
+            try:
+                job_id = self.claim_job()
+                if job_id:
+                    self.run_job(job_id)
+                    continue
+            except Exception as e:
+                logger.error(f"Error in detection job loop: {e}", exc_info=True)
+            self._wakeup.wait(self.poll_interval)
+
+    def status(self) -> Dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": bool(self._dispatcher and self._dispatcher.is_alive()),
+            "workers": self.workers,
+            "prefetch_workers": self.prefetch_workers,
+            "stats": dict(self.stats),
+        }
+
+    def _get_pool(self) -> Executor:
+        """
+        Detection pool, started on first use.
+
+        Processes are spawned, not forked, for the same reason as the media
+        CPU pool: the API process holds DB connections and background threads.
+        """
+        with self._lock:
+            if self._pool is None:
+                if self.workers <= 0:
+                    self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detection")
+                else:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_detection_worker,
+                        initargs=(YOLO_WARMUP_MODELS,),
+                    )
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+
+    def claim_job(self) -> Optional[str]:
+        """
+        Claim the oldest pending job.
+
+        Returns:
+            Job ID, or None if no job is pending
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            self._expire_leases(db, now)
+
+            job = db.query(LotDetectionJob).filter(
+                LotDetectionJob.status == PENDING
+            ).order_by(
+                LotDetectionJob.created_at.asc()
+            ).with_for_update(skip_locked=True).first()
+
+            if job is None:
+                db.commit()
+                return None
+
+            job.status = RUNNING
+            job.started_at = job.started_at or now
+            job.attempts = (job.attempts or 0) + 1
+            job.lease_owner = self.worker_id
+            job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            job_id = job.job_id
+            db.commit()
+            return job_id
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _expire_leases(self, db: Session, now: datetime):
+        """Requeue running jobs whose runner stopped renewing the lease (or fail them after max_attempts)."""
+        expired = db.query(LotDetectionJob).filter(
+            LotDetectionJob.status == RUNNING,
+            LotDetectionJob.lease_expires_at < now
+        ).with_for_update(skip_locked=True).all()
+
+        for job in expired:
+            job.lease_owner = None
+            job.lease_expires_at = None
+            if job.attempts >= self.max_attempts:
+                job.status = FAILED
+                job.error_message = f"Runner lease expired {job.attempts} times"
+                job.completed_at = now
+            else:
+                job.status = PENDING
+            # Phases the dead runner had in flight start over
+            db.query(LotDetectionJobItem).filter(
+                LotDetectionJobItem.job_id == job.job_id,
+                LotDetectionJobItem.status == RUNNING
+            ).update({LotDetectionJobItem.status: PENDING}, synchronize_session=False)
+
+        if expired:
+            db.flush()
+            self.stats["leases_expired"] += len(expired)
+            logger.warning(f"🔧 Requeued {len(expired)} detection job(s) with expired leases")
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def run_job(self, job_id: str):
+        """Run the unfinished phases of a claimed job, committing each result as it arrives."""
+        db = self.session_factory()
+        try:
+            job = db.get(LotDetectionJob, job_id)
+            items = db.query(LotDetectionJobItem).filter(
+                LotDetectionJobItem.job_id == job_id,
+                LotDetectionJobItem.status.notin_(FINISHED)
+            ).order_by(LotDetectionJobItem.position).all()
+            method, parameters = job.detection_method, dict(job.parameters or {})
+
+            outcome = self._run_items(db, job, items, method, parameters)
+            if outcome is None:
+                return
+
+            if outcome == COMPLETED:
+                # Only a job this runner still holds completes (not one cancelled meanwhile)
+                completed = db.query(LotDetectionJob).filter(
+                    LotDetectionJob.job_id == job_id,
+                    LotDetectionJob.status == RUNNING,
+                    LotDetectionJob.lease_owner == self.worker_id
+                ).update({
+                    LotDetectionJob.status: COMPLETED,
+                    LotDetectionJob.completed_at: datetime.utcnow(),
+                    LotDetectionJob.lease_owner: None,
+                    LotDetectionJob.lease_expires_at: None,
+                }, synchronize_session=False)
+                if not completed:
+                    outcome = db.query(LotDetectionJob.status).filter(
+                        LotDetectionJob.job_id == job_id
+                    ).scalar()
+            else:
+                self._release_lease(job)
+            db.commit()
+            self.stats["jobs"] += 1
+            logger.info(f"🏁 Detection job {job_id} {outcome}: "
+                        f"{job.completed_phases} phases, {job.failed_phases} failed, "
+                        f"{job.lots_detected} lots")
+        except Exception as e:
+            db.rollback()
+            if self._stop.is_set():
+                # The pool was shut down under the job; not the job's fault
+                self._requeue(db, job_id)
+                return
+            logger.error(f"❌ Detection job {job_id} failed: {e}", exc_info=True)
+            if isinstance(e, BrokenExecutor):
+                self._reset_pool()
+            job = db.get(LotDetectionJob, job_id)
+            if job is not None and job.status == RUNNING and job.lease_owner == self.worker_id:
+                job.status = FAILED
+                job.error_message = str(e)
+                job.completed_at = datetime.utcnow()
+                self._release_lease(job)
+                db.commit()
+        finally:
+            db.close()
+
+    def _run_items(
+        self,
+        db: Session,
+        job: LotDetectionJob,
+        items: List[LotDetectionJobItem],
+        method: str,
+        parameters: Dict,
+    ) -> Optional[str]:
+        """
+        Download and detect items, keeping at most workers + prefetch_workers in flight.
+
+        The lease is renewed before each batch of results is written. The
+        renewal is conditional on this runner still owning the job, so once
+        the lease has expired (and the job was requeued or taken by another
+        runner) processing stops without writing anything.
+
+        Returns:
+            COMPLETED, CANCELLED if the job was cancelled while running, or
+            None if the lease was lost or the runner is stopping (job requeued)
+        """
+        pool = self._get_pool()
+        queued = deque(items)
+        in_flight: Dict[Any, Tuple[str, LotDetectionJobItem]] = {}
+        heartbeat_interval = max(1.0, self.lease_seconds / 3)
+        max_in_flight = max(1, self.workers) + self.prefetch_workers
+
+        with ThreadPoolExecutor(max_workers=self.prefetch_workers, thread_name_prefix="detection-io") as io:
+            def fill():
+                while queued and len(in_flight) < max_in_flight:
+                    item = queued.popleft()
+                    item.status = RUNNING
+                    item.started_at = datetime.utcnow()
+                    in_flight[io.submit(self.download, item.storage_path)] = ("download", item)
+
+            fill()
+            db.commit()
+
+            while in_flight:
+                done, _ = wait([*in_flight, self._stopping], timeout=heartbeat_interval, return_when=FIRST_COMPLETED)
+                if self._stop.is_set():
+                    for future in in_flight:
+                        future.cancel()
+                    self._requeue(db, job.job_id)
+                    return None
+
+                renewed = db.query(LotDetectionJob).filter(
+                    LotDetectionJob.job_id == job.job_id,
+                    LotDetectionJob.status == RUNNING,
+                    LotDetectionJob.lease_owner == self.worker_id
+                ).update({
+                    LotDetectionJob.lease_expires_at: datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                }, synchronize_session=False)
+                if not renewed:
+                    for future in in_flight:
+                        future.cancel()
+                    status = db.query(LotDetectionJob.status).filter(
+                        LotDetectionJob.job_id == job.job_id
+                    ).scalar()
+                    if status == CANCELLED:
+                        db.query(LotDetectionJobItem).filter(
+                            LotDetectionJobItem.job_id == job.job_id,
+                            LotDetectionJobItem.status.in_([PENDING, RUNNING])
+                        ).update({LotDetectionJobItem.status: CANCELLED}, synchronize_session=False)
+                        db.commit()
+                        return CANCELLED
+                    db.rollback()
+                    logger.warning(f"Lost the lease on detection job {job.job_id}; stopping")
+                    return None
+
+                for future in done:
+                    stage, item = in_flight.pop(future)
+                    error = future.exception()
+                    if isinstance(error, BrokenExecutor) and pool is self._pool:
+                        # A worker process died; later phases go to a fresh pool
+                        self._reset_pool()
+                        pool = self._get_pool()
+                    if stage == "download" and error is None:
+                        in_flight[pool.submit(self.detect, future.result(), method, parameters)] = ("detect", item)
+                    else:
+                        self._record(job, item, None if error else future.result(), error)
+
+                fill()
+                db.commit()
+
+        return COMPLETED
+
+    def _record(self, job: LotDetectionJob, item: LotDetectionJobItem, result: Optional[Dict], error):
+        item.completed_at = datetime.utcnow()
+        self.stats["phases"] += 1
+        if error is not None:
+            item.status = FAILED
+            item.error_message = str(error) or type(error).__name__
+            job.failed_phases += 1
+            self.stats["failed_phases"] += 1
+            logger.warning(f"Detection of phase {item.phase_id} in job {job.job_id} failed: {item.error_message}")
+        else:
+            item.status = COMPLETED
+            item.lots_detected = result["lots_detected"]
+            item.result = result
+            job.completed_phases += 1
+            job.lots_detected += result["lots_detected"]
+
+    def _requeue(self, db: Session, job_id: str):
+        """
+        Hand a job this runner still holds back to the queue (runner stopping).
+
+        Its unfinished phases go back to pending, and the claim does not count
+        towards max_attempts: the runner was stopped, the job did not stall.
+        """
+        requeued = db.query(LotDetectionJob).filter(
+            LotDetectionJob.job_id == job_id,
+            LotDetectionJob.status == RUNNING,
+            LotDetectionJob.lease_owner == self.worker_id
+        ).update({
+            LotDetectionJob.status: PENDING,
+            LotDetectionJob.attempts: LotDetectionJob.attempts - 1,
+            LotDetectionJob.lease_owner: None,
+            LotDetectionJob.lease_expires_at: None,
+        }, synchronize_session=False)
+        if requeued:
+            db.query(LotDetectionJobItem).filter(
+                LotDetectionJobItem.job_id == job_id,
+                LotDetectionJobItem.status == RUNNING
+            ).update({LotDetectionJobItem.status: PENDING}, synchronize_session=False)
+        db.commit()
+        if requeued:
+            logger.info(f"⏸️ Requeued detection job {job_id}: runner {self.worker_id} stopping")
+
+    def _release_lease(self, job: LotDetectionJob):
+        if job.lease_owner == self.worker_id:
+            job.lease_owner = None
+            job.lease_expires_at = None
+
+
+# ===================================================================
+# Process-wide runner
+# ===================================================================
+
+_runner: Optional[DetectionJobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_detection_job_runner() -> DetectionJobRunner:
+    """Get (or create) the process-wide detection job runner."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = DetectionJobRunner()
+    return _runner
+
+
+def start_detection_job_runner() -> DetectionJobRunner:
+    """Start the process-wide detection job runner."""
+    runner = get_detection_job_runner()
+    runner.start()
+    return runner
+
+
+def stop_detection_job_runner():
+    """Stop the process-wide runner (app shutdown)."""
+    global _runner
+    with _runner_lock:
+        if _runner is not None:
+            _runner.stop()
+            _runner = None
@@ -4,6 +4,7 @@ Learns lot patterns from just 2-3 examples using template matching
 Uses shape descriptors and similarity scoring
 """
 import cv2
+import logging
 import numpy as np
 import pickle
 from typing import List, Tuple, Optional, Dict
@@ -11,6 +12,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from scipy.spatial import distance
 
+from services.pattern_matrix import PATTERN_SUFFIX, PatternMatrix, load_pattern_arrays, save_pattern_arrays
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class LotPattern:
@@ -63,6 +68,10 @@ class FewShotDetector:
         self.similarity_threshold = similarity_threshold
         self.patterns: Dict[str, LotPattern] = {}
 
+        # Stacked descriptors for scoring, per pattern selection (None = all);
+        # cleared whenever patterns change
+        self._matrices: Dict[Optional[str], PatternMatrix] = {}
+
         # Load existing patterns if directory exists
         if self.patterns_dir and self.patterns_dir.exists():
             self.load_all_patterns()
@@ -129,6 +138,7 @@ class FewShotDetector:
 
         # Store pattern
         self.patterns[pattern_name] = pattern
+        self._matrices.clear()
 
         # Save to disk
         if save_pattern and self.patterns_dir:
@@ -159,73 +169,54 @@ class FewShotDetector:
             raise ValueError("No patterns loaded. Train a pattern first.")
 
         # Determine which patterns to use
-        if pattern_name:
-            if pattern_name not in self.patterns:
-                raise ValueError(f"Pattern '{pattern_name}' not found")
-            patterns = {pattern_name: self.patterns[pattern_name]}
-        else:
-            patterns = self.patterns
+        if pattern_name and pattern_name not in self.patterns:
+            raise ValueError(f"Pattern '{pattern_name}' not found")
+        matrix = self._pattern_matrix(pattern_name)
 
         # Find contours in image
         contours = self._find_contours(image, min_area, max_area)
+        if not contours:
+            return []
+
+        # Score every contour against every pattern example at once
+        descriptors = self._extract_shape_descriptors(contours)
+        areas = np.array([cv2.contourArea(contour) for contour in contours])
+        best, best_scores = matrix.best_matches(descriptors, areas)
 
-        # Match contours against patterns
         matches = []
+        for i in np.flatnonzero(best_scores >= self.similarity_threshold):
+            contour = contours[i]
 
-        for contour in contours:
-            # Calculate shape descriptor for this contour
-            contour_descriptor = self._extract_shape_descriptor(contour)
-            contour_area = cv2.contourArea(contour)
-
-            # Find best matching pattern
-            best_match = None
-            best_score = 0.0
-
-            for pname, pattern in patterns.items():
-                # Calculate similarity to each example in pattern
-                similarities = []
-                for pattern_descriptor in pattern.shape_descriptors:
-                    sim = self._calculate_similarity(
-                        contour_descriptor,
-                        pattern_descriptor,
-                    )
-                    similarities.append(sim)
-
-                # Use maximum similarity among examples
-                max_similarity = max(similarities)
-
-                # Check area similarity
-                area_diff = abs(contour_area - pattern.avg_area)
-                area_tolerance = 2 * pattern.area_std if pattern.area_std > 0 else pattern.avg_area * 0.5
-                area_score = 1.0 - min(area_diff / area_tolerance, 1.0)
-
-                # Combined score (shape 70%, area 30%)
-                combined_score = max_similarity * 0.7 + area_score * 0.3
-
-                if combined_score > best_score:
-                    best_score = combined_score
-                    best_match = pname
-
-            # Add if above threshold
-            if best_score >= self.similarity_threshold:
-                # Get coordinates
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                coordinates = [(int(p[0][0]), int(p[0][1])) for p in approx]
-
-                matches.append(FewShotMatch(
-                    coordinates=coordinates,
-                    area=contour_area,
-                    confidence=float(best_score),
-                    similarity_score=float(best_score),
-                    matched_pattern=best_match,
-                ))
+            # Get coordinates
+            epsilon = 0.02 * cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, epsilon, True)
+            coordinates = [(int(p[0][0]), int(p[0][1])) for p in approx]
+
+            matches.append(FewShotMatch(
+                coordinates=coordinates,
+                area=float(areas[i]),
+                confidence=float(best_scores[i]),
+                similarity_score=float(best_scores[i]),
+                matched_pattern=matrix.names[best[i]] if best[i] >= 0 else None,
+            ))
 
         # Sort by confidence
         matches.sort(key=lambda x: x.confidence, reverse=True)
 
         return matches
 
+    def _pattern_matrix(self, pattern_name: Optional[str]) -> PatternMatrix:
+        """Stacked descriptors of one pattern (or all), built once per pattern change"""
+        matrix = self._matrices.get(pattern_name)
+        if matrix is None:
+            if pattern_name:
+                patterns = [self.patterns[pattern_name]]
+            else:
+                patterns = list(self.patterns.values())
+            matrix = PatternMatrix.from_patterns(patterns)
+            self._matrices[pattern_name] = matrix
+        return matrix
+
     def _find_contours(
         self,
         image: np.ndarray,
@@ -294,6 +285,21 @@ class FewShotDetector:
 
         return hu_moments
 
+    def _extract_shape_descriptors(self, contours: List[np.ndarray]) -> np.ndarray:
+        """
+        Shape descriptors of many contours (rows match _extract_shape_descriptor)
+
+        Args:
+            contours: OpenCV contours
+
+        Returns:
+            (n, 7) descriptor matrix
+        """
+        hu_moments = np.array([cv2.HuMoments(cv2.moments(contour)).flatten() for contour in contours])
+
+        # Log transform
+        return -np.sign(hu_moments) * np.log10(np.abs(hu_moments) + 1e-10)
+
     def _calculate_similarity(
         self,
         descriptor1: np.ndarray,
@@ -320,7 +326,7 @@ class FewShotDetector:
 
     def save_pattern(self, pattern: LotPattern):
         """
-        Save pattern to disk
+        Save pattern to disk (.npz of descriptors, contours and area stats)
 
         Args:
             pattern: Pattern to save
@@ -330,10 +336,21 @@ class FewShotDetector:
 
         self.patterns_dir.mkdir(parents=True, exist_ok=True)
 
-        pattern_file = self.patterns_dir / f"{pattern.name}.pkl"
+        save_pattern_arrays(
+            self.patterns_dir / f"{pattern.name}{PATTERN_SUFFIX}",
+            name=pattern.name,
+            descriptors=pattern.shape_descriptors,
+            contours=pattern.contours,
+            avg_area=pattern.avg_area,
+            area_std=pattern.area_std,
+            avg_vertices=pattern.avg_vertices,
+            metadata=pattern.metadata,
+        )
 
-        with open(pattern_file, 'wb') as f:
-            pickle.dump(pattern, f)
+        # Replaces any pickle from before patterns were stored as arrays
+        legacy_file = self.patterns_dir / f"{pattern.name}.pkl"
+        if legacy_file.exists():
+            legacy_file.unlink()
 
     def load_pattern(self, pattern_name: str) -> LotPattern:
         """
@@ -348,15 +365,18 @@ class FewShotDetector:
         if not self.patterns_dir:
             raise ValueError("No patterns directory specified")
 
-        pattern_file = self.patterns_dir / f"{pattern_name}.pkl"
+        pattern_file = self.patterns_dir / f"{pattern_name}{PATTERN_SUFFIX}"
+        legacy_file = self.patterns_dir / f"{pattern_name}.pkl"
 
-        if not pattern_file.exists():
+        if pattern_file.exists():
+            pattern = self._read_pattern_file(pattern_file)
+        elif legacy_file.exists():
+            pattern = self._read_pattern_file(legacy_file)
+        else:
             raise FileNotFoundError(f"Pattern file not found: {pattern_file}")
 
-        with open(pattern_file, 'rb') as f:
-            pattern = pickle.load(f)
-
         self.patterns[pattern.name] = pattern
+        self._matrices.clear()
 
         return pattern
 
@@ -365,13 +385,31 @@ class FewShotDetector:
         if not self.patterns_dir or not self.patterns_dir.exists():
             return
 
-        for pattern_file in self.patterns_dir.glob("*.pkl"):
+        pattern_files = sorted(self.patterns_dir.glob(f"*{PATTERN_SUFFIX}"))
+        stored = {f.stem for f in pattern_files}
+        pattern_files += [f for f in sorted(self.patterns_dir.glob("*.pkl")) if f.stem not in stored]
+
+        for pattern_file in pattern_files:
             try:
-                with open(pattern_file, 'rb') as f:
-                    pattern = pickle.load(f)
+                pattern = self._read_pattern_file(pattern_file)
                 self.patterns[pattern.name] = pattern
             except Exception as e:
-                print(f"Error loading pattern {pattern_file}: {e}")
+                logger.error(f"Error loading pattern {pattern_file}: {e}")
+
+        self._matrices.clear()
+
+    def _read_pattern_file(self, pattern_file: Path) -> LotPattern:
+        """Read an .npz pattern, or a legacy pickle (converted to .npz on the way)"""
+        if pattern_file.suffix == PATTERN_SUFFIX:
+            return LotPattern(**load_pattern_arrays(pattern_file))
+
+        with open(pattern_file, 'rb') as f:
+            pattern = pickle.load(f)
+        try:
+            self.save_pattern(pattern)
+        except Exception as e:
+            logger.warning(f"Could not convert pattern {pattern_file} to {PATTERN_SUFFIX}: {e}")
+        return pattern
 
     def delete_pattern(self, pattern_name: str):
         """
@@ -383,12 +421,14 @@ class FewShotDetector:
         # Remove from memory
         if pattern_name in self.patterns:
             del self.patterns[pattern_name]
+        self._matrices.clear()
 
         # Remove from disk
         if self.patterns_dir:
-            pattern_file = self.patterns_dir / f"{pattern_name}.pkl"
-            if pattern_file.exists():
-                pattern_file.unlink()
+            for suffix in (PATTERN_SUFFIX, ".pkl"):
+                pattern_file = self.patterns_dir / f"{pattern_name}{suffix}"
+                if pattern_file.exists():
+                    pattern_file.unlink()
 
     def list_patterns(self) -> List[str]:
         """
@@ -0,0 +1,207 @@
+"""
+Line Graph Engine
+Vectorized collinear-segment grouping and segment intersection search for
+LineLotDetector
+
+Produces exactly the groups and intersection points of the original
+pairwise loops, in the same order, without comparing every pair:
+- Endpoint proximity comes from a KD-tree over segment endpoints; angle
+  similarity is then checked for the near pairs only
+- Intersection candidates come from a sweep over the segments' bounding
+  boxes (extended by the intersection tolerance); intersections of all
+  candidate pairs are computed in NumPy batches with the same arithmetic
+  as LineLotDetector._line_intersection
+- Near-duplicate intersections are removed with a grid hash instead of a
+  scan over every point kept so far
+"""
+from typing import List, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Tolerance on the segment parameters t, u (matches _line_intersection)
+INTERSECTION_TOLERANCE = 0.1
+
+# Candidate pairs evaluated per NumPy batch
+PAIR_BATCH = 1 << 20
+
+
+def collinear_groups(
+    segments: np.ndarray,
+    angles: np.ndarray,
+    angle_threshold: float,
+    max_distance: float,
+) -> List[List[int]]:
+    """
+    Group segments to be merged into one line.
+
+    Same rule as the original greedy pass: segments are visited in order;
+    each segment not yet grouped starts a group and takes every later
+    ungrouped segment whose angle differs by less than angle_threshold and
+    which has an endpoint closer than max_distance to one of its own.
+
+    Args:
+        segments: (n, 4) array of x1, y1, x2, y2
+        angles: (n,) segment angles in degrees
+        angle_threshold: Maximum angle difference (exclusive)
+        max_distance: Maximum endpoint distance (exclusive)
+
+    Returns:
+        Groups of segment indices, seed first, in seed order
+    """
+    n = len(segments)
+    if n == 0:
+        return []
+
+    endpoints = np.asarray(segments, dtype=np.float64).reshape(-1, 2)
+    pairs = cKDTree(endpoints).query_pairs(r=max_distance, output_type='ndarray')
+
+    if len(pairs):
+        a, b = pairs[:, 0], pairs[:, 1]
+        distances = np.sqrt(((endpoints[a] - endpoints[b]) ** 2).sum(axis=1))
+        i, j = np.minimum(a // 2, b // 2), np.maximum(a // 2, b // 2)
+        keep = (distances < max_distance) & (i != j)
+        i, j = i[keep], j[keep]
+
+        diff = np.abs(angles[i] - angles[j])
+        diff = np.where(diff > 180, 360 - diff, diff)
+        keep = diff < angle_threshold
+        pair_ids = np.unique(i[keep].astype(np.int64) * n + j[keep])
+        i, j = pair_ids // n, pair_ids % n
+    else:
+        i = j = np.zeros(0, dtype=np.int64)
+
+    # Later neighbours of every segment, in index order
+    starts = np.searchsorted(i, np.arange(n + 1))
+    used = np.zeros(n, dtype=bool)
+    groups = []
+    for seed in range(n):
+        if used[seed]:
+            continue
+        later = j[starts[seed]:starts[seed + 1]]
+        later = later[~used[later]]
+        used[later] = True
+        used[seed] = True
+        groups.append([seed] + later.tolist())
+    return groups
+
+
+def _candidate_pairs(segments: np.ndarray):
+    """Yield (i, j) batches of segment pairs whose extended bounding boxes overlap."""
+    x1, y1, x2, y2 = (segments[:, k].astype(np.float64) for k in range(4))
+    dx, dy = (x2 - x1) * INTERSECTION_TOLERANCE, (y2 - y1) * INTERSECTION_TOLERANCE
+    xs = np.stack([x1 - dx, x2 + dx])
+    ys = np.stack([y1 - dy, y2 + dy])
+    # One pixel of slack for the integer truncation of intersection points
+    xmin, xmax = xs.min(axis=0) - 1, xs.max(axis=0) + 1
+    ymin, ymax = ys.min(axis=0) - 1, ys.max(axis=0) + 1
+
+    order = np.argsort(xmin, kind='stable')
+    xmin_sorted = xmin[order]
+    ends = np.searchsorted(xmin_sorted, xmax[order], side='right')
+    counts = np.maximum(ends - np.arange(len(order)) - 1, 0)
+
+    start = 0
+    while start < len(order):
+        # Take as many sweep positions as fit in one batch (at least one)
+        cumulative = np.cumsum(counts[start:])
+        stop = start + max(1, int(np.searchsorted(cumulative, PAIR_BATCH, side='right')))
+        block_counts = counts[start:stop]
+        total = int(block_counts.sum())
+        if total:
+            first = np.repeat(np.arange(start, stop), block_counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+            second = first + 1 + offsets
+            a, b = order[first], order[second]
+            overlap = (ymin[a] <= ymax[b]) & (ymin[b] <= ymax[a])
+            a, b = a[overlap], b[overlap]
+            yield np.minimum(a, b), np.maximum(a, b)
+        start = stop
+
+
+def segment_intersections(segments: np.ndarray, min_separation: float = 10) -> List[Tuple[int, int]]:
+    """
+    Intersection points of all segment pairs, near-duplicates removed.
+
+    Same result as evaluating _line_intersection for every pair (i < j) in
+    order and keeping each point unless a kept point lies closer than
+    min_separation.
+
+    Args:
+        segments: (n, 4) integer array of x1, y1, x2, y2
+        min_separation: Points closer than this to a kept point are dropped
+
+    Returns:
+        Intersection points as (x, y) tuples
+    """
+    segments = np.asarray(segments, dtype=np.int64)
+    if len(segments) < 2:
+        return []
+
+    found_i, found_j, found_x, found_y = [], [], [], []
+    for i, j in _candidate_pairs(segments):
+        x1, y1, x2, y2 = (segments[i, k] for k in range(4))
+        x3, y3, x4, y4 = (segments[j, k] for k in range(4))
+
+        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+        valid = denom != 0
+        if not valid.any():
+            continue
+        i, j = i[valid], j[valid]
+        x1, y1, x2, y2, x3, y3, x4, y4, denom = (
+            v[valid] for v in (x1, y1, x2, y2, x3, y3, x4, y4, denom)
+        )
+
+        # Integer numerators divided once: the same correctly rounded
+        # quotients as Python's int / int
+        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+        u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
+
+        lo, hi = -INTERSECTION_TOLERANCE, 1 + INTERSECTION_TOLERANCE
+        inside = (lo <= t) & (t <= hi) & (lo <= u) & (u <= hi)
+        t, x1, y1, x2, y2 = t[inside], x1[inside], y1[inside], x2[inside], y2[inside]
+
+        found_i.append(i[inside])
+        found_j.append(j[inside])
+        found_x.append(np.trunc(x1 + t * (x2 - x1)).astype(np.int64))
+        found_y.append(np.trunc(y1 + t * (y2 - y1)).astype(np.int64))
+
+    if not found_i:
+        return []
+
+    # Original visiting order: by first segment, then second
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    order = np.lexsort((j, i))
+    points = np.stack([np.concatenate(found_x)[order], np.concatenate(found_y)[order]], axis=1)
+
+    # A repeat of an earlier point is always dropped; only first
+    # occurrences need the sequential check
+    _, first = np.unique(points, axis=0, return_index=True)
+    points = points[np.sort(first)]
+
+    return _dedupe_points(points, min_separation)
+
+
+def _dedupe_points(points: np.ndarray, min_separation: float) -> List[Tuple[int, int]]:
+    """Keep points in order unless a kept point lies closer than min_separation."""
+    cell = float(min_separation)
+    limit = min_separation * min_separation
+    grid = {}
+    kept = []
+    for x, y in points.tolist():
+        cx, cy = int(x // cell), int(y // cell)
+        duplicate = False
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for kx, ky in grid.get((gx, gy), ()):
+                    if (x - kx) ** 2 + (y - ky) ** 2 < limit:
+                        duplicate = True
+                        break
+                if duplicate:
+                    break
+            if duplicate:
+                break
+        if not duplicate:
+            grid.setdefault((cx, cy), []).append((x, y))
+            kept.append((x, y))
+    return kept
@@ -7,7 +7,8 @@ import cv2
 import numpy as np
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
-from scipy.spatial import distance
+
+from services.line_graph import collinear_groups, segment_intersections
 
 
 @dataclass
@@ -167,37 +168,13 @@ class LineLotDetector:
         if not lines:
             return []
 
-        merged = []
-        used = set()
+        segments = np.array([(line.x1, line.y1, line.x2, line.y2) for line in lines], dtype=np.int64)
+        angles = np.array([line.angle for line in lines], dtype=np.float64)
+        groups = collinear_groups(segments, angles, self.angle_threshold, self.max_line_gap * 2)
 
-        for i, line1 in enumerate(lines):
-            if i in used:
-                continue
-
-            # Find lines with similar angles
-            similar_lines = [line1]
-            for j, line2 in enumerate(lines):
-                if j <= i or j in used:
-                    continue
-
-                # Check if angles are similar
-                angle_diff = abs(line1.angle - line2.angle)
-                if angle_diff > 180:
-                    angle_diff = 360 - angle_diff
-
-                if angle_diff < self.angle_threshold:
-                    # Check if lines are close to each other
-                    # Simplified check: if endpoints are close
-                    dist = min(
-                        distance.euclidean((line1.x1, line1.y1), (line2.x1, line2.y1)),
-                        distance.euclidean((line1.x1, line1.y1), (line2.x2, line2.y2)),
-                        distance.euclidean((line1.x2, line1.y2), (line2.x1, line2.y1)),
-                        distance.euclidean((line1.x2, line1.y2), (line2.x2, line2.y2)),
-                    )
-
-                    if dist < self.max_line_gap * 2:
-                        similar_lines.append(line2)
-                        used.add(j)
+        merged = []
+        for group in groups:
+            similar_lines = [lines[k] for k in group]
 
             # Merge similar lines by finding extreme points
             if len(similar_lines) > 1:
@@ -227,9 +204,7 @@ class LineLotDetector:
                     length=length,
                 ))
             else:
-                merged.append(line1)
-
-            used.add(i)
+                merged.append(similar_lines[0])
 
         return merged
 
@@ -246,30 +221,13 @@ class LineLotDetector:
         Returns:
             List of intersection points
         """
-        intersections = []
-
-        for i, line1 in enumerate(lines):
-            for j, line2 in enumerate(lines):
-                if j <= i:
-                    continue
-
-                # Calculate intersection
-                intersection = self._line_intersection(line1, line2)
-                if intersection:
-                    intersections.append(intersection)
-
-        # Remove duplicates (points close to each other)
-        unique_intersections = []
-        for point in intersections:
-            is_duplicate = False
-            for existing in unique_intersections:
-                if distance.euclidean(point, existing) < 10:  # 10 pixel threshold
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                unique_intersections.append(point)
-
-        return unique_intersections
+        if not lines:
+            return []
+
+        segments = np.array([(line.x1, line.y1, line.x2, line.y2) for line in lines], dtype=np.int64)
+
+        # Points closer than 10 pixels to an earlier one are duplicates
+        return segment_intersections(segments, min_separation=10)
 
     def _line_intersection(
         self,
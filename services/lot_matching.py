@@ -0,0 +1,234 @@
+"""
+Lot Number Matching
+Assigns OCR lot numbers to detected lot boundaries for AutoDetectService
+
+Each boundary/lot-number pair is scored by the distance from the polygon
+centroid to the number's position, reduced to INSIDE_WEIGHT of that when
+the number lies inside the polygon; pairs scoring max_distance or more are
+never matched.
+
+- Centroids and point-in-polygon tests are computed for all candidate
+  pairs at once in NumPy
+- A KD-tree over lot number positions limits candidates to numbers near
+  the centroid or inside the polygon's bounding box
+- greedy: boundaries in order each take their best unused number (the
+  original AutoDetectService behaviour)
+- optimal: minimum-cost assignment (the problem the Hungarian method
+  solves) that matches as many boundaries as possible at the lowest total
+  score; solved on the sparse candidate graph with scipy's
+  min_weight_full_bipartite_matching, since on a street grid all
+  boundaries compete in one connected group and a dense cost matrix
+  would not fit in memory
+"""
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from scipy.spatial import cKDTree
+
+GREEDY = "greedy"
+OPTIMAL = "optimal"
+MATCHING_MODES = (GREEDY, OPTIMAL)
+
+# Score multiplier for numbers inside the boundary (strong preference)
+INSIDE_WEIGHT = 0.1
+
+
+class _Polygons:
+    """Polygons packed into flat vertex arrays."""
+
+    def __init__(self, polygons: Sequence[Sequence[Tuple[float, float]]]):
+        self.sizes = np.array([len(p) for p in polygons], dtype=np.int64)
+        self.offsets = np.cumsum(self.sizes) - self.sizes
+        self.vertices = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons])
+
+        # Edge k of a polygon runs from vertex k-1 to vertex k (wrapping)
+        polygon_of = np.repeat(np.arange(len(polygons)), self.sizes)
+        local = np.arange(len(self.vertices)) - self.offsets[polygon_of]
+        previous = self.offsets[polygon_of] + (local - 1) % self.sizes[polygon_of]
+        self.edge_start = self.vertices[previous]
+        self.edge_end = self.vertices
+
+    def centroids(self) -> np.ndarray:
+        """Vertex mean of every polygon ((0, 0) for empty ones)."""
+        sums = np.zeros((len(self.sizes), 2))
+        np.add.at(sums, np.repeat(np.arange(len(self.sizes)), self.sizes), self.vertices)
+        return sums / np.maximum(self.sizes, 1)[:, None]
+
+    def bounds(self) -> np.ndarray:
+        """(x0, y0, x1, y1) of every polygon (NaN for empty ones)."""
+        boxes = np.full((len(self.sizes), 4), np.nan)
+        present = self.sizes > 0
+        starts = self.offsets[present]
+        boxes[present, 0] = np.minimum.reduceat(self.vertices[:, 0], starts)
+        boxes[present, 1] = np.minimum.reduceat(self.vertices[:, 1], starts)
+        boxes[present, 2] = np.maximum.reduceat(self.vertices[:, 0], starts)
+        boxes[present, 3] = np.maximum.reduceat(self.vertices[:, 1], starts)
+        return boxes
+
+    def contains(self, polygon_index: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Ray-casting point-in-polygon test for (polygon, point) pairs.
+
+        Args:
+            polygon_index: (k,) polygon of each pair
+            points: (k, 2) point of each pair
+
+        Returns:
+            (k,) bool, True where the point is inside its polygon
+        """
+        inside = np.zeros(len(polygon_index), dtype=bool)
+        sizes = self.sizes[polygon_index]
+        present = np.flatnonzero(sizes > 0)
+        if not len(present):
+            return inside
+
+        # One row per (pair, edge)
+        counts = sizes[present]
+        pair = np.repeat(present, counts)
+        first_row = np.cumsum(counts) - counts
+        edge = np.repeat(self.offsets[polygon_index[present]], counts) + (
+            np.arange(counts.sum()) - np.repeat(first_row, counts)
+        )
+
+        x, y = points[pair, 0], points[pair, 1]
+        p1x, p1y = self.edge_start[edge, 0], self.edge_start[edge, 1]
+        p2x, p2y = self.edge_end[edge, 0], self.edge_end[edge, 1]
+
+        spans = (y > np.minimum(p1y, p2y)) & (y <= np.maximum(p1y, p2y)) & (x <= np.maximum(p1x, p2x))
+        dy = p2y - p1y
+        xinters = np.divide((y - p1y) * (p2x - p1x), dy, out=np.zeros_like(dy), where=dy != 0) + p1x
+        crosses = spans & ((p1x == p2x) | (x <= xinters))
+
+        inside[present] = np.add.reduceat(crosses.astype(np.int64), first_row) % 2 == 1
+        return inside
+
+
+def candidate_scores(
+    polygons: Sequence[Sequence[Tuple[float, float]]],
+    positions: Sequence[Tuple[float, float]],
+    max_distance: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score every boundary/lot-number pair that can match.
+
+    Args:
+        polygons: Boundary vertices
+        positions: Lot number positions (x, y)
+        max_distance: Pairs scoring this or more are dropped
+
+    Returns:
+        (boundary index, lot number index, score) arrays, ordered by
+        boundary, then lot number
+    """
+    empty = (np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0))
+    if not len(polygons) or not len(positions):
+        return empty
+
+    packed = _Polygons(polygons)
+    points = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    centroids = packed.centroids()
+    boxes = packed.bounds()
+    tree = cKDTree(points)
+
+    # Numbers near the centroid, plus numbers inside the bounding box (which
+    # may be inside the polygon, and then only need to be within
+    # max_distance / INSIDE_WEIGHT)
+    near = tree.query_ball_point(centroids, r=max_distance * (1 + 1e-9))
+    present = np.flatnonzero(~np.isnan(boxes[:, 0]))
+    centers = (boxes[present, :2] + boxes[present, 2:]) / 2
+    half = np.maximum(boxes[present, 2] - boxes[present, 0], boxes[present, 3] - boxes[present, 1]) / 2
+    in_box = tree.query_ball_point(centers, r=half, p=np.inf)
+
+    def flatten(owners, lists):
+        counts = np.array([len(c) for c in lists], dtype=np.int64)
+        members = np.fromiter(chain.from_iterable(lists), dtype=np.int64, count=counts.sum())
+        return np.repeat(owners, counts) * len(points) + members
+
+    pair_ids = np.unique(np.concatenate([
+        flatten(np.arange(len(polygons)), near),
+        flatten(present, in_box),
+    ]))
+    if not len(pair_ids):
+        return empty
+    boundary, number = pair_ids // len(points), pair_ids % len(points)
+
+    dx = centroids[boundary, 0] - points[number, 0]
+    dy = centroids[boundary, 1] - points[number, 1]
+    score = np.sqrt(dx * dx + dy * dy)
+    inside = packed.contains(boundary, points[number])
+    score = np.where(inside, score * INSIDE_WEIGHT, score)
+
+    keep = score < max_distance
+    return boundary[keep], number[keep], score[keep]
+
+
+def _greedy(n: int, boundary: np.ndarray, number: np.ndarray, score: np.ndarray) -> List[Optional[int]]:
+    # Best (lowest score, then lowest index) candidate first within each boundary
+    order = np.lexsort((number, score, boundary))
+    boundary, number = boundary[order], number[order]
+    starts = np.searchsorted(boundary, np.arange(n + 1))
+
+    used = set()
+    assignment: List[Optional[int]] = [None] * n
+    for i in range(n):
+        for candidate in number[starts[i]:starts[i + 1]].tolist():
+            if candidate not in used:
+                used.add(candidate)
+                assignment[i] = candidate
+                break
+    return assignment
+
+
+def _optimal(n: int, m: int, boundary: np.ndarray, number: np.ndarray, score: np.ndarray) -> List[Optional[int]]:
+    assignment: List[Optional[int]] = [None] * n
+    if not len(boundary):
+        return assignment
+
+    # Sparse assignment problem: one row per boundary; columns are the
+    # numbers plus an "unmatched" column for each boundary. Leaving a
+    # boundary unmatched costs more than any set of real matches, so the
+    # most boundaries are matched before scores are compared. Every row is
+    # matched exactly once, so the +1 on all weights (explicit zeros would
+    # be dropped) does not change the optimum.
+    unmatched = (score.max() + 1) * (min(n, m) + 1)
+    rows = np.concatenate([boundary, np.arange(n)])
+    cols = np.concatenate([number, m + np.arange(n)])
+    weights = np.concatenate([score, np.full(n, unmatched)]) + 1
+    graph = csr_matrix((weights, (rows, cols)), shape=(n, m + n))
+
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+    real = matched_cols < m
+    for row, col in zip(matched_rows[real].tolist(), matched_cols[real].tolist()):
+        assignment[row] = col
+    return assignment
+
+
+def match_lot_numbers(
+    polygons: Sequence[Sequence[Tuple[float, float]]],
+    positions: Sequence[Tuple[float, float]],
+    max_distance: float,
+    mode: str = GREEDY,
+) -> List[Optional[int]]:
+    """
+    Assign lot numbers to boundaries, each number to at most one boundary.
+
+    Args:
+        polygons: Boundary vertices
+        positions: Lot number positions (x, y)
+        max_distance: Maximum match score (centroid distance, or
+            INSIDE_WEIGHT of it for numbers inside the boundary)
+        mode: GREEDY or OPTIMAL
+
+    Returns:
+        Index into positions for every boundary, or None when unmatched
+    """
+    if mode not in MATCHING_MODES:
+        raise ValueError(f"Unknown matching mode: {mode} (expected one of {', '.join(MATCHING_MODES)})")
+
+    boundary, number, score = candidate_scores(polygons, positions, max_distance)
+    if mode == OPTIMAL:
+        return _optimal(len(polygons), len(positions), boundary, number, score)
+    return _greedy(len(polygons), boundary, number, score)
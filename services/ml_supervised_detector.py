@@ -6,6 +6,7 @@ Uses RandomForest classifier with feature extraction
 import cv2
 import numpy as np
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass, asdict
 from pathlib import Path
@@ -13,6 +14,15 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from scipy.spatial import distance
 
+from config.settings import ML_FEATURE_WORKERS
+
+# Order of the columns returned by extract_features
+FEATURE_NAMES = (
+    'area', 'perimeter', 'aspect_ratio', 'extent', 'solidity',
+    'num_vertices', 'circularity', 'edge_density',
+    'mean_intensity', 'std_intensity',
+)
+
 
 @dataclass
 class TrainingExample:
@@ -101,8 +111,61 @@ class MLSupervisedDetector:
         Returns:
             Feature vector (numpy array)
         """
-        features = []
+        return self._contour_features(contour, *self._feature_planes(image))
+
+    def extract_features_batch(
+        self,
+        contours: List[np.ndarray],
+        image: np.ndarray,
+        workers: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Extract features for many contours of one image
+
+        Grayscale conversion and edge detection run once for the image,
+        and each contour's mask only covers its bounding box. Rows are
+        identical to extract_features for the same contour.
+
+        Args:
+            contours: List of OpenCV contours
+            image: Source image
+            workers: Threads for feature extraction (None = ML_FEATURE_WORKERS)
+
+        Returns:
+            Feature matrix, one row per contour
+        """
+        if not contours:
+            return np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+
+        gray, edges = self._feature_planes(image)
+        workers = ML_FEATURE_WORKERS if workers is None else workers
+
+        if workers > 1 and len(contours) > 1:
+            # OpenCV releases the GIL, so threads extract in parallel
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                rows = list(executor.map(lambda c: self._contour_features(c, gray, edges), contours))
+        else:
+            rows = [self._contour_features(contour, gray, edges) for contour in contours]
+
+        return np.stack(rows)
 
+    def _feature_planes(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Grayscale image and its Canny edges, shared by all contours of an image"""
+        if len(image.shape) == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image.copy()
+
+        edges = cv2.Canny(gray, 50, 150)
+        return gray, edges
+
+    def _contour_features(
+        self,
+        contour: np.ndarray,
+        gray: np.ndarray,
+        edges: np.ndarray,
+    ) -> np.ndarray:
+        """Feature vector of one contour (see extract_features)"""
         # Basic shape features
         area = cv2.contourArea(contour)
         perimeter = cv2.arcLength(contour, True)
@@ -128,22 +191,26 @@ class MLSupervisedDetector:
         # Circularity (4π * area / perimeter²)
         circularity = (4 * np.pi * area) / (perimeter ** 2) if perimeter > 0 else 0
 
-        # Create mask for contour
-        mask = np.zeros(image.shape[:2], dtype=np.uint8)
-        cv2.drawContours(mask, [contour], -1, 255, -1)
-
-        # Edge density inside contour
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Mask for the contour, limited to its bounding box within the image
+        # (the filled contour never extends past the box, so the pixels are
+        # the same as with a full-image mask)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, gray.shape[1]), min(y + h, gray.shape[0])
+        if x1 > x0 and y1 > y0:
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.drawContours(mask, [contour], -1, 255, -1, offset=(-x0, -y0))
+
+            edges_roi = edges[y0:y1, x0:x1]
+            edge_pixels = cv2.countNonZero(cv2.bitwise_and(edges_roi, edges_roi, mask=mask))
+            masked_pixels = gray[y0:y1, x0:x1][mask > 0]
         else:
-            gray = image.copy()
+            edge_pixels = 0
+            masked_pixels = gray[:0, :0].ravel()
 
-        edges = cv2.Canny(gray, 50, 150)
-        edge_pixels = cv2.countNonZero(cv2.bitwise_and(edges, edges, mask=mask))
+        # Edge density inside contour
         edge_density = edge_pixels / area if area > 0 else 0
 
         # Intensity statistics
-        masked_pixels = gray[mask > 0]
         mean_intensity = np.mean(masked_pixels) if len(masked_pixels) > 0 else 0
         std_intensity = np.std(masked_pixels) if len(masked_pixels) > 0 else 0
 
@@ -208,12 +275,7 @@ class MLSupervisedDetector:
         train_accuracy = self.classifier.score(X_scaled, y)
 
         # Feature importance
-        feature_names = [
-            'area', 'perimeter', 'aspect_ratio', 'extent', 'solidity',
-            'num_vertices', 'circularity', 'edge_density',
-            'mean_intensity', 'std_intensity'
-        ]
-        importance = dict(zip(feature_names, self.classifier.feature_importances_))
+        importance = dict(zip(FEATURE_NAMES, self.classifier.feature_importances_))
 
         # Save model
         if save_model and self.model_path:
@@ -229,6 +291,7 @@ class MLSupervisedDetector:
         self,
         contours: List[np.ndarray],
         image: np.ndarray,
+        workers: Optional[int] = None,
     ) -> List[MLLotCandidate]:
         """
         Predict which contours are valid lots
@@ -236,6 +299,7 @@ class MLSupervisedDetector:
         Args:
             contours: List of OpenCV contours
             image: Source image
+            workers: Threads for feature extraction (None = ML_FEATURE_WORKERS)
 
         Returns:
             List of lot candidates with predictions
@@ -243,18 +307,21 @@ class MLSupervisedDetector:
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first or load a trained model.")
 
-        candidates = []
+        if not contours:
+            return []
 
-        for contour in contours:
-            # Extract features
-            features = self.extract_features(contour, image)
+        # One feature matrix and one classifier pass for all contours
+        features = self.extract_features_batch(contours, image, workers=workers)
+        features_scaled = self.scaler.transform(features)
+        probabilities = self.classifier.predict_proba(features_scaled)
 
-            # Scale features
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
+        # RandomForestClassifier.predict is the most probable class
+        predictions = self.classifier.classes_.take(np.argmax(probabilities, axis=1))
+        confidences = probabilities[np.arange(len(contours)), predictions]
 
-            # Predict
-            prediction = self.classifier.predict(features_scaled)[0]
-            confidence = self.classifier.predict_proba(features_scaled)[0][prediction]
+        lots = []
+        for i in np.flatnonzero(predictions == 1):
+            contour = contours[i]
 
             # Get coordinates
             epsilon = 0.02 * cv2.arcLength(contour, True)
@@ -264,17 +331,14 @@ class MLSupervisedDetector:
             # Calculate area
             area = cv2.contourArea(contour)
 
-            candidates.append(MLLotCandidate(
+            lots.append(MLLotCandidate(
                 coordinates=coordinates,
                 area=area,
-                confidence=float(confidence),
-                features=features,
-                prediction=int(prediction),
+                confidence=float(confidences[i]),
+                features=features[i],
+                prediction=int(predictions[i]),
             ))
 
-        # Filter only predicted lots (prediction == 1)
-        lots = [c for c in candidates if c.prediction == 1]
-
         # Sort by confidence
         lots.sort(key=lambda x: x.confidence, reverse=True)
 
@@ -429,11 +493,7 @@ class MLSupervisedDetector:
             'is_trained': True,
             'training_samples': len(self.training_data),
             'n_estimators': self.n_estimators,
-            'feature_names': [
-                'area', 'perimeter', 'aspect_ratio', 'extent', 'solidity',
-                'num_vertices', 'circularity', 'edge_density',
-                'mean_intensity', 'std_intensity'
-            ],
+            'feature_names': list(FEATURE_NAMES),
             'model_path': self.model_path,
         }
 
@@ -0,0 +1,413 @@
+"""
+OCR Engine
+Cached, region-parallel Tesseract OCR for OCRService
+
+- Raw OCR tokens (text, confidence, box) are cached per image content hash
+  and OCR settings (preprocessing, page segmentation mode, region mode), in
+  memory and on disk. Confidence thresholds and lot number patterns are
+  applied by the caller afterwards, so changing them never re-runs OCR
+- In "regions" mode, text-like regions are found on the preprocessed image
+  (long boundary lines removed, characters merged into labels), packed
+  into a few compact canvases and OCR'd in parallel - one tesseract process
+  per canvas - instead of running tesseract over the whole site plan
+- Region detection uses SciPy only; tesseract is only needed on a cache miss
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import ndimage
+
+from config.settings import OCR_CACHE_DIR, OCR_CACHE_MAX_MB, OCR_ROI_MODE, OCR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+REGIONS = "regions"
+ROI_MODES = (FULL, REGIONS)
+
+# Bump when token extraction changes, so old cache entries are ignored
+CACHE_VERSION = 1
+
+# Text region detection (pixels)
+LINE_LENGTH = 40          # straight ink runs at least this long are lines, not text
+CHARACTER_GAP = 12        # characters closer than this merge into one label
+MIN_TEXT_HEIGHT = 6
+MAX_TEXT_HEIGHT = 200
+MAX_TEXT_WIDTH = 800
+MIN_INK_PIXELS = 12
+REGION_MARGIN = 6         # white border kept around each region
+
+# Region canvases
+CANVAS_GAP = 40           # white space between packed regions
+MIN_CANVAS_WIDTH = 2000
+
+
+@dataclass(frozen=True)
+class OCRToken:
+    """One word from tesseract, in image coordinates, before any filtering"""
+    text: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+# ===================================================================
+# Tesseract
+# ===================================================================
+
+def tesseract_tokens(image: np.ndarray, psm: int) -> List[OCRToken]:
+    """
+    Run tesseract over an image and return every non-empty word.
+
+    Raises:
+        Exception: If tesseract fails (results are not cached then)
+    """
+    import pytesseract
+    from pytesseract import Output
+
+    data = pytesseract.image_to_data(
+        image,
+        config=f'--psm {psm} --oem 3',  # LSTM OCR Engine Mode
+        output_type=Output.DICT
+    )
+    tokens = []
+    for i in range(len(data['text'])):
+        text = data['text'][i].strip()
+        if text:
+            tokens.append(OCRToken(
+                text=text,
+                confidence=float(data['conf'][i]),
+                bbox=(int(data['left'][i]), int(data['top'][i]), int(data['width'][i]), int(data['height'][i])),
+            ))
+    return tokens
+
+
+# ===================================================================
+# Text regions
+# ===================================================================
+
+def _runs(mask: np.ndarray, length: int, axis: int) -> np.ndarray:
+    """Pixels that belong to a straight run of at least `length` along axis."""
+    full = ndimage.uniform_filter1d(mask.astype(np.float32), length, axis=axis, mode="constant") > 1 - 0.5 / length
+    return ndimage.maximum_filter1d(full, length, axis=axis, mode="constant")
+
+
+def text_regions(image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Find label-sized clusters of ink (dark pixels) that are likely text.
+
+    Long horizontal/vertical runs (lot boundaries, streets) are removed
+    first, so labels touching a boundary line are still found.
+
+    Args:
+        image: Preprocessed image, dark text on light background
+
+    Returns:
+        Regions (x, y, width, height) in reading order, with a small margin
+    """
+    gray = image if image.ndim == 2 else image.mean(axis=2)
+    ink = gray < 128
+    ink &= ~(_runs(ink, LINE_LENGTH, axis=1) | _runs(ink, LINE_LENGTH, axis=0))
+
+    merged = ndimage.maximum_filter1d(ink, CHARACTER_GAP, axis=1, mode="constant")
+    merged = ndimage.maximum_filter1d(merged, 3, axis=0, mode="constant")
+    labels, count = ndimage.label(merged)
+    if not count:
+        return []
+
+    ink_counts = ndimage.sum_labels(ink, labels, index=np.arange(1, count + 1))
+    height, width = gray.shape
+    regions = []
+    for index, found in enumerate(ndimage.find_objects(labels)):
+        rows, cols = found
+        h, w = rows.stop - rows.start, cols.stop - cols.start
+        if not (MIN_TEXT_HEIGHT <= h <= MAX_TEXT_HEIGHT and w <= MAX_TEXT_WIDTH and ink_counts[index] >= MIN_INK_PIXELS):
+            continue
+        x0, y0 = max(0, cols.start - REGION_MARGIN), max(0, rows.start - REGION_MARGIN)
+        x1, y1 = min(width, cols.stop + REGION_MARGIN), min(height, rows.stop + REGION_MARGIN)
+        regions.append((x0, y0, x1 - x0, y1 - y0))
+
+    regions.sort(key=lambda r: (r[1], r[0]))
+    return regions
+
+
+@dataclass
+class _Canvas:
+    image: np.ndarray
+    placements: np.ndarray  # (n, 6): canvas x, canvas y, width, height, source x, source y
+
+
+def pack_regions(
+    image: np.ndarray,
+    regions: Sequence[Tuple[int, int, int, int]],
+    groups: int,
+) -> List[_Canvas]:
+    """
+    Copy regions onto `groups` white canvases, shelf-packed row by row.
+
+    Regions are split into contiguous runs (in reading order), one per
+    canvas, and separated by CANVAS_GAP so tesseract reads them as
+    separate words.
+    """
+    gray = image if image.ndim == 2 else image.mean(axis=2).astype(image.dtype)
+    canvases = []
+    for chunk in np.array_split(np.arange(len(regions)), max(1, min(groups, len(regions)))):
+        boxes = [regions[i] for i in chunk]
+        canvas_width = max(MIN_CANVAS_WIDTH, max(w for _, _, w, _ in boxes) + 2 * CANVAS_GAP)
+
+        placements = []
+        x = y = CANVAS_GAP
+        row_height = 0
+        for rx, ry, w, h in boxes:
+            if x + w + CANVAS_GAP > canvas_width:
+                x, y, row_height = CANVAS_GAP, y + row_height + CANVAS_GAP, 0
+            placements.append((x, y, w, h, rx, ry))
+            x += w + CANVAS_GAP
+            row_height = max(row_height, h)
+
+        canvas = np.full((y + row_height + CANVAS_GAP, canvas_width), 255, dtype=gray.dtype)
+        for cx, cy, w, h, rx, ry in placements:
+            canvas[cy:cy + h, cx:cx + w] = gray[ry:ry + h, rx:rx + w]
+        canvases.append(_Canvas(canvas, np.array(placements, dtype=np.int64).reshape(-1, 6)))
+    return canvases
+
+
+def unpack_tokens(tokens: Sequence[OCRToken], placements: np.ndarray) -> List[OCRToken]:
+    """Map tokens read on a canvas back to image coordinates (by the region holding their centre)."""
+    mapped = []
+    for token in tokens:
+        x, y, w, h = token.bbox
+        cx, cy = x + w / 2, y + h / 2
+        inside = np.flatnonzero(
+            (placements[:, 0] <= cx) & (cx < placements[:, 0] + placements[:, 2])
+            & (placements[:, 1] <= cy) & (cy < placements[:, 1] + placements[:, 3])
+        )
+        if not len(inside):
+            continue
+        px, py, pw, ph, rx, ry = placements[inside[0]].tolist()
+        # Clip to the region, then shift into image coordinates
+        x0, y0 = max(x, px), max(y, py)
+        x1, y1 = min(x + w, px + pw), min(y + h, py + ph)
+        mapped.append(OCRToken(token.text, token.confidence, (x0 - px + rx, y0 - py + ry, x1 - x0, y1 - y0)))
+    return mapped
+
+
+# ===================================================================
+# Cache
+# ===================================================================
+
+def image_digest(image: np.ndarray) -> str:
+    """Hash of an image's pixels, shape and dtype"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{image.shape}:{image.dtype}".encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Raw OCR tokens per key, kept in memory (most recent entries) and on disk.
+
+    Disk entries are small JSON files written atomically; the directory is
+    trimmed to max_bytes, least recently used first.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]], max_bytes: int, memory_entries: int = 64):
+        """
+        Args:
+            directory: Cache directory (None = memory only)
+            max_bytes: Disk size above which the oldest entries are removed
+            memory_entries: Entries kept in memory
+        """
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, List[OCRToken]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[OCRToken]]:
+        with self._lock:
+            tokens = self._memory.get(key)
+            if tokens is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return tokens
+
+        tokens = None
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path) as f:
+                    tokens = [OCRToken(text, conf, tuple(bbox)) for text, conf, bbox in json.load(f)]
+                os.utime(path)
+            except (FileNotFoundError, ValueError, OSError):
+                tokens = None
+
+        with self._lock:
+            if tokens is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, tokens)
+        return tokens
+
+    def put(self, key: str, tokens: List[OCRToken]):
+        with self._lock:
+            self._remember(key, tokens)
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump([[t.text, t.confidence, list(t.bbox)] for t in tokens], f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _remember(self, key: str, tokens: List[OCRToken]):
+        self._memory[key] = tokens
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        entries, total = [], 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# ===================================================================
+# Engine
+# ===================================================================
+
+class OCREngine:
+    """Runs (or recalls) tesseract over images for OCRService."""
+
+    def __init__(
+        self,
+        cache: Optional[OCRCache] = None,
+        workers: int = OCR_WORKERS,
+        roi_mode: str = OCR_ROI_MODE,
+        ocr_fn: Callable[[np.ndarray, int], List[OCRToken]] = tesseract_tokens,
+    ):
+        """
+        Args:
+            cache: Token cache (None = no caching)
+            workers: Tesseract processes run at once in regions mode
+            roi_mode: "regions" (OCR packed text regions) or "full" (whole image)
+            ocr_fn: Called as ocr_fn(image, psm); returns the image's tokens
+        """
+        if roi_mode not in ROI_MODES:
+            raise ValueError(f"Unknown OCR ROI mode: {roi_mode}")
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.roi_mode = roi_mode
+        self.ocr_fn = ocr_fn
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def tokens(
+        self,
+        image: np.ndarray,
+        psm: int,
+        preprocess: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        preprocess_key: str = "none",
+    ) -> List[OCRToken]:
+        """
+        All OCR tokens of an image, from the cache when possible.
+
+        Args:
+            image: Image as given to OCRService (before preprocessing)
+            psm: Tesseract page segmentation mode
+            preprocess: Applied to the image before OCR (only on a cache miss)
+            preprocess_key: Identifies the preprocessing in the cache key
+
+        Returns:
+            Tokens in image coordinates, unfiltered
+        """
+        key = None
+        if self.cache is not None:
+            key = hashlib.blake2b(
+                f"{CACHE_VERSION}:{image_digest(image)}:{preprocess_key}:{psm}:{self.roi_mode}".encode(),
+                digest_size=20,
+            ).hexdigest()
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        processed = preprocess(image) if preprocess else image
+        try:
+            tokens = self._ocr(processed, psm)
+        except Exception as e:
+            logger.error(f"OCR Error: {e}")
+            return []
+
+        if key is not None:
+            self.cache.put(key, tokens)
+        return tokens
+
+    def _ocr(self, image: np.ndarray, psm: int) -> List[OCRToken]:
+        if self.roi_mode == FULL:
+            return self.ocr_fn(image, psm)
+
+        regions = text_regions(image)
+        if not regions:
+            return []
+        canvases = pack_regions(image, regions, self.workers)
+        if len(canvases) == 1:
+            results = [self.ocr_fn(canvases[0].image, psm)]
+        else:
+            results = list(self._get_pool().map(lambda canvas: self.ocr_fn(canvas.image, psm), canvases))
+
+        tokens = []
+        for canvas, canvas_tokens in zip(canvases, results):
+            tokens.extend(unpack_tokens(canvas_tokens, canvas.placements))
+        return tokens
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # Threads are enough: each call waits on its own tesseract process
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+            return self._pool
+
+
+_engine: Optional[OCREngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """Get the process-wide OCR engine (shared cache)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OCREngine(cache=OCRCache(OCR_CACHE_DIR, OCR_CACHE_MAX_MB * 1024 * 1024))
+    return _engine
@@ -2,14 +2,21 @@
 OCR Service for Lot Number Extraction
 Extracts lot numbers from site plan images using Tesseract OCR
 Supports multiple lot numbering patterns and confidence scoring
+
+Tesseract runs through services/ocr_engine.py, which caches the raw tokens
+per image and OCRs text regions in parallel; confidence and pattern
+filtering happen here on every call.
 """
+import logging
 import cv2
 import numpy as np
 import re
 from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass
-import pytesseract
-from pytesseract import Output
+
+from services.ocr_engine import OCREngine, OCRToken, get_ocr_engine, tesseract_tokens
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -59,6 +66,7 @@ class OCRService:
         custom_patterns: Optional[List[str]] = None,
         preprocess: bool = True,
         psm_mode: int = 6,  # Page segmentation mode
+        engine: Optional[OCREngine] = None,
     ):
         """
         Initialize OCR service
@@ -68,7 +76,9 @@ class OCRService:
             custom_patterns: Additional regex patterns for lot numbers
             preprocess: Apply image preprocessing
             psm_mode: Tesseract page segmentation mode (default 6 = single block)
+            engine: OCR engine (default: the shared, cached engine)
         """
+        self.engine = engine or get_ocr_engine()
         self.min_confidence = min_confidence
         self.patterns = self.DEFAULT_PATTERNS.copy()
         if custom_patterns:
@@ -102,11 +112,14 @@ class OCRService:
         else:
             roi_offset = (0, 0)
 
-        # Preprocess image
-        processed = self._preprocess_image(image) if self.preprocess else image
-
-        # Perform OCR
-        ocr_results = self._perform_ocr(processed)
+        # Preprocess and OCR (or recall the tokens of this image)
+        tokens = self.engine.tokens(
+            image,
+            self.psm_mode,
+            preprocess=self._preprocess_image if self.preprocess else None,
+            preprocess_key=f"{type(self).__name__}._preprocess_image" if self.preprocess else "none",
+        )
+        ocr_results = self._filter_tokens(tokens)
 
         # Filter and validate lot numbers
         lot_numbers = self._extract_lot_numbers_from_ocr(ocr_results, roi_offset)
@@ -167,7 +180,7 @@ class OCRService:
 
     def _perform_ocr(self, image: np.ndarray) -> List[OCRResult]:
         """
-        Perform OCR on preprocessed image
+        Perform OCR on preprocessed image (uncached, whole image)
 
         Args:
             image: Preprocessed image
@@ -175,49 +188,35 @@ class OCRService:
         Returns:
             List of OCR results
         """
-        # Configure Tesseract
-        config = f'--psm {self.psm_mode} --oem 3'  # LSTM OCR Engine Mode
-
-        # Get detailed OCR data
         try:
-            data = pytesseract.image_to_data(
-                image,
-                config=config,
-                output_type=Output.DICT
-            )
+            tokens = tesseract_tokens(image, self.psm_mode)
         except Exception as e:
-            print(f"OCR Error: {e}")
+            logger.error(f"OCR failed: {e}")
             return []
 
-        # Parse results
-        results = []
-        n_boxes = len(data['text'])
-
-        for i in range(n_boxes):
-            text = data['text'][i].strip()
-            conf = float(data['conf'][i])
-
-            # Skip empty or low confidence detections
-            if not text or conf < self.min_confidence:
-                continue
+        return self._filter_tokens(tokens)
 
-            # Get bounding box
-            x = data['left'][i]
-            y = data['top'][i]
-            w = data['width'][i]
-            h = data['height'][i]
-
-            # Normalize text
-            normalized = self._normalize_text(text)
+    def _filter_tokens(self, tokens: List[OCRToken]) -> List[OCRResult]:
+        """
+        Keep confident tokens and normalize their text
 
-            results.append(OCRResult(
-                text=text,
-                confidence=conf,
-                bbox=(x, y, w, h),
-                normalized_text=normalized,
-            ))
+        Args:
+            tokens: Raw OCR tokens
 
-        return results
+        Returns:
+            List of OCR results
+        """
+        return [
+            OCRResult(
+                text=token.text,
+                confidence=token.confidence,
+                bbox=token.bbox,
+                normalized_text=self._normalize_text(token.text),
+            )
+            for token in tokens
+            # Skip low confidence detections
+            if token.confidence >= self.min_confidence
+        ]
 
     def _normalize_text(self, text: str) -> str:
         """
@@ -455,6 +454,8 @@ def configure_tesseract(tesseract_cmd: Optional[str] = None):
                       (e.g., '/usr/local/bin/tesseract' on macOS/Linux
                        or 'C:\\Program Files\\Tesseract-OCR\\tesseract.exe' on Windows)
     """
+    import pytesseract
+
     if tesseract_cmd:
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
     else:
@@ -0,0 +1,189 @@
+"""
+Pattern Matrix
+Vectorized few-shot similarity scoring for FewShotDetector
+
+All example descriptors (log-scaled Hu moments) of the patterns being
+matched are stacked into one matrix, and every contour is scored against
+every example in a single NumPy broadcast:
+
+- shape similarity: exp(-euclidean distance / 10), best example per pattern
+- area score: 1 - min(|area - avg_area| / tolerance, 1), where tolerance is
+  2 x the pattern's area std (or half its average area when all examples
+  had the same area)
+- combined: shape 70%, area 30%; each contour keeps its best pattern
+
+Patterns are stored as .npz archives of plain arrays (no pickle), so
+loading a phase's patterns is a few array reads.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+SHAPE_WEIGHT = 0.7
+AREA_WEIGHT = 0.3
+
+# Contours scored per broadcast (bounds the contours x examples x 7 temporary)
+SCORE_BATCH = 4096
+
+
+class PatternMatrix:
+    """Descriptors and area statistics of several patterns, stacked for scoring."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        descriptors: Sequence[Sequence[np.ndarray]],
+        avg_areas: Sequence[float],
+        area_stds: Sequence[float],
+    ):
+        """
+        Args:
+            names: Pattern names
+            descriptors: Example descriptors of each pattern (at least one each)
+            avg_areas: Average example area of each pattern
+            area_stds: Example area standard deviation of each pattern
+        """
+        self.names = list(names)
+        counts = np.array([len(d) for d in descriptors], dtype=np.int64)
+        if (counts == 0).any():
+            raise ValueError("Every pattern needs at least one example descriptor")
+
+        self.examples = (
+            np.concatenate([np.asarray(d, dtype=np.float64).reshape(-1, 7) for d in descriptors])
+            if len(counts) else np.zeros((0, 7))
+        )
+        self.starts = np.cumsum(counts) - counts
+
+        avg = np.asarray(avg_areas, dtype=np.float64)
+        std = np.asarray(area_stds, dtype=np.float64)
+        self.avg_areas = avg
+        self.area_tolerances = np.where(std > 0, 2 * std, avg * 0.5)
+
+    @classmethod
+    def from_patterns(cls, patterns) -> "PatternMatrix":
+        """Build from LotPattern objects (in the given order)."""
+        patterns = list(patterns)
+        return cls(
+            [p.name for p in patterns],
+            [p.shape_descriptors for p in patterns],
+            [p.avg_area for p in patterns],
+            [p.area_std for p in patterns],
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def scores(self, descriptors: np.ndarray, areas: np.ndarray) -> np.ndarray:
+        """
+        Combined score of every contour against every pattern.
+
+        Args:
+            descriptors: (n, 7) contour descriptors
+            areas: (n,) contour areas
+
+        Returns:
+            (n, patterns) combined scores
+        """
+        descriptors = np.asarray(descriptors, dtype=np.float64).reshape(-1, 7)
+        areas = np.asarray(areas, dtype=np.float64)
+        combined = np.empty((len(descriptors), len(self.names)))
+
+        for start in range(0, len(descriptors), SCORE_BATCH):
+            block = slice(start, start + SCORE_BATCH)
+            diff = descriptors[block, None, :] - self.examples[None, :, :]
+            similarity = np.exp(-np.sqrt((diff * diff).sum(axis=2)) / 10.0)
+            shape = np.maximum.reduceat(similarity, self.starts, axis=1)
+
+            area_diff = np.abs(areas[block, None] - self.avg_areas[None, :])
+            ratio = np.divide(
+                area_diff, self.area_tolerances,
+                out=np.ones_like(area_diff), where=self.area_tolerances > 0,
+            )
+            area = 1.0 - np.minimum(ratio, 1.0)
+
+            combined[block] = shape * SHAPE_WEIGHT + area * AREA_WEIGHT
+        return combined
+
+    def best_matches(self, descriptors: np.ndarray, areas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best pattern of every contour.
+
+        Ties go to the earlier pattern; a contour scoring 0 or less against
+        every pattern has no match.
+
+        Returns:
+            (pattern index or -1, score clipped at 0) per contour
+        """
+        if not len(self.names) or not len(descriptors):
+            return np.full(len(descriptors), -1, dtype=np.int64), np.zeros(len(descriptors))
+
+        combined = self.scores(descriptors, areas)
+        best = np.argmax(combined, axis=1)
+        best_score = combined[np.arange(len(combined)), best]
+        matched = best_score > 0
+        return np.where(matched, best, -1), np.where(matched, best_score, 0.0)
+
+
+# ===================================================================
+# Pattern files
+# ===================================================================
+
+PATTERN_SUFFIX = ".npz"
+
+
+def save_pattern_arrays(
+    path: Path,
+    name: str,
+    descriptors: Sequence[np.ndarray],
+    contours: Sequence[np.ndarray],
+    avg_area: float,
+    area_std: float,
+    avg_vertices: float,
+    metadata: Optional[Dict] = None,
+):
+    """
+    Write a pattern to an .npz archive (atomically, via a temp file).
+
+    Contours are stored as one (points, 2) int32 array plus their sizes.
+    """
+    points = [np.asarray(c, dtype=np.int32).reshape(-1, 2) for c in contours]
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            name=np.array(name),
+            descriptors=np.asarray(descriptors, dtype=np.float64).reshape(-1, 7),
+            contour_points=np.concatenate(points) if points else np.zeros((0, 2), dtype=np.int32),
+            contour_sizes=np.array([len(p) for p in points], dtype=np.int64),
+            stats=np.array([avg_area, area_std, avg_vertices], dtype=np.float64),
+            metadata=np.array(json.dumps(metadata)),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_pattern_arrays(path: Path) -> Dict:
+    """
+    Read a pattern written by save_pattern_arrays.
+
+    Returns:
+        Dict with name, shape_descriptors, contours, avg_area, area_std,
+        avg_vertices and metadata (the LotPattern fields)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        descriptors = data["descriptors"]
+        sizes = data["contour_sizes"]
+        contours = np.split(data["contour_points"], np.cumsum(sizes)[:-1]) if len(sizes) else []
+        avg_area, area_std, avg_vertices = data["stats"].tolist()
+        return {
+            "name": str(data["name"]),
+            "shape_descriptors": list(descriptors),
+            "contours": contours,
+            "avg_area": avg_area,
+            "area_std": area_std,
+            "avg_vertices": avg_vertices,
+            "metadata": json.loads(str(data["metadata"])),
+        }
@@ -2,14 +2,21 @@
 PDF Processor Service
 Converts PDF site plans to images for lot detection
 Supports multi-page PDFs and quality settings
+
+Pages are rasterized through services/pdf_raster.py: streamed as they are
+rendered, in parallel worker processes, and cached by file hash and DPI.
 """
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional, Dict
+from typing import Iterator, List, Tuple, Optional, Dict
 from dataclasses import dataclass
 from pathlib import Path
 import tempfile
 
+from config.settings import PDF_PREVIEW_MAX_SIDE
+from services.pdf_raster import Clip, iter_documents, iter_pages, page_sizes, preview_dpi
+from services.tiled_inference import PDFTileSource
+
 
 @dataclass
 class PDFPage:
@@ -39,12 +46,15 @@ class PDFProcessor:
     - Multi-page support
     - Metadata extraction
     - Image enhancement options
+    - Streaming, page-parallel conversion with a page cache
+    - Clip-region and downscaled preview rendering
     """
 
     def __init__(
         self,
         dpi: int = 300,
         enhance_images: bool = True,
+        cache: bool = True,
     ):
         """
         Initialize PDF processor
@@ -52,9 +62,11 @@ class PDFProcessor:
         Args:
             dpi: Resolution for PDF conversion (default 300 DPI)
             enhance_images: Apply image enhancement after conversion
+            cache: Reuse pages converted before (keyed by file hash and DPI)
         """
         self.dpi = dpi
         self.enhance_images = enhance_images
+        self.cache = cache
 
         # Check if PyMuPDF is available
         try:
@@ -74,6 +86,9 @@ class PDFProcessor:
         """
         Process PDF and convert to images
 
+        Holds every converted page; use iter_pages to handle pages one at a
+        time as they are rendered.
+
         Args:
             pdf_path: Path to PDF file
             page_numbers: Specific page numbers to process (None = all pages)
@@ -84,10 +99,8 @@ class PDFProcessor:
         if not self.pdf_support:
             raise RuntimeError("PyMuPDF not installed. Install with: pip install PyMuPDF")
 
-        # Open PDF
-        doc = self.fitz.open(pdf_path)
-
         # Get metadata
+        doc = self.fitz.open(pdf_path)
         metadata = {
             'title': doc.metadata.get('title', ''),
             'author': doc.metadata.get('author', ''),
@@ -95,77 +108,134 @@ class PDFProcessor:
             'total_pages': len(doc),
             'format': doc.metadata.get('format', ''),
         }
-
-        # Determine which pages to process
-        if page_numbers is None:
-            page_numbers = list(range(len(doc)))
-        else:
-            # Validate page numbers
-            page_numbers = [p for p in page_numbers if 0 <= p < len(doc)]
-
-        # Convert pages
-        pages = []
-        for page_num in page_numbers:
-            page_image = self._convert_page(doc, page_num)
-
-            pages.append(PDFPage(
-                page_number=page_num + 1,  # 1-indexed for user display
-                image=page_image,
-                width=page_image.shape[1],
-                height=page_image.shape[0],
-                dpi=self.dpi,
-            ))
-
         doc.close()
 
         return PDFProcessResult(
-            total_pages=len(doc),
-            pages=pages,
+            total_pages=metadata['total_pages'],
+            pages=list(self.iter_pages(pdf_path, page_numbers)),
             metadata=metadata,
         )
 
-    def _convert_page(
+    def iter_pages(
         self,
-        doc,
-        page_num: int,
-    ) -> np.ndarray:
+        pdf_path: str,
+        page_numbers: Optional[List[int]] = None,
+        clip: Optional[Clip] = None,
+        dpi: Optional[int] = None,
+    ) -> Iterator[PDFPage]:
         """
-        Convert single PDF page to image
+        Convert PDF pages, yielding each as soon as it is rendered
+
+        Pages render in parallel worker processes, a few pages ahead of the
+        consumer, and come back in page order. Converted pages are cached,
+        so converting the same file again at the same DPI is a cache read.
 
         Args:
-            doc: PyMuPDF document
-            page_num: Page number (0-indexed)
+            pdf_path: Path to PDF file
+            page_numbers: Specific page numbers to process, 0-indexed (None = all pages)
+            clip: Only render this region, (x0, y0, x1, y1) in pixels at the DPI
+            dpi: Override the processor DPI (e.g. for a preview)
+
+        Yields:
+            Converted pages (BGR, enhanced if enabled)
+        """
+        if not self.pdf_support:
+            raise RuntimeError("PyMuPDF not installed. Install with: pip install PyMuPDF")
+
+        dpi = dpi or self.dpi
+        for page in iter_pages(
+            pdf_path, page_numbers, dpi=dpi, clip=clip, transform=self._page_transform(), cache=self.cache
+        ):
+            yield self._pdf_page(page.page_index, page.image, dpi)
+
+    def preview_page(
+        self,
+        pdf_path: str,
+        page_number: int = 1,
+        max_side: int = PDF_PREVIEW_MAX_SIDE,
+    ) -> PDFPage:
+        """
+        Render a downscaled page for a quick first look
+
+        Regions found on the preview map to full-resolution clips for
+        extract_region by scaling by self.dpi / preview.dpi.
+
+        Args:
+            pdf_path: Path to PDF file
+            page_number: Page number (1-indexed)
+            max_side: Longest side of the preview in pixels
 
         Returns:
-            OpenCV image (numpy array)
+            Preview page
         """
-        # Load page
-        page = doc.load_page(page_num)
+        if not self.pdf_support:
+            raise RuntimeError("PyMuPDF not installed. Install with: pip install PyMuPDF")
 
-        # Calculate zoom factor for desired DPI
-        # PDF default is 72 DPI
-        zoom = self.dpi / 72
+        sizes = page_sizes(pdf_path)
+        if not 1 <= page_number <= len(sizes):
+            raise ValueError(f"Page {page_number} not found in PDF")
+        dpi = min(self.dpi, preview_dpi(sizes[page_number - 1], max_side))
+        return next(self.iter_pages(pdf_path, [page_number - 1], dpi=dpi))
 
-        # Render page to pixmap
-        mat = self.fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
+    def extract_region(
+        self,
+        pdf_path: str,
+        page_number: int,
+        clip: Clip,
+    ) -> np.ndarray:
+        """
+        Render only a region of a page at full DPI
 
-        # Convert to numpy array
-        img_data = pix.samples
-        img = np.frombuffer(img_data, dtype=np.uint8)
-        img = img.reshape(pix.height, pix.width, pix.n)
+        Args:
+            pdf_path: Path to PDF file
+            page_number: Page number (1-indexed)
+            clip: (x0, y0, x1, y1) in pixels at self.dpi
 
-        # Convert RGB to BGR for OpenCV
-        if pix.n == 3:  # RGB
-            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        elif pix.n == 4:  # RGBA
-            img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+        Returns:
+            Region image
+        """
+        pages = list(self.iter_pages(pdf_path, [page_number - 1], clip=clip))
+        if not pages:
+            raise ValueError(f"Page {page_number} not found in PDF")
+        return pages[0].image
+
+    def _page_transform(self):
+        return rgb_to_enhanced_bgr if self.enhance_images else rgb_to_bgr
+
+    def _pdf_page(self, page_index: int, image: np.ndarray, dpi: int) -> PDFPage:
+        return PDFPage(
+            page_number=page_index + 1,  # 1-indexed for user display
+            image=image,
+            width=image.shape[1],
+            height=image.shape[0],
+            dpi=dpi,
+        )
 
-        # Apply enhancement if enabled
-        if self.enhance_images:
-            img = self._enhance_image(img)
+    def page_tile_source(
+        self,
+        doc,
+        page_num: int,
+    ) -> PDFTileSource:
+        """
+        Tile source for one page, for tiled detection
 
-        return img
+        Tiles are rendered on demand at self.dpi (BGR, enhanced like
+        _convert_page), so the full page is never rasterized at once.
+
+        Args:
+            doc: PyMuPDF document (must stay open while tiles are read)
+            page_num: Page number (0-indexed)
+
+        Returns:
+            Tile source for AutoDetectService.detect_lots_tiled /
+            YOLODetector.detect_tiled
+        """
+        return PDFTileSource(
+            doc.load_page(page_num),
+            dpi=self.dpi,
+            bgr=True,
+            transform=self._enhance_image if self.enhance_images else None,
+        )
 
     def _enhance_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -177,25 +247,7 @@ class PDFProcessor:
         Returns:
             Enhanced image
         """
-        # Convert to grayscale for processing
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-
-        # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
-
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(enhanced, None, h=10)
-
-        # Convert back to BGR if original was color
-        if len(image.shape) == 3:
-            enhanced_bgr = cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
-            return enhanced_bgr
-        else:
-            return denoised
+        return enhance_image(image)
 
     def save_pages_as_images(
         self,
@@ -216,15 +268,13 @@ class PDFProcessor:
         Returns:
             List of saved image paths
         """
-        result = self.process_pdf(pdf_path)
-
         # Create output directory
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Save pages
+        # Save pages as they are rendered
         saved_paths = []
-        for page in result.pages:
+        for page in self.iter_pages(pdf_path):
             filename = f"{prefix}_{page.page_number:03d}.{format}"
             filepath = output_path / filename
 
@@ -248,12 +298,12 @@ class PDFProcessor:
         Returns:
             Page image
         """
-        result = self.process_pdf(pdf_path, page_numbers=[page_number - 1])
+        pages = list(self.iter_pages(pdf_path, page_numbers=[page_number - 1]))
 
-        if not result.pages:
+        if not pages:
             raise ValueError(f"Page {page_number} not found in PDF")
 
-        return result.pages[0].image
+        return pages[0].image
 
     def get_pdf_info(self, pdf_path: str) -> Dict:
         """
@@ -302,6 +352,49 @@ class PDFProcessor:
         return info
 
 
+# Page transforms (module level, so worker processes can run them)
+
+def rgb_to_bgr(image: np.ndarray) -> np.ndarray:
+    """Rendered RGB page to OpenCV BGR"""
+    return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+
+def rgb_to_enhanced_bgr(image: np.ndarray) -> np.ndarray:
+    """Rendered RGB page to enhanced OpenCV BGR"""
+    return enhance_image(rgb_to_bgr(image))
+
+
+def enhance_image(image: np.ndarray) -> np.ndarray:
+    """
+    Enhance converted PDF image for better detection
+
+    Args:
+        image: Input image
+
+    Returns:
+        Enhanced image
+    """
+    # Convert to grayscale for processing
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image.copy()
+
+    # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    enhanced = clahe.apply(gray)
+
+    # Denoise
+    denoised = cv2.fastNlMeansDenoising(enhanced, None, h=10)
+
+    # Convert back to BGR if original was color
+    if len(image.shape) == 3:
+        enhanced_bgr = cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
+        return enhanced_bgr
+    else:
+        return denoised
+
+
 # Convenience functions
 
 def pdf_to_images(
@@ -368,6 +461,8 @@ def batch_convert_pdfs(
     """
     Batch convert multiple PDFs to images
 
+    Pages of all PDFs are rendered in parallel and saved as they finish.
+
     Args:
         pdf_paths: List of PDF file paths
         output_dir: Output directory
@@ -377,23 +472,28 @@ def batch_convert_pdfs(
         Dictionary mapping PDF paths to lists of output image paths
     """
     processor = PDFProcessor(dpi=dpi)
+    if not processor.pdf_support:
+        raise RuntimeError("PyMuPDF not installed. Install with: pip install PyMuPDF")
 
-    results = {}
+    # Create subdirectory for each PDF
+    output_dirs = []
     for pdf_path in pdf_paths:
-        pdf_name = Path(pdf_path).stem
-
-        # Create subdirectory for each PDF
-        pdf_output_dir = Path(output_dir) / pdf_name
+        pdf_output_dir = Path(output_dir) / Path(pdf_path).stem
+        pdf_output_dir.mkdir(parents=True, exist_ok=True)
+        output_dirs.append(pdf_output_dir)
 
-        saved_paths = processor.save_pages_as_images(
-            pdf_path,
-            str(pdf_output_dir),
-            prefix="page",
-        )
-
-        results[pdf_path] = saved_paths
-
-    return results
+    saved = {pdf_path: {} for pdf_path in pdf_paths}
+    for source, page in iter_documents(
+        pdf_paths, dpi=dpi, transform=processor._page_transform(), cache=processor.cache
+    ):
+        filepath = output_dirs[source] / f"page_{page.page_index + 1:03d}.png"
+        cv2.imwrite(str(filepath), page.image)
+        saved[pdf_paths[source]][page.page_index] = str(filepath)
+
+    return {
+        pdf_path: [pages[index] for index in sorted(pages)]
+        for pdf_path, pages in saved.items()
+    }
 
 
 # PDF validation
@@ -0,0 +1,470 @@
+"""
+PDF Raster
+Streaming, page-parallel PDF rasterization with a page cache
+
+- iter_pages() yields the pages of one PDF in page order as soon as each is
+  rendered, with a bounded number of pages rendered ahead
+- iter_documents() renders the pages of several PDFs together and yields
+  them as they finish
+- Pages are rendered on a process pool (PyMuPDF is process-safe; each worker
+  keeps its recently opened documents), optionally only a clip region, or
+  at a reduced DPI for a quick preview (preview_dpi / render_preview)
+- Rendered pages are cached on disk as .npy files keyed by file content hash,
+  page, DPI, clip and transform. Workers write straight into the cache and
+  the caller memory-maps the result, so full-resolution pages are not
+  pickled between processes and repeated detections on the same plan skip
+  rasterization entirely
+
+Images are RGB uint8 unless a transform says otherwise. Clip regions are
+(x0, y0, x1, y1) in pixels of the page rendered at the requested DPI.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from config.settings import (
+    PDF_PREVIEW_MAX_SIDE,
+    PDF_RASTER_CACHE_DIR,
+    PDF_RASTER_CACHE_MAX_MB,
+    PDF_RASTER_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+Clip = Tuple[int, int, int, int]
+Transform = Callable[[np.ndarray], np.ndarray]
+
+# Documents each process keeps open between pages
+OPEN_DOCUMENTS = 4
+
+
+@dataclass
+class RasterPage:
+    """One rendered page (or clip region of a page)"""
+    page_index: int  # 0-indexed
+    image: np.ndarray
+    dpi: int
+    clip: Optional[Clip] = None
+    cached: bool = False
+
+
+# ===================================================================
+# Page cache
+# ===================================================================
+
+def file_digest(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def transform_name(transform: Optional[Transform]) -> str:
+    """Stable name of a page transform, used in cache keys"""
+    if transform is None:
+        return "raw"
+    return f"{transform.__module__}.{transform.__qualname__}"
+
+
+class RasterCache:
+    """
+    Directory of rendered pages, evicted least recently used first.
+
+    Entries are plain .npy files written atomically, so several processes
+    can share the directory.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size above which the oldest entries are removed
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, digest: str, page_index: int, dpi: int, clip: Optional[Clip], transform: str) -> Path:
+        key = f"{digest}:{page_index}:{dpi}:{clip}:{transform}"
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.npy"
+
+    def load(self, path: Path) -> Optional[np.ndarray]:
+        """Memory-map a cached page (copy-on-write), or None on a miss."""
+        try:
+            image = np.load(path, mmap_mode="c", allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".npy"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+def _save_npy(path: Path, image: np.ndarray):
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, image, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+_cache: Optional[RasterCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_raster_cache() -> RasterCache:
+    """Get the process-wide page cache (PDF_RASTER_CACHE_DIR)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RasterCache(PDF_RASTER_CACHE_DIR, PDF_RASTER_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+# ===================================================================
+# Rendering (runs in the worker processes)
+# ===================================================================
+
+_documents: "OrderedDict[Tuple[str, int, int], object]" = OrderedDict()
+
+
+def _open_document(path: str):
+    """Open a PDF, reusing this process's recently opened documents."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    doc = _documents.get(key)
+    if doc is not None:
+        _documents.move_to_end(key)
+        return doc
+
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(path)
+    _documents[key] = doc
+    while len(_documents) > OPEN_DOCUMENTS:
+        _documents.popitem(last=False)[1].close()
+    return doc
+
+
+def render_page(
+    path: str,
+    page_index: int,
+    dpi: int,
+    clip: Optional[Clip] = None,
+    transform: Optional[Transform] = None,
+    cache_path: Optional[str] = None,
+) -> Optional[np.ndarray]:
+    """
+    Rasterize one page (or a clip region of it).
+
+    Args:
+        path: PDF file path
+        page_index: Page (0-indexed)
+        dpi: Resolution
+        clip: Pixel region at this DPI to render (None = whole page)
+        transform: Module-level function applied to the RGB image
+        cache_path: Write the image here and return None instead of the image
+
+    Returns:
+        Image, or None when written to cache_path
+    """
+    import fitz  # PyMuPDF
+
+    page = _open_document(path).load_page(page_index)
+    zoom = dpi / 72
+    pdf_clip = None
+    if clip is not None:
+        origin = page.rect.tl
+        x0, y0, x1, y1 = clip
+        pdf_clip = fitz.Rect(origin.x + x0 / zoom, origin.y + y0 / zoom, origin.x + x1 / zoom, origin.y + y1 / zoom)
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=pdf_clip, alpha=False)
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        image = np.repeat(image, 3, axis=2)
+    if clip is not None:
+        # Rounding of the clip can be off by a pixel; match the requested size
+        width, height = x1 - x0, y1 - y0
+        image = image[:height, :width]
+        if image.shape[0] < height or image.shape[1] < width:
+            padded = np.full((height, width, 3), 255, dtype=np.uint8)
+            padded[:image.shape[0], :image.shape[1]] = image
+            image = padded
+    image = transform(image) if transform else np.array(image)
+
+    if cache_path is None:
+        return image
+    _save_npy(Path(cache_path), image)
+    return None
+
+
+def page_sizes(path: Union[str, Path]) -> List[Tuple[float, float]]:
+    """Page sizes in PDF points (1/72 inch)"""
+    doc = _open_document(str(path))
+    return [(page.rect.width, page.rect.height) for page in doc]
+
+
+def preview_dpi(page_size: Tuple[float, float], max_side: int = PDF_PREVIEW_MAX_SIDE, max_dpi: int = 300) -> int:
+    """
+    DPI at which a page's longer side is at most max_side pixels.
+
+    A region found on the preview maps to a full-resolution clip by scaling
+    its coordinates by full_dpi / preview_dpi.
+    """
+    longest = max(page_size) or 1
+    return max(1, min(max_dpi, int(max_side * 72 / longest)))
+
+
+# ===================================================================
+# Streaming API
+# ===================================================================
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def get_raster_pool() -> Optional[Executor]:
+    """
+    Get the shared rasterization process pool (None with PDF_RASTER_WORKERS=0,
+    in which case pages are rendered in the calling thread).
+    """
+    global _pool
+    if PDF_RASTER_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_RASTER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"PDF raster pool started ({PDF_RASTER_WORKERS} processes)")
+    return _pool
+
+
+def shutdown_raster_pool():
+    """Stop the rasterization pool (app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+class _InlineFuture:
+    """Already-finished stand-in for a Future when rendering in-thread."""
+
+    def __init__(self, fn, *args):
+        try:
+            self._result, self._error = fn(*args), None
+        except Exception as e:
+            self._result, self._error = None, e
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def done(self):
+        return True
+
+
+@dataclass
+class _PageJob:
+    source: int
+    page_index: int
+    dpi: int
+    clip: Optional[Clip]
+    cache_path: Optional[Path]
+
+
+class _Renderer:
+    """Submits page renders (cache first) and turns results into RasterPages."""
+
+    def __init__(self, transform: Optional[Transform], cache: Optional[RasterCache], pool: Optional[Executor]):
+        self.transform = transform
+        self.transform_key = transform_name(transform)
+        self.cache = cache
+        self.pool = pool
+        self.digests: Dict[str, str] = {}
+
+    def job(self, source: int, path: str, page_index: int, dpi: int, clip: Optional[Clip]) -> _PageJob:
+        cache_path = None
+        if self.cache is not None:
+            digest = self.digests.get(path)
+            if digest is None:
+                digest = self.digests[path] = file_digest(path)
+            cache_path = self.cache.path(digest, page_index, dpi, clip, self.transform_key)
+        return _PageJob(source, page_index, dpi, clip, cache_path)
+
+    def submit(self, path: str, job: _PageJob):
+        """Returns (future, cached image or None)."""
+        if job.cache_path is not None:
+            image = self.cache.load(job.cache_path)
+            if image is not None:
+                return None, image
+        args = (path, job.page_index, job.dpi, job.clip, self.transform,
+                str(job.cache_path) if job.cache_path is not None else None)
+        if self.pool is None:
+            return _InlineFuture(render_page, *args), None
+        return self.pool.submit(render_page, *args), None
+
+    def page(self, job: _PageJob, future, cached_image) -> RasterPage:
+        if cached_image is not None:
+            return RasterPage(job.page_index, cached_image, job.dpi, job.clip, cached=True)
+        image = future.result()
+        if image is None:
+            image = self.cache.load(job.cache_path)
+            if image is None:
+                raise RuntimeError(f"Rendered page {job.page_index} missing from cache")
+            self.cache.evict()
+        return RasterPage(job.page_index, image, job.dpi, job.clip)
+
+
+def _resolve_cache(cache) -> Optional[RasterCache]:
+    return get_raster_cache() if cache is True else (cache or None)
+
+
+def iter_pages(
+    path: Union[str, Path],
+    page_numbers: Optional[Sequence[int]] = None,
+    dpi: int = 300,
+    clip: Optional[Clip] = None,
+    transform: Optional[Transform] = None,
+    cache: Union[bool, RasterCache, None] = True,
+    lookahead: Optional[int] = None,
+) -> Iterator[RasterPage]:
+    """
+    Render pages of a PDF, yielding each in page order as soon as it is ready.
+
+    Args:
+        path: PDF file path
+        page_numbers: Pages to render (0-indexed; None = all, out-of-range skipped)
+        dpi: Resolution
+        clip: Pixel region at this DPI to render on every page
+        transform: Module-level function applied to each page in the worker
+        cache: True for the shared cache, a RasterCache, or None/False to disable
+        lookahead: Pages rendered ahead of the consumer (default: 2 per worker)
+
+    Yields:
+        RasterPage per page
+    """
+    path = str(path)
+    count = len(page_sizes(path))
+    pages = range(count) if page_numbers is None else [p for p in page_numbers if 0 <= p < count]
+
+    pool = get_raster_pool()
+    renderer = _Renderer(transform, _resolve_cache(cache), pool)
+    lookahead = lookahead or 2 * max(1, PDF_RASTER_WORKERS)
+
+    pending = deque()
+    queued = iter(pages)
+    try:
+        while True:
+            while len(pending) < (lookahead if pool else 1):
+                page_index = next(queued, None)
+                if page_index is None:
+                    break
+                job = renderer.job(0, path, page_index, dpi, clip)
+                pending.append((job, *renderer.submit(path, job)))
+            if not pending:
+                return
+            yield renderer.page(*pending.popleft())
+    finally:
+        for _, future, _ in pending:
+            if future is not None and not future.done():
+                future.cancel()
+
+
+def iter_documents(
+    paths: Sequence[Union[str, Path]],
+    dpi: int = 300,
+    transform: Optional[Transform] = None,
+    cache: Union[bool, RasterCache, None] = True,
+    lookahead: Optional[int] = None,
+) -> Iterator[Tuple[int, RasterPage]]:
+    """
+    Render every page of several PDFs, pages and documents in parallel.
+
+    Yields:
+        (index into paths, RasterPage) in completion order
+    """
+    pool = get_raster_pool()
+    renderer = _Renderer(transform, _resolve_cache(cache), pool)
+    lookahead = lookahead or 2 * max(1, PDF_RASTER_WORKERS)
+
+    def jobs() -> Iterable[Tuple[str, _PageJob]]:
+        for source, path in enumerate(map(str, paths)):
+            for page_index in range(len(page_sizes(path))):
+                yield path, renderer.job(source, path, page_index, dpi, None)
+
+    queued = iter(jobs())
+    in_flight = {}
+    try:
+        while True:
+            while len(in_flight) < (lookahead if pool else 1):
+                item = next(queued, None)
+                if item is None:
+                    break
+                path, job = item
+                future, image = renderer.submit(path, job)
+                if future is None or pool is None:
+                    yield job.source, renderer.page(job, future, image)
+                else:
+                    in_flight[future] = job
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                yield job.source, renderer.page(job, future, None)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def render_preview(
+    path: Union[str, Path],
+    page_index: int = 0,
+    max_side: int = PDF_PREVIEW_MAX_SIDE,
+    transform: Optional[Transform] = None,
+    cache: Union[bool, RasterCache, None] = True,
+) -> RasterPage:
+    """Render a downscaled page whose longer side is at most max_side pixels."""
+    dpi = preview_dpi(page_sizes(path)[page_index], max_side)
+    return next(iter_pages(path, [page_index], dpi=dpi, transform=transform, cache=cache))
@@ -0,0 +1,249 @@
+"""
+Tiled Inference
+Runs lot detection over very large site plans in overlapping tiles
+
+- tile_windows splits a page into overlapping tile_size windows
+- ArrayTileSource serves tiles of an in-memory image as views (no copies)
+- PDFTileSource renders each tile straight from the PDF at full DPI, so
+  the whole 300 DPI page is never held in memory
+- run_tiled feeds tiles to a detector (optionally on an executor), keeping
+  at most max_in_flight tiles alive at once
+- merge_tiled removes duplicates of lots seen by more than one tile
+  (non-maximum suppression on polygon bounding boxes, preferring
+  detections that do not touch a tile seam)
+
+Overlap should be larger than the largest lot, so every lot lies wholly
+inside at least one tile.
+"""
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Detections whose box comes within this many pixels of an interior tile
+# edge are treated as possibly cut off by the seam
+SEAM_MARGIN = 2
+
+
+@dataclass(frozen=True)
+class TileWindow:
+    """One tile, in page pixel coordinates."""
+    x: int
+    y: int
+    width: int
+    height: int
+    page_width: int
+    page_height: int
+
+    def touches_seam(self, box: Tuple[float, float, float, float], margin: int = SEAM_MARGIN) -> bool:
+        """Whether a box (x0, y0, x1, y1) reaches an edge shared with another tile."""
+        x0, y0, x1, y1 = box
+        return (
+            (self.x > 0 and x0 <= self.x + margin)
+            or (self.y > 0 and y0 <= self.y + margin)
+            or (self.x + self.width < self.page_width and x1 >= self.x + self.width - margin)
+            or (self.y + self.height < self.page_height and y1 >= self.y + self.height - margin)
+        )
+
+
+def _positions(size: int, tile_size: int, stride: int) -> List[int]:
+    if size <= tile_size:
+        return [0]
+    positions = list(range(0, size - tile_size, stride))
+    positions.append(size - tile_size)
+    return positions
+
+
+def tile_windows(width: int, height: int, tile_size: int = 1024, overlap: int = 256) -> List[TileWindow]:
+    """
+    Overlapping windows covering a width x height page.
+
+    Windows are tile_size square (smaller only when the page is), step by
+    tile_size - overlap, and the last row/column is aligned to the page
+    edge.
+    """
+    if overlap >= tile_size:
+        raise ValueError("Tile overlap must be smaller than the tile size")
+    stride = tile_size - overlap
+    tile_w, tile_h = min(tile_size, width), min(tile_size, height)
+    return [
+        TileWindow(x, y, tile_w, tile_h, width, height)
+        for y in _positions(height, tile_size, stride)
+        for x in _positions(width, tile_size, stride)
+    ]
+
+
+# ===================================================================
+# Tile sources
+# ===================================================================
+
+class ArrayTileSource:
+    """Tiles of an image already in memory."""
+
+    def __init__(self, image: np.ndarray):
+        self.image = image
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.shape[1], self.image.shape[0]
+
+    def tile(self, window: TileWindow) -> np.ndarray:
+        return self.image[window.y:window.y + window.height, window.x:window.x + window.width]
+
+
+class PDFTileSource:
+    """
+    Tiles of a PDF page rendered on demand at the given DPI.
+
+    Each tile is rasterized with a clip rectangle, so memory is bounded by
+    the tile size rather than the page size.
+    """
+
+    def __init__(
+        self,
+        page,
+        dpi: int = 300,
+        bgr: bool = False,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ):
+        """
+        Args:
+            page: PyMuPDF page
+            dpi: Rasterization resolution
+            bgr: Return BGR (OpenCV) instead of RGB tiles
+            transform: Applied to every tile after rendering (e.g. enhancement)
+        """
+        import fitz  # PyMuPDF
+
+        self.fitz = fitz
+        self.page = page
+        self.zoom = dpi / 72
+        self.bgr = bgr
+        self.transform = transform
+        rect = page.rect
+        self._size = (int(rect.width * self.zoom), int(rect.height * self.zoom))
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._size
+
+    def tile(self, window: TileWindow) -> np.ndarray:
+        origin = self.page.rect.tl
+        clip = self.fitz.Rect(
+            origin.x + window.x / self.zoom,
+            origin.y + window.y / self.zoom,
+            origin.x + (window.x + window.width) / self.zoom,
+            origin.y + (window.y + window.height) / self.zoom,
+        )
+        pix = self.page.get_pixmap(matrix=self.fitz.Matrix(self.zoom, self.zoom), clip=clip, alpha=False)
+        tile = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+
+        # Rounding of the clip can be off by a pixel; match the window
+        tile = tile[:window.height, :window.width]
+        if tile.shape[0] < window.height or tile.shape[1] < window.width:
+            padded = np.full((window.height, window.width, tile.shape[2]), 255, dtype=np.uint8)
+            padded[:tile.shape[0], :tile.shape[1]] = tile
+            tile = padded
+
+        tile = np.ascontiguousarray(tile[..., ::-1] if self.bgr else tile)
+        return self.transform(tile) if self.transform else tile
+
+
+# ===================================================================
+# Running and merging
+# ===================================================================
+
+def run_tiled(
+    source,
+    detect_fn: Callable[[np.ndarray, TileWindow], Sequence[Any]],
+    tile_size: int = 1024,
+    overlap: int = 256,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 8,
+) -> List[Tuple[TileWindow, Any]]:
+    """
+    Run a detector over every tile of a source.
+
+    Args:
+        source: ArrayTileSource or PDFTileSource
+        detect_fn: Called as detect_fn(tile, window); returns detections in
+            page coordinates
+        tile_size: Tile edge in pixels
+        overlap: Overlap between neighbouring tiles in pixels
+        executor: Run tiles in parallel on this executor (None = inline)
+        max_in_flight: Tiles rendered but not yet detected, at most
+
+    Returns:
+        (window, detection) for every detection of every tile
+    """
+    width, height = source.size
+    detections = []
+
+    if executor is None:
+        for window in tile_windows(width, height, tile_size, overlap):
+            detections.extend((window, d) for d in detect_fn(source.tile(window), window))
+        return detections
+
+    in_flight = []
+    for window in tile_windows(width, height, tile_size, overlap):
+        if len(in_flight) >= max_in_flight:
+            done_window, future = in_flight.pop(0)
+            detections.extend((done_window, d) for d in future.result())
+        in_flight.append((window, executor.submit(detect_fn, source.tile(window), window)))
+    for window, future in in_flight:
+        detections.extend((window, d) for d in future.result())
+    return detections
+
+
+def polygon_box(coordinates: Sequence[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    return points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()
+
+
+def merge_tiled(
+    detections: Sequence[Tuple[TileWindow, Any]],
+    iou_threshold: float = 0.5,
+    containment_threshold: float = 0.8,
+    coordinates_fn: Callable[[Any], Sequence[Tuple[float, float]]] = lambda d: d.coordinates,
+    score_fn: Callable[[Any], float] = lambda d: d.confidence,
+) -> List[Any]:
+    """
+    Suppress duplicate detections from overlapping tiles.
+
+    Detections clear of every seam win over ones touching a seam (which may
+    be cut off), then higher scores win. A detection is dropped when its
+    box overlaps a kept one by iou_threshold IoU, or lies within it by
+    containment_threshold of its own area.
+
+    Returns:
+        Kept detections, in priority order
+    """
+    if not detections:
+        return []
+
+    boxes = np.array([polygon_box(coordinates_fn(d)) for _, d in detections], dtype=np.float64)
+    seam = np.array([window.touches_seam(tuple(box)) for (window, _), box in zip(detections, boxes)])
+    scores = np.array([score_fn(d) for _, d in detections], dtype=np.float64)
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+
+    order = np.lexsort((-areas, -scores, seam))
+    suppressed = np.zeros(len(detections), dtype=bool)
+    kept = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        kept.append(detections[i][1])
+
+        ix0 = np.maximum(boxes[i, 0], boxes[:, 0])
+        iy0 = np.maximum(boxes[i, 1], boxes[:, 1])
+        ix1 = np.minimum(boxes[i, 2], boxes[:, 2])
+        iy1 = np.minimum(boxes[i, 3], boxes[:, 3])
+        inter = np.maximum(ix1 - ix0, 0) * np.maximum(iy1 - iy0, 0)
+        union = areas[i] + areas - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        contained = np.divide(inter, areas, out=np.zeros_like(inter), where=areas > 0)
+        suppressed |= (iou >= iou_threshold) | (contained >= containment_threshold)
+
+    return kept
+
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from pathlib import Path
 import io
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from ultralytics import YOLO
@@ -17,6 +18,10 @@ try:
 except ImportError:
     YOLO_AVAILABLE = False
 
+from config.settings import YOLO_MAX_BATCH, YOLO_TILE_OVERLAP, YOLO_TILE_SIZE
+from services.tiled_inference import ArrayTileSource, PDFTileSource, TileWindow, merge_tiled, run_tiled
+from services.yolo_registry import DEFAULT_MODEL_PATH, get_yolo_registry
+
 
 @dataclass
 class YOLOLotResult:
@@ -42,6 +47,23 @@ class YOLODetectionResult:
     image_dimensions: Dict[str, int]
 
 
+def _remove_letterbox(mask: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Crop the letterbox padding from a mask at the model's input size
+
+    Batched images are each scaled to fit the input square and padded
+    evenly on both sides (ultralytics LetterBox); this keeps only the part
+    covering the image, as ultralytics.utils.ops.scale_image does.
+    """
+    mask_height, mask_width = mask.shape[:2]
+    gain = min(mask_height / height, mask_width / width)
+    pad_x = (mask_width - width * gain) / 2
+    pad_y = (mask_height - height * gain) / 2
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    bottom, right = int(round(mask_height - pad_y + 0.1)), int(round(mask_width - pad_x + 0.1))
+    return mask[top:bottom, left:right]
+
+
 class YOLODetector:
     """
     High-accuracy lot detector using YOLOv8 segmentation
@@ -80,8 +102,9 @@ class YOLODetector:
                 "Install with: pip install ultralytics"
             )
 
-        self.model_path = model_path or 'yolov8n-seg.pt'
-        self.model = YOLO(self.model_path)
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        # Shared per process; loaded on first use (see yolo_registry)
+        self.model = get_yolo_registry().get_model(self.model_path)
         self.confidence_threshold = confidence_threshold
         self.min_area = min_area
         self.max_area = max_area
@@ -91,6 +114,7 @@ class YOLODetector:
         self,
         minio_path: str,
         confidence_threshold: Optional[float] = None,
+        tile_size: Optional[int] = None,
     ) -> YOLODetectionResult:
         """
         Detect lots from image stored in MinIO
@@ -98,10 +122,19 @@ class YOLODetector:
         Args:
             minio_path: MinIO storage path (e.g., 'phases/CMY-XXX/site-plan.jpg')
             confidence_threshold: Override default confidence threshold
+            tile_size: Detect in overlapping tiles of this size (see detect_tiled)
 
         Returns:
             YOLO detection result with lots
         """
+        if tile_size:
+            from src.storage_service import storage_service
+
+            file_data = storage_service.download_file(minio_path)
+            if Path(minio_path).suffix.lower() == '.pdf':
+                return self._detect_pdf_tiled(file_data, True, confidence_threshold, tile_size)
+            return self.detect_tiled(self._load_image_from_bytes(file_data), confidence_threshold, tile_size)
+
         image, dimensions = self._load_image_from_minio(minio_path)
         return self._run_detection(
             image,
@@ -113,6 +146,7 @@ class YOLODetector:
         self,
         file_path: str,
         confidence_threshold: Optional[float] = None,
+        tile_size: Optional[int] = None,
     ) -> YOLODetectionResult:
         """
         Detect lots from local file
@@ -120,11 +154,17 @@ class YOLODetector:
         Args:
             file_path: Path to image or PDF file
             confidence_threshold: Override default confidence threshold
+            tile_size: Detect in overlapping tiles of this size (see detect_tiled)
 
         Returns:
             YOLO detection result with lots
         """
+        if tile_size and Path(file_path).suffix.lower() == '.pdf':
+            return self._detect_pdf_tiled(file_path, False, confidence_threshold, tile_size)
+
         image, dimensions = self._load_image_from_filesystem(file_path)
+        if tile_size:
+            return self.detect_tiled(image, confidence_threshold, tile_size)
         return self._run_detection(
             image,
             dimensions,
@@ -155,6 +195,110 @@ class YOLODetector:
             confidence_threshold or self.confidence_threshold
         )
 
+    def detect_from_arrays(
+        self,
+        images: List[np.ndarray],
+        confidence_threshold: Optional[float] = None,
+    ) -> List[YOLODetectionResult]:
+        """
+        Detect lots in several images at once
+
+        All images are queued before waiting, so they share forward passes
+        with each other (and with concurrent requests).
+
+        Args:
+            images: Images as numpy arrays
+            confidence_threshold: Override default confidence threshold
+
+        Returns:
+            One detection result per image, in order
+        """
+        confidence_threshold = confidence_threshold or self.confidence_threshold
+        batcher = get_yolo_registry().get_batcher(self.model_path)
+        futures = [batcher.submit(image, confidence_threshold) for image in images]
+
+        return [
+            self._build_result(
+                [future.result()],
+                (image.shape[1], image.shape[0]),
+                confidence_threshold
+            )
+            for image, future in zip(images, futures)
+        ]
+
+    def detect_tiled(
+        self,
+        source,
+        confidence_threshold: Optional[float] = None,
+        tile_size: int = YOLO_TILE_SIZE,
+        overlap: int = YOLO_TILE_OVERLAP,
+    ) -> YOLODetectionResult:
+        """
+        Detect lots in overlapping tiles of a large site plan
+
+        Each tile is run at the model's input size, so small lots survive
+        on plans far larger than it. Tiles go through the micro-batcher
+        together; lots seen by more than one tile are merged.
+
+        Args:
+            source: Image array, or a tile source (e.g. PDFTileSource, which
+                renders tiles without rasterizing the whole page)
+            confidence_threshold: Override default confidence threshold
+            tile_size: Tile edge in pixels
+            overlap: Overlap between tiles; should exceed the largest lot
+
+        Returns:
+            Detection result in page coordinates
+        """
+        confidence_threshold = confidence_threshold or self.confidence_threshold
+        overlap = min(overlap, tile_size // 2)
+        if isinstance(source, np.ndarray):
+            source = ArrayTileSource(source)
+        batcher = get_yolo_registry().get_batcher(self.model_path)
+
+        def detect_tile(tile: np.ndarray, window: TileWindow) -> List[YOLOLotResult]:
+            result = batcher.predict(tile, confidence_threshold)
+            lots = self._build_result([result], (window.width, window.height), confidence_threshold).lots
+            for lot in lots:
+                lot.coordinates = [(x + window.x, y + window.y) for x, y in lot.coordinates]
+                lot.centroid = (lot.centroid[0] + window.x, lot.centroid[1] + window.y)
+            return lots
+
+        # One thread per batch slot keeps the batcher's batches full
+        with ThreadPoolExecutor(max_workers=YOLO_MAX_BATCH, thread_name_prefix="yolo-tile") as executor:
+            detections = run_tiled(
+                source, detect_tile, tile_size, overlap,
+                executor=executor, max_in_flight=2 * YOLO_MAX_BATCH
+            )
+
+        detected_lots = merge_tiled(detections)
+        width, height = source.size
+        return self._summarize(detected_lots, len(detections), confidence_threshold, width, height)
+
+    def _detect_pdf_tiled(
+        self,
+        pdf_source,
+        from_bytes: bool,
+        confidence_threshold: Optional[float],
+        tile_size: int,
+        dpi: int = 300,
+        page_number: int = 0,
+    ) -> YOLODetectionResult:
+        """Tiled detection on a PDF page, rendering one tile at a time."""
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            raise ImportError("PyMuPDF not installed. Install with: pip install PyMuPDF")
+
+        doc = fitz.open(stream=pdf_source, filetype="pdf") if from_bytes else fitz.open(pdf_source)
+        try:
+            if page_number >= len(doc):
+                raise ValueError(f"Page {page_number} not found in PDF (only {len(doc)} pages)")
+            source = PDFTileSource(doc[page_number], dpi=dpi)
+            return self.detect_tiled(source, confidence_threshold, tile_size)
+        finally:
+            doc.close()
+
     def _load_image_from_minio(self, minio_path: str) -> Tuple[np.ndarray, Tuple[int, int]]:
         """
         Load image from MinIO storage
@@ -307,14 +451,28 @@ class YOLODetector:
         Returns:
             Detection result
         """
-        width, height = dimensions
+        # Run YOLO inference (batched with concurrent requests)
+        result = get_yolo_registry().get_batcher(self.model_path).predict(image, confidence_threshold)
+        return self._build_result([result], dimensions, confidence_threshold)
 
-        # Run YOLO inference
-        results = self.model.predict(
-            image,
-            conf=confidence_threshold,
-            verbose=False
-        )
+    def _build_result(
+        self,
+        results,
+        dimensions: Tuple[int, int],
+        confidence_threshold: float,
+    ) -> YOLODetectionResult:
+        """
+        Convert YOLO segmentation results into lots
+
+        Args:
+            results: YOLO results for one image
+            dimensions: (width, height)
+            confidence_threshold: Minimum confidence
+
+        Returns:
+            Detection result
+        """
+        width, height = dimensions
 
         detected_lots = []
         total_detections = 0
@@ -327,14 +485,18 @@ class YOLODetector:
             masks = result.masks.data.cpu().numpy()
             boxes = result.boxes.data.cpu().numpy()
 
+            # A batch runs at the lowest threshold of its requests
+            keep = boxes[:, 4] >= confidence_threshold
+            masks, boxes = masks[keep], boxes[keep]
+
             total_detections = len(masks)
 
             for idx, (mask, box) in enumerate(zip(masks, boxes)):
                 confidence = float(box[4])
 
-                # Resize mask to original image size
+                # Drop the letterbox padding, then resize to original image size
                 mask_resized = cv2.resize(
-                    mask,
+                    _remove_letterbox(mask, width, height),
                     (width, height),
                     interpolation=cv2.INTER_LINEAR
                 )
@@ -384,6 +546,17 @@ class YOLODetector:
                     num_sides=len(approx),
                 ))
 
+        return self._summarize(detected_lots, total_detections, confidence_threshold, width, height)
+
+    def _summarize(
+        self,
+        detected_lots: List[YOLOLotResult],
+        total_detections: int,
+        confidence_threshold: float,
+        width: int,
+        height: int,
+    ) -> YOLODetectionResult:
+        """Number lots by position and wrap them in a detection result"""
         # Sort by position (top-left to bottom-right)
         detected_lots.sort(key=lambda x: (x.centroid[1], x.centroid[0]))
 
@@ -434,7 +607,9 @@ class YOLODetector:
         print(f"Dataset: {dataset_yaml}")
         print(f"Epochs: {epochs}, Image size: {image_size}, Batch: {batch_size}")
 
-        results = self.model.train(
+        # Train a private copy; self.model is shared with inference
+        model = YOLO(self.model_path)
+        results = model.train(
             data=dataset_yaml,
             epochs=epochs,
             imgsz=image_size,
@@ -0,0 +1,234 @@
+"""
+YOLO Model Registry
+Loads each YOLO weights file once per process and serves inference through
+a micro-batching queue.
+
+- get_yolo_registry().get_model(path) returns the shared model for a
+  weights file, loading it on first use (or at startup, see warm_up)
+- Concurrent requests for the same weights are queued and grouped into one
+  forward pass of up to YOLO_MAX_BATCH images, waiting at most
+  YOLO_MAX_WAIT_MS for a batch to fill
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config.settings import YOLO_MAX_BATCH, YOLO_MAX_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = 'yolov8n-seg.pt'
+
+
+class _PendingImage:
+    __slots__ = ("image", "confidence", "future")
+
+    def __init__(self, image, confidence: float):
+        self.image = image
+        self.confidence = confidence
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Groups single-image predictions into batched forward passes.
+
+    One worker thread per model takes the first queued image, waits up to
+    max_wait seconds for more (at most max_batch in total) and runs them
+    through predict_fn together. The batch uses the lowest confidence
+    threshold of its images; callers filter detections by their own
+    threshold.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any], float], Sequence[Any]],
+        max_batch: int = YOLO_MAX_BATCH,
+        max_wait: float = YOLO_MAX_WAIT_MS / 1000,
+        name: str = "yolo"
+    ):
+        """
+        Args:
+            predict_fn: Called as predict_fn(images, confidence); returns one
+                result per image, in order
+            max_batch: Maximum images per forward pass
+            max_wait: Seconds the first image of a batch waits for others
+            name: Worker thread name
+        """
+        self.predict_fn = predict_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self.queue: "queue.Queue[Optional[_PendingImage]]" = queue.Queue()
+
+        self.batches = 0
+        self.images = 0
+        self.largest_batch = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, confidence: float) -> Future:
+        """Queue an image; the future resolves to its prediction result."""
+        pending = _PendingImage(image, confidence)
+        self.queue.put(pending)
+        return pending.future
+
+    def predict(self, image, confidence: float):
+        """Predict one image (blocks until its batch has run)."""
+        return self.submit(image, confidence).result()
+
+    def _collect(self, first: _PendingImage) -> List[_PendingImage]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                # Shutdown requested; finish this batch first
+                self.queue.put(None)
+                break
+            batch.append(pending)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            confidence = min(pending.confidence for pending in batch)
+            try:
+                results = list(self.predict_fn([pending.image for pending in batch], confidence))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Model returned {len(results)} results for {len(batch)} images")
+            except BaseException as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.images += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "images": self.images,
+            "average_batch": round(self.images / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def shutdown(self):
+        """Stop the worker once queued images have been processed."""
+        self.queue.put(None)
+        self._thread.join()
+
+
+def _load_yolo(model_path: str):
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
+
+class YOLOModelRegistry:
+    """Process-wide cache of loaded YOLO models and their batchers."""
+
+    def __init__(self, loader: Callable[[str], Any] = _load_yolo):
+        self.loader = loader
+        self.models: Dict[str, Any] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get_model(self, model_path: str = DEFAULT_MODEL_PATH):
+        """Get the shared model for a weights file, loading it once."""
+        model = self.models.get(model_path)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_path, threading.Lock())
+        # Loads of different weights files do not wait for each other
+        with load_lock:
+            model = self.models.get(model_path)
+            if model is None:
+                start = time.perf_counter()
+                model = self.loader(model_path)
+                self.models[model_path] = model
+                logger.info(f"Loaded YOLO model {model_path} in {time.perf_counter() - start:.2f}s")
+        return model
+
+    def get_batcher(self, model_path: str = DEFAULT_MODEL_PATH) -> MicroBatcher:
+        """Get the micro-batching queue serving a weights file."""
+        batcher = self.batchers.get(model_path)
+        if batcher is not None:
+            return batcher
+
+        model = self.get_model(model_path)
+        with self._lock:
+            batcher = self.batchers.get(model_path)
+            if batcher is None:
+                def predict(images, confidence, model=model):
+                    return model.predict(images, conf=confidence, verbose=False)
+
+                batcher = MicroBatcher(predict, name=f"yolo:{model_path}")
+                self.batchers[model_path] = batcher
+        return batcher
+
+    def warm_up(self, model_paths: Sequence[str]):
+        """Load models and run one dummy forward pass each (first-call setup cost)."""
+        import numpy as np
+
+        for model_path in model_paths:
+            try:
+                self.get_batcher(model_path).predict(np.zeros((640, 640, 3), dtype=np.uint8), 0.25)
+                logger.info(f"Warmed up YOLO model {model_path}")
+            except Exception as e:
+                logger.warning(f"Could not warm up YOLO model {model_path}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "models": sorted(self.models),
+            "batchers": {path: batcher.status() for path, batcher in self.batchers.items()},
+        }
+
+    def shutdown(self):
+        with self._lock:
+            batchers = list(self.batchers.values())
+            self.batchers.clear()
+        for batcher in batchers:
+            batcher.shutdown()
+
+
+_registry: Optional[YOLOModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_yolo_registry() -> YOLOModelRegistry:
+    """Get the process-wide YOLO model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = YOLOModelRegistry()
+    return _registry
+
+
+def shutdown_yolo_registry():
+    """Stop the batching workers (app shutdown)."""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.shutdown()
+            _registry = None
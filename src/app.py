@@ -21,6 +21,7 @@ from routes.schools import router as schools_router
 from routes.ml_detection import router as ml_detection_router
 from routes.phase_maps import router as phase_maps_router
 from routes.ml_training import router as ml_training_router
+from routes.search import router as search_router
 from fastapi.openapi.utils import get_openapi
 
 # Load environment variables from .env file
@@ -36,6 +37,8 @@ except Exception:  # pragma: no cover
 
 
 from config.db import engine, SessionLocal
+from config.settings import PASSWORD_HASH_RETRY_AFTER
+from src.password_hashing import PasswordHashingBusy
 from model.base import Base
 from model.user import Role
 
@@ -90,6 +93,7 @@ app.add_middleware(
       ],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
     allow_credentials=True,
 )
 
@@ -112,6 +116,7 @@ app.include_router(lots_router, prefix="/v1", tags=["Lots & Phases"])
 app.include_router(ml_detection_router, prefix="/v1", tags=["ML Detection"])
 app.include_router(phase_maps_router, prefix="/v1/phase-maps", tags=["Phase Maps & ML Detection"])
 app.include_router(ml_training_router, prefix="/v1/ml", tags=["ML Training & Feedback"])
+app.include_router(search_router, prefix="/v1/search", tags=["Search"])
 
 
 
@@ -152,6 +157,15 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         "message": exc.detail,
     })
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    # Login/registration burst beyond PASSWORD_HASH_MAX_PENDING: shed instead of queueing
+    logger.warning("Password hashing busy on %s %s", request.method, request.url.path)
+    return JSONResponse(status_code=429, headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)}, content={
+        "code": "busy",
+        "message": "Too many sign-in requests, please retry shortly",
+    })
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     response = await call_next(request)
@@ -172,22 +186,31 @@ def _start_job_monitor():
             try:
                 time.sleep(300)  # Check every 5 minutes
 
+                from sqlalchemy import and_, or_
                 from model.collection import CollectionJob
                 db = SessionLocal()
 
                 try:
-                    # Find jobs stuck for more than 30 minutes
-                    cutoff = datetime.utcnow() - timedelta(minutes=30)
+                    # Leased jobs are stuck once their lease lapses (the owner's heartbeat
+                    # stopped); jobs without a lease fall back to 30 minutes since start
+                    now = datetime.utcnow()
+                    cutoff = now - timedelta(minutes=30)
                     stuck_jobs = db.query(CollectionJob).filter(
                         CollectionJob.status == "running",
-                        CollectionJob.started_at < cutoff
+                        or_(
+                            CollectionJob.lease_expires_at < now,
+                            and_(CollectionJob.lease_expires_at.is_(None), CollectionJob.started_at < cutoff),
+                        ),
                     ).all()
 
                     if stuck_jobs:
                         logger.warning(f"🔧 Found {len(stuck_jobs)} stuck job(s), marking as failed")
                         for job in stuck_jobs:
                             job.status = "failed"
-                            job.error_message = "Job timed out after 30+ minutes (auto-cleanup)"
+                            job.error_message = (
+                                f"Job lease expired (owner {job.lease_owner})" if job.lease_expires_at
+                                else "Job timed out after 30+ minutes (auto-cleanup)"
+                            )
                             job.completed_at = datetime.utcnow()
                         db.commit()
                         logger.info(f"✅ Reset {len(stuck_jobs)} stuck job(s)")
@@ -241,6 +264,75 @@ def _startup():
     # Start background job monitor to cleanup stuck jobs
     _start_job_monitor()
 
+    # Start the collection job scheduler (claims pending jobs via DB leases)
+    from config.collection_config import CollectionConfig
+    if CollectionConfig.AUTO_EXECUTE_JOBS:
+        from src.collection.job_scheduler import start_job_scheduler
+        start_job_scheduler()
+    else:
+        logger.info("AUTO_EXECUTE_JOBS disabled; collection job scheduler not started.")
+
+    # Start the batch lot detection runner (claims queued jobs via DB leases)
+    from config.settings import DETECTION_JOBS_AUTOSTART
+    if DETECTION_JOBS_AUTOSTART:
+        from services.detection_jobs import start_detection_job_runner
+        start_detection_job_runner()
+
+    # Build (or catch up) the full-text search index in the background; list
+    # endpoints use ILIKE search until it is ready
+    from src.search_index import start_search_index_sync
+    start_search_index_sync()
+
+    # Rebuild the admin dashboard rollups and keep recent days current
+    from src.metrics_rollup import start_metrics_rollup_sync
+    start_metrics_rollup_sync()
+
+    # Load YOLO weights before the first detection request (in the background,
+    # so startup is not held up by the model load)
+    from config.settings import YOLO_WARMUP_MODELS
+    if YOLO_WARMUP_MODELS:
+        import threading
+        from services.yolo_registry import get_yolo_registry
+        threading.Thread(
+            target=get_yolo_registry().warm_up, args=(YOLO_WARMUP_MODELS,),
+            name="yolo-warmup", daemon=True
+        ).start()
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    # Stop media processing workers (spawned lazily by upload routes)
+    from src.media_offload import shutdown_media_pools
+    shutdown_media_pools()
+
+    # Stop the password hashing pool (started on first login/registration)
+    from src.password_hashing import shutdown_password_hasher
+    shutdown_password_hasher()
+
+    # Stop PDF rasterization workers (started lazily on first conversion)
+    from services.pdf_raster import shutdown_raster_pool
+    shutdown_raster_pool()
+
+    # Stop the batch detection runner and its worker processes
+    from services.detection_jobs import stop_detection_job_runner
+    stop_detection_job_runner()
+
+    # Stop YOLO micro-batching workers (started lazily by detection routes)
+    from services.yolo_registry import shutdown_yolo_registry
+    shutdown_yolo_registry()
+
+    # Stop the dashboard rollup refresh
+    from src.metrics_rollup import stop_metrics_rollup_sync
+    stop_metrics_rollup_sync()
+
+    # Close the full-text search index file
+    from src.search_index import close_search_index
+    close_search_index()
+
+    # Persist the near-duplicate index so the next start skips the rebuild
+    from src.media_hash_index import save_media_hash_index
+    save_media_hash_index()
+
 # Optional quick health route
 @app.get("/health")
 def health():
@@ -3,16 +3,16 @@ Base Collector Service
 
 Provides common functionality for all data collectors.
 """
-import os
 import json
 import logging
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
-from anthropic import Anthropic
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError, DBAPIError
-from model.collection import CollectionJob, CollectionChange, EntityMatch, CollectionSource, CollectionJobLog
+from model.collection import CollectionJob, CollectionChange, EntityMatch, CollectionSource
+from .job_telemetry import JobTelemetryWriter
+from .claude_pipeline import ClaudeRequest, get_claude_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,11 @@ class BaseCollector:
         self.db = db
         self.job_id = job_id
         self.job = self._load_job()
-        self.anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.telemetry = JobTelemetryWriter(db, self.job)
+        self.claude_stats = {
+            "calls": 0, "cache_hits": 0, "cache_misses": 0,
+            "coalesced": 0, "api_calls": 0, "api_latency_ms": 0.0
+        }
 
     def _load_job(self) -> CollectionJob:
         """Load the collection job from database."""
@@ -127,6 +131,19 @@ class BaseCollector:
             status: New status (pending, running, completed, failed)
             **kwargs: Additional fields to update
         """
+        if status in ["completed", "failed"] and self.claude_stats["calls"]:
+            stats = self.claude_stats
+            self.log(
+                f"Claude usage: {stats['calls']} calls, {stats['cache_hits']} cache hits, "
+                f"{stats['coalesced']} shared, {stats['api_calls']} API requests "
+                f"({stats['api_latency_ms'] / 1000:.1f}s)",
+                "INFO",
+                log_data=dict(stats)
+            )
+
+        # Write buffered logs/changes first; status changes are always immediate
+        self.telemetry.flush()
+
         self.job.status = status
 
         if status == "running" and not self.job.started_at:
@@ -148,19 +165,18 @@ class BaseCollector:
         Update job progress counts without changing status.
         Useful for providing incremental progress updates during long-running jobs.
 
+        Counts are buffered and written with the next telemetry flush.
+
         Args:
             items_found: Total items found so far
             new_entities_found: New entities created so far
             changes_detected: Changes detected so far
         """
-        if items_found is not None:
-            self.job.items_found = items_found
-        if new_entities_found is not None:
-            self.job.new_entities_found = new_entities_found
-        if changes_detected is not None:
-            self.job.changes_detected = changes_detected
-
-        self.db.commit()
+        self.telemetry.set_progress(
+            items_found=items_found,
+            new_entities_found=new_entities_found,
+            changes_detected=changes_detected
+        )
         logger.debug(f"Job {self.job_id} progress: items={self.job.items_found}, "
                     f"entities={self.job.new_entities_found}, changes={self.job.changes_detected}")
 
@@ -170,21 +186,16 @@ class BaseCollector:
         Write a log entry to the database for this job.
         Logs are displayed in the admin UI for monitoring and debugging.
 
+        Entries are buffered and bulk-inserted by the telemetry writer when
+        the batch fills up, the stage changes or the job status changes.
+
         Args:
             message: The log message
             level: Log level (DEBUG, INFO, SUCCESS, WARNING, ERROR)
             stage: Optional stage name (searching, parsing, matching, saving, etc.)
             log_data: Optional structured data (counts, URLs, errors, etc.)
         """
-        log_entry = CollectionJobLog(
-            job_id=self.job_id,
-            level=level.upper(),
-            message=message,
-            stage=stage,
-            log_data=log_data
-        )
-        self.db.add(log_entry)
-        self.db.commit()
+        self.telemetry.add_log(message, level, stage, log_data)
 
         # Also log to Python logger for backend monitoring
         log_func = getattr(logger, level.lower(), logger.info)
@@ -194,6 +205,10 @@ class BaseCollector:
         """
         Call Claude API with a prompt.
 
+        Goes through the process-wide Claude pipeline (see claude_pipeline):
+        cached and in-flight identical prompts are reused, and requests share
+        the global concurrency/rate limits and retry policy.
+
         Args:
             prompt: The prompt to send to Claude
             max_tokens: Maximum tokens in response
@@ -206,84 +221,55 @@ class BaseCollector:
             TimeoutError: If API call takes longer than timeout
             Exception: Other API errors
         """
-        try:
-            logger.info(f"Calling Claude API (max_tokens={max_tokens}, timeout={timeout}s)...")
+        result = self.call_claude_many([ClaudeRequest(prompt, max_tokens)], timeout=timeout)[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
 
-            # Log the prompt (first 500 chars for debugging)
-            prompt_preview = prompt[:500].replace('\n', ' ')
-            logger.info(f"Prompt preview: {prompt_preview}...")
-
-            message = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=max_tokens,
-                timeout=float(timeout),  # Anthropic client timeout
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
-
-            logger.info(f"Claude API call completed successfully")
+    def call_claude_many(self, requests: List[ClaudeRequest], timeout: int = 300) -> List[Any]:
+        """
+        Send independent prompts concurrently and wait for all of them.
 
-            # Extract text content
-            response_text = message.content[0].text
+        Args:
+            requests: Prompts to send (ClaudeRequest(prompt, max_tokens))
+            timeout: Per-request timeout in seconds
 
-            # Log response preview for debugging
-            response_preview = response_text[:500].replace('\n', ' ')
-            logger.info(f"Response preview: {response_preview}...")
+        Returns:
+            Parsed response, or the exception raised for that prompt, per
+            request in input order
+        """
+        logger.info(f"[{self.job_id}] Calling Claude API for {len(requests)} prompt(s) "
+                    f"(max_tokens={max(r.max_tokens for r in requests)}, timeout={timeout}s)...")
+        for request in requests:
+            # Log the prompt (first 500 chars for debugging)
+            prompt_preview = request.prompt[:500].replace('\n', ' ')
+            logger.info(f"Prompt preview: {prompt_preview}...")
 
-            # Try to parse as JSON
-            try:
-                # First try direct parsing
-                return json.loads(response_text)
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown code blocks
-                import re
-                json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-                if json_match:
-                    json_text = json_match.group(1)
-                    try:
-                        return json.loads(json_text)
-                    except json.JSONDecodeError:
-                        pass
+        results = get_claude_pipeline().call_many(requests, timeout=timeout)
+
+        parsed = []
+        for result in results:
+            self.claude_stats["calls"] += 1
+            if isinstance(result, BaseException):
+                logger.error(f"Claude API call failed: {str(result)}")
+                parsed.append(result)
+                continue
+
+            if result.source == "cache":
+                self.claude_stats["cache_hits"] += 1
+                logger.info(f"[{self.job_id}] Claude response served from cache")
+            else:
+                self.claude_stats["cache_misses"] += 1
+                if result.source == "shared":
+                    self.claude_stats["coalesced"] += 1
+                    logger.info(f"[{self.job_id}] Claude response shared with an in-flight identical request")
+                else:
+                    self.claude_stats["api_calls"] += 1
+                    self.claude_stats["api_latency_ms"] += round(result.latency * 1000, 1)
+                    logger.info(f"Claude API call completed successfully in {result.latency:.1f}s")
+            parsed.append(result.data)
 
-                # Try to find any JSON object in the response
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_text = json_match.group(0)
-                    try:
-                        return json.loads(json_text)
-                    except json.JSONDecodeError:
-                        # Try to repair incomplete JSON (truncated response)
-                        # Close any open arrays and objects
-                        repaired = json_text.rstrip()
-                        # Count open/close brackets
-                        open_braces = repaired.count('{') - repaired.count('}')
-                        open_brackets = repaired.count('[') - repaired.count(']')
-
-                        # Close arrays first, then objects
-                        for _ in range(open_brackets):
-                            repaired += ']'
-                        for _ in range(open_braces):
-                            repaired += '}'
-
-                        try:
-                            parsed = json.loads(repaired)
-                            logger.warning(f"Successfully repaired incomplete JSON (added {open_brackets} ] and {open_braces} }})")
-                            return parsed
-                        except json.JSONDecodeError:
-                            pass
-
-                # If still not valid JSON, return as text
-                logger.warning("Could not parse Claude response as JSON")
-                return {"raw_response": response_text}
-
-        except TimeoutError as e:
-            logger.error(f"Claude API call timed out after {timeout} seconds: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Claude API call failed: {str(e)}")
-            raise
+        return parsed
 
     def record_change(
         self,
@@ -336,27 +322,13 @@ class BaseCollector:
             source_url=source_url
         )
 
-        self.db.add(change)
-
-        # Update job's changes_detected count
-        self.job.changes_detected += 1
-
-        # Commit both changes in a single transaction with retry logic
-        try:
-            self._db_commit_with_retry(max_retries=3, initial_delay=1.0)
-            logger.info(
-                f"Recorded change for {entity_type} "
-                f"(entity_id={entity_id}, field={field_name}, type={change_type})"
-            )
-        except (OperationalError, DBAPIError) as e:
-            error_msg = f"Database error recording change: {str(e)}"
-            logger.error(error_msg)
-            # Try to log the error to the database if possible
-            try:
-                self.log(error_msg, "ERROR", "saving", {"entity_type": entity_type, "change_type": change_type})
-            except Exception:
-                pass  # If logging fails, at least we logged to Python logger
-            raise
+        # Added to the session now; committed (and counted towards the job's
+        # changes_detected) with the next telemetry flush
+        self.telemetry.add_change(change)
+        logger.info(
+            f"Recorded change for {entity_type} "
+            f"(entity_id={entity_id}, field={field_name}, type={change_type})"
+        )
 
         return change
 
@@ -424,8 +396,7 @@ class BaseCollector:
             job_id=self.job_id
         )
 
-        self.db.add(match)
-        self.db.commit()
+        self.telemetry.add_record(match)
 
         logger.info(
             f"Recorded entity match for {discovered_name} "
@@ -434,6 +405,10 @@ class BaseCollector:
 
         return match
 
+    def flush_telemetry(self) -> bool:
+        """Write any buffered logs, changes and progress counts."""
+        return self.telemetry.flush()
+
     def run(self):
         """
         Main execution method - must be implemented by subclasses.
@@ -0,0 +1,200 @@
+"""
+Claude Response Cache
+
+Content-addressed cache for Claude responses used by the collectors.
+
+Responses are keyed by a hash of model + max_tokens + prompt and stored in
+a local SQLite file with a TTL and a size budget (least recently used rows
+are evicted first). Only responses that parsed cleanly as JSON are cached,
+and the parsed result is stored so cache hits skip the JSON repair logic.
+
+Concurrent calls with the same key are coalesced by the Claude pipeline
+(claude_pipeline), which consults this cache before sending a request.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from config.collection_config import CollectionConfig
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(prompt: str, model: str, max_tokens: int, temperature: Optional[float] = None) -> str:
+    """Content hash identifying a Claude request."""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(max_tokens).encode("utf-8"))
+    digest.update(b"\0")
+    if temperature is not None:
+        digest.update(f"t={temperature}".encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ClaudeResponseCache:
+    """
+    SQLite-backed response cache with TTL and size-based LRU eviction.
+
+    One connection is shared by all threads in the process and guarded by a
+    lock; WAL mode lets several API/worker processes use the same file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file path
+            ttl_seconds: Age after which entries are ignored and deleted
+            max_bytes: Total size of stored responses before eviction
+        """
+        self.path = path or CollectionConfig.CLAUDE_CACHE_PATH
+        self.ttl_seconds = ttl_seconds or CollectionConfig.CLAUDE_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes or CollectionConfig.CLAUDE_CACHE_MAX_MB * 1024 * 1024
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS claude_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                max_tokens INTEGER NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_claude_responses_last_access ON claude_responses (last_access)"
+        )
+        self._conn.commit()
+
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached parsed response, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM claude_responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM claude_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE claude_responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats["hits"] += 1
+
+        return json.loads(response)
+
+    def put(self, key: str, model: str, max_tokens: int, parsed: Any):
+        """Store a parsed response and evict old entries if over budget."""
+        response = json.dumps(parsed)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO claude_responses "
+                "(key, model, max_tokens, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, max_tokens, response, len(response), now, now)
+            )
+            self.stats["stores"] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows until under max_bytes."""
+        cursor = self._conn.execute(
+            "DELETE FROM claude_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self.stats["evictions"] += cursor.rowcount
+
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM claude_responses").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM claude_responses ORDER BY last_access"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM claude_responses WHERE key = ?", victims)
+        self.stats["evictions"] += len(victims)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM claude_responses")
+            self._conn.commit()
+
+    def status(self) -> Dict[str, Any]:
+        """Size and hit/miss counters for monitoring."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM claude_responses"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats,
+        }
+
+
+# ===================================================================
+# Process-wide instances
+# ===================================================================
+
+_cache: Optional[ClaudeResponseCache] = None
+_init_lock = threading.Lock()
+
+
+def get_claude_cache() -> Optional[ClaudeResponseCache]:
+    """Get the process-wide response cache (None when disabled)."""
+    global _cache
+    if not CollectionConfig.CLAUDE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _init_lock:
+            if _cache is None:
+                try:
+                    _cache = ClaudeResponseCache()
+                except sqlite3.Error as e:
+                    logger.error(f"Claude response cache unavailable ({e}); calls will not be cached")
+                    return None
+    return _cache
+
@@ -0,0 +1,392 @@
+"""
+Claude Pipeline
+
+Async, process-wide client pipeline for Claude calls made by collectors and
+admin endpoints.
+
+All requests run on one background event loop using AsyncAnthropic, so the
+limits below apply to every job in the process:
+- A global concurrency limit (CLAUDE_MAX_CONCURRENCY in-flight requests)
+- A token-bucket rate limiter (CLAUDE_REQUESTS_PER_MINUTE, bursting up to
+  the concurrency limit)
+- Retry with full-jitter exponential backoff on rate limits, overload,
+  timeouts and connection errors (honouring retry-after)
+
+Independent prompts are fanned out with call_many() and their results
+gathered in order. The response cache and coalescing of identical
+in-flight prompts (claude_cache) are applied before a request is sent.
+
+Sync code (collectors running in scheduler worker threads) uses the
+blocking wrappers; async routes await the *_async variants.
+"""
+import asyncio
+import copy
+import logging
+import os
+import random
+import re
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, Tuple
+
+from anthropic import AsyncAnthropic, APIConnectionError, APIStatusError
+from config.collection_config import CollectionConfig
+from .claude_cache import cache_key, get_claude_cache
+
+logger = logging.getLogger(__name__)
+
+CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+
+# HTTP statuses worth retrying (timeout, conflict, rate limit, overloaded/5xx)
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+@dataclass
+class ClaudeRequest:
+    """One prompt in a fan-out batch."""
+    prompt: str
+    max_tokens: int = 4096
+    temperature: Optional[float] = None
+
+
+@dataclass
+class ClaudeResult:
+    """Parsed reply plus where it came from (api, cache or shared)."""
+    data: Any
+    source: str
+    latency: float = 0.0
+    attempts: int = 0
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`;
+    acquire() waits until a token is available. Waiters are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+def parse_claude_response(response_text: str) -> Tuple[Any, bool]:
+    """
+    Parse a Claude reply as JSON.
+
+    Tries direct parsing, then a ```json code block, then the outermost
+    {...} object, closing unbalanced brackets of truncated replies.
+
+    Returns:
+        Tuple of (parsed, clean): clean is False when the JSON had to be
+        repaired or the reply is returned as {"raw_response": text}
+    """
+    try:
+        # First try direct parsing
+        return json.loads(response_text), True
+    except json.JSONDecodeError:
+        pass
+
+    # Try to extract JSON from markdown code blocks
+    json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
+    if json_match:
+        json_text = json_match.group(1)
+        try:
+            return json.loads(json_text), True
+        except json.JSONDecodeError:
+            pass
+
+    # Try to find any JSON object in the response
+    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+    if json_match:
+        json_text = json_match.group(0)
+        try:
+            return json.loads(json_text), True
+        except json.JSONDecodeError:
+            # Try to repair incomplete JSON (truncated response)
+            # Close any open arrays and objects
+            repaired = json_text.rstrip()
+            # Count open/close brackets
+            open_braces = repaired.count('{') - repaired.count('}')
+            open_brackets = repaired.count('[') - repaired.count(']')
+
+            # Close arrays first, then objects
+            for _ in range(open_brackets):
+                repaired += ']'
+            for _ in range(open_braces):
+                repaired += '}'
+
+            try:
+                parsed = json.loads(repaired)
+                logger.warning(f"Successfully repaired incomplete JSON (added {open_brackets} ] and {open_braces} }})")
+                return parsed, False
+            except json.JSONDecodeError:
+                pass
+
+    # If still not valid JSON, return as text
+    logger.warning("Could not parse Claude response as JSON")
+    return {"raw_response": response_text}, False
+
+
+class ClaudePipeline:
+    """
+    Process-wide async Claude client with concurrency, rate and retry control.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncAnthropic] = None,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        retry_max_delay: Optional[float] = None,
+        use_cache: bool = True
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            client: AsyncAnthropic client (default: from ANTHROPIC_API_KEY)
+            max_concurrency: Maximum in-flight API requests
+            requests_per_minute: Sustained request rate
+            max_retries: Retries per request after the first attempt
+            retry_base_delay: Backoff base in seconds (doubles per attempt)
+            retry_max_delay: Backoff cap in seconds
+            use_cache: Serve and store replies in the Claude response cache
+        """
+        self.max_concurrency = max_concurrency or CollectionConfig.CLAUDE_MAX_CONCURRENCY
+        rpm = requests_per_minute or CollectionConfig.CLAUDE_REQUESTS_PER_MINUTE
+        self.max_retries = CollectionConfig.CLAUDE_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = retry_base_delay or CollectionConfig.CLAUDE_RETRY_BASE_DELAY
+        self.retry_max_delay = retry_max_delay or CollectionConfig.CLAUDE_RETRY_MAX_DELAY
+        self.use_cache = use_cache
+
+        # The SDK's own retries are disabled; retries here are jittered and
+        # pass back through the rate limiter
+        self._client = client or AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+        self._bucket = TokenBucket(rpm / 60.0, float(self.max_concurrency))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.stats = {
+            "requests": 0, "retries": 0, "failures": 0,
+            "cache_hits": 0, "coalesced": 0, "active": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="claude-pipeline", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, coro: Coroutine):
+        """Schedule a coroutine on the pipeline loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def shutdown(self):
+        """Stop the pipeline loop (used by tests and process shutdown)."""
+        with self._start_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop = None
+                self._thread = None
+
+    # ------------------------------------------------------------------
+    # Requests (run on the pipeline loop)
+    # ------------------------------------------------------------------
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, at least the server's retry-after."""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except (TypeError, ValueError):
+                pass
+        return delay
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIConnectionError):  # includes APITimeoutError
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+        return False
+
+    async def _send(self, request: ClaudeRequest, timeout: float) -> Tuple[str, float, int]:
+        """Send one request with rate limiting and retries; returns (text, latency, attempts)."""
+        params = {
+            "model": CLAUDE_MODEL,
+            "max_tokens": request.max_tokens,
+            "timeout": float(timeout),
+            "messages": [{"role": "user", "content": request.prompt}],
+        }
+        if request.temperature is not None:
+            params["temperature"] = request.temperature
+
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            async with self._semaphore:
+                self.stats["active"] += 1
+                self.stats["requests"] += 1
+                start = time.perf_counter()
+                try:
+                    message = await self._client.messages.create(**params)
+                    return message.content[0].text, time.perf_counter() - start, attempt + 1
+                except Exception as e:
+                    if not self._is_retryable(e) or attempt == self.max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    error = e
+                finally:
+                    self.stats["active"] -= 1
+
+            delay = self._retry_delay(attempt, error)
+            self.stats["retries"] += 1
+            logger.warning(
+                f"Claude request failed ({type(error).__name__}); retry "
+                f"{attempt + 1}/{self.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _call(self, request: ClaudeRequest, timeout: float) -> ClaudeResult:
+        """Cache lookup, coalescing of identical in-flight prompts, then the API."""
+        key = cache_key(request.prompt, CLAUDE_MODEL, request.max_tokens, request.temperature)
+        cache = get_claude_cache() if self.use_cache else None
+
+        # SQLite reads/writes (and their lock) run on worker threads, not the event loop
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return ClaudeResult(cached, "cache")
+
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.stats["coalesced"] += 1
+            result = await asyncio.shield(shared)
+            # Don't hand out the leader's mutable result
+            return ClaudeResult(copy.deepcopy(result.data), "shared", result.latency, 0)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text, latency, attempts = await self._send(request, timeout)
+            parsed, clean = parse_claude_response(text)
+
+            # Repaired or unparseable responses are not cached; a retry may do better
+            if clean and cache is not None:
+                try:
+                    await asyncio.to_thread(cache.put, key, CLAUDE_MODEL, request.max_tokens, parsed)
+                except Exception as e:
+                    logger.warning(f"Failed to cache Claude response: {e}")
+
+            result = ClaudeResult(parsed, "api", latency, attempts)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unshared failure is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call_many(self, requests: Sequence[ClaudeRequest], timeout: float) -> List[Any]:
+        """Fan out independent requests; results (or exceptions) in input order."""
+        return await asyncio.gather(
+            *(self._call(request, timeout) for request in requests),
+            return_exceptions=True
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def call(self, prompt: str, max_tokens: int = 4096, timeout: float = 300,
+             temperature: Optional[float] = None) -> ClaudeResult:
+        """Blocking single call from sync code."""
+        result = self.call_many([ClaudeRequest(prompt, max_tokens, temperature)], timeout)[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def call_many(self, requests: Sequence[ClaudeRequest], timeout: float = 300) -> List[Any]:
+        """
+        Blocking fan-out/fan-in from sync code.
+
+        Returns:
+            One ClaudeResult or exception per request, in input order
+        """
+        return self.submit(self._call_many(list(requests), timeout)).result()
+
+    async def call_many_async(self, requests: Sequence[ClaudeRequest], timeout: float = 300) -> List[Any]:
+        """Fan-out/fan-in from another event loop (e.g. an async route)."""
+        return await asyncio.wrap_future(self.submit(self._call_many(list(requests), timeout)))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": round(self._bucket.rate * 60),
+            "inflight_prompts": len(self._inflight),
+            **self.stats,
+        }
+
+
+_pipeline: Optional[ClaudePipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_claude_pipeline() -> ClaudePipeline:
+    """Get the process-wide Claude pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = ClaudePipeline()
+    return _pipeline
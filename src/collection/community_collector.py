@@ -1625,21 +1625,50 @@ class CommunityCollector(BaseCollector):
             community_numeric_id = community.id  # Get the internal numeric ID
             cards_created = 0
             cards_skipped = 0
+            cards_linked = 0
 
-            # Process each builder
-            for builder_data in builders:
-                if not isinstance(builder_data, dict):
-                    continue
+            builders = [b for b in builders if isinstance(b, dict) and b.get("name")]
+
+            # Existing cards for this community, loaded once
+            existing_cards = {
+                card.name.lower(): card
+                for card in self.db.query(CommunityBuilder).filter(
+                    CommunityBuilder.community_id == community_public_id
+                ).all()
+                if card.name
+            }
 
+            # Resolve all discovered builders against existing builder profiles in one batch
+            from .duplicate_detection import resolve_builders
+            matches = resolve_builders(self.db, [
+                {
+                    "name": b.get("name"),
+                    "city": b.get("city") or community.city,
+                    "state": b.get("state") or community.state,
+                    "website": b.get("website"),
+                    "phone": b.get("phone"),
+                    "email": b.get("email"),
+                    "community_id": community_numeric_id,
+                }
+                for b in builders
+            ])
+
+            # Email/phone matches are only validated against the location, not
+            # this community; linking their cards would skip the builder job
+            # that creates the builder_communities row
+            from model.profiles.builder import builder_communities
+            linked_builder_ids = {
+                row.builder_id for row in self.db.query(builder_communities.c.builder_id).filter(
+                    builder_communities.c.community_id == community_numeric_id
+                )
+            }
+
+            # Process each builder
+            for builder_data, (matched_builder_id, match_confidence, match_method) in zip(builders, matches):
                 builder_name = builder_data.get("name")
-                if not builder_name:
-                    continue
 
                 # Check if this builder card already exists for this community
-                existing_card = self.db.query(CommunityBuilder).filter(
-                    CommunityBuilder.community_id == community_public_id,
-                    func.lower(CommunityBuilder.name) == func.lower(builder_name)
-                ).first()
+                existing_card = existing_cards.get(builder_name.lower())
 
                 if existing_card:
                     cards_skipped += 1
@@ -1677,7 +1706,20 @@ class CommunityCollector(BaseCollector):
                     followers=0
                 )
 
+                # Builder already has a matching profile in this community - link
+                # the card so no discovery job is created for it
+                if matched_builder_id and matched_builder_id in linked_builder_ids:
+                    new_card.builder_profile_id = matched_builder_id
+                    cards_linked += 1
+                    self.log(
+                        f"Linked builder card to existing builder ID {matched_builder_id}: {builder_name}",
+                        "INFO",
+                        "builder_cards",
+                        {"builder_id": matched_builder_id, "confidence": match_confidence, "method": match_method}
+                    )
+
                 self.db.add(new_card)
+                existing_cards[builder_name.lower()] = new_card
                 cards_created += 1
 
                 self.log(
@@ -1705,6 +1747,7 @@ class CommunityCollector(BaseCollector):
                     "community_name": community_name,
                     "cards_created": cards_created,
                     "cards_skipped": cards_skipped,
+                    "cards_linked": cards_linked,
                     "total_builders": len(builders)
                 }
             )
@@ -1757,6 +1800,17 @@ class CommunityCollector(BaseCollector):
             jobs_created = 0
             jobs_skipped = 0
 
+            # Pending/running builder jobs for these names, loaded once
+            card_names = {card.name for card in uncollected_cards if card.name}
+            active_jobs = {}
+            if card_names:
+                for job in self.db.query(CollectionJob).filter(
+                    CollectionJob.entity_type == "builder",
+                    CollectionJob.search_query.in_(card_names),
+                    CollectionJob.status.in_(["pending", "running"])
+                ).all():
+                    active_jobs.setdefault(job.search_query, job)
+
             for card in uncollected_cards:
                 builder_name = card.name
 
@@ -1765,11 +1819,7 @@ class CommunityCollector(BaseCollector):
                     continue
 
                 # Check if a pending/running job already exists for this builder name
-                existing_job = self.db.query(CollectionJob).filter(
-                    CollectionJob.entity_type == "builder",
-                    CollectionJob.search_query == builder_name,
-                    CollectionJob.status.in_(["pending", "running"])
-                ).first()
+                existing_job = active_jobs.get(builder_name)
 
                 if existing_job:
                     jobs_skipped += 1
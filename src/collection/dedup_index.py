@@ -0,0 +1,447 @@
+"""
+Duplicate Detection Index
+
+In-memory lookup structures used by duplicate_detection to find candidate
+builders and communities without scanning the whole table.
+
+Each index keeps:
+- Hash maps of normalized website, email, phone and name
+- City/state maps (and builder service areas) for location filtering
+- A trigram blocking index over names, partitioned by state, so fuzzy
+  scoring only runs on entries that share enough trigrams with the query
+
+Indexes are built lazily per process, updated when a session commits
+builder or community inserts/updates/deletes made through the ORM, and refreshed
+from rows whose updated_at changed (writes from other processes) every
+DEDUP_INDEX_REFRESH_SECONDS.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from config.collection_config import CollectionConfig
+from config.db import database_now
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram Dice coefficient for a name to be scored with SequenceMatcher.
+# Deliberately loose: names scoring >= 0.75 with SequenceMatcher share far more
+# trigrams than this, so blocking does not change which match wins.
+MIN_GRAM_SIMILARITY = 0.3
+
+
+# ===================================================================
+# Normalization
+# ===================================================================
+
+def normalize_name(value: Optional[str]) -> str:
+    return value.lower().strip() if value else ""
+
+
+def normalize_website(value: Optional[str]) -> str:
+    return value.lower().strip().rstrip('/') if value else ""
+
+
+def normalize_email(value: Optional[str]) -> str:
+    return value.lower().strip() if value else ""
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    return ''.join(c for c in value if c.isdigit()) if value else ""
+
+
+def normalize_city(value: Optional[str]) -> str:
+    return value.lower().strip() if value else ""
+
+
+def normalize_state(value: Optional[str]) -> str:
+    return value.upper().strip() if value else ""
+
+
+def name_grams(name: str, q: int = 3) -> Set[str]:
+    """Padded q-grams of a normalized name."""
+    padded = f"  {name} "
+    if len(padded) < q:
+        return {padded}
+    return {padded[i:i + q] for i in range(len(padded) - q + 1)}
+
+
+def gram_similarity(a: Set[str], b: Set[str]) -> float:
+    """Dice coefficient between two gram sets."""
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+# ===================================================================
+# Index
+# ===================================================================
+
+class DedupEntry:
+    """Indexed fields of one builder or community row."""
+
+    __slots__ = ("id", "name", "name_norm", "city", "state", "website",
+                 "email", "phone", "service_areas", "grams")
+
+    def __init__(self, id: int, name: Optional[str], city: Optional[str] = None,
+                 state: Optional[str] = None, website: Optional[str] = None,
+                 email: Optional[str] = None, phone: Optional[str] = None,
+                 service_areas=None):
+        self.id = id
+        self.name = name or ""
+        self.name_norm = normalize_name(name)
+        self.city = normalize_city(city)
+        self.state = normalize_state(state)
+        self.website = normalize_website(website)
+        self.email = normalize_email(email)
+        self.phone = normalize_phone(phone)
+        self.service_areas = service_areas if isinstance(service_areas, list) else None
+        self.grams = name_grams(self.name_norm) if self.name_norm else set()
+
+
+class DedupIndex:
+    """
+    Blocking index over one entity table (builders or communities).
+
+    Not thread-safe on its own; the process-wide indexes returned by
+    get_builder_index/get_community_index guard access with a lock.
+    """
+
+    def __init__(self):
+        self.entries: Dict[int, DedupEntry] = {}
+        self.by_name: Dict[str, Set[int]] = {}
+        self.by_website: Dict[str, Set[int]] = {}
+        self.by_email: Dict[str, Set[int]] = {}
+        self.by_phone: Dict[str, Set[int]] = {}
+        self.by_city: Dict[str, Set[int]] = {}
+        self.by_state: Dict[str, Set[int]] = {}
+        # Service areas (builders): raw lowercase strings and structured city/state
+        self.by_area_text: Dict[str, Set[int]] = {}
+        self.by_area_city: Dict[str, Set[int]] = {}
+        self.by_area_state: Dict[str, Set[int]] = {}
+        # (state, gram) -> ids. Append-only; stale ids are filtered at query time
+        self.postings: Dict[tuple, List[int]] = {}
+        self._stale_postings = 0
+        self._total_postings = 0
+
+        self.lock = threading.RLock()
+        self.built_at: Optional[float] = None
+        # Refresh watermark on the database clock (which sets updated_at),
+        # and when the last refresh ran on the local monotonic clock
+        self.refreshed_at: Optional[datetime] = None
+        self.checked_at: Optional[float] = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _add_key(mapping: Dict[str, Set[int]], key: str, entity_id: int):
+        if key:
+            mapping.setdefault(key, set()).add(entity_id)
+
+    @staticmethod
+    def _remove_key(mapping: Dict[str, Set[int]], key: str, entity_id: int):
+        if key and key in mapping:
+            mapping[key].discard(entity_id)
+            if not mapping[key]:
+                del mapping[key]
+
+    def _keys(self, entry: DedupEntry):
+        yield self.by_name, entry.name_norm
+        yield self.by_website, entry.website
+        yield self.by_email, entry.email
+        yield self.by_phone, entry.phone
+        yield self.by_city, entry.city
+        yield self.by_state, entry.state
+        for area in entry.service_areas or []:
+            if isinstance(area, str):
+                yield self.by_area_text, area.lower()
+            elif isinstance(area, dict):
+                yield self.by_area_city, normalize_city(area.get('city'))
+                yield self.by_area_state, normalize_state(area.get('state'))
+
+    def upsert(self, entry: DedupEntry):
+        """Add or replace an entry."""
+        previous = self.entries.pop(entry.id, None)
+        if previous is not None:
+            self._unlink(previous)
+            if previous.grams == entry.grams and previous.state == entry.state:
+                # Postings from the previous version are still valid
+                self.entries[entry.id] = entry
+                self._link(entry)
+                return
+            self._stale_postings += len(previous.grams)
+
+        self.entries[entry.id] = entry
+        self._link(entry)
+        for gram in entry.grams:
+            self.postings.setdefault((entry.state, gram), []).append(entry.id)
+        self._total_postings += len(entry.grams)
+        self._maybe_compact()
+
+    def remove(self, entity_id: int):
+        """Remove an entry (its postings are dropped lazily)."""
+        entry = self.entries.pop(entity_id, None)
+        if entry is None:
+            return
+        self._unlink(entry)
+        self._stale_postings += len(entry.grams)
+        self._maybe_compact()
+
+    def _link(self, entry: DedupEntry):
+        for mapping, key in self._keys(entry):
+            self._add_key(mapping, key, entry.id)
+
+    def _unlink(self, entry: DedupEntry):
+        for mapping, key in self._keys(entry):
+            self._remove_key(mapping, key, entry.id)
+
+    def _maybe_compact(self):
+        if self._total_postings and self._stale_postings > 0.25 * self._total_postings:
+            self._compact()
+
+    def _compact(self):
+        """Rebuild posting lists without stale ids."""
+        self.postings = {}
+        for entry in self.entries.values():
+            for gram in entry.grams:
+                self.postings.setdefault((entry.state, gram), []).append(entry.id)
+        self._total_postings = sum(len(e.grams) for e in self.entries.values())
+        self._stale_postings = 0
+
+    def bulk_load(self, entries: Iterable[DedupEntry]):
+        for entry in entries:
+            self.upsert(entry)
+        self.built_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def ids_for(self, mapping: Dict[str, Set[int]], key: str) -> List[int]:
+        """Ids stored under a key, in ascending id order (DB scan order)."""
+        return sorted(mapping.get(key, ())) if key else []
+
+    def service_area_ids(self, city: str, state: str) -> Set[int]:
+        """Ids whose service areas cover the city/state (same rules as validate_builder_location)."""
+        ids: Set[int] = set()
+        if city:
+            for area, area_ids in self.by_area_text.items():
+                if city in area:
+                    ids |= area_ids
+            ids |= self.by_area_city.get(city, set())
+        if state:
+            for area, area_ids in self.by_area_text.items():
+                if state in area.upper():
+                    ids |= area_ids
+            ids |= self.by_area_state.get(state, set())
+        return ids
+
+    def gram_candidates(self, name: str, state: str,
+                        min_similarity: float = MIN_GRAM_SIMILARITY) -> Set[int]:
+        """
+        Ids in the state block whose name shares enough trigrams with `name`.
+
+        Uses prefix filtering: only the rarest grams are needed to generate
+        every candidate that could reach `min_similarity`, so common grams
+        such as ' ho'/'mes' ("homes") never expand the candidate set.
+        """
+        query = name_grams(normalize_name(name))
+        if not query:
+            return set()
+
+        # Dice >= t implies at least t * |Q| / (2 - t) shared grams, so any
+        # match must contain one of the |Q| - min_overlap + 1 rarest grams
+        min_overlap = max(1, math.ceil(min_similarity * len(query) / (2 - min_similarity) - 1e-9))
+        ordered = sorted(query, key=lambda g: len(self.postings.get((state, g), ())))
+        prefix = ordered[:max(1, len(ordered) - min_overlap + 1)]
+
+        candidates: Set[int] = set()
+        for gram in prefix:
+            candidates.update(self.postings.get((state, gram), ()))
+
+        return {
+            entity_id for entity_id in candidates
+            if entity_id in self.entries
+            and self.entries[entity_id].state == state
+            and gram_similarity(query, self.entries[entity_id].grams) >= min_similarity
+        }
+
+    def filter_by_grams(self, name: str, ids: Iterable[int],
+                        min_similarity: float = MIN_GRAM_SIMILARITY) -> Set[int]:
+        """Keep ids from an explicit set whose names pass the trigram filter."""
+        query = name_grams(normalize_name(name))
+        return {
+            entity_id for entity_id in ids
+            if entity_id in self.entries
+            and gram_similarity(query, self.entries[entity_id].grams) >= min_similarity
+        }
+
+
+# ===================================================================
+# Process-wide indexes
+# ===================================================================
+
+_builder_index: Optional[DedupIndex] = None
+_community_index: Optional[DedupIndex] = None
+_registry_lock = threading.Lock()
+
+
+def _builder_entry(row) -> DedupEntry:
+    return DedupEntry(row.id, row.name, row.city, row.state, row.website,
+                      row.email, row.phone, row.service_areas)
+
+
+def _community_entry(row) -> DedupEntry:
+    return DedupEntry(row.id, row.name, row.city, row.state,
+                      row.community_website_url, row.email, row.phone)
+
+
+def _builder_columns():
+    from model.profiles.builder import BuilderProfile
+    return BuilderProfile, (
+        BuilderProfile.id, BuilderProfile.name, BuilderProfile.city, BuilderProfile.state,
+        BuilderProfile.website, BuilderProfile.email, BuilderProfile.phone,
+        BuilderProfile.service_areas
+    )
+
+
+def _community_columns():
+    from model.profiles.community import Community
+    return Community, (
+        Community.id, Community.name, Community.city, Community.state,
+        Community.community_website_url, Community.email, Community.phone
+    )
+
+
+def _watermark(db: Session) -> datetime:
+    # Database clock, which sets updated_at; TIMESTAMP columns have second
+    # precision, so overlap the next refresh slightly
+    return database_now(db) - timedelta(seconds=2)
+
+
+def _load(db: Session, columns_fn, entry_fn, since: Optional[datetime] = None) -> List[DedupEntry]:
+    model, columns = columns_fn()
+    query = db.query(*columns)
+    if since is not None:
+        query = query.filter(model.updated_at >= since)
+    return [entry_fn(row) for row in query.yield_per(10000)]
+
+
+def _get_index(db: Session, which: str) -> DedupIndex:
+    global _builder_index, _community_index
+
+    columns_fn, entry_fn = (
+        (_builder_columns, _builder_entry) if which == "builder"
+        else (_community_columns, _community_entry)
+    )
+
+    with _registry_lock:
+        index = _builder_index if which == "builder" else _community_index
+        if index is None:
+            index = DedupIndex()
+            start = time.perf_counter()
+            refreshed_at = _watermark(db)
+            index.bulk_load(_load(db, columns_fn, entry_fn))
+            index.refreshed_at = refreshed_at
+            index.checked_at = time.monotonic()
+            logger.info(f"Built {which} dedup index: {len(index)} entries "
+                        f"in {time.perf_counter() - start:.2f}s")
+            if which == "builder":
+                _builder_index = index
+            else:
+                _community_index = index
+            return index
+
+    # Pick up rows written by other processes since the last refresh
+    if time.monotonic() - index.checked_at >= CollectionConfig.DEDUP_INDEX_REFRESH_SECONDS:
+        index.checked_at = time.monotonic()
+        refreshed_at = _watermark(db)
+        rows = _load(db, columns_fn, entry_fn, since=index.refreshed_at)
+        with index.lock:
+            for entry in rows:
+                index.upsert(entry)
+            index.refreshed_at = refreshed_at
+
+    return index
+
+
+def get_builder_index(db: Session) -> DedupIndex:
+    """Get the process-wide builder index, building or refreshing it as needed."""
+    return _get_index(db, "builder")
+
+
+def get_community_index(db: Session) -> DedupIndex:
+    """Get the process-wide community index, building or refreshing it as needed."""
+    return _get_index(db, "community")
+
+
+def reset_indexes():
+    """Drop the process-wide indexes (rebuilt on next use)."""
+    global _builder_index, _community_index
+    with _registry_lock:
+        _builder_index = None
+        _community_index = None
+
+
+# ===================================================================
+# Incremental updates from ORM writes
+# ===================================================================
+
+# Changes are collected at flush time and applied once the session commits,
+# so rolled-back writes never reach the index.
+_PENDING_KEY = "dedup_index_pending"
+
+
+def _queue_change(target, which: str, entry: Optional[DedupEntry], entity_id: int):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((which, entry, entity_id))
+
+
+def _register_listeners():
+    from model.profiles.builder import BuilderProfile
+    from model.profiles.community import Community
+
+    for model, which, entry_fn in (
+        (BuilderProfile, "builder", _builder_entry),
+        (Community, "community", _community_entry),
+    ):
+        def _upsert(mapper, connection, target, which=which, entry_fn=entry_fn):
+            _queue_change(target, which, entry_fn(target), target.id)
+
+        def _delete(mapper, connection, target, which=which):
+            _queue_change(target, which, None, target.id)
+
+        event.listen(model, "after_insert", _upsert)
+        event.listen(model, "after_update", _upsert)
+        event.listen(model, "after_delete", _delete)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes_after_commit(session):
+    for which, entry, entity_id in session.info.pop(_PENDING_KEY, []):
+        index = _builder_index if which == "builder" else _community_index
+        if index is None:
+            continue
+        with index.lock:
+            if entry is None:
+                index.remove(entity_id)
+            else:
+                index.upsert(entry)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_changes_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_register_listeners()
@@ -5,10 +5,21 @@ Provides fuzzy matching and duplicate detection for entities to prevent
 duplicate communities and builders from being created.
 """
 import logging
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Callable, Iterable, List, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
 from difflib import SequenceMatcher
+from .dedup_index import (
+    DedupIndex,
+    MIN_GRAM_SIMILARITY,
+    get_builder_index,
+    get_community_index,
+    normalize_city,
+    normalize_email,
+    normalize_name,
+    normalize_phone,
+    normalize_state,
+    normalize_website,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -106,6 +117,202 @@ def calculate_similarity(str1: str, str2: str) -> float:
     return SequenceMatcher(None, s1, s2).ratio()
 
 
+def _fuzzy_threshold_filter(threshold: float) -> float:
+    """
+    Trigram similarity required before a name is scored with SequenceMatcher.
+
+    Location boosts add at most 0.10, so a candidate needs a name ratio of
+    threshold - 0.10; below a 0.70 ratio the trigram filter is no longer a
+    safe shortcut and every candidate in the location block is scored.
+    """
+    return MIN_GRAM_SIMILARITY if threshold - 0.10 >= 0.70 else 0.0
+
+
+def _location_candidates(
+    index: DedupIndex,
+    name: str,
+    city: Optional[str],
+    state: Optional[str],
+    extra_ids: Iterable[int],
+    min_similarity: float
+) -> Set[int]:
+    """
+    Ids in the same state, the same city, or `extra_ids` whose names pass the
+    trigram filter.
+    """
+    city_key = normalize_city(city)
+    state_key = normalize_state(state)
+
+    with index.lock:
+        others = set(extra_ids)
+        if city_key:
+            others |= index.by_city.get(city_key, set())
+
+        if min_similarity <= 0:
+            ids = set(others)
+            if state_key:
+                ids |= index.by_state.get(state_key, set())
+            return {i for i in ids if i in index.entries}
+
+        ids = index.gram_candidates(name, state_key, min_similarity) if state_key else set()
+        ids |= index.filter_by_grams(name, others - ids, min_similarity)
+        return ids
+
+
+def _rank_fuzzy(
+    index: DedupIndex,
+    name: str,
+    city: Optional[str],
+    state: Optional[str],
+    candidate_ids: Iterable[int],
+    threshold: float
+) -> List[Tuple[float, int]]:
+    """
+    Score candidates the same way as the original full-table loop.
+
+    Returns:
+        List of (score, entity_id) at or above threshold, best first, ties
+        broken by lowest id (the first row the table scan would have kept)
+    """
+    city_key = city.lower() if city else None
+    state_key = state.upper() if state else None
+    query = name.lower().strip() if name else ""
+
+    scored = []
+    for entity_id in candidate_ids:
+        entry = index.entries.get(entity_id)
+        if entry is None or not query or not entry.name_norm:
+            continue
+
+        # Boost score if location matches perfectly
+        location_boost = 0.0
+        if city_key and entry.city and city_key == entry.city:
+            location_boost += 0.05
+        if state_key and entry.state and state_key == entry.state:
+            location_boost += 0.05
+
+        # Same comparison as calculate_similarity; the quick ratios are
+        # upper bounds of ratio() and skip most hopeless candidates cheaply
+        matcher = SequenceMatcher(None, query, entry.name_norm)
+        if (matcher.real_quick_ratio() + location_boost < threshold or
+                matcher.quick_ratio() + location_boost < threshold):
+            continue
+        name_similarity = matcher.ratio()
+
+        total_score = min(name_similarity + location_boost, 1.0)
+        if total_score >= threshold and total_score > 0.0:
+            scored.append((total_score, entity_id))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored
+
+
+def _confirm_exists(db: Session, model, index: DedupIndex, entity_id: int) -> bool:
+    """Confirm an indexed row still exists, dropping it from the index if not."""
+    found = db.query(model.id).filter(model.id == entity_id).first() is not None
+    if not found:
+        with index.lock:
+            index.remove(entity_id)
+    return found
+
+
+def _existing_ids(db: Session, model, index: DedupIndex, entity_ids: Set[int]) -> Set[int]:
+    """Bulk version of _confirm_exists: one query for all ids."""
+    found = {row[0] for row in db.query(model.id).filter(model.id.in_(entity_ids)).all()}
+    with index.lock:
+        for entity_id in entity_ids - found:
+            index.remove(entity_id)
+    return found
+
+
+NO_MATCH: Tuple[None, None, None] = (None, None, None)
+
+
+def _entry_name(index: DedupIndex, entity_id: int) -> str:
+    entry = index.entries.get(entity_id)
+    return entry.name if entry else ""
+
+
+def _match_community(
+    index: DedupIndex,
+    name: str,
+    city: Optional[str],
+    state: Optional[str],
+    website: Optional[str],
+    threshold: float,
+    exists: Callable[[int], bool]
+) -> Tuple[Optional[int], Optional[float], Optional[str]]:
+    """Methods 1-3 of find_duplicate_community, answered from the index."""
+    # Method 1: Exact website match (highest confidence)
+    if website:
+        with index.lock:
+            candidate_ids = index.ids_for(index.by_website, normalize_website(website))
+        for candidate_id in candidate_ids:
+            if exists(candidate_id):
+                logger.info(f"Found exact website match for {name}: {_entry_name(index, candidate_id)} (ID: {candidate_id})")
+                return candidate_id, 1.0, "website_exact"
+
+    # Method 2: Exact name + location match
+    if name and city and state:
+        with index.lock:
+            candidate_ids = sorted(
+                index.by_name.get(normalize_name(name), set())
+                & index.by_city.get(normalize_city(city), set())
+                & index.by_state.get(normalize_state(state), set())
+            )
+        for candidate_id in candidate_ids:
+            if exists(candidate_id):
+                logger.info(f"Found exact name+location match for {name}: {_entry_name(index, candidate_id)} (ID: {candidate_id})")
+                return candidate_id, 0.95, "name_location_exact"
+
+    # Method 3: Fuzzy name matching with location
+    if name and (city or state):
+        # Communities in the same city or state that share enough trigrams
+        candidate_ids = _location_candidates(
+            index, name, city, state, (), _fuzzy_threshold_filter(threshold)
+        )
+
+        for best_score, candidate_id in _rank_fuzzy(index, name, city, state, candidate_ids, threshold):
+            if exists(candidate_id):
+                logger.info(f"Found fuzzy match for {name}: {_entry_name(index, candidate_id)} (ID: {candidate_id}, score: {best_score:.2f})")
+                return candidate_id, best_score, "name_fuzzy"
+
+    return NO_MATCH
+
+
+def _match_address(
+    name: str,
+    address: str,
+    candidates: List[Any],
+    threshold: float
+) -> Tuple[Optional[int], Optional[float], Optional[str]]:
+    """Method 4 of find_duplicate_community over (id, name, address) rows."""
+    best_match = None
+    best_score = 0.0
+
+    for candidate in candidates:
+        if candidate.address:
+            addr_similarity = calculate_similarity(address, candidate.address)
+
+            if addr_similarity > best_score and addr_similarity >= threshold:
+                best_score = addr_similarity
+                best_match = candidate
+
+    if best_match:
+        logger.info(f"Found address match for {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f})")
+        return best_match.id, best_score, "address_fuzzy"
+
+    return NO_MATCH
+
+
+def _address_candidates(db: Session) -> List[Any]:
+    from model.profiles.community import Community
+
+    return db.query(Community.id, Community.name, Community.address).filter(
+        Community.address.isnot(None)
+    ).all()
+
+
 def find_duplicate_community(
     db: Session,
     name: str,
@@ -124,6 +331,9 @@ def find_duplicate_community(
     3. Fuzzy name match + location match (confidence: varies)
     4. Address similarity (confidence: varies)
 
+    Methods 1-3 are answered from the in-memory community index
+    (see dedup_index); only the matched row is checked in the database.
+
     Args:
         db: Database session
         name: Community name
@@ -138,94 +348,217 @@ def find_duplicate_community(
     """
     from model.profiles.community import Community
 
-    # Method 1: Exact website match (highest confidence)
-    if website:
-        normalized_website = website.lower().strip().rstrip('/')
-        existing = db.query(Community).filter(
-            func.lower(Community.community_website_url) == normalized_website
-        ).first()
+    index = get_community_index(db)
+    match = _match_community(
+        index, name, city, state, website, threshold,
+        exists=lambda entity_id: _confirm_exists(db, Community, index, entity_id)
+    )
+    if match[0]:
+        return match
 
-        if existing:
-            logger.info(f"Found exact website match for {name}: {existing.name} (ID: {existing.id})")
-            return existing.id, 1.0, "website_exact"
+    # Method 4: Address matching (if no location provided)
+    if address and not (city or state):
+        match = _match_address(name, address, _address_candidates(db), threshold)
+        if match[0]:
+            return match
 
-    # Method 2: Exact name + location match
-    if name and city and state:
-        existing = db.query(Community).filter(
-            func.lower(Community.name) == name.lower().strip(),
-            func.lower(Community.city) == city.lower().strip(),
-            func.lower(Community.state) == state.upper().strip()
-        ).first()
+    logger.info(f"No duplicate found for community: {name}")
+    return NO_MATCH
 
-        if existing:
-            logger.info(f"Found exact name+location match for {name}: {existing.name} (ID: {existing.id})")
-            return existing.id, 0.95, "name_location_exact"
 
-    # Method 3: Fuzzy name matching with location
-    if name and (city or state):
-        # Get all communities in the same city or state
-        query = db.query(Community)
-
-        if city and state:
-            query = query.filter(
-                or_(
-                    func.lower(Community.city) == city.lower().strip(),
-                    func.lower(Community.state) == state.upper().strip()
-                )
-            )
-        elif city:
-            query = query.filter(func.lower(Community.city) == city.lower().strip())
-        elif state:
-            query = query.filter(func.lower(Community.state) == state.upper().strip())
+def _builder_links(db: Session, community_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Builder ids linked to each community, read with a single query."""
+    community_ids = {c for c in community_ids if c}
+    links: Dict[int, Set[int]] = {c: set() for c in community_ids}
+    if not community_ids:
+        return links
 
-        candidates = query.all()
+    from model.profiles.builder import builder_communities
+    from sqlalchemy import select
 
-        best_match = None
-        best_score = 0.0
+    rows = db.execute(
+        select(builder_communities.c.community_id, builder_communities.c.builder_id).where(
+            builder_communities.c.community_id.in_(community_ids)
+        )
+    ).all()
+    for community_id, builder_id in rows:
+        links[community_id].add(builder_id)
+    return links
+
+
+def _entry_serves_location(
+    entry,
+    linked_ids: Set[int],
+    city: Optional[str],
+    state: Optional[str]
+) -> bool:
+    """In-memory equivalent of validate_builder_location for an indexed builder."""
+    if entry.id in linked_ids:
+        return True
 
-        for candidate in candidates:
-            name_similarity = calculate_similarity(name, candidate.name)
+    if entry.service_areas and (city or state):
+        for service_area in entry.service_areas:
+            if isinstance(service_area, str):
+                if city and city.lower() in service_area.lower():
+                    return True
+                if state and state.upper() in service_area.upper():
+                    return True
+            elif isinstance(service_area, dict):
+                if city and normalize_city(service_area.get('city')) == normalize_city(city):
+                    return True
+                if state and normalize_state(service_area.get('state')) == normalize_state(state):
+                    return True
+
+    if city and entry.city and normalize_city(city) == entry.city:
+        return True
+    if state and entry.state and normalize_state(state) == entry.state:
+        return True
 
-            # Boost score if location matches perfectly
-            location_boost = 0.0
-            if city and candidate.city and city.lower() == candidate.city.lower():
-                location_boost += 0.05
-            if state and candidate.state and state.upper() == candidate.state.upper():
-                location_boost += 0.05
+    return False
 
-            total_score = min(name_similarity + location_boost, 1.0)
 
-            if total_score > best_score and total_score >= threshold:
-                best_score = total_score
-                best_match = candidate
+def _match_builder(
+    index: DedupIndex,
+    name: str,
+    city: Optional[str],
+    state: Optional[str],
+    website: Optional[str],
+    phone: Optional[str],
+    email: Optional[str],
+    threshold: float,
+    community_id: Optional[int],
+    linked_ids: Set[int],
+    exists: Callable[[int], bool]
+) -> Tuple[Optional[int], Optional[float], Optional[str]]:
+    """Methods 1-6 of find_duplicate_builder, answered from the index."""
 
-        if best_match:
-            logger.info(f"Found fuzzy match for {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f})")
-            return best_match.id, best_score, "name_fuzzy"
+    def validated(candidate_ids):
+        """Candidates that serve the collection location, in id order."""
+        with index.lock:
+            entries = [index.entries[i] for i in candidate_ids if i in index.entries]
+        return [e for e in entries if _entry_serves_location(e, linked_ids, city, state)]
 
-    # Method 4: Address matching (if no location provided)
-    if address and not (city or state):
-        existing = db.query(Community).filter(
-            Community.address.isnot(None)
-        ).all()
+    # Method 1: Exact name + community match (highest confidence for location accuracy)
+    # This prevents matching national builders by name alone without location validation
+    if community_id and name:
+        with index.lock:
+            candidate_ids = sorted(index.by_name.get(normalize_name(name), set()) & linked_ids)
+        for candidate_id in candidate_ids:
+            if exists(candidate_id):
+                # Found exact match: same name AND linked to the same community
+                logger.info(f"Found exact name+community match for builder {name}: {_entry_name(index, candidate_id)} (ID: {candidate_id}) in community {community_id}")
+                return candidate_id, 1.0, "name_community_exact"
+
+    # Method 2: Exact website match + location validation
+    if website:
+        normalized_website = normalize_website(website)
+        with index.lock:
+            candidate_ids = index.ids_for(index.by_website, normalized_website)
+
+        if candidate_ids:
+            # For multi-location builders sharing same corporate website,
+            # validate location to ensure we match the correct office
+            for entry in validated(candidate_ids):
+                # Additional check: if community_id is provided, only return as duplicate
+                # if the builder is already linked to THIS specific community
+                # (same builder can exist in multiple communities in same city)
+                if community_id and entry.id not in linked_ids:
+                    logger.info(f"Found builder {entry.name} (ID: {entry.id}) with same website but in different community - allowing creation")
+                    continue
+                if exists(entry.id):
+                    logger.info(f"Found exact website match with location validation for builder {name}: {entry.name} (ID: {entry.id})")
+                    return entry.id, 0.98, "website_exact_location_validated"
+
+            # If we found website matches but none passed location validation,
+            # log a warning (likely different office/location of same builder)
+            logger.warning(f"Found {len(candidate_ids)} website matches for {normalized_website} but none serve location {city}, {state} (community {community_id})")
+            # Don't return a match - this could be a different office
 
-        best_match = None
-        best_score = 0.0
+    # Method 3: Exact email match + location validation
+    if email:
+        normalized_email = normalize_email(email)
+        with index.lock:
+            candidate_ids = index.ids_for(index.by_email, normalized_email)
 
-        for candidate in existing:
-            if candidate.address:
-                addr_similarity = calculate_similarity(address, candidate.address)
+        if candidate_ids:
+            # Validate location for email matches
+            for entry in validated(candidate_ids):
+                if exists(entry.id):
+                    logger.info(f"Found exact email match with location validation for builder {name}: {entry.name} (ID: {entry.id})")
+                    return entry.id, 0.95, "email_exact_location_validated"
 
-                if addr_similarity > best_score and addr_similarity >= threshold:
-                    best_score = addr_similarity
-                    best_match = candidate
+            logger.warning(f"Found {len(candidate_ids)} email matches for {normalized_email} but none serve location {city}, {state} (community {community_id})")
 
-        if best_match:
-            logger.info(f"Found address match for {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f})")
-            return best_match.id, best_score, "address_fuzzy"
+    # Method 4: Exact phone match + location validation
+    if phone:
+        # Normalize phone number (remove spaces, dashes, parentheses)
+        normalized_phone = normalize_phone(phone)
+        with index.lock:
+            candidate_ids = index.ids_for(index.by_phone, normalized_phone)
 
-    logger.info(f"No duplicate found for community: {name}")
-    return None, None, None
+        if candidate_ids:
+            # Validate location for phone matches
+            for entry in validated(candidate_ids):
+                if exists(entry.id):
+                    logger.info(f"Found exact phone match with location validation for builder {name}: {entry.name} (ID: {entry.id})")
+                    return entry.id, 0.93, "phone_exact_location_validated"
+
+            logger.warning(f"Found {len(candidate_ids)} phone matches for {normalized_phone} but none serve location {city}, {state} (community {community_id})")
+
+    # Method 5: Exact name + location match (with community validation if provided)
+    if name and city and state:
+        with index.lock:
+            candidate_ids = sorted(
+                index.by_name.get(normalize_name(name), set())
+                & index.by_city.get(normalize_city(city), set())
+                & index.by_state.get(normalize_state(state), set())
+            )
+
+        if candidate_ids:
+            # If community_id provided, only a builder already linked to THIS community is a duplicate
+            if community_id:
+                candidate_ids = [i for i in candidate_ids if i in linked_ids]
+            for candidate_id in candidate_ids:
+                if exists(candidate_id):
+                    logger.info(f"Found exact name+location match for builder {name}: {_entry_name(index, candidate_id)} (ID: {candidate_id})")
+                    return candidate_id, 0.90, "name_location_exact"
+
+            if community_id:
+                # Name+location matches exist but none in this community - not a duplicate
+                logger.info(f"Found name+location matches for {name} in {city}, {state} but none in community {community_id} - allowing creation")
+
+    # Method 6: Fuzzy name matching with location + service area validation
+    # Only match builders that serve the collection location
+    if name and (city or state):
+        # Builders linked to the community or covering the location through
+        # their service areas are candidates even if their own city/state differ
+        with index.lock:
+            extra_ids = linked_ids | index.service_area_ids(
+                city.lower() if city else "", state.upper() if state else ""
+            )
+        candidate_ids = _location_candidates(
+            index, name, city, state, extra_ids, _fuzzy_threshold_filter(threshold)
+        )
+        ranked = _rank_fuzzy(
+            index, name, city, state,
+            [e.id for e in validated(candidate_ids)], threshold
+        )
+
+        for best_score, candidate_id in ranked:
+            if not exists(candidate_id):
+                continue
+
+            best_name = _entry_name(index, candidate_id)
+            # If community_id provided, check if this builder is already linked to THIS community
+            if community_id and candidate_id not in linked_ids:
+                logger.info(f"Found fuzzy match for {name}: {best_name} (ID: {candidate_id}, score: {best_score:.2f}) but in different community - allowing creation")
+                # Not a duplicate for this community
+                break
+
+            logger.info(f"Found fuzzy match with location validation for builder {name}: {best_name} (ID: {candidate_id}, score: {best_score:.2f})")
+            return candidate_id, best_score, "name_fuzzy_location_validated"
+
+    return NO_MATCH
 
 
 def find_duplicate_builder(
@@ -255,6 +588,10 @@ def find_duplicate_builder(
     - Builder's service areas include the collection location
     - For multi-location builders, we match the correct office/location
 
+    Candidates come from the in-memory builder index (see dedup_index) and
+    the community's builder links are read once, so a lookup no longer loads
+    every builder or runs one link query per candidate.
+
     Args:
         db: Database session
         name: Builder name
@@ -269,194 +606,157 @@ def find_duplicate_builder(
     Returns:
         Tuple of (entity_id, confidence_score, match_method) or (None, None, None)
     """
-    from model.profiles.builder import BuilderProfile, builder_communities
-    from sqlalchemy import select
+    from model.profiles.builder import BuilderProfile
 
-    # Method 1: Exact name + community match (highest confidence for location accuracy)
-    # This prevents matching national builders by name alone without location validation
-    if community_id and name:
-        # Find builders linked to this specific community
-        builders_in_community = db.execute(
-            select(BuilderProfile).join(
-                builder_communities,
-                BuilderProfile.id == builder_communities.c.builder_id
-            ).where(
-                builder_communities.c.community_id == community_id,
-                func.lower(BuilderProfile.name) == name.lower().strip()
-            )
-        ).scalars().all()
+    index = get_builder_index(db)
+    linked_ids = _builder_links(db, [community_id]).get(community_id, set())
 
-        if builders_in_community:
-            # Found exact match: same name AND linked to the same community
-            builder = builders_in_community[0]
-            logger.info(f"Found exact name+community match for builder {name}: {builder.name} (ID: {builder.id}) in community {community_id}")
-            return builder.id, 1.0, "name_community_exact"
+    match = _match_builder(
+        index, name, city, state, website, phone, email, threshold, community_id, linked_ids,
+        exists=lambda entity_id: _confirm_exists(db, BuilderProfile, index, entity_id)
+    )
+    if match[0]:
+        return match
 
-    # Method 2: Exact website match + location validation
-    if website:
-        normalized_website = website.lower().strip().rstrip('/')
-        candidates = db.query(BuilderProfile).filter(
-            func.lower(BuilderProfile.website) == normalized_website
-        ).all()
+    logger.info(f"No duplicate found for builder: {name} in location {city}, {state} (community {community_id})")
+    return NO_MATCH
 
-        if candidates:
-            # For multi-location builders sharing same corporate website,
-            # validate location to ensure we match the correct office
-            for candidate in candidates:
-                if validate_builder_location(db, candidate, community_id, city, state):
-                    # Additional check: if community_id is provided, only return as duplicate
-                    # if the builder is already linked to THIS specific community
-                    # (same builder can exist in multiple communities in same city)
-                    if community_id:
-                        is_in_community = db.execute(
-                            select(builder_communities).where(
-                                builder_communities.c.builder_id == candidate.id,
-                                builder_communities.c.community_id == community_id
-                            )
-                        ).first()
-
-                        if is_in_community:
-                            logger.info(f"Found exact website match with location validation for builder {name}: {candidate.name} (ID: {candidate.id}) in same community {community_id}")
-                            return candidate.id, 0.98, "website_exact_location_validated"
-                        else:
-                            logger.info(f"Found builder {candidate.name} (ID: {candidate.id}) with same website but in different community - allowing creation")
-                            continue
-                    else:
-                        # No community context, return match
-                        logger.info(f"Found exact website match with location validation for builder {name}: {candidate.name} (ID: {candidate.id})")
-                        return candidate.id, 0.98, "website_exact_location_validated"
 
-            # If we found website matches but none passed location validation,
-            # log a warning (likely different office/location of same builder)
-            if candidates:
-                logger.warning(f"Found {len(candidates)} website matches for {normalized_website} but none serve location {city}, {state} (community {community_id})")
-                # Don't return a match - this could be a different office
+# ===================================================================
+# Batch resolution
+# ===================================================================
 
-    # Method 3: Exact email match + location validation
-    if email:
-        normalized_email = email.lower().strip()
-        candidates = db.query(BuilderProfile).filter(
-            func.lower(BuilderProfile.email) == normalized_email
-        ).all()
+def _resolve_batch(
+    db: Session,
+    model,
+    index: DedupIndex,
+    records: List[Dict[str, Any]],
+    match_fn: Callable[[Dict[str, Any], Callable[[int], bool]], Tuple],
+    max_rounds: int = 3
+) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+    """
+    Match every record against the index, then confirm all winners with a
+    single query. Records whose winner was deleted meanwhile are matched
+    again with that id excluded.
+    """
+    verified: Dict[int, bool] = {}
+    exists = lambda entity_id: verified.get(entity_id, True)
 
-        if candidates:
-            # Validate location for email matches
-            for candidate in candidates:
-                if validate_builder_location(db, candidate, community_id, city, state):
-                    logger.info(f"Found exact email match with location validation for builder {name}: {candidate.name} (ID: {candidate.id})")
-                    return candidate.id, 0.95, "email_exact_location_validated"
+    results: List[Tuple] = [NO_MATCH] * len(records)
+    pending = list(range(len(records)))
 
-            if candidates:
-                logger.warning(f"Found {len(candidates)} email matches for {normalized_email} but none serve location {city}, {state} (community {community_id})")
+    for _ in range(max_rounds):
+        proposals = {i: match_fn(records[i], exists) for i in pending}
 
-    # Method 4: Exact phone match + location validation
-    if phone:
-        # Normalize phone number (remove spaces, dashes, parentheses)
-        normalized_phone = ''.join(c for c in phone if c.isdigit())
+        unchecked = {m[0] for m in proposals.values() if m[0] and m[0] not in verified}
+        if unchecked:
+            found = _existing_ids(db, model, index, unchecked)
+            verified.update({entity_id: entity_id in found for entity_id in unchecked})
 
-        all_builders = db.query(BuilderProfile).filter(
-            BuilderProfile.phone.isnot(None)
-        ).all()
+        pending = []
+        for i, match in proposals.items():
+            if match[0] and not verified[match[0]]:
+                pending.append(i)
+            else:
+                results[i] = match
+        if not pending:
+            break
+    else:
+        # Winners kept disappearing; settle the rest one query at a time
+        strict = lambda entity_id: verified.get(entity_id) or _confirm_exists(db, model, index, entity_id)
+        for i in pending:
+            results[i] = match_fn(records[i], strict)
 
-        matched_candidates = []
-        for builder in all_builders:
-            if builder.phone:
-                builder_phone = ''.join(c for c in builder.phone if c.isdigit())
-                if normalized_phone == builder_phone:
-                    matched_candidates.append(builder)
+    return results
 
-        if matched_candidates:
-            # Validate location for phone matches
-            for candidate in matched_candidates:
-                if validate_builder_location(db, candidate, community_id, city, state):
-                    logger.info(f"Found exact phone match with location validation for builder {name}: {candidate.name} (ID: {candidate.id})")
-                    return candidate.id, 0.93, "phone_exact_location_validated"
 
-            logger.warning(f"Found {len(matched_candidates)} phone matches for {normalized_phone} but none serve location {city}, {state} (community {community_id})")
+def resolve_builders(
+    db: Session,
+    records: List[Dict[str, Any]],
+    threshold: float = 0.85
+) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+    """
+    Resolve many discovered builders at once.
 
-    # Method 5: Exact name + location match (with community validation if provided)
-    if city and state:
-        candidates = db.query(BuilderProfile).filter(
-            func.lower(BuilderProfile.name) == name.lower().strip(),
-            func.lower(BuilderProfile.city) == city.lower().strip(),
-            func.lower(BuilderProfile.state) == state.upper().strip()
-        ).all()
-
-        if candidates:
-            # If community_id provided, check if any candidate is already linked to THIS community
-            if community_id:
-                for candidate in candidates:
-                    # Check if this builder is already linked to the specific community
-                    is_in_community = db.execute(
-                        select(builder_communities).where(
-                            builder_communities.c.builder_id == candidate.id,
-                            builder_communities.c.community_id == community_id
-                        )
-                    ).first()
-
-                    if is_in_community:
-                        logger.info(f"Found exact name+location+community match for builder {name}: {candidate.name} (ID: {candidate.id}) in community {community_id}")
-                        return candidate.id, 0.90, "name_location_exact"
-
-                # If we found name+location matches but none in this community, it's NOT a duplicate
-                logger.info(f"Found {len(candidates)} name+location matches for {name} in {city}, {state} but none in community {community_id} - allowing creation")
-                # Continue to next method
-            else:
-                # No community context, return first match
-                existing = candidates[0]
-                logger.info(f"Found exact name+location match for builder {name}: {existing.name} (ID: {existing.id})")
-                return existing.id, 0.90, "name_location_exact"
+    Same matching rules as find_duplicate_builder, but builder_communities
+    links for every community in the batch are read with one query and all
+    matched ids are confirmed with one query, so a community page with
+    dozens of builders costs a few queries instead of several per builder.
 
-    # Method 6: Fuzzy name matching with location + service area validation
-    # Only match builders that serve the collection location
-    if city or state:
-        # Get all builders (we'll filter by location validation)
-        all_builders = db.query(BuilderProfile).all()
+    Args:
+        db: Database session
+        records: Dicts with name, city, state, website, phone, email and
+                 community_id (all optional except name)
+        threshold: Minimum similarity score (0.0-1.0)
+
+    Returns:
+        List of (entity_id, confidence_score, match_method) tuples in input
+        order, (None, None, None) for records without a duplicate
+    """
+    from model.profiles.builder import BuilderProfile
 
-        best_match = None
-        best_score = 0.0
+    if not records:
+        return []
 
-        for candidate in all_builders:
-            # First check if builder serves this location
-            if not validate_builder_location(db, candidate, community_id, city, state):
-                continue
+    index = get_builder_index(db)
+    links = _builder_links(db, [r.get("community_id") for r in records])
 
-            # Calculate name similarity
-            name_similarity = calculate_similarity(name, candidate.name)
+    def match(record, exists):
+        community_id = record.get("community_id")
+        return _match_builder(
+            index, record.get("name"), record.get("city"), record.get("state"),
+            record.get("website"), record.get("phone"), record.get("email"),
+            threshold, community_id, links.get(community_id, set()), exists
+        )
 
-            # Boost score if location matches perfectly
-            location_boost = 0.0
-            if city and candidate.city and city.lower() == candidate.city.lower():
-                location_boost += 0.05
-            if state and candidate.state and state.upper() == candidate.state.upper():
-                location_boost += 0.05
+    results = _resolve_batch(db, BuilderProfile, index, records, match)
+    logger.info(f"Resolved {len(records)} builders: {sum(1 for r in results if r[0])} duplicates found")
+    return results
 
-            total_score = min(name_similarity + location_boost, 1.0)
 
-            if total_score > best_score and total_score >= threshold:
-                best_score = total_score
-                best_match = candidate
+def resolve_communities(
+    db: Session,
+    records: List[Dict[str, Any]],
+    threshold: float = 0.85
+) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+    """
+    Resolve many discovered communities at once.
 
-        if best_match:
-            # If community_id provided, check if this builder is already linked to THIS community
-            if community_id:
-                is_in_community = db.execute(
-                    select(builder_communities).where(
-                        builder_communities.c.builder_id == best_match.id,
-                        builder_communities.c.community_id == community_id
-                    )
-                ).first()
-
-                if is_in_community:
-                    logger.info(f"Found fuzzy match with location validation for builder {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f}) in community {community_id}")
-                    return best_match.id, best_score, "name_fuzzy_location_validated"
-                else:
-                    logger.info(f"Found fuzzy match for {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f}) but in different community - allowing creation")
-                    # Not a duplicate for this community
-            else:
-                # No community context, return match
-                logger.info(f"Found fuzzy match with location validation for builder {name}: {best_match.name} (ID: {best_match.id}, score: {best_score:.2f})")
-                return best_match.id, best_score, "name_fuzzy_location_validated"
+    Same matching rules as find_duplicate_community; matched ids are
+    confirmed with one query and community addresses are loaded at most
+    once for records that only have an address.
 
-    logger.info(f"No duplicate found for builder: {name} in location {city}, {state} (community {community_id})")
-    return None, None, None
+    Args:
+        db: Database session
+        records: Dicts with name, city, state, website and address
+        threshold: Minimum similarity score (0.0-1.0)
+
+    Returns:
+        List of (entity_id, confidence_score, match_method) tuples in input order
+    """
+    from model.profiles.community import Community
+
+    if not records:
+        return []
+
+    index = get_community_index(db)
+
+    def match(record, exists):
+        return _match_community(
+            index, record.get("name"), record.get("city"), record.get("state"),
+            record.get("website"), threshold, exists
+        )
+
+    results = _resolve_batch(db, Community, index, records, match)
+
+    # Method 4: Address matching for records without a location
+    address_candidates = None
+    for i, record in enumerate(records):
+        if results[i][0] or not record.get("address") or record.get("city") or record.get("state"):
+            continue
+        if address_candidates is None:
+            address_candidates = _address_candidates(db)
+        results[i] = _match_address(record.get("name"), record["address"], address_candidates, threshold)
+
+    logger.info(f"Resolved {len(records)} communities: {sum(1 for r in results if r[0])} duplicates found")
+    return results
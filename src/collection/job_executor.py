@@ -4,15 +4,8 @@ Collection Job Executor
 Routes collection jobs to appropriate collectors and manages execution.
 """
 import logging
-import time
-import threading
-from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config.settings import DB_URL
-from config.collection_config import CollectionConfig
 from model.collection import CollectionJob
 from .community_collector import CommunityCollector
 from .builder_collector import BuilderCollector
@@ -26,19 +19,11 @@ class JobExecutor:
     """
     Executes collection jobs by routing to appropriate collectors.
 
-    Supports concurrent execution with configurable limits per entity type.
+    Concurrent execution is handled by JobScheduler (see job_scheduler.py).
     """
 
     def __init__(self, db: Session):
         self.db = db
-        # Track running jobs by entity type
-        self.running_jobs: Dict[str, List[str]] = {
-            'community': [],
-            'builder': [],
-            'property': [],
-            'sales_rep': []
-        }
-        self.lock = threading.Lock()
 
     def execute_job(self, job_id: str):
         """
@@ -82,6 +67,12 @@ class JobExecutor:
         except Exception as e:
             logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
             raise
+        finally:
+            # Write logs buffered after the last status change (or before a crash)
+            try:
+                collector.flush_telemetry()
+            except Exception as flush_err:
+                logger.error(f"Failed to flush telemetry for job {job_id}: {flush_err}")
 
     def execute_pending_jobs(self, limit: int = 10):
         """
@@ -111,99 +102,6 @@ class JobExecutor:
                 # Continue with next job
                 continue
 
-    def _get_running_job_count(self, entity_type: str) -> int:
-        """Get number of currently running jobs for entity type."""
-        with self.lock:
-            return len(self.running_jobs.get(entity_type, []))
-
-    def _get_total_running_jobs(self) -> int:
-        """Get total number of running jobs across all types."""
-        with self.lock:
-            return sum(len(jobs) for jobs in self.running_jobs.values())
-
-    def _add_running_job(self, entity_type: str, job_id: str):
-        """Add job to running jobs tracker."""
-        with self.lock:
-            if entity_type in self.running_jobs:
-                self.running_jobs[entity_type].append(job_id)
-
-    def _remove_running_job(self, entity_type: str, job_id: str):
-        """Remove job from running jobs tracker."""
-        with self.lock:
-            if entity_type in self.running_jobs and job_id in self.running_jobs[entity_type]:
-                self.running_jobs[entity_type].remove(job_id)
-
-    def _can_start_job(self, entity_type: str) -> bool:
-        """
-        Check if we can start a new job for this entity type.
-
-        Respects both per-type and global concurrency limits.
-        """
-        # Check global limit
-        if self._get_total_running_jobs() >= CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS:
-            return False
-
-        # Check per-type limit
-        max_concurrent = CollectionConfig.get_max_concurrent_jobs(entity_type)
-        current_count = self._get_running_job_count(entity_type)
-
-        return current_count < max_concurrent
-
-    def execute_job_in_background(self, job_id: str, entity_type: str):
-        """
-        Execute a job in a background thread.
-
-        Args:
-            job_id: Job ID to execute
-            entity_type: Entity type for concurrency tracking
-        """
-        def background_task():
-            # Create new DB session for this thread
-            engine = create_engine(DB_URL, pool_pre_ping=True)
-            SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-            bg_db = SessionLocal()
-
-            try:
-                # Track this job as running
-                self._add_running_job(entity_type, job_id)
-                logger.info(f"🔵 Starting job {job_id} ({entity_type}) - "
-                           f"Running: {self._get_running_job_count(entity_type)}/{CollectionConfig.get_max_concurrent_jobs(entity_type)}")
-
-                # Create executor with background DB session
-                executor = JobExecutor(bg_db)
-                executor.execute_job(job_id)
-
-                logger.info(f"✅ Job {job_id} completed successfully")
-            except Exception as e:
-                error_message = str(e)
-                logger.error(f"❌ Job {job_id} failed: {error_message}", exc_info=True)
-
-                # Mark job as failed
-                try:
-                    failed_job = bg_db.query(CollectionJob).filter(
-                        CollectionJob.job_id == job_id
-                    ).first()
-
-                    if failed_job and failed_job.status == "running":
-                        failed_job.status = "failed"
-                        failed_job.error_message = f"Execution failed: {error_message}"
-                        failed_job.completed_at = datetime.utcnow()
-                        bg_db.commit()
-                except Exception as db_err:
-                    logger.error(f"Failed to update job status: {db_err}")
-                    bg_db.rollback()
-            finally:
-                # Remove from running tracker
-                self._remove_running_job(entity_type, job_id)
-                bg_db.close()
-                logger.info(f"🏁 Job {job_id} finished - "
-                           f"Running: {self._get_running_job_count(entity_type)}/{CollectionConfig.get_max_concurrent_jobs(entity_type)}")
-
-        # Start background thread
-        thread = threading.Thread(target=background_task)
-        thread.daemon = True
-        thread.start()
-
     def execute_pending_jobs_concurrent(
         self,
         max_iterations: int = 100,
@@ -212,81 +110,18 @@ class JobExecutor:
         """
         Execute pending jobs with concurrency control.
 
-        Continuously polls for pending jobs and executes them in parallel
-        while respecting concurrency limits.
+        Runs the DB-backed JobScheduler dispatch loop in the calling thread.
+        Jobs are claimed with row leases and executed on a bounded worker
+        pool, respecting per-type and global limits across all processes.
 
         Args:
-            max_iterations: Maximum polling iterations (0 = infinite)
-            poll_interval: Seconds between polls (default from config)
+            max_iterations: Maximum dispatch iterations (0 = infinite)
+            poll_interval: Max seconds between claim attempts (default from config)
         """
-        if poll_interval is None:
-            poll_interval = CollectionConfig.EXECUTOR_POLL_INTERVAL
-
-        iteration = 0
-
-        logger.info(f"🚀 Starting concurrent job executor")
-        logger.info(f"📊 Concurrency limits: "
-                   f"community={CollectionConfig.MAX_CONCURRENT_COMMUNITY_JOBS}, "
-                   f"builder={CollectionConfig.MAX_CONCURRENT_BUILDER_JOBS}, "
-                   f"property={CollectionConfig.MAX_CONCURRENT_PROPERTY_JOBS}, "
-                   f"sales_rep={CollectionConfig.MAX_CONCURRENT_SALES_REP_JOBS}, "
-                   f"total={CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS}")
-
-        while max_iterations == 0 or iteration < max_iterations:
-            iteration += 1
-
-            try:
-                # Get pending jobs grouped by entity type
-                for entity_type in ['community', 'builder', 'property', 'sales_rep']:
-                    # Check if we can start more jobs of this type
-                    if not self._can_start_job(entity_type):
-                        continue
-
-                    # Calculate how many more jobs we can start
-                    max_concurrent = CollectionConfig.get_max_concurrent_jobs(entity_type)
-                    current_running = self._get_running_job_count(entity_type)
-                    available_slots = max_concurrent - current_running
-
-                    # Also respect global limit
-                    global_available = CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS - self._get_total_running_jobs()
-                    available_slots = min(available_slots, global_available)
-
-                    if available_slots <= 0:
-                        continue
-
-                    # Get pending jobs for this entity type
-                    pending_jobs = self.db.query(CollectionJob).filter(
-                        CollectionJob.status == "pending",
-                        CollectionJob.entity_type == entity_type
-                    ).order_by(
-                        CollectionJob.priority.desc(),
-                        CollectionJob.created_at.asc()
-                    ).limit(available_slots).all()
-
-                    # Start jobs
-                    for job in pending_jobs:
-                        # Double-check we can still start (another thread might have started one)
-                        if not self._can_start_job(entity_type):
-                            break
-
-                        # Mark as running immediately
-                        job.status = "running"
-                        job.started_at = datetime.utcnow()
-                        self.db.commit()
-
-                        # Execute in background
-                        self.execute_job_in_background(job.job_id, entity_type)
-
-                        logger.info(f"⏳ Started {entity_type} job: {job.job_id}")
-
-                # Sleep before next poll
-                time.sleep(poll_interval)
-
-            except Exception as e:
-                logger.error(f"Error in executor loop: {str(e)}", exc_info=True)
-                time.sleep(poll_interval)
+        from .job_scheduler import JobScheduler
 
-        logger.info(f"🛑 Job executor stopped after {iteration} iterations")
+        scheduler = JobScheduler(poll_interval=poll_interval)
+        scheduler.run(max_iterations=max_iterations)
 
 
 def create_community_collection_job(
@@ -0,0 +1,450 @@
+"""
+Collection Job Scheduler
+
+Claims pending collection jobs from the database and executes them on a
+bounded worker pool.
+
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED while holding the
+'claim' row in collection_scheduler_locks, so several API processes can run
+a scheduler at once without executing the same job twice or exceeding the
+per-entity-type limits in CollectionConfig. Each claimed job carries a lease
+that the owning worker renews with heartbeats; jobs whose lease expires
+(crashed worker) are marked as failed.
+
+Workers wake up as soon as a CollectionJob is committed in this process and
+fall back to polling every EXECUTOR_POLL_INTERVAL seconds to pick up jobs
+inserted by other processes.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from config.db import SessionLocal
+from config.collection_config import CollectionConfig
+from model.collection import CollectionJob, CollectionSchedulerLock
+from .job_executor import JobExecutor
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ['community', 'builder', 'property', 'sales_rep']
+CLAIM_LOCK_NAME = 'claim'
+
+
+class JobScheduler:
+    """
+    Bounded worker pool that runs collection jobs claimed from the database.
+
+    Concurrency limits are enforced against the number of running jobs in the
+    database rather than in-process counters, so they survive restarts and
+    hold across multiple API workers.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_workers: Optional[int] = None,
+        poll_interval: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        heartbeat_interval: Optional[int] = None
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            session_factory: Callable returning a new database session
+            max_workers: Worker pool size (default: MAX_TOTAL_CONCURRENT_JOBS)
+            poll_interval: Max seconds between claim attempts (default from config)
+            lease_seconds: Lease duration for claimed jobs (default from config)
+            heartbeat_interval: Seconds between lease renewals (default from config)
+        """
+        self.session_factory = session_factory
+        self.max_workers = max_workers or CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS
+        self.poll_interval = poll_interval or CollectionConfig.EXECUTOR_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or CollectionConfig.SCHEDULER_LEASE_SECONDS
+        self.heartbeat_interval = heartbeat_interval or CollectionConfig.SCHEDULER_HEARTBEAT_INTERVAL
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # job_id -> entity_type for jobs running in this process
+        self._active: Dict[str, str] = {}
+        self.stats = {"claimed": 0, "completed": 0, "failed": 0, "leases_expired": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the dispatcher and heartbeat threads in the background."""
+        if self._dispatcher and self._dispatcher.is_alive():
+            return
+
+        self._stop.clear()
+        self._ensure_workers()
+        self._dispatcher = threading.Thread(
+            target=self.run, name="collection-scheduler", daemon=True
+        )
+        self._dispatcher.start()
+        logger.info(f"🚀 Started collection job scheduler {self.worker_id} "
+                    f"({self.max_workers} workers)")
+
+    def stop(self, wait: bool = False):
+        """
+        Stop claiming new jobs.
+
+        Args:
+            wait: Block until jobs already running in this process finish
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+        logger.info(f"🛑 Collection job scheduler {self.worker_id} stopped")
+
+    def notify(self):
+        """Wake the dispatcher so it claims new jobs immediately."""
+        self._wakeup.set()
+
+    def run(self, max_iterations: int = 0):
+        """
+        Run the claim/dispatch loop in the calling thread.
+
+        Args:
+            max_iterations: Maximum loop iterations (0 = until stop() is called)
+        """
+        self._ensure_workers()
+        iteration = 0
+
+        logger.info(f"📊 Concurrency limits: "
+                    f"community={CollectionConfig.MAX_CONCURRENT_COMMUNITY_JOBS}, "
+                    f"builder={CollectionConfig.MAX_CONCURRENT_BUILDER_JOBS}, "
+                    f"property={CollectionConfig.MAX_CONCURRENT_PROPERTY_JOBS}, "
+                    f"sales_rep={CollectionConfig.MAX_CONCURRENT_SALES_REP_JOBS}, "
+                    f"total={CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS}")
+
+        while not self._stop.is_set() and (max_iterations == 0 or iteration < max_iterations):
+            iteration += 1
+            self._wakeup.clear()
+
+            try:
+                for job_id, entity_type in self.claim_jobs():
+                    self._submit(job_id, entity_type)
+            except Exception as e:
+                logger.error(f"Error in scheduler loop: {str(e)}", exc_info=True)
+
+            self._wakeup.wait(self.poll_interval)
+
+        logger.info(f"Scheduler loop exited after {iteration} iterations")
+
+    def status(self) -> Dict:
+        """Return scheduler state for this process."""
+        with self._lock:
+            active = dict(self._active)
+        return {
+            "worker_id": self.worker_id,
+            "running": bool(self._dispatcher and self._dispatcher.is_alive()),
+            "max_workers": self.max_workers,
+            "active_jobs": active,
+            "stats": dict(self.stats),
+        }
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+
+    def claim_jobs(self) -> List[Tuple[str, str]]:
+        """
+        Claim as many pending jobs as the concurrency limits allow.
+
+        Returns:
+            List of (job_id, entity_type) tuples claimed by this worker
+        """
+        with self._lock:
+            capacity = self.max_workers - len(self._active)
+        if capacity <= 0:
+            return []
+
+        db = self.session_factory()
+        try:
+            self._acquire_claim_lock(db)
+            now = datetime.utcnow()
+            self._expire_leases(db, now)
+
+            running = dict(
+                db.query(CollectionJob.entity_type, func.count(CollectionJob.id))
+                .filter(CollectionJob.status == "running")
+                .group_by(CollectionJob.entity_type)
+                .all()
+            )
+            available = min(
+                capacity,
+                CollectionConfig.MAX_TOTAL_CONCURRENT_JOBS - sum(running.values())
+            )
+
+            claimed = []
+            for entity_type in ENTITY_TYPES:
+                if available <= 0:
+                    break
+
+                slots = CollectionConfig.get_max_concurrent_jobs(entity_type) - running.get(entity_type, 0)
+                slots = min(slots, available)
+                if slots <= 0:
+                    continue
+
+                jobs = db.query(CollectionJob).filter(
+                    CollectionJob.status == "pending",
+                    CollectionJob.entity_type == entity_type
+                ).order_by(
+                    CollectionJob.priority.desc(),
+                    CollectionJob.created_at.asc()
+                ).limit(slots).with_for_update(skip_locked=True).all()
+
+                for job in jobs:
+                    job.status = "running"
+                    job.started_at = now
+                    job.lease_owner = self.worker_id
+                    job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+                    job.heartbeat_at = now
+                    claimed.append((job.job_id, entity_type))
+
+                available -= len(jobs)
+
+            # Commit releases the claim lock and the row locks
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["claimed"] += len(claimed)
+        return claimed
+
+    def claim_job(self, job_id: str) -> Optional[Future]:
+        """
+        Claim one specific pending job (manual start) and run it on the pool.
+
+        The claim is a conditional UPDATE on status='pending', so a job that
+        a dispatcher in this or another process already claimed is never run
+        twice. The per-entity-type limits do not apply to manual starts.
+
+        Returns:
+            Future of the job run, or None if the job was not pending
+        """
+        self._ensure_workers()
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            entity_type = db.query(CollectionJob.entity_type).filter(
+                CollectionJob.job_id == job_id
+            ).scalar()
+            claimed = db.query(CollectionJob).filter(
+                CollectionJob.job_id == job_id,
+                CollectionJob.status == "pending"
+            ).update({
+                CollectionJob.status: "running",
+                CollectionJob.started_at: now,
+                CollectionJob.lease_owner: self.worker_id,
+                CollectionJob.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                CollectionJob.heartbeat_at: now,
+            }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if not claimed:
+            return None
+        self.stats["claimed"] += 1
+        return self._submit(job_id, entity_type)
+
+    def _acquire_claim_lock(self, db: Session):
+        """Lock the claim row, creating it on first use."""
+        lock = db.query(CollectionSchedulerLock).filter(
+            CollectionSchedulerLock.name == CLAIM_LOCK_NAME
+        ).with_for_update().first()
+
+        if lock is None:
+            try:
+                db.add(CollectionSchedulerLock(name=CLAIM_LOCK_NAME))
+                db.flush()
+            except IntegrityError:
+                # Another process created it first; lock theirs instead
+                db.rollback()
+                db.query(CollectionSchedulerLock).filter(
+                    CollectionSchedulerLock.name == CLAIM_LOCK_NAME
+                ).with_for_update().first()
+
+    def _expire_leases(self, db: Session, now: datetime):
+        """Fail running jobs whose worker stopped renewing their lease."""
+        expired = db.query(CollectionJob).filter(
+            CollectionJob.status == "running",
+            CollectionJob.lease_owner.isnot(None),
+            CollectionJob.lease_expires_at < now
+        ).update({
+            CollectionJob.status: "failed",
+            CollectionJob.error_message: "Worker lease expired (worker stopped or crashed)",
+            CollectionJob.completed_at: now,
+            CollectionJob.lease_owner: None,
+            CollectionJob.lease_expires_at: None,
+        }, synchronize_session=False)
+
+        if expired:
+            self.stats["leases_expired"] += expired
+            logger.warning(f"🔧 Marked {expired} job(s) with expired leases as failed")
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="collection-job"
+            )
+        if not (self._heartbeat and self._heartbeat.is_alive()):
+            self._heartbeat = threading.Thread(
+                target=self._heartbeat_loop, name="collection-heartbeat", daemon=True
+            )
+            self._heartbeat.start()
+
+    def _submit(self, job_id: str, entity_type: str) -> Future:
+        with self._lock:
+            self._active[job_id] = entity_type
+        future = self._pool.submit(self._run_job, job_id, entity_type)
+        logger.info(f"⏳ Started {entity_type} job: {job_id}")
+        return future
+
+    def _run_job(self, job_id: str, entity_type: str):
+        """Execute a claimed job on a worker thread."""
+        db = self.session_factory()
+        try:
+            JobExecutor(db).execute_job(job_id)
+            self.stats["completed"] += 1
+            logger.info(f"✅ Job {job_id} completed successfully")
+        except Exception as e:
+            self.stats["failed"] += 1
+            error_message = str(e)
+            logger.error(f"❌ Job {job_id} failed: {error_message}", exc_info=True)
+
+            try:
+                db.rollback()
+                failed_job = db.query(CollectionJob).filter(
+                    CollectionJob.job_id == job_id
+                ).first()
+
+                if failed_job and failed_job.status == "running":
+                    failed_job.status = "failed"
+                    failed_job.error_message = f"Execution failed: {error_message}"
+                    failed_job.completed_at = datetime.utcnow()
+                    db.commit()
+            except Exception as db_err:
+                logger.error(f"Failed to update job status: {db_err}")
+                db.rollback()
+        finally:
+            self._release_lease(db, job_id)
+            db.close()
+            with self._lock:
+                self._active.pop(job_id, None)
+            # A slot just freed up
+            self.notify()
+            logger.info(f"🏁 Job {job_id} ({entity_type}) finished")
+
+    def _release_lease(self, db: Session, job_id: str):
+        try:
+            db.query(CollectionJob).filter(
+                CollectionJob.job_id == job_id,
+                CollectionJob.lease_owner == self.worker_id
+            ).update({
+                CollectionJob.lease_owner: None,
+                CollectionJob.lease_expires_at: None,
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to release lease for job {job_id}: {e}")
+            db.rollback()
+
+    def _heartbeat_loop(self):
+        """Periodically extend leases for jobs running in this process."""
+        while not self._stop.wait(self.heartbeat_interval):
+            self.heartbeat()
+
+    def heartbeat(self):
+        """Renew leases on all jobs currently running in this process."""
+        with self._lock:
+            job_ids = list(self._active)
+        if not job_ids:
+            return
+
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            db.query(CollectionJob).filter(
+                CollectionJob.job_id.in_(job_ids),
+                CollectionJob.lease_owner == self.worker_id
+            ).update({
+                CollectionJob.heartbeat_at: now,
+                CollectionJob.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Scheduler heartbeat failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+# ===================================================================
+# Process-wide scheduler
+# ===================================================================
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get (or create) the process-wide job scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
+
+
+def start_job_scheduler() -> JobScheduler:
+    """Start the process-wide job scheduler."""
+    scheduler = get_job_scheduler()
+    scheduler.start()
+    return scheduler
+
+
+@event.listens_for(CollectionJob, "after_insert")
+def _mark_job_inserted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["collection_job_inserted"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_scheduler_after_commit(session):
+    if session.info.pop("collection_job_inserted", False) and _scheduler is not None:
+        _scheduler.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_job_inserted(session):
+    session.info.pop("collection_job_inserted", None)
@@ -0,0 +1,189 @@
+"""
+Job Telemetry Writer
+
+Buffers collection job logs, detected changes and progress counters in
+memory and writes them to the database in batches.
+
+Collectors used to commit once per log line, change and progress update,
+turning a single community job into hundreds of one-row transactions. The
+writer flushes when TELEMETRY_FLUSH_SIZE entries are pending, when
+TELEMETRY_FLUSH_INTERVAL seconds have passed, when the log stage changes
+and whenever the job status changes. Buffered entries are only dropped
+after a successful commit, so a rollback in the collector's session does
+not lose them; the next flush re-applies everything still pending.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+from config.collection_config import CollectionConfig
+from model.collection import CollectionJob, CollectionJobLog
+
+logger = logging.getLogger(__name__)
+
+
+class JobTelemetryWriter:
+    """
+    Batched writer for a single job's logs, changes and counters.
+
+    Log rows are written with one multi-row INSERT per flush. ORM records
+    (CollectionChange, EntityMatch) are added to the collector's session
+    immediately so callers can keep using them, and are committed together
+    with the logs and counters.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        job: CollectionJob,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: int = 3
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            db: Collector's database session
+            job: The job being executed
+            flush_size: Pending entry count that triggers a flush
+            flush_interval: Seconds between time-based flushes
+            max_retries: Commit attempts per flush before giving up
+        """
+        self.db = db
+        self.job = job
+        self.flush_size = flush_size or CollectionConfig.TELEMETRY_FLUSH_SIZE
+        self.flush_interval = flush_interval or CollectionConfig.TELEMETRY_FLUSH_INTERVAL
+        self.max_retries = max_retries
+
+        self._logs: List[Dict[str, Any]] = []
+        self._records: List[Any] = []
+        self._counters: Dict[str, int] = {}
+        self._changes_delta = 0
+        self._stage: Optional[str] = None
+        self._last_flush = time.monotonic()
+
+        self.stats = {"flushes": 0, "logs_written": 0, "records_written": 0, "failed_flushes": 0}
+
+    # ------------------------------------------------------------------
+    # Buffering
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered entries not yet committed."""
+        return len(self._logs) + len(self._records) + len(self._counters)
+
+    def add_log(self, message: str, level: str = "INFO", stage: Optional[str] = None,
+                log_data: Optional[Dict[str, Any]] = None):
+        """Buffer a CollectionJobLog row; a new stage flushes the previous one."""
+        if stage and self._stage and stage != self._stage:
+            self.flush()
+        if stage:
+            self._stage = stage
+
+        self._logs.append({
+            "job_id": self.job.job_id,
+            "timestamp": datetime.utcnow(),
+            "level": level.upper(),
+            "message": message,
+            "stage": stage,
+            "log_data": log_data,
+        })
+        self._maybe_flush()
+
+    def add_change(self, change):
+        """Buffer a CollectionChange and count it towards changes_detected."""
+        self._changes_delta += 1
+        self.add_record(change)
+
+    def add_record(self, record):
+        """Add an ORM record to the session; it is committed on the next flush."""
+        self.db.add(record)
+        self._records.append(record)
+        self._maybe_flush()
+
+    def set_progress(self, **counts: Optional[int]):
+        """Buffer absolute progress counters (items_found, new_entities_found, ...)."""
+        for field, value in counts.items():
+            if value is not None:
+                self._counters[field] = value
+                setattr(self.job, field, value)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if (self.pending >= self.flush_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self) -> bool:
+        """
+        Write everything buffered and commit the collector's session.
+
+        Returns:
+            True if the buffer was written (or was empty), False otherwise
+        """
+        self._last_flush = time.monotonic()
+        if not self.pending and not self._changes_delta:
+            return True
+
+        for attempt in range(self.max_retries):
+            try:
+                if not self.db.is_active:
+                    # Session left in a failed transaction by the collector
+                    self.db.rollback()
+                self._apply()
+                self.db.commit()
+            except (OperationalError, DBAPIError) as e:
+                logger.warning(
+                    f"[{self.job.job_id}] Telemetry flush failed on attempt "
+                    f"{attempt + 1}/{self.max_retries}: {e}"
+                )
+                self.db.rollback()
+                time.sleep(0.5 * (2 ** attempt))
+                continue
+            except Exception:
+                self.db.rollback()
+                raise
+
+            self.stats["flushes"] += 1
+            self.stats["logs_written"] += len(self._logs)
+            self.stats["records_written"] += len(self._records)
+            self._logs.clear()
+            self._records.clear()
+            self._counters.clear()
+            self._changes_delta = 0
+            return True
+
+        self.stats["failed_flushes"] += 1
+        logger.error(
+            f"[{self.job.job_id}] Telemetry flush gave up after {self.max_retries} attempts; "
+            f"{self.pending} entries kept in memory for the next flush"
+        )
+        return False
+
+    def _apply(self):
+        """Stage buffered entries in the session (safe to repeat after a rollback)."""
+        # A rollback detaches pending ORM records; add them back
+        for record in self._records:
+            if record not in self.db:
+                self.db.add(record)
+
+        for field, value in self._counters.items():
+            setattr(self.job, field, value)
+
+        if self._changes_delta:
+            self.job.changes_detected = (self.job.changes_detected or 0) + self._changes_delta
+
+        # Flush ORM records first so the log INSERT runs after them
+        self.db.flush()
+
+        if self._logs:
+            self.db.execute(insert(CollectionJobLog), self._logs)
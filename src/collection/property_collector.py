@@ -440,6 +440,8 @@ class PropertyCollector(BaseCollector):
             confidence=confidence,
             source_url=source_url
         )
+        # Assign the change ID (used by auto-approval logs and notifications)
+        self.db.flush()
 
         # Process through auto-approval logic
         try:
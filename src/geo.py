@@ -0,0 +1,349 @@
+# src/geo.py
+"""
+Geospatial search for map views.
+
+Properties and communities carry a geohash of their coordinates in an
+indexed column, so a radius or viewport (bounding box) filter becomes a few
+range scans of that index instead of a full table scan over latitude and
+longitude. Works the same on MySQL and SQLite (no SPATIAL index needed).
+
+- A box is covered by at most GEO_MAX_CELLS geohash cells; adjacent cells
+  merge into one `geohash >= lo AND geohash < hi` range, and an exact
+  latitude/longitude check drops the cells' overhang
+- Radius searches use the circle's bounding box, then exact great-circle
+  distances; results are served nearest first through paginate_ranked
+- Marker clustering groups matches by geohash prefix sized to the map zoom,
+  aggregated in SQL, so a dense viewport returns a few hundred clusters
+  rather than every pin
+- Viewports crossing the antimeridian (min_lng > max_lng) are supported
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_
+
+from config.settings import GEO_CLUSTER_CELLS_PER_TILE, GEO_MAX_CELLS, GEO_MAX_RESULTS
+
+# Characters stored per coordinate (~5 m cells); the column is String(12)
+GEOHASH_LENGTH = 9
+
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+# =============================================================================
+# Geohash
+# =============================================================================
+
+def encode_geohash(latitude: Optional[float], longitude: Optional[float],
+                   precision: int = GEOHASH_LENGTH) -> Optional[str]:
+    """
+    Geohash of a coordinate, or None when either part is missing.
+
+    Args:
+        latitude: Degrees, -90..90
+        longitude: Degrees, -180..180
+        precision: Characters (5 bits each, alternating longitude/latitude)
+    """
+    if latitude is None or longitude is None:
+        return None
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if longitude >= mid:
+                value = value * 2 + 1
+                lng_lo = mid
+            else:
+                value *= 2
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) extent in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _next_prefix(cell: str) -> Optional[str]:
+    """Smallest geohash sorting after every hash starting with `cell`"""
+    for i in range(len(cell) - 1, -1, -1):
+        position = _BASE32.index(cell[i])
+        if position < len(_BASE32) - 1:
+            return cell[:i] + _BASE32[position + 1]
+    return None
+
+
+# =============================================================================
+# Areas
+# =============================================================================
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """A viewport; min_lng > max_lng means it crosses the antimeridian"""
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    def lng_spans(self) -> List[Tuple[float, float]]:
+        if self.min_lng <= self.max_lng:
+            return [(self.min_lng, self.max_lng)]
+        return [(self.min_lng, 180.0), (-180.0, self.max_lng)]
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        lng = (self.min_lng + self.max_lng) / 2
+        if self.min_lng > self.max_lng:
+            lng = (lng + 360.0) % 360.0 - 180.0
+        return (self.min_lat + self.max_lat) / 2, lng
+
+
+def parse_bbox(bbox: str) -> BoundingBox:
+    """
+    Parse a `min_lat,min_lng,max_lat,max_lng` query value.
+
+    Raises:
+        HTTPException 400: Not four numbers, or out of range
+    """
+    try:
+        min_lat, min_lng, max_lat, max_lng = (float(part) for part in bbox.split(","))
+        valid = (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= 180 and -180 <= max_lng <= 180)
+    except ValueError:
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be min_lat,min_lng,max_lat,max_lng in degrees"
+        )
+    return BoundingBox(min_lat, min_lng, max_lat, max_lng)
+
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """Smallest box containing the circle (all longitudes near a pole)"""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    if min_lat == -90.0 or max_lat == 90.0:
+        return BoundingBox(min_lat, -180.0, max_lat, 180.0)
+    dlng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude)))))
+    if dlng >= 180.0:
+        return BoundingBox(min_lat, -180.0, max_lat, 180.0)
+    wrap = lambda lng: (lng + 180.0) % 360.0 - 180.0  # noqa: E731
+    return BoundingBox(min_lat, wrap(longitude - dlng), max_lat, wrap(longitude + dlng))
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km; works elementwise on numpy arrays"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# =============================================================================
+# Index ranges
+# =============================================================================
+
+def _cells(bbox: BoundingBox, precision: int) -> List[str]:
+    lat_step, lng_step = cell_size(precision)
+    cells = set()
+    for lng_lo, lng_hi in bbox.lng_spans():
+        lat_rows = range(math.floor((bbox.min_lat + 90) / lat_step), math.floor((bbox.max_lat + 90) / lat_step) + 1)
+        lng_cols = range(math.floor((lng_lo + 180) / lng_step), math.floor((lng_hi + 180) / lng_step) + 1)
+        if len(lat_rows) * len(lng_cols) > GEO_MAX_CELLS:
+            return []
+        for row in lat_rows:
+            for col in lng_cols:
+                lat = min(-90 + (row + 0.5) * lat_step, 90.0)
+                lng = min(-180 + (col + 0.5) * lng_step, 180.0)
+                cells.add(encode_geohash(lat, lng, precision))
+    if len(cells) > GEO_MAX_CELLS:
+        return []
+    return sorted(cells)
+
+
+def covering_ranges(bbox: BoundingBox) -> List[Tuple[str, Optional[str]]]:
+    """
+    Geohash ranges [lo, hi) covering the box with at most GEO_MAX_CELLS cells.
+
+    Uses the finest precision that stays within the cell budget, then merges
+    cells that are adjacent in geohash order. hi is None for "to the end".
+    Returns no ranges when even single-character cells exceed the budget
+    (a box spanning much of the globe), which the index cannot narrow.
+    """
+    cells: List[str] = []
+    for precision in range(1, GEOHASH_LENGTH + 1):
+        finer = _cells(bbox, precision)
+        if not finer:
+            break
+        cells = finer
+
+    ranges: List[Tuple[str, Optional[str]]] = []
+    for cell in cells:
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], _next_prefix(cell))
+        else:
+            ranges.append((cell, _next_prefix(cell)))
+    return ranges
+
+
+def geo_filter(geohash_col, lat_col, lng_col, bbox: BoundingBox):
+    """Condition selecting rows inside the box, led by geohash index ranges"""
+    conditions = [lat_col.between(bbox.min_lat, bbox.max_lat),
+                  or_(*[lng_col.between(lo, hi) for lo, hi in bbox.lng_spans()])]
+    ranges = [geohash_col >= lo if hi is None else and_(geohash_col >= lo, geohash_col < hi)
+              for lo, hi in covering_ranges(bbox)]
+    if ranges:
+        conditions.insert(0, or_(*ranges))
+    return and_(*conditions)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+def distance_km_expr(lat_col, lng_col, center: Tuple[float, float]):
+    """SQL great-circle distance in km from `center` (the haversine_km formula)"""
+    lat0, lng0 = math.radians(center[0]), math.radians(center[1])
+    to_radians = math.pi / 180.0
+    half_dlat = func.sin((lat_col * to_radians - lat0) / 2)
+    half_dlng = func.sin((lng_col * to_radians - lng0) / 2)
+    a = half_dlat * half_dlat + math.cos(lat0) * func.cos(lat_col * to_radians) * half_dlng * half_dlng
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
+
+
+def nearest_ids(
+    query,
+    id_col,
+    lat_col,
+    lng_col,
+    center: Tuple[float, float],
+    radius_km: Optional[float] = None,
+    limit: int = GEO_MAX_RESULTS,
+) -> List[int]:
+    """
+    Ids of the query's rows ordered by distance from `center`.
+
+    The distance is computed, filtered and sorted in SQL, so only the `limit`
+    nearest ids are read back.
+
+    Args:
+        query: Query already filtered to the area (see geo_filter)
+        id_col, lat_col, lng_col: The entity's id and coordinate columns
+        center: (latitude, longitude) to measure from
+        radius_km: Drop rows farther than this (the box's corners)
+        limit: Keep at most this many nearest rows
+
+    Returns:
+        Ids, nearest first (ties by id)
+    """
+    distance = distance_km_expr(lat_col, lng_col, center)
+    query = query.with_entities(id_col).order_by(None)
+    if radius_km is not None:
+        query = query.filter(distance <= radius_km)
+    return [row[0] for row in query.order_by(distance, id_col).limit(limit)]
+
+
+def distance_ranking_name(center: Tuple[float, float], radius_km: Optional[float],
+                          bbox: Optional[BoundingBox]) -> str:
+    """Cursor sort name for a distance ordering, so cursors only resume the same area"""
+    key = repr((center, radius_km, bbox))
+    return "distance:" + hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+
+def zoom_precision(zoom: int) -> int:
+    """
+    Geohash precision whose cells are about 1/GEO_CLUSTER_CELLS_PER_TILE of a
+    web-map tile (256 px) wide at this zoom level.
+    """
+    tile_lng = 360.0 / 2 ** zoom
+    precision = 1
+    for p in range(1, GEOHASH_LENGTH + 1):
+        if cell_size(p)[1] * GEO_CLUSTER_CELLS_PER_TILE >= tile_lng:
+            precision = p
+    return precision
+
+
+def cluster_markers(query, id_col, lat_col, lng_col, geohash_col, zoom: int) -> Dict[str, object]:
+    """
+    Group the query's rows into map clusters for a zoom level.
+
+    Args:
+        query: Query already filtered to the viewport (see geo_filter)
+        id_col, lat_col, lng_col, geohash_col: The entity's columns
+        zoom: Web-map zoom level (0 = whole world)
+
+    Returns:
+        Dict with the precision used, total rows, and clusters (geohash cell,
+        count, mean position, and the id when the cluster is a single row)
+    """
+    precision = zoom_precision(zoom)
+    cell = func.substr(geohash_col, 1, precision)
+    rows = (
+        query.with_entities(cell, func.count(id_col), func.avg(lat_col), func.avg(lng_col), func.min(id_col))
+        .order_by(None)
+        .group_by(cell)
+        .all()
+    )
+    clusters = [
+        {"geohash": c, "count": n, "latitude": lat, "longitude": lng, "id": min_id if n == 1 else None}
+        for c, n, lat, lng, min_id in rows
+    ]
+    clusters.sort(key=lambda c: (-c["count"], c["geohash"]))
+    return {"zoom": zoom, "precision": precision, "total": sum(c["count"] for c in clusters), "clusters": clusters}
+
+
+def area_from_params(
+    lat: Optional[float],
+    lng: Optional[float],
+    radius_km: Optional[float],
+    bbox: Optional[str],
+) -> Tuple[Optional[BoundingBox], Optional[Tuple[float, float]], Optional[float]]:
+    """
+    Resolve a route's radius (lat, lng, radius_km) or viewport (bbox) params.
+
+    Returns:
+        Tuple of (box to filter by, center to order from, radius to enforce);
+        all None when no area was given
+
+    Raises:
+        HTTPException 400: Partial radius params, or both a radius and a bbox
+    """
+    radius_params: Sequence = (lat, lng, radius_km)
+    if any(p is not None for p in radius_params):
+        if any(p is None for p in radius_params):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Radius search needs lat, lng and radius_km"
+            )
+        if bbox:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either a radius or a bbox")
+        return radius_bbox(lat, lng, radius_km), (lat, lng), radius_km
+    if bbox:
+        box = parse_bbox(bbox)
+        return box, box.center, None
+    return None, None, None
@@ -0,0 +1,269 @@
+"""
+Single-decode image variant generation.
+
+Produces every size variant of an image from one decode:
+- JPEG uploads are decoded in draft mode, letting libjpeg scale by 1/2, 1/4
+  or 1/8 during decode when the largest variant is much smaller than the
+  original (a 24MP photo is never fully decoded for an 1600px variant)
+- EXIF orientation and RGBA/P flattening are applied once, to the decoded
+  image
+- Sizes are produced by a cascaded resize chain (large -> medium -> small ->
+  thumbnail): each variant is resized from the smallest image already
+  produced that is still large enough, not from the original
+- Each variant is encoded as JPEG and, optionally, WebP/AVIF
+"""
+
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Pillow's own thumbnail() quality bound: reduce to no less than twice the
+# target size before the final LANCZOS pass
+REDUCING_GAP = 2.0
+
+# Margin kept over the largest variant when picking the JPEG decode scale.
+# libjpeg's DCT scaling is itself a clean downsample, so a smaller margin
+# than REDUCING_GAP is enough and lets a 24MP photo decode at 1/2 scale for
+# a 1600px variant
+DRAFT_GAP = 1.5
+
+# EXIF orientations that swap width and height
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Output format -> (file extension, MIME type)
+FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "WEBP": ("webp", "image/webp"),
+    "AVIF": ("avif", "image/avif"),
+}
+
+# AVIF reaches JPEG-like quality at much lower quality settings
+AVIF_QUALITY = 60
+AVIF_SPEED = 8
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """
+    One output size.
+
+    Attributes:
+        name: Variant key (thumbnail, medium, ...)
+        max_size: Bounding box the variant is fitted into
+        quality: JPEG/WebP quality
+        crop_square: Center-crop to a square before fitting
+        only_if_larger: Skip the variant when the original already fits
+    """
+    name: str
+    max_size: Tuple[int, int]
+    quality: int = 85
+    crop_square: bool = False
+    only_if_larger: bool = False
+
+
+@dataclass
+class Variant:
+    """A generated variant: its size and encoded bytes per format."""
+    name: str
+    width: int
+    height: int
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+def available_formats(formats: Sequence[str]) -> List[str]:
+    """Filter output formats down to those this Pillow build can encode."""
+    usable = []
+    for fmt in formats:
+        fmt = fmt.strip().upper()
+        if fmt not in FORMATS:
+            logger.warning(f"Unknown image variant format: {fmt}")
+        elif fmt != "JPEG" and not features.check(fmt.lower()):
+            logger.warning(f"Pillow was built without {fmt} support; skipping {fmt} variants")
+        else:
+            usable.append(fmt)
+    return usable
+
+
+def _fit(width: int, height: int, box: Tuple[int, int]) -> Tuple[int, int]:
+    """Size of (width, height) fitted into box, preserving aspect ratio, never enlarged."""
+    scale = min(box[0] / width, box[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _target_size(spec: VariantSpec, width: int, height: int) -> Tuple[int, int]:
+    """Output size of a variant for an (oriented) source of width x height."""
+    if spec.crop_square:
+        side = min(width, height)
+        return _fit(side, side, spec.max_size)
+    return _fit(width, height, spec.max_size)
+
+
+def _needed_specs(specs: Sequence[VariantSpec], width: int, height: int) -> List[VariantSpec]:
+    return [
+        spec for spec in specs
+        if not spec.only_if_larger or width > spec.max_size[0] or height > spec.max_size[1]
+    ]
+
+
+def oriented_size(img: Image.Image) -> Tuple[int, int]:
+    """Size of an opened image once its EXIF orientation is applied."""
+    width, height = img.size
+    if img.getexif().get(274, 1) in TRANSPOSED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def decode_for_variants(
+    img: Image.Image,
+    specs: Sequence[VariantSpec],
+    on_load: Optional[Callable[[Image.Image], None]] = None,
+) -> Image.Image:
+    """
+    Decode an opened image at the smallest resolution the variants need.
+
+    Args:
+        img: Image returned by Image.open (not yet loaded)
+        specs: Variants that will be generated from the result
+        on_load: Called with the decoded image in stored orientation, before
+            EXIF orientation and flattening are applied
+
+    Returns:
+        Loaded, orientation-corrected RGB/L image
+    """
+    width, height = oriented_size(img)
+    transposed = (width, height) != img.size
+
+    # Smallest oriented source size from which every variant can be cut
+    need_w = need_h = 1
+    for spec in _needed_specs(specs, width, height):
+        out_w, out_h = _target_size(spec, width, height)
+        if spec.crop_square:
+            scale = out_w / min(width, height)
+        else:
+            scale = max(out_w / width, out_h / height)
+        need_w = max(need_w, width * scale)
+        need_h = max(need_h, height * scale)
+
+    draft_size = (int(need_w * DRAFT_GAP), int(need_h * DRAFT_GAP))
+    if transposed:
+        draft_size = draft_size[::-1]
+    if draft_size[0] < img.size[0] and draft_size[1] < img.size[1]:
+        # Only JPEG supports draft decoding; other formats ignore it
+        img.draft(None, draft_size)
+
+    img.load()
+    if on_load:
+        on_load(img)
+    img = ImageOps.exif_transpose(img)
+
+    # Flatten transparency onto white (all outputs are opaque)
+    if img.mode in ("RGBA", "LA", "P", "PA"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    return img
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    output = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(output, format="JPEG", quality=quality, optimize=True)
+    elif fmt == "WEBP":
+        img.save(output, format="WEBP", quality=quality, method=4)
+    elif fmt == "AVIF":
+        img.save(output, format="AVIF", quality=AVIF_QUALITY, speed=AVIF_SPEED)
+    return output.getvalue()
+
+
+def build_variants(
+    decoded: Image.Image,
+    specs: Sequence[VariantSpec],
+    formats: Sequence[str] = ("JPEG",),
+    original_size: Optional[Tuple[int, int]] = None
+) -> Dict[str, Variant]:
+    """
+    Generate variants from a decoded image with a cascaded resize chain.
+
+    Args:
+        decoded: Image from decode_for_variants
+        specs: Variants to produce
+        formats: Output formats (see available_formats)
+        original_size: Oriented size of the original, for only_if_larger
+            and target sizes (default: decoded.size)
+
+    Returns:
+        Dict of variant name -> Variant (skipped variants are absent)
+    """
+    width, height = original_size or decoded.size
+    formats = available_formats(formats)
+
+    planned = [(spec, _target_size(spec, width, height)) for spec in _needed_specs(specs, width, height)]
+    # Largest first, so each step can start from the previous result
+    planned.sort(key=lambda item: item[1][0] * item[1][1], reverse=True)
+
+    # Aspect-preserving images available as resize sources, smallest last
+    sources = [decoded]
+    results = {}
+
+    for spec, (out_w, out_h) in planned:
+        if spec.crop_square:
+            eligible = [s for s in sources if min(s.size) >= out_w]
+        else:
+            eligible = [s for s in sources if s.size[0] >= out_w and s.size[1] >= out_h]
+        source = eligible[-1] if eligible else decoded
+
+        if spec.crop_square:
+            # Center square, in source coordinates
+            side = min(source.size)
+            left = (source.size[0] - side) / 2
+            top = (source.size[1] - side) / 2
+            box = (left, top, left + side, top + side)
+        else:
+            box = None
+
+        if source.size == (out_w, out_h) and box is None:
+            resized = source
+        else:
+            resized = source.resize((out_w, out_h), Image.Resampling.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+
+        if not spec.crop_square:
+            sources.append(resized)
+            sources.sort(key=lambda s: s.size[0] * s.size[1], reverse=True)
+
+        results[spec.name] = Variant(
+            spec.name, out_w, out_h,
+            {fmt: _encode(resized, fmt, spec.quality) for fmt in formats}
+        )
+
+    return results
+
+
+def generate_variants(
+    file_data: Union[bytes, BinaryIO],
+    specs: Sequence[VariantSpec],
+    formats: Sequence[str] = ("JPEG",)
+) -> Tuple[Tuple[int, int], Dict[str, Variant]]:
+    """
+    Open, decode once and generate all variants of an image.
+
+    Returns:
+        Tuple of ((width, height) of the original as stored, variants)
+    """
+    if isinstance(file_data, bytes):
+        file_data = io.BytesIO(file_data)
+
+    img = Image.open(file_data)
+    stored_size = img.size
+    original_size = oriented_size(img)
+
+    decoded = decode_for_variants(img, specs)
+    return stored_size, build_variants(decoded, specs, formats, original_size=original_size)
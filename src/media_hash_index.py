@@ -0,0 +1,456 @@
+"""
+Perceptual Hash Index
+
+In-memory near-duplicate lookup over Media.image_hash, used at upload time
+(routes/media/entities.py) and by the media scraper instead of comparing
+hashes row by row.
+
+Hashes are the 64-bit imagehash hex strings stored on Media, held as ints.
+Lookups use multi-index hashing: each hash is split into HASH_CHUNKS 16-bit
+chunks with one bucket map per chunk. Two hashes within Hamming distance r
+agree on at least one chunk to within r // HASH_CHUNKS bits (pigeonhole), so
+a query probes only the buckets of its chunks' near neighbours and verifies
+the candidates with a popcount.
+
+The index is built lazily per process from a snapshot file
+(MEDIA_HASH_INDEX_PATH) plus Media rows updated since it was written, or
+from the Media table when there is no usable snapshot. It is updated when a
+session commits Media inserts/updates/deletes made through the ORM, and
+refreshed from rows whose updated_at changed every
+MEDIA_HASH_INDEX_REFRESH_SECONDS. Deletes made by other processes are
+dropped lazily when a match no longer exists in the database.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from config.db import database_now
+from config.media_config import MediaConfig
+from model.media import Media
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+HASH_CHUNKS = 4
+CHUNK_BITS = HASH_BITS // HASH_CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Above this per-chunk radius probing costs more than scanning every entry
+MAX_CHUNK_RADIUS = 2
+
+# Scoped queries scan the entity's hashes directly when it has at most this
+# many (cheaper than probing buckets for a typical gallery)
+SCOPE_SCAN_LIMIT = 64
+
+SNAPSHOT_VERSION = 1
+
+
+def hash_to_int(value: Optional[str]) -> Optional[int]:
+    """Convert a stored 64-bit hex hash to an int (None if missing or not 64-bit)."""
+    if not value or len(value) != HASH_BITS // 4:
+        return None
+    try:
+        return int(value, 16)
+    except ValueError:
+        return None
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@lru_cache(maxsize=None)
+def _chunk_masks(radius: int) -> Tuple[int, ...]:
+    """XOR masks of every CHUNK_BITS-bit value within radius of a chunk."""
+    masks = []
+    for r in range(radius + 1):
+        for bits in combinations(range(CHUNK_BITS), r):
+            mask = 0
+            for bit in bits:
+                mask |= 1 << bit
+            masks.append(mask)
+    return tuple(masks)
+
+
+def _chunks(value: int) -> List[int]:
+    return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(HASH_CHUNKS)]
+
+
+# ===================================================================
+# Index
+# ===================================================================
+
+class HashEntry:
+    """Indexed fields of one Media row."""
+
+    __slots__ = ("id", "hash", "entity_type", "entity_id")
+
+    def __init__(self, id: int, hash: int, entity_type: str, entity_id: int):
+        self.id = id
+        self.hash = hash
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+
+    @property
+    def scope(self) -> Tuple[str, int]:
+        return self.entity_type, self.entity_id
+
+
+class MediaHashIndex:
+    """
+    Multi-index hash table over Media perceptual hashes.
+
+    Not thread-safe on its own; the process-wide index returned by
+    get_media_hash_index guards access with its lock.
+    """
+
+    def __init__(self):
+        self.entries: Dict[int, HashEntry] = {}
+        # One map per chunk: chunk value -> media ids
+        self.buckets: List[Dict[int, Set[int]]] = [{} for _ in range(HASH_CHUNKS)]
+        # (entity_type, entity_id) -> media ids
+        self.by_scope: Dict[Tuple[str, int], Set[int]] = {}
+
+        self.lock = threading.RLock()
+        # Refresh watermark on the database clock (which sets updated_at),
+        # and when the last refresh ran on the local monotonic clock
+        self.refreshed_at: Optional[datetime] = None
+        self.checked_at: Optional[float] = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def upsert(self, entry: HashEntry):
+        """Add or replace an entry."""
+        self.remove(entry.id)
+        self.entries[entry.id] = entry
+        for i, chunk in enumerate(_chunks(entry.hash)):
+            self.buckets[i].setdefault(chunk, set()).add(entry.id)
+        self.by_scope.setdefault(entry.scope, set()).add(entry.id)
+
+    def remove(self, media_id: int):
+        entry = self.entries.pop(media_id, None)
+        if entry is None:
+            return
+        for i, chunk in enumerate(_chunks(entry.hash)):
+            ids = self.buckets[i].get(chunk)
+            if ids is not None:
+                ids.discard(media_id)
+                if not ids:
+                    del self.buckets[i][chunk]
+        ids = self.by_scope.get(entry.scope)
+        if ids is not None:
+            ids.discard(media_id)
+            if not ids:
+                del self.by_scope[entry.scope]
+
+    def bulk_load(self, entries: Iterable[HashEntry]):
+        for entry in entries:
+            self.upsert(entry)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidates(self, value: int, max_distance: int) -> Iterable[int]:
+        radius = max_distance // HASH_CHUNKS
+        if radius > MAX_CHUNK_RADIUS:
+            return self.entries.keys()
+
+        masks = _chunk_masks(radius)
+        candidates: Set[int] = set()
+        for i, chunk in enumerate(_chunks(value)):
+            buckets = self.buckets[i]
+            for mask in masks:
+                ids = buckets.get(chunk ^ mask)
+                if ids:
+                    candidates.update(ids)
+        return candidates
+
+    def query(
+        self,
+        value: int,
+        max_distance: int,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Find indexed hashes within max_distance of value.
+
+        Args:
+            value: 64-bit hash (see hash_to_int)
+            max_distance: Maximum Hamming distance (inclusive)
+            entity_type, entity_id: Only match media attached to this entity
+            exclude_id: Media id to leave out (the row being checked)
+
+        Returns:
+            List of (distance, media_id), closest first
+        """
+        scoped = entity_type is not None and entity_id is not None
+        if scoped:
+            scope = (entity_type, entity_id)
+            scope_ids = self.by_scope.get(scope)
+            if not scope_ids:
+                return []
+            candidates = scope_ids if len(scope_ids) <= SCOPE_SCAN_LIMIT else self._candidates(value, max_distance)
+        else:
+            candidates = self._candidates(value, max_distance)
+
+        matches = []
+        for media_id in candidates:
+            entry = self.entries.get(media_id)
+            if entry is None or media_id == exclude_id:
+                continue
+            if scoped and entry.scope != scope:
+                continue
+            distance = hamming(value, entry.hash)
+            if distance <= max_distance:
+                matches.append((distance, media_id))
+        matches.sort()
+        return matches
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write a snapshot (gzipped JSON) atomically."""
+        with self.lock:
+            payload = {
+                "version": SNAPSHOT_VERSION,
+                "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+                "entries": [[e.id, e.hash, e.entity_type, e.entity_id] for e in self.entries.values()],
+            }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Per-process temp name: several workers may snapshot the same path at once
+        temp_path = f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["MediaHashIndex"]:
+        """Read a snapshot written by save (None if missing or unreadable)."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != SNAPSHOT_VERSION or not payload.get("refreshed_at"):
+                return None
+            index = cls()
+            index.bulk_load(HashEntry(*row) for row in payload["entries"])
+            index.refreshed_at = datetime.fromisoformat(payload["refreshed_at"])
+            return index
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable media hash index snapshot {path}: {e}")
+            return None
+
+
+# ===================================================================
+# Process-wide index
+# ===================================================================
+
+_index: Optional[MediaHashIndex] = None
+_registry_lock = threading.Lock()
+
+
+def _entry(row) -> Optional[HashEntry]:
+    value = hash_to_int(row.image_hash)
+    if value is None:
+        return None
+    return HashEntry(row.id, value, row.entity_type, row.entity_id)
+
+
+def _watermark(db: Session) -> datetime:
+    # Database clock, which sets updated_at; DATETIME columns have second
+    # precision, so overlap the next refresh slightly
+    return database_now(db) - timedelta(seconds=2)
+
+
+def _load(db: Session, since: Optional[datetime] = None) -> List[Tuple[int, Optional[HashEntry]]]:
+    """(media id, entry or None when the row has no usable hash) per Media row."""
+    query = db.query(Media.id, Media.image_hash, Media.entity_type, Media.entity_id)
+    if since is not None:
+        query = query.filter(Media.updated_at >= since)
+    else:
+        query = query.filter(Media.image_hash.isnot(None))
+    return [(row.id, _entry(row)) for row in query.yield_per(10000)]
+
+
+def _apply_rows(index: MediaHashIndex, rows: List[Tuple[int, Optional[HashEntry]]]):
+    with index.lock:
+        for media_id, entry in rows:
+            if entry is None:
+                index.remove(media_id)
+            else:
+                index.upsert(entry)
+
+
+def rebuild_media_hash_index(db: Session) -> MediaHashIndex:
+    """Rebuild the process-wide index from the Media table and snapshot it."""
+    global _index
+
+    start = time.perf_counter()
+    index = MediaHashIndex()
+    refreshed_at = _watermark(db)
+    _apply_rows(index, _load(db))
+    index.refreshed_at = refreshed_at
+    index.checked_at = time.monotonic()
+    logger.info(f"Built media hash index: {len(index)} entries in {time.perf_counter() - start:.2f}s")
+
+    with _registry_lock:
+        _index = index
+    save_media_hash_index()
+    return index
+
+
+def get_media_hash_index(db: Session) -> MediaHashIndex:
+    """Get the process-wide index, loading, building or refreshing it as needed."""
+    global _index
+
+    loaded = False
+    with _registry_lock:
+        index = _index
+        if index is None and MediaConfig.MEDIA_HASH_INDEX_PATH:
+            index = MediaHashIndex.load(MediaConfig.MEDIA_HASH_INDEX_PATH)
+            if index is not None:
+                logger.info(f"Loaded media hash index snapshot: {len(index)} entries")
+                _index = index
+                loaded = True
+
+    if index is None:
+        return rebuild_media_hash_index(db)
+
+    # Pick up rows written since the snapshot or by other processes
+    if loaded or time.monotonic() - index.checked_at >= MediaConfig.MEDIA_HASH_INDEX_REFRESH_SECONDS:
+        index.checked_at = time.monotonic()
+        refreshed_at = _watermark(db)
+        _apply_rows(index, _load(db, since=index.refreshed_at))
+        with index.lock:
+            index.refreshed_at = refreshed_at
+
+    return index
+
+
+def save_media_hash_index():
+    """Snapshot the process-wide index to MEDIA_HASH_INDEX_PATH (if built and configured)."""
+    index = _index
+    if index is None or not MediaConfig.MEDIA_HASH_INDEX_PATH:
+        return
+    try:
+        index.save(MediaConfig.MEDIA_HASH_INDEX_PATH)
+    except OSError as e:
+        logger.warning(f"Could not write media hash index snapshot: {e}")
+
+
+def reset_media_hash_index():
+    """Drop the process-wide index (reloaded on next use)."""
+    global _index
+    with _registry_lock:
+        _index = None
+
+
+def find_duplicate_media(
+    db: Session,
+    image_hash: Optional[str],
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    max_distance: Optional[int] = None,
+    exclude_id: Optional[int] = None
+) -> List[Tuple[Media, int]]:
+    """
+    Find near-duplicate media of a perceptual hash.
+
+    Args:
+        db: Database session
+        image_hash: Hex perceptual hash of the new image
+        entity_type, entity_id: Only match media attached to this entity
+        max_distance: Maximum Hamming distance (default: DUPLICATE_HASH_THRESHOLD)
+        exclude_id: Media id to leave out
+
+    Returns:
+        List of (Media, distance), closest first
+    """
+    value = hash_to_int(image_hash)
+    if value is None:
+        return []
+    if max_distance is None:
+        max_distance = MediaConfig.DUPLICATE_HASH_THRESHOLD
+
+    index = get_media_hash_index(db)
+    with index.lock:
+        matches = index.query(value, max_distance, entity_type, entity_id, exclude_id)
+    if not matches:
+        return []
+
+    # Only the matched rows are read; ids deleted elsewhere are dropped
+    rows = {media.id: media for media in db.query(Media).filter(Media.id.in_([m for _, m in matches]))}
+    stale = [media_id for _, media_id in matches if media_id not in rows]
+    if stale:
+        with index.lock:
+            for media_id in stale:
+                index.remove(media_id)
+    return [(rows[media_id], distance) for distance, media_id in matches if media_id in rows]
+
+
+# ===================================================================
+# Incremental updates from ORM writes
+# ===================================================================
+
+# Changes are collected at flush time and applied once the session commits,
+# so rolled-back writes never reach the index.
+_PENDING_KEY = "media_hash_index_pending"
+
+
+def _queue_change(target, entry: Optional[HashEntry]):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((target.id, entry))
+
+
+@event.listens_for(Media, "after_insert")
+@event.listens_for(Media, "after_update")
+def _media_upserted(mapper, connection, target):
+    _queue_change(target, _entry(target))
+
+
+@event.listens_for(Media, "after_delete")
+def _media_deleted(mapper, connection, target):
+    _queue_change(target, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes_after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, [])
+    index = _index
+    if index is not None and changes:
+        _apply_rows(index, changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_changes_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
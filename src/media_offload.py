@@ -0,0 +1,170 @@
+"""
+Media offload pools.
+
+Keeps blocking media work off the event loop of async upload routes:
+- CPU work (image decode/resize) runs on a process pool, so it neither
+  blocks the loop nor competes for the GIL with request handling
+- Blocking I/O (local file writes, boto3 uploads, ffprobe/ffmpeg) runs on
+  a bounded thread pool
+
+Functions sent to the process pool take and return plain bytes/dicts so
+they pickle cheaply; BytesIO/PIL objects never cross the process boundary.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+import logging
+
+from config.media_config import MediaConfig
+from src.image_variants import generate_variants
+from src.media_processing import ImageProcessor, VideoProcessor
+
+logger = logging.getLogger(__name__)
+
+# Image variants produced for every upload, in upload order
+IMAGE_VARIANTS = ("thumbnail", "medium", "large")
+
+_cpu_pool: Optional[Executor] = None
+_io_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Get the shared thread pool for blocking media I/O."""
+    global _io_pool
+    if _io_pool is None:
+        with _pool_lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(
+                    max_workers=MediaConfig.MEDIA_IO_WORKERS,
+                    thread_name_prefix="media-io"
+                )
+    return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    """
+    Get the shared executor for CPU-bound media work.
+
+    Worker processes are spawned rather than forked: the API process runs
+    scheduler/monitor threads and holds DB connections that must not be
+    duplicated into children. With MEDIA_CPU_WORKERS=0 the I/O thread pool
+    is used instead (PIL releases the GIL for most of decode/resize).
+    """
+    global _cpu_pool
+    if _cpu_pool is None:
+        if MediaConfig.MEDIA_CPU_WORKERS <= 0:
+            return get_io_pool()
+        with _pool_lock:
+            if _cpu_pool is None:
+                _cpu_pool = ProcessPoolExecutor(
+                    max_workers=MediaConfig.MEDIA_CPU_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Media CPU pool started ({MediaConfig.MEDIA_CPU_WORKERS} processes)")
+    return _cpu_pool
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    """Run a picklable, module-level function on the media process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), partial(fn, *args, **kwargs))
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O call on the media thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), partial(fn, *args, **kwargs))
+
+
+def shutdown_media_pools():
+    """Stop the media pools (app shutdown)."""
+    global _cpu_pool, _io_pool
+    with _pool_lock:
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=True, cancel_futures=True)
+            _cpu_pool = None
+        if _io_pool is not None:
+            _io_pool.shutdown(wait=True, cancel_futures=True)
+            _io_pool = None
+
+
+# ===================================================================
+# Work functions (run inside the pools)
+# ===================================================================
+
+def process_image_variants(
+    file_data: bytes,
+    formats: Sequence[str] = ("JPEG",)
+) -> Dict[str, Any]:
+    """
+    Generate the resized variants of an uploaded image.
+
+    Runs in a worker process.
+
+    Args:
+        file_data: Uploaded image bytes
+        formats: Output formats; JPEG is always included
+
+    Returns:
+        Dict with width, height, the JPEG bytes of each variant in
+        IMAGE_VARIANTS (None when the variant is not generated) and
+        "alternates": {variant: {format: bytes}} for the other formats
+    """
+    formats = ["JPEG"] + [fmt for fmt in formats if fmt != "JPEG"]
+    try:
+        (width, height), variants = generate_variants(file_data, ImageProcessor.VARIANT_SPECS, formats)
+    except Exception as e:
+        logger.error(f"Error processing image: {e}")
+        return {"width": 0, "height": 0, "alternates": {}, **{variant: None for variant in IMAGE_VARIANTS}}
+
+    result = {"width": width, "height": height, "alternates": {}}
+    for name in IMAGE_VARIANTS:
+        variant = variants.get(name)
+        result[name] = variant.encoded["JPEG"] if variant else None
+        if variant and len(variant.encoded) > 1:
+            result["alternates"][name] = {fmt: data for fmt, data in variant.encoded.items() if fmt != "JPEG"}
+    return result
+
+
+def probe_video(file_data: bytes, suffix: str) -> Dict[str, Any]:
+    """
+    Read video metadata and extract a thumbnail frame with ffprobe/ffmpeg.
+
+    Runs on the I/O pool (the work happens in ffmpeg subprocesses).
+
+    Returns:
+        Dict with width, height, duration and thumbnail (JPEG bytes or None)
+    """
+    temp_dir = tempfile.mkdtemp(prefix="media-")
+    video_path = os.path.join(temp_dir, f"upload{suffix}")
+    thumb_path = os.path.join(temp_dir, "thumb.jpg")
+
+    try:
+        with open(video_path, "wb") as f:
+            f.write(file_data)
+
+        metadata = VideoProcessor.get_video_metadata(video_path)
+
+        thumbnail = None
+        if VideoProcessor.generate_video_thumbnail(video_path, thumb_path):
+            thumbnail = Path(thumb_path).read_bytes()
+
+        return {
+            "width": metadata.get("width"),
+            "height": metadata.get("height"),
+            "duration": metadata.get("duration"),
+            "thumbnail": thumbnail,
+        }
+    finally:
+        for path in (video_path, thumb_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(temp_dir)
@@ -13,6 +13,8 @@ from PIL import Image
 from PIL.ExifTags import TAGS
 import logging
 
+from src.image_variants import VariantSpec, generate_variants
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,14 @@ class ImageProcessor:
     MEDIUM_SIZE = (800, 800)
     LARGE_SIZE = (1600, 1600)
 
+    # Variants generated for every image (medium/large only when the
+    # original is larger)
+    VARIANT_SPECS = (
+        VariantSpec('thumbnail', THUMBNAIL_SIZE, quality=80, crop_square=True),
+        VariantSpec('medium', MEDIUM_SIZE, quality=85, only_if_larger=True),
+        VariantSpec('large', LARGE_SIZE, quality=90, only_if_larger=True),
+    )
+
     # Supported formats
     SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
 
@@ -152,8 +162,8 @@ class ImageProcessor:
         }
 
         try:
-            # Get dimensions
-            width, height = ImageProcessor.get_image_dimensions(file_data)
+            # Decode once and resize in a cascade (see image_variants)
+            (width, height), variants = generate_variants(file_data, ImageProcessor.VARIANT_SPECS)
 
             # Store original
             file_data.seek(0)
@@ -164,49 +174,15 @@ class ImageProcessor:
                 'height': height
             }
 
-            # Generate thumbnail (always)
-            thumbnail_data = ImageProcessor.generate_thumbnail(file_data)
-            if thumbnail_data:
-                thumb_width, thumb_height = ImageProcessor.get_image_dimensions(thumbnail_data)
-                result['thumbnail'] = {
-                    'file': thumbnail_data,
-                    'filename': f"{base_filename}_thumbnail.jpg",
-                    'width': thumb_width,
-                    'height': thumb_height
+            suffixes = {'thumbnail': '_thumbnail', 'medium': '_medium', 'large': '_large'}
+            for name, variant in variants.items():
+                result[name] = {
+                    'file': io.BytesIO(variant.encoded['JPEG']),
+                    'filename': f"{base_filename}{suffixes[name]}.jpg",
+                    'width': variant.width,
+                    'height': variant.height
                 }
 
-            # Generate medium size if original is larger
-            if width > ImageProcessor.MEDIUM_SIZE[0] or height > ImageProcessor.MEDIUM_SIZE[1]:
-                medium_data = ImageProcessor.resize_image(
-                    file_data,
-                    ImageProcessor.MEDIUM_SIZE,
-                    quality=85
-                )
-                if medium_data:
-                    med_width, med_height = ImageProcessor.get_image_dimensions(medium_data)
-                    result['medium'] = {
-                        'file': medium_data,
-                        'filename': f"{base_filename}_medium.jpg",
-                        'width': med_width,
-                        'height': med_height
-                    }
-
-            # Generate large size if original is larger
-            if width > ImageProcessor.LARGE_SIZE[0] or height > ImageProcessor.LARGE_SIZE[1]:
-                large_data = ImageProcessor.resize_image(
-                    file_data,
-                    ImageProcessor.LARGE_SIZE,
-                    quality=90
-                )
-                if large_data:
-                    large_width, large_height = ImageProcessor.get_image_dimensions(large_data)
-                    result['large'] = {
-                        'file': large_data,
-                        'filename': f"{base_filename}_large.jpg",
-                        'width': large_width,
-                        'height': large_height
-                    }
-
             logger.info(f"Processed image: original={width}x{height}, generated {len([k for k, v in result.items() if v])} variants")
 
         except Exception as e:
@@ -15,6 +15,8 @@ from PIL.ExifTags import TAGS
 import imagehash
 import logging
 
+from src.image_variants import VariantSpec, build_variants, decode_for_variants, oriented_size
+
 logger = logging.getLogger(__name__)
 
 # Allow loading of truncated images
@@ -115,6 +117,15 @@ class ImageProcessorEnhanced:
     THUMBNAIL_MEDIUM = (400, 400)
     THUMBNAIL_LARGE = (800, 800)
 
+    # Variants produced by process_image_complete (small/medium/large only
+    # when the original is larger)
+    VARIANT_SPECS = (
+        VariantSpec('thumbnail', THUMBNAIL_SMALL, quality=80, crop_square=True),
+        VariantSpec('small', THUMBNAIL_SMALL, quality=85, only_if_larger=True),
+        VariantSpec('medium', THUMBNAIL_MEDIUM, quality=85, only_if_larger=True),
+        VariantSpec('large', THUMBNAIL_LARGE, quality=90, only_if_larger=True),
+    )
+
     @staticmethod
     def extract_exif_data(img: Image.Image) -> Dict[str, Any]:
         """
@@ -308,6 +319,9 @@ class ImageProcessorEnhanced:
         """
         Complete image processing pipeline.
 
+        The image is decoded once; variants and the perceptual hash all come
+        from that decode.
+
         Args:
             file_data: Binary image data
             generate_sizes: List of sizes to generate
@@ -327,53 +341,34 @@ class ImageProcessorEnhanced:
         }
 
         try:
-            # Load image
+            # Open (header only)
             img = Image.open(file_data)
             original_width, original_height = img.size
             result['dimensions'] = (original_width, original_height)
+            variant_source_size = oriented_size(img)
 
             # Extract EXIF
             if "exif" in generate_sizes or True:  # Always extract EXIF
                 result['metadata'] = ImageProcessorEnhanced.extract_exif_data(img)
 
-            # Calculate perceptual hash
-            result['perceptual_hash'] = ImageProcessorEnhanced.calculate_perceptual_hash(img)
+            # Decode once, at the smallest resolution the variants need. The
+            # perceptual hash is taken from that decode in stored orientation,
+            # as existing Media.image_hash values (and the media scraper) are;
+            # average_hash shrinks to 8x8, so the draft scale does not matter
+            def hash_decoded(loaded: Image.Image):
+                result['perceptual_hash'] = ImageProcessorEnhanced.calculate_perceptual_hash(loaded)
+
+            specs = [spec for spec in ImageProcessorEnhanced.VARIANT_SPECS if spec.name in generate_sizes]
+            decoded = decode_for_variants(img, specs, on_load=hash_decoded)
 
             # Store original
             file_data.seek(0)
             result['original'] = file_data
 
-            # Generate thumbnail (square crop)
-            if "thumbnail" in generate_sizes:
-                result['thumbnail'] = ImageProcessorEnhanced.generate_thumbnail(
-                    img.copy(),
-                    ImageProcessorEnhanced.THUMBNAIL_SMALL,
-                    crop_to_square=True
-                )
-
-            # Generate small size
-            if "small" in generate_sizes and (original_width > 150 or original_height > 150):
-                result['small'] = ImageProcessorEnhanced.resize_image(
-                    img.copy(),
-                    ImageProcessorEnhanced.THUMBNAIL_SMALL,
-                    quality=85
-                )
-
-            # Generate medium size
-            if "medium" in generate_sizes and (original_width > 400 or original_height > 400):
-                result['medium'] = ImageProcessorEnhanced.resize_image(
-                    img.copy(),
-                    ImageProcessorEnhanced.THUMBNAIL_MEDIUM,
-                    quality=85
-                )
-
-            # Generate large size
-            if "large" in generate_sizes and (original_width > 800 or original_height > 800):
-                result['large'] = ImageProcessorEnhanced.resize_image(
-                    img.copy(),
-                    ImageProcessorEnhanced.THUMBNAIL_LARGE,
-                    quality=90
-                )
+            # Generate thumbnail (square crop) and sizes in a cascade, largest first
+            variants = build_variants(decoded, specs, original_size=variant_source_size)
+            for name, variant in variants.items():
+                result[name] = io.BytesIO(variant.encoded['JPEG'])
 
             logger.info(
                 f"Processed image: {original_width}x{original_height}, "
@@ -20,6 +20,7 @@ import boto3
 from botocore.exceptions import ClientError
 
 from model.media import Media, MediaType, StorageType, ModerationStatus
+from src.media_hash_index import find_duplicate_media
 from src.media_processing import ImageProcessor, VideoProcessor
 from src.storage import get_storage_backend
 from src.id_generator import generate_public_id
@@ -148,13 +149,10 @@ class MediaScraper:
             logger.info(f"⏭️ File already exists in MinIO: {filename}")
             return None  # File exists but no DB record - let upload create new record
 
-        # Check 3: Perceptual hash for renamed duplicates (images only)
+        # Check 3: Perceptual hash for renamed or re-encoded near-duplicates (images only)
         if image_hash:
-            existing_by_hash = self.db.query(Media).filter(
-                Media.image_hash == image_hash,
-                Media.entity_type == entity_type,
-                Media.entity_id == entity_id
-            ).first()
+            duplicates = find_duplicate_media(self.db, image_hash, entity_type, entity_id)
+            existing_by_hash = duplicates[0][0] if duplicates else None
 
             if existing_by_hash:
                 # Verify this duplicate's file also exists
@@ -0,0 +1,440 @@
+# src/metrics_rollup.py
+"""
+Admin Dashboard Metrics
+
+Serves GET /v1/admin/stats and /v1/admin/growth from daily rollups instead
+of COUNT(*) / GROUP BY DATE(created_at) scans of users, builder_profiles,
+communities and properties on every dashboard load.
+
+- metrics_daily_rollups holds, per entity and day, how many rows were
+  created that day (per role for users). Totals, role breakdown, period
+  counts and growth series are sums over a few of its rows
+- A background thread recounts the last METRICS_ROLLUP_RECENT_DAYS days
+  every METRICS_ROLLUP_REFRESH_SECONDS (an index range on created_at) and
+  rebuilds every entity in full every METRICS_ROLLUP_FULL_REBUILD_HOURS,
+  which also picks up deletions of older rows
+- Responses are cached for METRICS_CACHE_TTL_SECONDS; concurrent requests
+  for the same figures wait for one computation instead of each running it
+
+Counts are per calendar day: period and growth ranges cover whole days,
+and figures lag writes by up to the refresh interval plus the cache TTL.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from config.settings import (
+    METRICS_CACHE_TTL_SECONDS,
+    METRICS_ROLLUP_ENABLED,
+    METRICS_ROLLUP_FULL_REBUILD_HOURS,
+    METRICS_ROLLUP_RECENT_DAYS,
+    METRICS_ROLLUP_REFRESH_SECONDS,
+)
+from model.metrics import MetricsDailyRollup
+from src.schemas import (
+    AdminStatsOut,
+    AdminStatsPeriod,
+    AdminStatsTotals,
+    GrowthDataPoint,
+    GrowthTimeSeriesOut,
+)
+
+logger = logging.getLogger(__name__)
+
+# Day recorded for rows without a created_at
+NULL_DAY = date(1970, 1, 1)
+
+# How many days back "active users" reaches (users have no last login time,
+# so recently registered users count as active)
+ACTIVE_USER_DAYS = 30
+
+# users.role values -> AdminStatsTotals field
+ROLE_FIELDS = {
+    "buyer": "buyers",
+    "builder": None,  # builders are counted from builder_profiles
+    "sales_rep": "sales_reps",
+    "community": "community_pocs",
+    "community_admin": "community_admins",
+    "admin": "admins",
+}
+
+GROWTH_ENTITIES = ("users", "builders", "communities", "properties")
+
+
+@dataclass(frozen=True)
+class RollupSource:
+    """Table counted into one rollup entity"""
+    table: str
+    segment_column: Optional[str] = None
+
+
+# Tables that do not exist (posts, tours, documents in some deployments)
+# are skipped and count as 0
+SOURCES: Dict[str, RollupSource] = {
+    "users": RollupSource("users", "role"),
+    "builders": RollupSource("builder_profiles"),
+    "communities": RollupSource("communities"),
+    "properties": RollupSource("properties"),
+    "posts": RollupSource("posts"),
+    "tours": RollupSource("property_tours"),
+    "documents": RollupSource("documents"),
+}
+
+
+# ===================================================================
+# Rollup maintenance
+# ===================================================================
+
+def _as_date(value) -> date:
+    if value is None:
+        return NULL_DAY
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])  # SQLite returns DATE() as text
+
+
+def recount_entity(db: Session, entity: str, since: Optional[date] = None) -> bool:
+    """
+    Recount one entity's rollup rows from its table and commit.
+
+    Args:
+        entity: Key of SOURCES
+        since: Only recount days from this one on (None = every day)
+
+    Returns:
+        False if the source table does not exist
+    """
+    source = SOURCES[entity]
+    segment = f"COALESCE({source.segment_column}, '')" if source.segment_column else "''"
+    where = "WHERE created_at >= :since" if since else ""
+    query = text(
+        f"SELECT DATE(created_at) AS day, {segment} AS segment, COUNT(*) AS count "
+        f"FROM {source.table} {where} GROUP BY DATE(created_at), {segment}"
+    )
+    params = {"since": datetime.combine(since, datetime.min.time())} if since else {}
+    try:
+        counts: Dict[Tuple[date, str], int] = defaultdict(int)
+        for row in db.execute(query, params):
+            counts[(_as_date(row.day), row.segment or "")] += int(row.count)
+    except sa_exc.DBAPIError as e:
+        db.rollback()
+        logger.debug(f"Skipping {entity} rollup ({source.table}): {e}")
+        return False
+
+    delete = db.query(MetricsDailyRollup).filter(MetricsDailyRollup.entity == entity)
+    if since:
+        delete = delete.filter(MetricsDailyRollup.day >= since)
+    delete.delete(synchronize_session=False)
+    if counts:
+        db.execute(insert(MetricsDailyRollup), [
+            {"entity": entity, "day": day, "segment": segment, "count": count}
+            for (day, segment), count in counts.items()
+        ])
+    db.commit()
+    return True
+
+
+def refresh_rollups(db: Session, since: Optional[date] = None, entities: Sequence[str] = tuple(SOURCES)):
+    """Recount the given entities (all days, or the days from `since` on)."""
+    start = time.perf_counter()
+    for entity in entities:
+        try:
+            recount_entity(db, entity, since)
+        except sa_exc.SQLAlchemyError as e:
+            # e.g. another process replaced the same days concurrently; the next refresh retries
+            db.rollback()
+            logger.warning(f"Metrics rollup refresh failed for {entity}: {e}")
+    logger.debug(
+        "Metrics rollups refreshed (%s) in %.1f ms",
+        f"since {since}" if since else "full", (time.perf_counter() - start) * 1000
+    )
+
+
+def refresh_recent_rollups(db: Session, days: int = METRICS_ROLLUP_RECENT_DAYS):
+    """Recount today and the preceding days (new rows land there)."""
+    refresh_rollups(db, since=datetime.utcnow().date() - timedelta(days=max(days, 1) - 1))
+
+
+_rollups_built = False
+
+
+def ensure_rollups(db: Session):
+    """Build every rollup now if the table is still empty (first start)."""
+    global _rollups_built
+    if _rollups_built:
+        return
+    if db.scalar(select(MetricsDailyRollup.entity).limit(1)) is None:
+        refresh_rollups(db)
+    _rollups_built = True
+
+
+# ===================================================================
+# Dashboard figures
+# ===================================================================
+
+def _sums(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> Dict[Tuple[str, str], int]:
+    """(entity, segment) -> rows created between start and end (inclusive days)."""
+    query = select(
+        MetricsDailyRollup.entity, MetricsDailyRollup.segment, func.sum(MetricsDailyRollup.count)
+    ).group_by(MetricsDailyRollup.entity, MetricsDailyRollup.segment)
+    if start:
+        query = query.where(MetricsDailyRollup.day >= start)
+    if end:
+        query = query.where(MetricsDailyRollup.day <= end)
+    return {(entity, segment): int(total or 0) for entity, segment, total in db.execute(query)}
+
+
+def _entity_totals(sums: Dict[Tuple[str, str], int]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for (entity, _), count in sums.items():
+        totals[entity] += count
+    return totals
+
+
+def compute_admin_stats(db: Session, from_date: Optional[datetime] = None,
+                        to_date: Optional[datetime] = None) -> AdminStatsOut:
+    """Platform totals, user role breakdown and (with from/to) period counts."""
+    ensure_rollups(db)
+    sums = _sums(db)
+    totals = _entity_totals(sums)
+
+    roles: Dict[str, int] = defaultdict(int)
+    for (entity, segment), count in sums.items():
+        if entity != "users" or not segment:
+            continue
+        if segment in ROLE_FIELDS:
+            if ROLE_FIELDS[segment]:
+                roles[ROLE_FIELDS[segment]] += count
+        else:
+            logger.warning(f"Unknown user role found in database: {segment}")
+    unassigned = sums.get(("users", ""), 0)
+    if unassigned:
+        logger.warning(f"{unassigned} users have a NULL or empty role")
+
+    active_since = datetime.utcnow().date() - timedelta(days=ACTIVE_USER_DAYS)
+    active_users = _entity_totals(_sums(db, start=active_since))["users"]
+
+    stats_totals = AdminStatsTotals(
+        users=totals["users"],
+        active_users=active_users,
+        builders=totals["builders"],
+        communities=totals["communities"],
+        properties=totals["properties"],
+        posts=totals["posts"],
+        tours=totals["tours"],
+        documents=totals["documents"],
+        buyers=roles["buyers"],
+        sales_reps=roles["sales_reps"],
+        community_pocs=roles["community_pocs"],
+        community_admins=roles["community_admins"],
+        admins=roles["admins"],
+    )
+
+    period = None
+    if from_date and to_date:
+        new = _entity_totals(_sums(db, start=from_date.date(), end=to_date.date()))
+        period = AdminStatsPeriod(
+            from_date=from_date,
+            to_date=to_date,
+            new_users=new["users"],
+            new_builders=new["builders"],
+            new_communities=new["communities"],
+            new_properties=new["properties"],
+        )
+
+    return AdminStatsOut(totals=stats_totals, period=period)
+
+
+def _period_start(day: date, interval: str) -> datetime:
+    if interval == "week":
+        # Sunday-based week number, reported as the Monday of that week
+        return datetime.strptime(day.strftime("%Y-%U") + "-1", "%Y-%U-%w")
+    if interval == "month":
+        return datetime(day.year, day.month, 1)
+    return datetime.combine(day, datetime.min.time())
+
+
+def compute_growth(db: Session, from_date: date, to_date: date, interval: str = "day") -> GrowthTimeSeriesOut:
+    """New users/builders/communities/properties per day, week or month."""
+    ensure_rollups(db)
+    query = (
+        select(MetricsDailyRollup.entity, MetricsDailyRollup.day, func.sum(MetricsDailyRollup.count))
+        .where(
+            MetricsDailyRollup.entity.in_(GROWTH_ENTITIES),
+            MetricsDailyRollup.day >= from_date,
+            MetricsDailyRollup.day <= to_date,
+        )
+        .group_by(MetricsDailyRollup.entity, MetricsDailyRollup.day)
+    )
+    series: Dict[str, Dict[datetime, int]] = {entity: defaultdict(int) for entity in GROWTH_ENTITIES}
+    for entity, day, count in db.execute(query):
+        series[entity][_period_start(_as_date(day), interval)] += int(count or 0)
+
+    return GrowthTimeSeriesOut(**{
+        entity: [GrowthDataPoint(date=period, count=count) for period, count in sorted(points.items())]
+        for entity, points in series.items()
+    })
+
+
+# ===================================================================
+# Response cache with request coalescing
+# ===================================================================
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class MetricsCache:
+    """
+    TTL cache where concurrent misses for one key share a single computation.
+
+    The first caller computes; the others wait for its result (or error)
+    instead of running the same queries.
+    """
+
+    def __init__(self, ttl_seconds: float = METRICS_CACHE_TTL_SECONDS, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    now = time.monotonic()
+                    self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                self._entries[key] = (flight.value, time.monotonic() + self.ttl_seconds)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_cache = MetricsCache()
+
+
+def get_dashboard_stats(db: Session, from_date: Optional[datetime] = None,
+                        to_date: Optional[datetime] = None) -> AdminStatsOut:
+    """compute_admin_stats() through the response cache."""
+    return _cache.get_or_compute(
+        ("stats", from_date, to_date), lambda: compute_admin_stats(db, from_date, to_date)
+    )
+
+
+def get_dashboard_growth(db: Session, from_date: datetime, to_date: datetime,
+                         interval: str = "day") -> GrowthTimeSeriesOut:
+    """compute_growth() over the days of [from_date, to_date], through the response cache."""
+    start, end = from_date.date(), to_date.date()
+    return _cache.get_or_compute(
+        ("growth", start, end, interval), lambda: compute_growth(db, start, end, interval)
+    )
+
+
+def clear_metrics_cache():
+    _cache.clear()
+
+
+# ===================================================================
+# Background refresh
+# ===================================================================
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _refresh_loop(session_factory):
+    last_full = None
+    while not _stop.is_set():
+        db = session_factory()
+        try:
+            if last_full is None or time.monotonic() - last_full >= METRICS_ROLLUP_FULL_REBUILD_HOURS * 3600:
+                refresh_rollups(db)
+                last_full = time.monotonic()
+            else:
+                refresh_recent_rollups(db)
+        except Exception as e:
+            logger.warning(f"Metrics rollup refresh failed: {e}")
+        finally:
+            db.close()
+        _stop.wait(METRICS_ROLLUP_REFRESH_SECONDS)
+
+
+def start_metrics_rollup_sync(session_factory=None) -> Optional[threading.Thread]:
+    """Rebuild the rollups, then keep recent days current, in a background thread."""
+    global _thread
+    if not METRICS_ROLLUP_ENABLED or (_thread is not None and _thread.is_alive()):
+        return None
+    if session_factory is None:
+        from config.db import SessionLocal
+        session_factory = SessionLocal
+    _stop.clear()
+    _thread = threading.Thread(target=_refresh_loop, args=(session_factory,),
+                               name="metrics-rollup-sync", daemon=True)
+    _thread.start()
+    return _thread
+
+
+def stop_metrics_rollup_sync():
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
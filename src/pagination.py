@@ -0,0 +1,278 @@
+# src/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Offset pagination makes MySQL read and throw away every row before the
+requested page, so deep pages of an infinite-scroll list get slower the
+further the client scrolls. Keyset pagination instead remembers the sort key
+of the last row served and asks for rows strictly after it, which an index on
+(sort columns..., id) answers with a short range scan whatever the depth.
+
+- Cursors are opaque URL-safe strings encoding the sort mode and the last
+  row's key values; a cursor only works with the sort it was issued for
+- The key must end in a unique column (the primary key) so ordering is total
+- NULLs sort before every value (MySQL/MariaDB and SQLite order); a nullable
+  leading sort column pages through its NULL rows as a separate index range
+- Routes keep returning plain lists; the next cursor travels in the
+  X-Next-Cursor response header, so skip/offset clients are unaffected
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class KeysetColumn:
+    """One column of a keyset sort key"""
+    column: Any                 # mapped attribute, e.g. Property.price
+    descending: bool = False
+    nullable: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.column.key
+
+
+# =============================================================================
+# Cursor encoding
+# =============================================================================
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        (tag, raw), = value.items()
+        return {"dt": datetime.fromisoformat, "d": date.fromisoformat, "n": Decimal}[tag](raw)
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """
+    Build an opaque cursor for the row with the given key values.
+
+    Args:
+        sort: Sort mode the cursor belongs to (e.g. "price_desc")
+        values: Key values of the last row served, in key order
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"s": sort, "k": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> List[Any]:
+    """
+    Decode a cursor issued by encode_cursor for the given sort mode.
+
+    Raises:
+        HTTPException 400: Malformed cursor, or issued for a different sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload["k"]]
+        valid = payload["s"] == sort and len(values) == size
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor for this listing; restart from the first page"
+        )
+    return values
+
+
+# =============================================================================
+# Query building
+# =============================================================================
+
+def _after(key: KeysetColumn, value: Any):
+    """Condition for non-NULL values strictly after `value` in this column's order"""
+    return key.column < value if key.descending else key.column > value
+
+
+def _ties_after(keys: Sequence[KeysetColumn], values: Sequence[Any]):
+    """(a after va) OR (a = va AND b after vb) OR ... over non-nullable columns"""
+    clauses = []
+    prefix = []
+    for key, value in zip(keys, values):
+        clauses.append(and_(*prefix, _after(key, value)))
+        prefix.append(key.column == value)
+    return or_(*clauses)
+
+
+def keyset_segments(keys: Sequence[KeysetColumn], values: Sequence[Any]) -> list:
+    """
+    Conditions selecting the rows that sort after `values`, in key order.
+
+    The rows after the cursor are split into consecutive ranges of the
+    (a, b, ...) index: the rest of the cursor's tie group (a = va AND b > vb),
+    then everything past it (a > va), then the NULL rows of a nullable column
+    when they sort last. Each is an exact index seek with bind parameters on
+    MySQL and SQLite alike, which a single OR-expanded condition is not, and
+    a page simply continues into the next range when one runs out.
+    Only the leading key column may be nullable.
+    """
+    first, value = keys[0], values[0]
+    rest, rest_values = keys[1:], values[1:]
+    col = first.column
+    segments = []
+
+    if value is None:
+        if rest:
+            segments.append(and_(col.is_(None), _ties_after(rest, rest_values)))
+        # NULLs sort first ascending, last descending
+        if not first.descending:
+            segments.append(col.isnot(None))
+        return segments
+
+    if rest:
+        segments.append(and_(col == value, _ties_after(rest, rest_values)))
+    segments.append(_after(first, value))
+    if first.nullable and first.descending:
+        segments.append(col.is_(None))
+    return segments
+
+
+def order_by_keys(query, keys: Sequence[KeysetColumn]):
+    """Apply the key's ORDER BY (the key columns, each in its direction)"""
+    return query.order_by(*[k.column.desc() if k.descending else k.column.asc() for k in keys])
+
+
+def paginate(
+    query,
+    keys: Sequence[KeysetColumn],
+    sort: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of `query` ordered by `keys`.
+
+    With a cursor the page starts right after the cursor row; without one it
+    starts at `offset` (0 for the first page, or a legacy skip/offset client).
+    Either way the cursor of the page's last row is returned when more rows
+    follow, so offset clients can switch to cursors at any point.
+
+    Args:
+        query: Filtered SQLAlchemy query, without ORDER BY/LIMIT/OFFSET
+        keys: Sort key; the last column must be unique (the primary key)
+        sort: Sort mode name embedded in (and checked against) cursors
+        limit: Page size
+        cursor: Cursor from a previous page's X-Next-Cursor
+        offset: Rows to skip when no cursor is given
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        HTTPException 400: Invalid cursor, or both cursor and offset given
+    """
+    if cursor:
+        if offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either cursor or skip/offset, not both"
+            )
+        rows = []
+        for segment in keyset_segments(keys, decode_cursor(cursor, sort, len(keys))):
+            rows += order_by_keys(query.filter(segment), keys).limit(limit + 1 - len(rows)).all()
+            if len(rows) > limit:
+                break
+    else:
+        query = order_by_keys(query, keys)
+        if offset:
+            query = query.offset(offset)
+        rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, [getattr(last, k.name) for k in keys])
+
+
+def paginate_ranked(
+    query,
+    id_column,
+    ranked_ids: Sequence[Any],
+    sort: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of `query` in a precomputed order (e.g. search relevance).
+
+    Rows are loaded by id in rank order, chunk by chunk, skipping ids the
+    query's own filters exclude. The cursor records the rank position to
+    resume from, so it should be issued under a `sort` naming the ranking
+    (e.g. including a hash of the search text).
+
+    Args:
+        query: Filtered SQLAlchemy query, without ORDER BY/LIMIT/OFFSET
+        id_column: Column the ranked ids refer to (e.g. Community.id)
+        ranked_ids: Ids in the order to serve them
+        sort: Ranking name embedded in (and checked against) cursors
+        limit: Page size
+        cursor: Cursor from a previous page's X-Next-Cursor
+        offset: Matching rows to skip when no cursor is given
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    if cursor and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either cursor or skip/offset, not both"
+        )
+    position = decode_cursor(cursor, sort, 1)[0] if cursor else 0
+    if not isinstance(position, int) or position < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor for this listing")
+
+    page = []  # (rank position, row)
+    chunk_size = max(limit + 1, 100)
+    while position < len(ranked_ids) and len(page) <= limit:
+        chunk = list(ranked_ids[position:position + chunk_size])
+        by_id = {getattr(row, id_column.key): row for row in query.filter(id_column.in_(chunk))}
+        for i, entity_id in enumerate(chunk):
+            row = by_id.get(entity_id)
+            if row is None:
+                continue
+            if offset:
+                offset -= 1
+                continue
+            page.append((position + i, row))
+            if len(page) > limit:
+                break
+        position += len(chunk)
+
+    if len(page) <= limit:
+        return [row for _, row in page], None
+    return [row for _, row in page[:limit]], encode_cursor(sort, [page[limit - 1][0] + 1])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page's cursor on the response (absent on the last page)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
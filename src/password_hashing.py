@@ -0,0 +1,218 @@
+"""
+Password hashing pool.
+
+bcrypt/argon2 are deliberately slow (tens to hundreds of ms per call). Run
+inline in sync handlers, a login or registration burst holds every thread of
+Starlette's request threadpool and starves all other sync endpoints. Here
+hashing runs on its own small thread pool (both backends release the GIL, so
+threads give real parallelism) and callers wait for the result:
+- At most PASSWORD_HASH_MAX_PENDING hashes are running or queued; further
+  calls raise PasswordHashingBusy, which the app answers with 429
+- Cost (bcrypt rounds, argon2 time/memory/parallelism) comes from settings;
+  hashes made with another scheme or cost still verify and are reported as
+  needing a rehash, which login applies transparently
+- Hash latency and queue wait are recorded for /admin/collection/password-hashing
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config.settings import (
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing queue is full; the caller should retry later (HTTP 429)."""
+
+
+def build_password_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    """
+    CryptContext that hashes with `scheme` at the configured cost.
+
+    Every scheme in SCHEMES still verifies; the others are deprecated, and
+    min/max rounds are pinned to the configured cost so needs_update() is
+    true for any hash made at a different cost, higher or lower.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown password hash scheme {scheme!r} (expected one of {SCHEMES})")
+    return CryptContext(
+        schemes=[scheme] + [s for s in SCHEMES if s != scheme],
+        default=scheme,
+        deprecated=[s for s in SCHEMES if s != scheme],
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__max_rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+class HashMetrics:
+    """Thread-safe counters for hash latency, queue wait and shed calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.completed = 0
+            self.rejected = 0
+            self.total_hash_seconds = 0.0
+            self.max_hash_seconds = 0.0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, hash_seconds: float):
+        with self._lock:
+            self.completed += 1
+            self.total_hash_seconds += hash_seconds
+            self.max_hash_seconds = max(self.max_hash_seconds, hash_seconds)
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            n = self.completed
+            return {
+                "completed": n,
+                "rejected": self.rejected,
+                "avg_hash_ms": round(self.total_hash_seconds / n * 1000, 3) if n else 0.0,
+                "max_hash_ms": round(self.max_hash_seconds * 1000, 3),
+                "avg_wait_ms": round(self.total_wait_seconds / n * 1000, 3) if n else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class PasswordHasher:
+    """
+    Bounded pool that hashes and verifies passwords off the request threads.
+
+    Calls block until their hash is done; a call that would exceed
+    max_pending running-or-queued hashes raises PasswordHashingBusy at once.
+    """
+
+    def __init__(
+        self,
+        context: Optional[CryptContext] = None,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.context = context or build_password_context()
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, self.workers)
+        self.metrics = HashMetrics()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.metrics.record_rejected()
+                raise PasswordHashingBusy("Password hashing queue is full")
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.metrics.record(started - submitted, time.perf_counter() - started)
+
+        try:
+            return self._pool.submit(timed).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured scheme and cost."""
+        return self._run(self.context.hash, password)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against its stored hash.
+
+        Returns:
+            (valid, new_hash): new_hash is a fresh hash at the configured
+            scheme/cost when the password is valid but the stored hash is
+            outdated, otherwise None
+        """
+        return self._run(self.context.verify_and_update, password, hashed)
+
+    def identify(self, hashed: str) -> Optional[str]:
+        """Scheme name of a stored hash (e.g. "bcrypt"), None if unrecognised."""
+        return self.context.identify(hashed)
+
+    def status(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "scheme": self.context.default_scheme(),
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            **self.metrics.snapshot(),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher (started on first use)."""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+                logger.info(
+                    "Password hashing pool started (%s, %d workers, %d max pending)",
+                    _hasher.context.default_scheme(), _hasher.workers, _hasher.max_pending,
+                )
+    return _hasher
+
+
+def shutdown_password_hasher():
+    """Stop the password hashing pool (app shutdown)."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher.shutdown()
+            _hasher = None
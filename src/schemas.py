@@ -77,6 +77,9 @@ class LoginIn(BaseModel):
     email: EmailStr
     password: str
 
+class LogoutIn(BaseModel):
+    refresh_token: Optional[str] = None  # omit to end every session of the user
+
 # =============================
 # Step 2: Role Selection & Org Lookup
 # =============================
@@ -0,0 +1,680 @@
+# src/search_index.py
+"""
+Full-Text Search Index
+
+Inverted index over community, builder and property text, used by the `q`
+search of the list endpoints and GET /v1/search instead of ILIKE '%q%'
+filters, which MySQL can only answer by scanning the whole table.
+
+- Embedded SQLite FTS5 file (SEARCH_INDEX_PATH) with one full-text table
+  per kind: BM25 relevance with the name weighted above location and
+  description text
+- Every query term matches as a prefix ("highl" finds Highlands); a term
+  that no indexed word starts with is widened to indexed words within one
+  or two edits ("higlands"), so typos still find results
+- Facet counts (city, state, price band) over all matches, from the index
+- Updated when a session commits ORM inserts/updates/deletes of communities,
+  builders and properties (profile edits and applied collection changes),
+  and by a background thread that builds missing kinds at startup and then
+  re-reads rows whose updated_at changed (writes from other processes)
+  every SEARCH_INDEX_REFRESH_SECONDS
+
+Until a kind's first full build finishes, its searches return None and the
+routes keep using their ILIKE filters.
+"""
+import bisect
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from config.db import database_now
+from config.settings import (
+    SEARCH_FACET_LIMIT,
+    SEARCH_INDEX_ENABLED,
+    SEARCH_INDEX_PATH,
+    SEARCH_INDEX_REFRESH_SECONDS,
+    SEARCH_MAX_RESULTS,
+    SEARCH_PRICE_BANDS,
+)
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY = "community"
+BUILDER = "builder"
+PROPERTY = "property"
+KINDS = (COMMUNITY, BUILDER, PROPERTY)
+
+# bm25() column weights for (name, body, place)
+BM25_WEIGHTS = (10.0, 1.0, 3.0)
+
+# Query terms shorter than this are not typo-corrected
+MIN_CORRECTION_LENGTH = 4
+MAX_CORRECTIONS = 3
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+@dataclass
+class SearchDoc:
+    """One indexed entity"""
+    kind: str
+    entity_id: int
+    name: str
+    body: str = ""
+    place: str = ""
+    city: Optional[str] = None
+    state: Optional[str] = None
+    price: Optional[float] = None
+    public_id: Optional[str] = None
+
+
+@dataclass
+class SearchHit:
+    entity_id: int
+    public_id: Optional[str]
+    name: str
+    city: Optional[str]
+    state: Optional[str]
+    price: Optional[float]
+    score: float
+
+
+@dataclass
+class SearchResult:
+    hits: List[SearchHit]
+    total: int
+    facets: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    corrections: Dict[str, List[str]] = field(default_factory=dict)
+
+
+# ===================================================================
+# Query parsing
+# ===================================================================
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, accent-free word tokens, matching the index's unicode61 tokenizer."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(stripped.lower())
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _Vocabulary:
+    """Indexed terms, for prefix checks and typo candidates."""
+
+    def __init__(self, terms: Iterable[Tuple[str, int]]):
+        self.frequency: Dict[str, int] = {}
+        self.by_shape: Dict[Tuple[str, int], List[str]] = {}
+        for term, docs in terms:
+            if term.isalpha():
+                self.frequency[term] = docs
+                self.by_shape.setdefault((term[0], len(term)), []).append(term)
+        self.sorted = sorted(self.frequency)
+
+    def has_prefix(self, prefix: str) -> bool:
+        i = bisect.bisect_left(self.sorted, prefix)
+        return i < len(self.sorted) and self.sorted[i].startswith(prefix)
+
+    def corrections(self, term: str) -> List[str]:
+        """Indexed words within 1 edit (2 for 8+ letters), most common first"""
+        limit = 2 if len(term) >= 8 else 1
+        found = []
+        # Typos rarely hit the first letter, so only same-initial words are scored
+        for length in range(len(term) - limit, len(term) + limit + 1):
+            for candidate in self.by_shape.get((term[0], length), ()):
+                distance = edit_distance(term, candidate, limit)
+                if distance <= limit:
+                    found.append((distance, -self.frequency[candidate], candidate))
+        return [candidate for _, _, candidate in sorted(found)[:MAX_CORRECTIONS]]
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+# ===================================================================
+# Index
+# ===================================================================
+
+# Each kind gets its own FTS table (and vocabulary), so a query only walks
+# posting lists of its own kind instead of intersecting with a kind term
+# that every row of the kind carries.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    rowid INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    public_id TEXT,
+    name TEXT,
+    city TEXT,
+    state TEXT,
+    price REAL,
+    UNIQUE (kind, entity_id)
+);
+CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT);
+""" + "".join(f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts_{kind} USING fts5(
+    name, body, place, prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_vocab_{kind} USING fts5vocab(search_fts_{kind}, 'row');
+""" for kind in KINDS)
+
+
+def _fts(kind: str) -> str:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown search kind: {kind}")
+    return f"search_fts_{kind}"
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index of SearchDocs.
+
+    One connection shared by all threads behind a lock; searches take a few
+    milliseconds, and WAL keeps readers in other processes unblocked.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_PATH, vocabulary_seconds: float = 60.0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.vocabulary_seconds = vocabulary_seconds
+        # kind -> (vocabulary, monotonic build time); kinds written since are stale
+        self._vocabularies: Dict[str, Tuple[_Vocabulary, float]] = {}
+        self._stale = set(KINDS)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # -- metadata ----------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM search_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO search_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value)
+            )
+
+    # -- writes ------------------------------------------------------
+
+    def upsert(self, docs: Iterable[SearchDoc]) -> int:
+        """Insert or replace docs; returns how many were written."""
+        count = 0
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for doc in docs:
+                    self._delete(doc.kind, doc.entity_id)
+                    cursor = self.conn.execute(
+                        "INSERT INTO search_docs (kind, entity_id, public_id, name, city, state, price) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (doc.kind, doc.entity_id, doc.public_id, doc.name, doc.city, doc.state, doc.price),
+                    )
+                    self.conn.execute(
+                        f"INSERT INTO {_fts(doc.kind)} (rowid, name, body, place) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, doc.name or "", doc.body or "", doc.place or ""),
+                    )
+                    self._stale.add(doc.kind)
+                    count += 1
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def remove(self, kind: str, entity_ids: Iterable[int]):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            for entity_id in entity_ids:
+                self._delete(kind, entity_id)
+            self.conn.execute("COMMIT")
+            self._stale.add(kind)
+
+    def clear(self, kind: str):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.execute(f"DELETE FROM {_fts(kind)}")
+            self.conn.execute("DELETE FROM search_docs WHERE kind = ?", (kind,))
+            self.conn.execute("COMMIT")
+            self._stale.add(kind)
+
+    def _delete(self, kind: str, entity_id: int):
+        row = self.conn.execute(
+            "SELECT rowid FROM search_docs WHERE kind = ? AND entity_id = ?", (kind, entity_id)
+        ).fetchone()
+        if row:
+            self.conn.execute(f"DELETE FROM {_fts(kind)} WHERE rowid = ?", row)
+            self.conn.execute("DELETE FROM search_docs WHERE rowid = ?", row)
+
+    def count(self, kind: str) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM search_docs WHERE kind = ?", (kind,)).fetchone()[0]
+
+    # -- queries -----------------------------------------------------
+
+    def _get_vocabulary(self, kind: str) -> _Vocabulary:
+        with self.lock:
+            now = time.monotonic()
+            cached = self._vocabularies.get(kind)
+            if cached is None or (kind in self._stale and now - cached[1] >= self.vocabulary_seconds):
+                _fts(kind)
+                terms = self.conn.execute(f"SELECT term, doc FROM search_vocab_{kind}")
+                cached = self._vocabularies[kind] = (_Vocabulary(terms), now)
+                self._stale.discard(kind)
+            return cached[0]
+
+    def match_expression(self, kind: str, q: str) -> Tuple[Optional[str], Dict[str, List[str]]]:
+        """
+        FTS5 MATCH expression for a user query: every term must match, each as
+        a prefix, widened with typo corrections when nothing starts with it.
+
+        Returns:
+            Tuple of (expression or None for an empty query, corrections by term)
+        """
+        terms = tokenize(q)
+        if not terms:
+            return None, {}
+        vocabulary = self._get_vocabulary(kind)
+        groups, corrections = [], {}
+        for term in terms:
+            alternatives = [_quote(term) + "*"]
+            if len(term) >= MIN_CORRECTION_LENGTH and term.isalpha() and not vocabulary.has_prefix(term):
+                fixes = vocabulary.corrections(term)
+                if fixes:
+                    corrections[term] = fixes
+                    alternatives += [_quote(fix) for fix in fixes]
+            groups.append(alternatives[0] if len(alternatives) == 1 else "(" + " OR ".join(alternatives) + ")")
+        return " AND ".join(groups), corrections
+
+    def _where(self, city: Optional[str], state: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if city:
+            clauses.append("d.city = ? COLLATE NOCASE")
+            params.append(city)
+        if state:
+            clauses.append("d.state = ? COLLATE NOCASE")
+            params.append(state)
+        return "".join(f" AND {c}" for c in clauses), params
+
+    def search(
+        self,
+        kind: str,
+        q: str,
+        limit: int = 20,
+        offset: int = 0,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        facets: bool = True,
+    ) -> SearchResult:
+        """
+        Rank `kind` docs matching `q`.
+
+        Args:
+            kind: community, builder or property
+            q: Free-text query
+            limit: Hits to return
+            offset: Hits to skip
+            city: Only docs in this city (exact, case-insensitive)
+            state: Only docs in this state (exact, case-insensitive)
+            facets: Also count matches by city, state and price band
+
+        Returns:
+            SearchResult with hits in relevance order, the total match count,
+            facet counts and any typo corrections applied
+        """
+        match, corrections = self.match_expression(kind, q)
+        if match is None:
+            return SearchResult([], 0)
+        fts = _fts(kind)
+        where, params = self._where(city, state)
+        base = f"FROM {fts} JOIN search_docs d ON d.rowid = {fts}.rowid WHERE {fts} MATCH ?{where}"
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT d.entity_id, d.public_id, d.name, d.city, d.state, d.price, "
+                f"bm25({fts}, {', '.join(map(str, BM25_WEIGHTS))}) AS score "
+                f"{base} ORDER BY score LIMIT ? OFFSET ?",
+                [match, *params, limit, offset],
+            ).fetchall()
+            hits = [SearchHit(*row[:6], score=-row[6]) for row in rows]
+            if not facets:
+                total = self.conn.execute(f"SELECT count(*) {base}", [match, *params]).fetchone()[0]
+                return SearchResult(hits, total, corrections=corrections)
+            groups = self.conn.execute(
+                f"SELECT d.city, d.state, {self._band_sql()}, count(*) {base} GROUP BY 1, 2, 3",
+                [*SEARCH_PRICE_BANDS, match, *params],
+            ).fetchall()
+        return SearchResult(hits, sum(g[3] for g in groups), self._facets(groups), corrections)
+
+    def ranked_ids(self, kind: str, q: str, limit: int = SEARCH_MAX_RESULTS) -> List[int]:
+        """Entity ids matching `q`, best first (at most `limit`)."""
+        match, _ = self.match_expression(kind, q)
+        if match is None:
+            return []
+        fts = _fts(kind)
+        with self.lock:
+            # Rank inside the FTS table first, then map only the kept rows to entities
+            rows = self.conn.execute(
+                f"SELECT d.entity_id FROM (SELECT rowid, bm25({fts}, {', '.join(map(str, BM25_WEIGHTS))}) AS score "
+                f"FROM {fts} WHERE {fts} MATCH ? ORDER BY score LIMIT ?) r "
+                f"JOIN search_docs d ON d.rowid = r.rowid ORDER BY r.score",
+                (match, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _band_sql() -> str:
+        cases = " ".join(f"WHEN d.price < ? THEN {i}" for i in range(len(SEARCH_PRICE_BANDS)))
+        return f"CASE WHEN d.price IS NULL THEN NULL {cases} ELSE {len(SEARCH_PRICE_BANDS)} END"
+
+    @staticmethod
+    def _facets(groups: Sequence[tuple]) -> Dict[str, List[Dict[str, Any]]]:
+        cities, states, bands = Counter(), Counter(), Counter()
+        for city, state, band, count in groups:
+            if city:
+                cities[city] += count
+            if state:
+                states[state] += count
+            if band is not None:
+                bands[band] += count
+        edges = [0, *SEARCH_PRICE_BANDS, None]
+        return {
+            "city": [{"value": v, "count": c} for v, c in cities.most_common(SEARCH_FACET_LIMIT)],
+            "state": [{"value": v, "count": c} for v, c in states.most_common(SEARCH_FACET_LIMIT)],
+            "price": [
+                {"min": edges[band], "max": edges[band + 1], "count": bands[band]}
+                for band in sorted(bands)
+            ],
+        }
+
+
+# ===================================================================
+# Documents from ORM rows
+# ===================================================================
+
+def _join(*parts) -> str:
+    return " ".join(str(p) for p in parts if p)
+
+
+def _community_doc(row) -> SearchDoc:
+    return SearchDoc(
+        COMMUNITY, row.id, row.name,
+        body=_join(row.about, row.developer_name, row.school_district),
+        place=_join(row.address, row.city, row.state, row.postal_code),
+        city=row.city, state=row.state, price=row.price_range_min, public_id=row.community_id,
+    )
+
+
+def _builder_doc(row) -> SearchDoc:
+    specialties = row.specialties if isinstance(row.specialties, list) else []
+    return SearchDoc(
+        BUILDER, row.id, row.name,
+        body=_join(row.about, row.mission, row.community_name, *specialties),
+        place=_join(row.headquarters_address, row.city, row.state),
+        city=row.city, state=row.state, price=row.price_range_min, public_id=row.builder_id,
+    )
+
+
+def _property_doc(row) -> SearchDoc:
+    return SearchDoc(
+        PROPERTY, row.id, row.title,
+        body=_join(row.description, row.builder_plan_name, row.property_type),
+        place=_join(row.address1, row.city, row.state, row.postal_code),
+        city=row.city, state=row.state,
+        price=float(row.price) if row.price is not None else None,
+        public_id=str(row.id),
+    )
+
+
+def _sources():
+    """kind -> (model, columns, doc_fn)"""
+    from model.profiles.builder import BuilderProfile as B
+    from model.profiles.community import Community as C
+    from model.property.property import Property as P
+    return {
+        COMMUNITY: (C, (C.id, C.community_id, C.name, C.about, C.developer_name, C.school_district,
+                        C.address, C.city, C.state, C.postal_code, C.price_range_min), _community_doc),
+        BUILDER: (B, (B.id, B.builder_id, B.name, B.about, B.mission, B.community_name, B.specialties,
+                      B.headquarters_address, B.city, B.state, B.price_range_min), _builder_doc),
+        PROPERTY: (P, (P.id, P.title, P.description, P.builder_plan_name, P.property_type,
+                       P.address1, P.city, P.state, P.postal_code, P.price), _property_doc),
+    }
+
+
+def _watermark(db: Session) -> datetime:
+    # Database clock, which sets updated_at; TIMESTAMP columns have second
+    # precision, so overlap the next refresh slightly
+    return database_now(db) - timedelta(seconds=2)
+
+
+def _load_docs(db: Session, kind: str, since: Optional[datetime] = None, batch: int = 5000):
+    model, columns, doc_fn = _sources()[kind]
+    query = db.query(*columns)
+    if since is not None:
+        query = query.filter(model.updated_at >= since)
+    chunk = []
+    for row in query.yield_per(batch):
+        chunk.append(doc_fn(row))
+        if len(chunk) == batch:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ===================================================================
+# Process-wide index
+# ===================================================================
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Get the process-wide index, opening (not building) it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex(SEARCH_INDEX_PATH)
+    return _index
+
+
+def build_search_index(db: Session, index: Optional[SearchIndex] = None, kinds: Sequence[str] = KINDS):
+    """Rebuild the given kinds from the database (replaces their docs)."""
+    index = index or get_search_index()
+    for kind in kinds:
+        start = time.perf_counter()
+        synced_at = _watermark(db)
+        index.clear(kind)
+        count = sum(index.upsert(chunk) for chunk in _load_docs(db, kind))
+        index.set_meta(f"synced_at:{kind}", synced_at.isoformat())
+        logger.info(f"Built {kind} search index: {count} docs in {time.perf_counter() - start:.1f}s")
+
+
+def refresh_search_index(db: Session, index: Optional[SearchIndex] = None, kinds: Sequence[str] = KINDS):
+    """Re-index rows updated since the last sync (writes from other processes)."""
+    index = index or get_search_index()
+    for kind in kinds:
+        synced = index.get_meta(f"synced_at:{kind}")
+        if synced is None:
+            continue
+        synced_at = _watermark(db)
+        for chunk in _load_docs(db, kind, since=datetime.fromisoformat(synced)):
+            index.upsert(chunk)
+        index.set_meta(f"synced_at:{kind}", synced_at.isoformat())
+
+
+def search_ready(kind: str, index: Optional[SearchIndex] = None) -> bool:
+    """Whether `kind` has been fully built at least once."""
+    return (index or get_search_index()).get_meta(f"synced_at:{kind}") is not None
+
+
+def ranked_search_ids(kind: str, q: str) -> Optional[List[int]]:
+    """
+    Entity ids matching `q`, best first, for routes to load and page through.
+
+    Returns:
+        Ranked ids, or None when the index is disabled or not built yet
+        (callers fall back to their ILIKE filters)
+    """
+    if not SEARCH_INDEX_ENABLED:
+        return None
+    try:
+        index = get_search_index()
+        if not search_ready(kind, index):
+            return None
+        return index.ranked_ids(kind, q)
+    except Exception as e:
+        logger.warning(f"Search index unavailable, using ILIKE search: {e}")
+        return None
+
+
+def ranking_name(kind: str, q: str) -> str:
+    """Cursor sort name for a relevance ranking, so cursors only resume the same search"""
+    digest = hashlib.blake2b(f"{kind}\0{' '.join(tokenize(q))}".encode(), digest_size=6).hexdigest()
+    return f"relevance:{digest}"
+
+
+# ===================================================================
+# Background sync
+# ===================================================================
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _sync_loop(session_factory):
+    while not _stop.is_set():
+        db = session_factory()
+        try:
+            index = get_search_index()
+            missing = [kind for kind in KINDS if not search_ready(kind, index)]
+            refresh_search_index(db, index)
+            if missing:
+                build_search_index(db, index, missing)
+        except Exception as e:
+            logger.warning(f"Search index sync failed; unbuilt kinds use ILIKE search: {e}")
+        finally:
+            db.close()
+        _stop.wait(SEARCH_INDEX_REFRESH_SECONDS)
+
+
+def start_search_index_sync(session_factory=None) -> Optional[threading.Thread]:
+    """Build missing kinds, then keep catching up on changed rows, in a background thread."""
+    global _thread
+    if not SEARCH_INDEX_ENABLED or (_thread is not None and _thread.is_alive()):
+        return None
+    if session_factory is None:
+        from config.db import SessionLocal
+        session_factory = SessionLocal
+    _stop.clear()
+    _thread = threading.Thread(target=_sync_loop, args=(session_factory,),
+                               name="search-index-sync", daemon=True)
+    _thread.start()
+    return _thread
+
+
+def close_search_index():
+    global _index, _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+            _index = None
+
+
+# ===================================================================
+# Incremental updates from ORM writes
+# ===================================================================
+
+# Changes are collected at flush time and applied once the session commits,
+# so rolled-back writes never reach the index.
+_PENDING_KEY = "search_index_pending"
+
+
+def _queue_change(target, kind: str, doc: Optional[SearchDoc], entity_id: int):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((kind, doc, entity_id))
+
+
+def _register_listeners():
+    for kind, (model, _, doc_fn) in _sources().items():
+        def _upsert(mapper, connection, target, kind=kind, doc_fn=doc_fn):
+            _queue_change(target, kind, doc_fn(target), target.id)
+
+        def _delete(mapper, connection, target, kind=kind):
+            _queue_change(target, kind, None, target.id)
+
+        event.listen(model, "after_insert", _upsert)
+        event.listen(model, "after_update", _upsert)
+        event.listen(model, "after_delete", _delete)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes_after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, [])
+    if not changes or _index is None:
+        return
+    try:
+        _index.upsert(doc for _, doc, _ in changes if doc is not None)
+        for kind, doc, entity_id in changes:
+            if doc is None:
+                _index.remove(kind, [entity_id])
+    except Exception as e:
+        # The periodic updated_at refresh picks the rows up again
+        logger.warning(f"Search index update failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_changes_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_register_listeners()
@@ -1,6 +1,9 @@
 """
 Storage abstraction layer for media files.
 Supports both local filesystem (development) and S3 (production).
+
+The async methods run their blocking filesystem/boto3 calls on the media
+I/O thread pool (src.media_offload), so they are safe to await from routes.
 """
 
 import os
@@ -11,6 +14,7 @@ from abc import ABC, abstractmethod
 import boto3
 from botocore.exceptions import ClientError
 import logging
+from src.media_offload import run_io
 
 logger = logging.getLogger(__name__)
 
@@ -128,22 +132,27 @@ class LocalFileStorage(StorageBackend):
         # Generate organized path
         storage_path = generate_organized_path(profile_id, entity_field, filename)
 
-        # Create full directory path
-        file_path = self.base_dir / storage_path
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Save file
-        with open(file_path, 'wb') as f:
-            content = file_data.read()
-            f.write(content)
+        # Write off the event loop
+        await run_io(self._write_file, self.base_dir / storage_path, file_data)
 
         access_url = f"{self.base_url}/uploads/{storage_path}"
         logger.info(f"Saved file locally: {storage_path} -> {access_url}")
 
         return storage_path, access_url
 
+    @staticmethod
+    def _write_file(file_path: Path, file_data: BinaryIO):
+        """Create the directory path and write the file (blocking)"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'wb') as f:
+            content = file_data.read()
+            f.write(content)
+
     async def delete(self, storage_path: str) -> bool:
         """Delete file from local filesystem"""
+        return await run_io(self._delete_file, storage_path)
+
+    def _delete_file(self, storage_path: str) -> bool:
         try:
             file_path = self.base_dir / storage_path
             if file_path.exists():
@@ -216,8 +225,9 @@ class S3Storage(StorageBackend):
         storage_path = generate_organized_path(profile_id, entity_field, filename)
 
         try:
-            # Upload to S3/MinIO
-            self.s3_client.upload_fileobj(
+            # Upload to S3/MinIO (boto3 is blocking; clients are thread-safe)
+            await run_io(
+                self.s3_client.upload_fileobj,
                 file_data,
                 self.bucket_name,
                 storage_path,
@@ -247,7 +257,7 @@ class S3Storage(StorageBackend):
     async def delete(self, storage_path: str) -> bool:
         """Delete file from S3"""
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=storage_path)
+            await run_io(self.s3_client.delete_object, Bucket=self.bucket_name, Key=storage_path)
             logger.info(f"Deleted from S3: {storage_path}")
             return True
         except ClientError as e:
@@ -2,20 +2,13 @@
 import logging
 import secrets, string
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
-from passlib.context import CryptContext
+from typing import Optional, Dict, Any, Tuple
 import jwt
 from config.settings import JWT_SECRET, JWT_ISS, JWT_ALG, ACCESS_TTL_MIN
+from src.password_hashing import PasswordHashingBusy, get_password_hasher
 
 logger = logging.getLogger(__name__)
 
-# Centralized password hashing policy (allows painless future upgrades)
-PWD_CONTEXT = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    # You can tune rounds via env if desired: bcrypt__rounds=12
-)
-
 SAFE_ALPHABET = string.ascii_letters + string.digits
 
 def _now_utc() -> datetime:
@@ -31,19 +24,31 @@ def gen_public_id(n: int = 26) -> str:
 def gen_token_hex(n_bytes=32):
     return secrets.token_hex(n_bytes)
 
+# Password hashing runs on the bounded pool in src/password_hashing.py; every
+# helper below raises PasswordHashingBusy (HTTP 429) when that pool is full.
 def hash_password(pw: str) -> str:
     if not pw:
         raise ValueError("Password must not be empty")
-    return PWD_CONTEXT.hash(pw)
+    return get_password_hasher().hash(pw)
 
-def verify_password(pw: str, hashed: str) -> bool:
+def verify_and_rehash_password(pw: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; on success also return a new hash if the stored one uses an outdated scheme/cost."""
     if not hashed:
-        return False
+        return False, None
     try:
-        return PWD_CONTEXT.verify(pw, hashed)
+        return get_password_hasher().verify_and_update(pw, hashed)
+    except PasswordHashingBusy:
+        raise
     except Exception:
         logger.warning("Password verification failed due to malformed hash", exc_info=True)
-        return False
+        return False, None
+
+def verify_password(pw: str, hashed: str) -> bool:
+    return verify_and_rehash_password(pw, hashed)[0]
+
+def password_algo(hashed: str) -> str:
+    """Value for UserCredential.password_algo of a hash made by hash_password()."""
+    return get_password_hasher().identify(hashed) or "bcrypt"
 
 def make_access_token(user_public_id: str, user_id: str, email: str) -> str:
     """Issue a short-lived access token.
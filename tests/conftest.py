@@ -0,0 +1,63 @@
+"""
+Shared test setup.
+
+Every model is registered once for the whole suite (relationships resolve
+other models by name), and database-backed tests get a throwaway SQLite file
+per test.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.mysql import BIGINT as MyBIGINT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from model import load_all_models
+from model.base import Base
+from model.profiles.builder import BuilderProfile, builder_portfolio
+from model.profiles.community import Community
+from model.property.property import Property
+from model.user import Users
+
+load_all_models()
+
+
+@compiles(MyBIGINT, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """File-backed SQLite engine, usable from worker threads; disposed after the test."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def create_tables(sqlite_engine):
+    """
+    Create model tables in sqlite_engine and return a session factory for it.
+
+    The users table is created without its indexes, since the model declares
+    ix_users_role twice.
+    """
+    def create(*tables, **session_kwargs):
+        users = Users.__table__
+        if users in tables:
+            with sqlite_engine.begin() as conn:
+                conn.execute(CreateTable(users))
+        Base.metadata.create_all(sqlite_engine, tables=[table for table in tables if table is not users])
+        return sessionmaker(bind=sqlite_engine, **session_kwargs)
+
+    return create
+
+
+@pytest.fixture
+def property_tables(create_tables):
+    """Session factory over properties plus the tables its selectin relationships read."""
+    return create_tables(
+        Users.__table__, Property.__table__, BuilderProfile.__table__, Community.__table__, builder_portfolio
+    )
@@ -0,0 +1,178 @@
+"""
+Test the cached auth layer in config/security.py.
+
+Tests:
+- Verified tokens are served from the decode cache, but expiry is still enforced
+- Tampered, refresh-typed and subject-less tokens are rejected with 401
+- Principals are cached (no query on a hit) and invalidated when a Users update commits,
+  but not when it rolls back
+- A principal loaded before an invalidation is not re-cached afterwards
+- require_admin_or_self and the config.dependencies role checks work on string roles
+- Admins pass require_admin and require_admin_or_self; everyone else gets 403
+"""
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from config import security
+from config.dependencies import require_admin, require_principal_roles, require_roles
+from config.security import (
+    clear_auth_caches,
+    create_access_token,
+    decode_token,
+    get_current_principal,
+    get_current_user,
+    get_principal,
+    get_token_claims,
+    invalidate_principal,
+    require_admin_or_self,
+)
+from model.user import Users
+from src.utils import make_access_token
+
+
+def _creds(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    clear_auth_caches()
+    yield
+    clear_auth_caches()
+
+
+@pytest.fixture
+def db(create_tables, sqlite_engine):
+    session = create_tables(Users.__table__)()
+    session.add_all([
+        Users(id=1, user_id="USR-1", email="ana@example.com", first_name="Ana", last_name="B",
+              role="buyer", status="active"),
+        Users(id=2, user_id="USR-2", email="root@example.com", first_name="Root", last_name="C",
+              role="admin", status="active"),
+    ])
+    session.commit()
+
+    queries = []
+    event.listen(sqlite_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    session.queries = queries
+    yield session
+    session.close()
+
+
+def test_decode_cache_still_checks_expiry(monkeypatch):
+    token = make_access_token("USR-1", 1, "ana@example.com")
+    claims = decode_token(token)
+    assert claims["sub"] == "USR-1" and claims["uid"] == 1
+
+    calls = []
+    monkeypatch.setattr(security, "decode_access_token", lambda *a, **kw: calls.append(a))
+    assert decode_token(token) is claims and calls == []
+
+    monkeypatch.setattr(time, "time", lambda: claims["exp"] + 1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_token(token)
+
+
+def test_bad_tokens_rejected():
+    token = create_access_token({"sub": "USR-1"})
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    refresh = create_access_token({"sub": "USR-1", "typ": "refresh"})
+    expired = create_access_token({"sub": "USR-1"}, expires_delta=timedelta(seconds=-5))
+    no_sub = create_access_token({"uid": 1})
+
+    assert get_token_claims(_creds(token))["sub"] == "USR-1"
+    for bad in (tampered, refresh, expired, no_sub, "not-a-jwt"):
+        with pytest.raises(HTTPException) as exc:
+            get_token_claims(_creds(bad))
+        assert exc.value.status_code == 401
+
+
+def test_principal_cached_and_invalidated_on_commit(db):
+    token = make_access_token("USR-1", 1, "ana@example.com")
+    first = get_current_principal(db=db, creds=_creds(token))
+    assert (first.id, first.role, first.is_active) == (1, "buyer", True)
+
+    db.queries.clear()
+    assert get_current_principal(db=db, creds=_creds(token)) is first
+    assert db.queries == []
+
+    # Rolled back: the cached principal stays
+    db.get(Users, 1).role = "admin"
+    db.flush()
+    db.rollback()
+    assert get_principal(db, "USR-1") is first
+
+    # Committed role change and suspension are visible on the next request
+    db.get(Users, 1).role = "admin"
+    db.commit()
+    assert get_principal(db, "USR-1").is_admin
+
+    db.get(Users, 1).status = "suspended"
+    db.commit()
+    assert not get_principal(db, "USR-1").is_active
+
+    # get_current_user still returns the full row
+    assert get_current_user(db=db, creds=_creds(token)).email == "ana@example.com"
+
+
+def test_stale_load_not_recached(db, monkeypatch):
+    real_execute = db.execute
+
+    def execute_then_invalidate(*args, **kwargs):
+        result = real_execute(*args, **kwargs)
+        invalidate_principal("USR-1")  # e.g. a logout landing mid-load
+        return result
+
+    monkeypatch.setattr(db, "execute", execute_then_invalidate)
+    assert get_principal(db, "USR-1") is not None
+    monkeypatch.undo()
+
+    db.queries.clear()
+    get_principal(db, "USR-1")
+    assert len(db.queries) == 1
+
+
+def test_role_checks(db):
+    user_token = make_access_token("USR-1", 1, "ana@example.com")
+    admin_token = make_access_token("USR-2", 2, "root@example.com")
+
+    assert require_admin_or_self(db=db, creds=_creds(user_token), public_id="USR-1")
+    assert require_admin_or_self(db=db, creds=_creds(admin_token), public_id="USR-1")
+    for kwargs in ({"public_id": "USR-2"}, {}):
+        with pytest.raises(HTTPException) as exc:
+            require_admin_or_self(db=db, creds=_creds(user_token), **kwargs)
+        assert exc.value.status_code == 403
+
+    admins_only = require_roles(["admin"])
+    assert admins_only(user=db.get(Users, 2)).id == 2
+    with pytest.raises(HTTPException):
+        admins_only(user=db.get(Users, 1))
+
+    buyers_only = require_principal_roles(["buyer"])
+    assert buyers_only(principal=get_principal(db, "USR-1")).user_id == "USR-1"
+    with pytest.raises(HTTPException):
+        buyers_only(principal=get_principal(db, "USR-2"))
+
+
+def test_admin_checks_admit_admins_only(db):
+    # users.role is a string; these checks used to read role.key and so
+    # answered 403 to admins as well
+    admin, buyer = db.get(Users, 2), db.get(Users, 1)
+    assert require_admin(user=admin) is admin
+    with pytest.raises(HTTPException) as exc:
+        require_admin(user=buyer)
+    assert exc.value.status_code == 403
+
+    admin_token = make_access_token("USR-2", 2, "root@example.com")
+    user_token = make_access_token("USR-1", 1, "ana@example.com")
+    assert require_admin_or_self(db=db, creds=_creds(admin_token))
+    assert require_admin_or_self(db=db, creds=_creds(admin_token), public_id="USR-3")
+    with pytest.raises(HTTPException) as exc:
+        require_admin_or_self(db=db, creds=_creds(user_token), public_id="USR-3")
+    assert exc.value.status_code == 403
@@ -0,0 +1,49 @@
+"""
+Test the Claude response cache.
+
+Tests:
+- Cached responses expire after the TTL
+- Least recently used entries are evicted over the size budget
+- Only cleanly parsed replies are marked cacheable
+"""
+import time
+
+from src.collection.claude_cache import ClaudeResponseCache, cache_key
+from src.collection.claude_pipeline import parse_claude_response
+
+
+def test_ttl_expiry(tmp_path):
+    cache = ClaudeResponseCache(str(tmp_path / "cache.db"), ttl_seconds=1, max_bytes=10_000)
+    key = cache_key("prompt", "model", 100)
+
+    cache.put(key, "model", 100, {"name": "Willow Creek"})
+    assert cache.get(key) == {"name": "Willow Creek"}
+    assert cache_key("prompt", "model", 200) != key
+    assert cache_key("prompt", "model", 100, temperature=0) != key
+
+    cache._conn.execute("UPDATE claude_responses SET created_at = created_at - 5")
+    assert cache.get(key) is None
+    assert cache.stats["expired"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ClaudeResponseCache(str(tmp_path / "cache.db"), ttl_seconds=3600, max_bytes=250)
+    payload = {"text": "x" * 90}
+
+    cache.put("a", "model", 1, payload)
+    time.sleep(0.01)
+    cache.put("b", "model", 1, payload)
+    time.sleep(0.01)
+    assert cache.get("a") is not None  # a is now more recently used than b
+    cache.put("c", "model", 1, payload)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_parse_marks_repaired_replies_unclean():
+    assert parse_claude_response('{"a": 1}') == ({"a": 1}, True)
+    assert parse_claude_response('Here:\n```json\n{"a": 1}\n```') == ({"a": 1}, True)
+    assert parse_claude_response('{"a": {"b": 1}, "c": [1, 2') == ({"a": {"b": 1}}, False)
+    assert parse_claude_response("no json") == ({"raw_response": "no json"}, False)
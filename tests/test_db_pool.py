@@ -0,0 +1,53 @@
+"""
+Test the shared database connection pool instrumentation.
+
+Tests:
+- Checkout/checkin counters
+- Wait and timeout tracking on an exhausted pool
+"""
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy import exc as sa_exc
+
+from config.db import InstrumentedQueuePool, pool_metrics
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    """File-backed SQLite engine with a single-connection instrumented pool."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    event.listen(engine, "checkout", lambda *args: pool_metrics.record_checkout())
+    event.listen(engine, "checkin", lambda *args: pool_metrics.record_checkin())
+    pool_metrics.reset()
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_and_checkin_are_counted(small_engine):
+    for _ in range(3):
+        with small_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    stats = pool_metrics.snapshot()
+    assert stats["checkouts"] == 3
+    assert stats["checkins"] == 3
+    assert stats["timeouts"] == 0
+
+
+def test_exhausted_pool_records_timeout(small_engine):
+    held = small_engine.connect()
+    try:
+        with pytest.raises(sa_exc.TimeoutError):
+            small_engine.connect()
+    finally:
+        held.close()
+
+    stats = pool_metrics.snapshot()
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 100
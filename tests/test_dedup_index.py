@@ -0,0 +1,197 @@
+"""
+Test the in-memory duplicate detection index.
+
+Tests:
+- Trigram blocking returns every name a full scan would accept
+- Builder and community lookups keep the original match methods
+- Committed writes update the index; rolled-back writes do not
+- Refreshes pick up rows changed outside the ORM
+- Batch resolution matches single lookups in a constant number of queries
+- Builder cards are only linked to profiles already tied to the community
+"""
+import random
+import string
+
+import pytest
+from sqlalchemy import event, text
+
+from config.collection_config import CollectionConfig
+from model.collection import CollectionJob, CollectionJobLog
+from model.profiles.builder import BuilderProfile, builder_communities, builder_portfolio
+from model.profiles.community import Community, CommunityBuilder
+from model.property.property import Property
+from model.user import Users
+from src.collection import dedup_index
+from src.collection.community_collector import CommunityCollector
+from src.collection.dedup_index import DedupEntry, DedupIndex, gram_similarity, name_grams
+from src.collection.duplicate_detection import (
+    find_duplicate_builder,
+    find_duplicate_community,
+    resolve_builders,
+    resolve_communities,
+)
+
+
+@pytest.fixture
+def db_session(create_tables):
+    session = create_tables(
+        Users.__table__, BuilderProfile.__table__, Community.__table__, builder_communities,
+        CommunityBuilder.__table__, CollectionJob.__table__, CollectionJobLog.__table__,
+        Property.__table__, builder_portfolio,
+        autoflush=False, autocommit=False,
+    )()
+
+    session.add_all([
+        Community(id=1, community_id="CMY-1", name="Willow Creek Estates", city="Austin", state="TX",
+                  community_website_url="https://willowcreek.com"),
+        Community(id=2, community_id="CMY-2", name="Willow Creek Estates", city="Denver", state="CO"),
+        Community(id=3, community_id="CMY-3", name="Bluebonnet Ridge", city="Austin", state="TX"),
+        BuilderProfile(id=1, builder_id="BLD-1", user_id="USR-1", name="Perry Homes",
+                       website="https://perryhomes.com/", city="Houston", state="TX"),
+        BuilderProfile(id=2, builder_id="BLD-2", user_id="USR-2", name="Perry Homes",
+                       website="https://perryhomes.com", city="Phoenix", state="AZ"),
+        BuilderProfile(id=3, builder_id="BLD-3", user_id="USR-3", name="Highland Homes",
+                       phone="(512) 555-0100", city="Dallas", state="TX"),
+        BuilderProfile(id=4, builder_id="BLD-4", user_id="USR-4", name="Coventry Homes",
+                       phone="(512) 555-0199", city="Reno", state="NV", service_areas=["Austin, TX metro"]),
+    ])
+    session.commit()
+    session.execute(builder_communities.insert().values(builder_id=3, community_id=3))
+    session.commit()
+
+    dedup_index.reset_indexes()
+    yield session
+    dedup_index.reset_indexes()
+    session.close()
+
+
+def test_gram_candidates_match_full_scan():
+    rng = random.Random(7)
+    words = ["oak", "ridge", "creek", "homes", "meadow", "park", "hill", "lake", "estates", "village"]
+    index = DedupIndex()
+    for i in range(2000):
+        name = " ".join(rng.sample(words, 2)) + " " + "".join(rng.choices(string.ascii_lowercase, k=3))
+        index.upsert(DedupEntry(i, name, state=rng.choice(["TX", "CO"])))
+
+    for query in ["oak ridge abc", "creek homes", "lake village xyz", "park"]:
+        grams = name_grams(query)
+        expected = {
+            e.id for e in index.entries.values()
+            if e.state == "TX" and gram_similarity(grams, e.grams) >= 0.3
+        }
+        assert index.gram_candidates(query, "TX", 0.3) == expected
+
+
+def test_community_lookup_methods(db_session):
+    assert find_duplicate_community(db_session, "Other", website="https://WillowCreek.com/") == (1, 1.0, "website_exact")
+    assert find_duplicate_community(db_session, "willow creek estates", "Denver", "CO") == (2, 0.95, "name_location_exact")
+
+    entity_id, score, method = find_duplicate_community(db_session, "Willow Creek Estate", "Austin", "TX")
+    assert (entity_id, method) == (1, "name_fuzzy")
+    assert score == 1.0
+
+    assert find_duplicate_community(db_session, "Completely Different", "Austin", "TX") == (None, None, None)
+
+
+def test_builder_lookup_methods(db_session):
+    # Same corporate website, only the Houston office serves Houston
+    assert find_duplicate_builder(db_session, "Perry", "Houston", "TX", website="perryhomes.com") == (None, None, None)
+    assert find_duplicate_builder(db_session, "Perry", "Houston", "TX", website="https://perryhomes.com") == (
+        1, 0.98, "website_exact_location_validated"
+    )
+    assert find_duplicate_builder(db_session, "Perry", "Mesa", "AZ", phone=None, website="https://perryhomes.com") == (
+        2, 0.98, "website_exact_location_validated"
+    )
+    assert find_duplicate_builder(db_session, "Highland", "Dallas", "TX", phone="512.555.0100") == (
+        3, 0.93, "phone_exact_location_validated"
+    )
+    assert find_duplicate_builder(db_session, "Highland Homes", "Austin", "TX", community_id=3) == (
+        3, 1.0, "name_community_exact"
+    )
+
+    # Matched through service areas even though the builder is based in Nevada
+    entity_id, _, method = find_duplicate_builder(db_session, "Coventry Homes Inc", "Austin", "TX")
+    assert (entity_id, method) == (4, "name_fuzzy_location_validated")
+
+    # Fuzzy match outside the community being collected is not a duplicate
+    assert find_duplicate_builder(db_session, "Coventry Homes Inc", "Austin", "TX", community_id=3) == (None, None, None)
+
+
+def test_index_follows_commits(db_session):
+    assert find_duplicate_community(db_session, "Cedar Hollow", "Austin", "TX") == (None, None, None)
+
+    db_session.add(Community(id=10, community_id="CMY-10", name="Cedar Hollow", city="Austin", state="TX"))
+    db_session.flush()
+    db_session.rollback()
+    assert 10 not in dedup_index.get_community_index(db_session).entries
+
+    db_session.add(Community(id=11, community_id="CMY-11", name="Cedar Hollow", city="Austin", state="TX"))
+    db_session.commit()
+    assert find_duplicate_community(db_session, "Cedar Hollow", "Austin", "TX") == (11, 0.95, "name_location_exact")
+
+    # Bulk deletes bypass the ORM events; the stale entry is dropped on lookup
+    db_session.query(Community).filter(Community.id == 11).delete()
+    db_session.commit()
+    assert find_duplicate_community(db_session, "Cedar Hollow", "Austin", "TX") == (None, None, None)
+
+
+def test_refresh_picks_up_rows_written_elsewhere(db_session, monkeypatch):
+    monkeypatch.setattr(CollectionConfig, "DEDUP_INDEX_REFRESH_SECONDS", 0)
+    assert 12 not in dedup_index.get_community_index(db_session).entries
+
+    # Another process's write: no ORM events, updated_at from the database clock
+    db_session.execute(text(
+        "INSERT INTO communities (id, community_id, name, city, state, updated_at) "
+        "VALUES (12, 'CMY-12', 'Birch Meadow', 'Austin', 'TX', CURRENT_TIMESTAMP)"
+    ))
+    db_session.commit()
+    assert 12 in dedup_index.get_community_index(db_session).entries
+
+
+def test_batch_resolution_matches_single_lookups(db_session):
+    records = [
+        {"name": "Perry", "city": "Houston", "state": "TX", "website": "https://perryhomes.com"},
+        {"name": "Highland Homes", "city": "Austin", "state": "TX", "community_id": 3},
+        {"name": "Highland", "city": "Dallas", "state": "TX", "phone": "512.555.0100"},
+        {"name": "Coventry Homes Inc", "city": "Austin", "state": "TX"},
+        {"name": "Coventry Homes Inc", "city": "Austin", "state": "TX", "community_id": 3},
+        {"name": "Brand New Builder", "city": "Austin", "state": "TX", "community_id": 1},
+    ] * 10
+    expected = [find_duplicate_builder(db_session, **record) for record in records]
+
+    statements = []
+    event.listen(db_session.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert resolve_builders(db_session, records) == expected
+    assert len(statements) <= 2
+
+    communities = [
+        {"name": "Willow Creek Estate", "city": "Austin", "state": "TX"},
+        {"name": "Other", "website": "https://willowcreek.com"},
+        {"name": "Nowhere", "city": "Austin", "state": "TX"},
+    ]
+    assert resolve_communities(db_session, communities) == [
+        find_duplicate_community(db_session, **record) for record in communities
+    ]
+
+
+def test_builder_cards_link_only_community_builders(db_session):
+    # Coventry serves Austin through its service areas but is not tied to Bluebonnet Ridge
+    db_session.add(CollectionJob(job_id="JOB-1", entity_type="community", job_type="discovery", status="running"))
+    db_session.commit()
+
+    discovered = [
+        {"name": "Highland Homes"},
+        {"name": "Coventry", "phone": "512-555-0199"},
+        {"name": "Brand New Builder"},
+    ]
+    matches = resolve_builders(db_session, [
+        {**b, "city": "Austin", "state": "TX", "community_id": 3} for b in discovered
+    ])
+    assert [m[0] for m in matches] == [3, 4, None]
+
+    collector = CommunityCollector(db_session, "JOB-1")
+    collector._populate_builder_cards({"name": "Bluebonnet Ridge", "builders": discovered})
+
+    cards = {card.name: card.builder_profile_id for card in db_session.query(CommunityBuilder)}
+    # Unlinked cards get builder jobs, which tie the builder to the community
+    assert cards == {"Highland Homes": 3, "Coventry": None, "Brand New Builder": None}
@@ -0,0 +1,275 @@
+"""
+Test DB-backed batch lot detection jobs.
+
+Tests:
+- A job's phases are downloaded, detected and stored one by one, with failures recorded per phase
+- A requeued job (expired lease) only runs the phases that had not finished
+- Cancelling a running job stops it without storing further results
+- A runner that lost its lease stops without writing results or completing the job
+- Stopping a runner mid-job requeues the job for another runner instead of failing it
+- Progress is streamed as server-sent events until the job finishes
+"""
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from model.detection_job import LotDetectionJob, LotDetectionJobItem
+from services.detection_jobs import (
+    DetectionJobRunner,
+    cancel_detection_job,
+    create_detection_job,
+    job_events,
+    job_snapshot,
+)
+
+
+@pytest.fixture
+def session_factory(create_tables):
+    return create_tables(
+        LotDetectionJob.__table__, LotDetectionJobItem.__table__, autoflush=False, autocommit=False
+    )
+
+
+def fake_download(storage_path):
+    if storage_path.startswith("missing"):
+        raise FileNotFoundError(storage_path)
+    return storage_path.encode()
+
+
+def fake_detect(data, method, parameters):
+    if data == b"corrupt.png":
+        raise ValueError("Could not decode image")
+    count = len(data) % 5
+    return {"lots_detected": count, "lots": [{"lot_number": str(i)} for i in range(count)]}
+
+
+def _create(session_factory, paths, method="auto"):
+    db = session_factory()
+    job_id = create_detection_job(
+        db, [(100 + i, path) for i, path in enumerate(paths)], method, {"min_area": 500}
+    ).job_id
+    db.close()
+    return job_id
+
+
+def _snapshot(session_factory, job_id, include_results=False):
+    db = session_factory()
+    try:
+        return job_snapshot(db, job_id, include_results)
+    finally:
+        db.close()
+
+
+def _runner(session_factory, detect=fake_detect, **kwargs):
+    return DetectionJobRunner(
+        session_factory=session_factory, workers=0, prefetch_workers=3,
+        poll_interval=0.01, download=fake_download, detect=detect, **kwargs
+    )
+
+
+def test_job_runs_and_stores_each_phase(session_factory):
+    paths = ["a.png", "bb.png", "missing.png", "corrupt.png", "ccc.png"]
+    job_id = _create(session_factory, paths)
+    runner = _runner(session_factory)
+
+    assert runner.claim_job() == job_id
+    assert runner.claim_job() is None
+    runner.run_job(job_id)
+
+    snapshot = _snapshot(session_factory, job_id, include_results=True)
+    assert snapshot["status"] == "completed"
+    assert (snapshot["completed_phases"], snapshot["failed_phases"]) == (3, 2)
+    assert snapshot["progress"] == 1.0
+    assert [p["phase_id"] for p in snapshot["results"]] == [100, 101, 102, 103, 104]
+    assert [p["status"] for p in snapshot["results"]] == ["completed", "completed", "failed", "failed", "completed"]
+    assert "missing.png" in snapshot["results"][2]["error"]
+    assert snapshot["results"][3]["error"] == "Could not decode image"
+
+    expected = [len(p) % 5 for p in ("a.png", "bb.png", "ccc.png")]
+    completed = [p for p in snapshot["results"] if p["status"] == "completed"]
+    assert [p["lots_detected"] for p in completed] == expected
+    assert [len(p["lots"]) for p in completed] == expected
+    assert snapshot["lots_detected"] == sum(expected)
+
+    db = session_factory()
+    job = db.get(LotDetectionJob, job_id)
+    assert job.lease_owner is None and job.attempts == 1
+    db.close()
+
+
+def test_requeued_job_skips_finished_phases(session_factory):
+    job_id = _create(session_factory, ["a.png", "bb.png", "ccc.png"])
+    crashed = _runner(session_factory)
+    assert crashed.claim_job() == job_id
+
+    # The crashed runner had finished the first phase and was working on the second
+    db = session_factory()
+    job = db.get(LotDetectionJob, job_id)
+    job.completed_phases, job.lots_detected = 1, 3
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    items = db.query(LotDetectionJobItem).order_by(LotDetectionJobItem.position).all()
+    items[0].status, items[0].lots_detected = "completed", 3
+    items[1].status = "running"
+    db.commit()
+    db.close()
+
+    detected = []
+
+    def recording_detect(data, method, parameters):
+        detected.append(data)
+        return fake_detect(data, method, parameters)
+
+    runner = _runner(session_factory, detect=recording_detect)
+    assert runner.claim_job() == job_id
+    runner.run_job(job_id)
+
+    assert sorted(detected) == [b"bb.png", b"ccc.png"]
+    snapshot = _snapshot(session_factory, job_id)
+    assert snapshot["status"] == "completed"
+    assert snapshot["completed_phases"] == 3
+    assert snapshot["lots_detected"] == 3 + len("bb.png") % 5 + len("ccc.png") % 5
+    assert runner.stats["leases_expired"] == 1
+
+
+def test_lease_expiring_too_often_fails_job(session_factory):
+    job_id = _create(session_factory, ["a.png"])
+    runner = _runner(session_factory, max_attempts=1)
+    assert runner.claim_job() == job_id
+
+    db = session_factory()
+    db.get(LotDetectionJob, job_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    db.close()
+
+    assert runner.claim_job() is None
+    snapshot = _snapshot(session_factory, job_id)
+    assert snapshot["status"] == "failed"
+    assert "lease expired" in snapshot["error"]
+
+
+def test_cancel_stops_running_job(session_factory):
+    job_id = _create(session_factory, [f"{i}.png" for i in range(6)])
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_detect(data, method, parameters):
+        started.set()
+        release.wait(5)
+        return fake_detect(data, method, parameters)
+
+    runner = _runner(session_factory, detect=blocking_detect, lease_seconds=3)
+    assert runner.claim_job() == job_id
+    thread = threading.Thread(target=runner.run_job, args=(job_id,))
+    thread.start()
+    assert started.wait(5)
+
+    db = session_factory()
+    assert cancel_detection_job(db, job_id)
+    assert not cancel_detection_job(db, job_id)
+    db.close()
+    release.set()
+    thread.join(10)
+
+    snapshot = _snapshot(session_factory, job_id)
+    assert snapshot["status"] == "cancelled"
+    statuses = {p["status"] for p in snapshot["results"]}
+    assert statuses <= {"completed", "cancelled"} and "cancelled" in statuses
+
+
+def test_lost_lease_stops_without_writing(session_factory):
+    job_id = _create(session_factory, [f"{i}.png" for i in range(4)])
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_detect(data, method, parameters):
+        started.set()
+        release.wait(5)
+        return fake_detect(data, method, parameters)
+
+    runner = _runner(session_factory, detect=blocking_detect, lease_seconds=3)
+    assert runner.claim_job() == job_id
+    thread = threading.Thread(target=runner.run_job, args=(job_id,))
+    thread.start()
+    assert started.wait(5)
+
+    # The lease expired and another runner took the job over
+    db = session_factory()
+    job = db.get(LotDetectionJob, job_id)
+    job.lease_owner = "other-runner"
+    db.commit()
+    db.close()
+    release.set()
+    thread.join(10)
+
+    snapshot = _snapshot(session_factory, job_id)
+    assert snapshot["status"] == "running"
+    assert snapshot["completed_phases"] == 0
+    db = session_factory()
+    assert db.get(LotDetectionJob, job_id).lease_owner == "other-runner"
+    db.close()
+
+
+def test_stop_during_run_requeues_job(session_factory):
+    job_id = _create(session_factory, [f"{i}.png" for i in range(4)])
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_detect(data, method, parameters):
+        started.set()
+        release.wait(5)
+        return fake_detect(data, method, parameters)
+
+    runner = _runner(session_factory, detect=blocking_detect, lease_seconds=30)
+    runner.start()
+    assert started.wait(5)
+    runner.stop(timeout=5)
+    release.set()
+    assert not runner.status()["running"]
+
+    snapshot = _snapshot(session_factory, job_id)
+    assert snapshot["status"] == "pending" and snapshot["error"] is None
+    assert (snapshot["completed_phases"], snapshot["failed_phases"]) == (0, 0)
+    assert {p["status"] for p in snapshot["results"]} == {"pending"}
+    db = session_factory()
+    job = db.get(LotDetectionJob, job_id)
+    assert job.lease_owner is None and job.attempts == 0
+    db.close()
+
+    # Another runner picks it up and finishes it
+    other = _runner(session_factory)
+    assert other.claim_job() == job_id
+    other.run_job(job_id)
+    assert _snapshot(session_factory, job_id)["status"] == "completed"
+
+
+def test_job_events_stream_progress(session_factory):
+    job_id = _create(session_factory, ["a.png", "missing.png", "bb.png"])
+    runner = _runner(session_factory)
+
+    async def collect():
+        events = []
+        async for message in job_events(job_id, session_factory, interval=0.01):
+            event, data = message.strip().split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+            if len(events) == 1:
+                # Pending job seen by the stream; now run it
+                runner.claim_job()
+                await asyncio.to_thread(runner.run_job, job_id)
+        return events
+
+    events = asyncio.run(collect())
+    kinds = [kind for kind, _ in events]
+
+    assert kinds[0] == "progress" and events[0][1]["status"] == "pending"
+    assert kinds[-1] == "done" and events[-1][1]["status"] == "completed"
+    phases = [data for kind, data in events if kind == "phase"]
+    assert [p["phase_id"] for p in phases] == [100, 101, 102]
+    assert [p["status"] for p in phases] == ["completed", "failed", "completed"]
+
+    missing = asyncio.run(_first_event("no-such-job", session_factory))
+    assert missing.startswith("event: error")
+
+
+async def _first_event(job_id, session_factory):
+    async for message in job_events(job_id, session_factory, interval=0.01):
+        return message
@@ -0,0 +1,175 @@
+"""
+Test geospatial (map) search.
+
+Tests:
+- Geohashes match the reference encoding and follow coordinate changes on the models
+- Covering ranges stay within the cell budget and contain every point of the box,
+  including boxes across the antimeridian
+- Radius search through list_properties returns exactly the properties within the
+  radius, nearest first, across cursor pages; bbox search returns the box's properties
+- Marker clusters account for every property in the viewport and coarsen as zoom drops
+- Partial radius params, radius + bbox, and malformed boxes are rejected with 400
+"""
+import random
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, Response
+
+from config.settings import GEO_MAX_CELLS
+from model.profiles.community import Community
+from model.property.property import Property
+from routes.property.property import cluster_properties, list_properties
+from src.geo import (
+    BoundingBox,
+    area_from_params,
+    covering_ranges,
+    encode_geohash,
+    haversine_km,
+    nearest_ids,
+    parse_bbox,
+    zoom_precision,
+)
+from src.pagination import NEXT_CURSOR_HEADER
+
+AUSTIN = (30.2672, -97.7431)
+
+
+def test_geohash_reference_values():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(*AUSTIN, 5) == "9v6kp"
+    assert encode_geohash(None, -97.7) is None
+
+
+def test_models_keep_geohash_current():
+    home = Property(latitude=AUSTIN[0], longitude=AUSTIN[1])
+    assert home.geohash == encode_geohash(*AUSTIN)
+    home.longitude = -97.70
+    assert home.geohash == encode_geohash(AUSTIN[0], -97.70)
+
+    community = Community(longitude=AUSTIN[1], latitude=AUSTIN[0])
+    assert community.geohash == encode_geohash(*AUSTIN)
+    community.latitude = None
+    assert community.geohash is None
+
+
+@pytest.mark.parametrize("box", [
+    BoundingBox(30.1, -97.9, 30.4, -97.6),
+    BoundingBox(30.2672, -97.7431, 30.2673, -97.7430),
+    BoundingBox(-10.0, 170.0, 10.0, -170.0),  # across the antimeridian
+    BoundingBox(20.0, -125.0, 50.0, -65.0),
+])
+def test_covering_ranges_contain_box(box):
+    ranges = covering_ranges(box)
+    assert 0 < len(ranges) <= GEO_MAX_CELLS
+
+    rng = random.Random(3)
+    for _ in range(2000):
+        lat = rng.uniform(box.min_lat, box.max_lat)
+        lo, hi = box.lng_spans()[rng.randrange(len(box.lng_spans()))]
+        geohash = encode_geohash(lat, rng.uniform(lo, hi))
+        assert any(start <= geohash and (end is None or geohash < end) for start, end in ranges)
+
+
+def test_area_params_validation():
+    for args in [(30.0, None, 5.0, None), (30.0, -97.0, 5.0, "30,-98,31,-97")]:
+        with pytest.raises(HTTPException) as exc:
+            area_from_params(*args)
+        assert exc.value.status_code == 400
+    for bad in ("1,2,3", "31,-98,30,-97", "a,b,c,d", "30,-200,31,-97"):
+        with pytest.raises(HTTPException):
+            parse_bbox(bad)
+    assert area_from_params(None, None, None, None) == (None, None, None)
+
+
+# ===================================================================
+# Database-backed
+# ===================================================================
+
+@pytest.fixture
+def db(property_tables):
+    session = property_tables()
+
+    rng = random.Random(11)
+    for i in range(1, 401):
+        session.add(Property(
+            id=i, title=f"Home {i}", address1=f"{i} Main St", city="Austin", state="TX", postal_code="78701",
+            builder_id=1, community_id=1, price=Decimal(300000 + 1000 * i), bedrooms=3,
+            latitude=None if i % 40 == 0 else AUSTIN[0] + rng.uniform(-0.5, 0.5),
+            longitude=None if i % 40 == 0 else AUSTIN[1] + rng.uniform(-0.5, 0.5),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _list(db, **params):
+    response = Response()
+    params = {"skip": 0, "limit": 20, "cursor": None, "search": None, "city": None, "state": None, "min_price": None,
+              "lat": None, "lng": None, "radius_km": None, "bbox": None,
+              "max_price": None, "min_beds": None, "min_baths": None, "builder_id": None,
+              "community_id": None, "has_pool": None, "sort": None, **params}
+    items = list_properties(response=response, db=db, **params)
+    return [p.id for p in items], response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def _walk(db, **params):
+    seen, cursor = [], None
+    while True:
+        ids, cursor = _list(db, cursor=cursor, limit=13, **params)
+        seen.extend(ids)
+        if cursor is None:
+            return seen
+
+
+def test_radius_search_nearest_first(db):
+    rows = [r for r in db.query(Property).all() if r.latitude is not None]
+    distances = {r.id: float(haversine_km(AUSTIN[0], AUSTIN[1], r.latitude, r.longitude)) for r in rows}
+    expected = sorted((i for i, d in distances.items() if d <= 20), key=lambda i: (distances[i], i))
+    assert 20 < len(expected) < 200
+
+    assert _walk(db, lat=AUSTIN[0], lng=AUSTIN[1], radius_km=20) == expected
+    # The SQL ordering matches haversine_km and stops at the limit
+    assert nearest_ids(db.query(Property), Property.id, Property.latitude, Property.longitude,
+                       AUSTIN, 20, limit=5) == expected[:5]
+
+    # Another sort still keeps to the circle
+    ids = _walk(db, lat=AUSTIN[0], lng=AUSTIN[1], radius_km=20, sort="price_desc")
+    assert ids == sorted(expected, reverse=True)  # price rises with id
+
+
+def test_bbox_search(db):
+    box = "30.1,-97.9,30.4,-97.6"
+    expected = {r.id for r in db.query(Property).all()
+                if r.latitude is not None and 30.1 <= r.latitude <= 30.4 and -97.9 <= r.longitude <= -97.6}
+    ids = _walk(db, bbox=box)
+    assert sorted(ids) == sorted(expected) and len(ids) == len(set(ids))
+
+    center = (30.25, -97.75)
+    by_id = {r.id: r for r in db.query(Property).filter(Property.id.in_(ids))}
+    distances = [float(haversine_km(*center, by_id[i].latitude, by_id[i].longitude)) for i in ids]
+    assert distances == sorted(distances)
+
+    assert _walk(db, bbox=box, sort="price_asc") == sorted(expected)
+
+    with pytest.raises(HTTPException):
+        _list(db, sort="distance")
+
+
+def test_clusters_cover_viewport(db):
+    box = "29.7,-98.3,30.8,-97.2"
+    in_box = sum(1 for r in db.query(Property).all() if r.latitude is not None)
+
+    def cluster(zoom):
+        return cluster_properties(db=db, bbox=box, zoom=zoom, city=None, state=None, min_price=None,
+                                  max_price=None, min_beds=None, min_baths=None, builder_id=None,
+                                  community_id=None, has_pool=None)
+
+    coarse, fine = cluster(8), cluster(14)
+    assert coarse["total"] == fine["total"] == in_box
+    assert coarse["precision"] == zoom_precision(8) < fine["precision"]
+    assert len(coarse["clusters"]) < len(fine["clusters"])
+    for c in fine["clusters"]:
+        assert len(c["geohash"]) == fine["precision"]
+        assert (c["id"] is not None) == (c["count"] == 1)
+        assert 29.7 <= c["latitude"] <= 30.8 and -98.3 <= c["longitude"] <= -97.2
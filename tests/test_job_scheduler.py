@@ -0,0 +1,104 @@
+"""
+Test the DB-backed collection job scheduler.
+
+Tests:
+- Per-entity-type concurrency limits when claiming
+- No double claims across scheduler instances
+- Expired leases are failed and free their slot
+- Manual starts claim a specific job once
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from config.collection_config import CollectionConfig
+from model.collection import CollectionJob, CollectionSchedulerLock
+from src.collection.job_scheduler import JobScheduler
+
+
+@pytest.fixture
+def session_factory(create_tables):
+    return create_tables(
+        CollectionJob.__table__, CollectionSchedulerLock.__table__, autoflush=False, autocommit=False
+    )
+
+
+def _add_jobs(session_factory, entity_type, count, start_id):
+    db = session_factory()
+    for i in range(count):
+        db.add(CollectionJob(
+            id=start_id + i,
+            job_id=f"JOB-{entity_type}-{i}",
+            entity_type=entity_type,
+            job_type="discovery",
+            status="pending",
+            priority=5,
+        ))
+    db.commit()
+    db.close()
+
+
+def test_claim_respects_entity_type_limits(session_factory, monkeypatch):
+    monkeypatch.setattr(CollectionConfig, "MAX_CONCURRENT_COMMUNITY_JOBS", 1)
+    monkeypatch.setattr(CollectionConfig, "MAX_CONCURRENT_BUILDER_JOBS", 2)
+    monkeypatch.setattr(CollectionConfig, "MAX_TOTAL_CONCURRENT_JOBS", 10)
+    _add_jobs(session_factory, "community", 3, 1)
+    _add_jobs(session_factory, "builder", 5, 100)
+
+    scheduler = JobScheduler(session_factory=session_factory, max_workers=10)
+    claimed = scheduler.claim_jobs()
+
+    types = [entity_type for _, entity_type in claimed]
+    assert types.count("community") == 1
+    assert types.count("builder") == 2
+
+    # Limits are counted from the database, so a second scheduler gets nothing
+    other = JobScheduler(session_factory=session_factory, max_workers=10)
+    assert other.claim_jobs() == []
+
+    db = session_factory()
+    leased = db.query(CollectionJob).filter(CollectionJob.lease_owner == scheduler.worker_id).count()
+    db.close()
+    assert leased == 3
+
+
+def test_expired_lease_is_failed_and_slot_reused(session_factory, monkeypatch):
+    monkeypatch.setattr(CollectionConfig, "MAX_CONCURRENT_COMMUNITY_JOBS", 1)
+    _add_jobs(session_factory, "community", 2, 1)
+
+    crashed = JobScheduler(session_factory=session_factory, max_workers=5)
+    [(first_job_id, _)] = crashed.claim_jobs()
+
+    db = session_factory()
+    job = db.query(CollectionJob).filter(CollectionJob.job_id == first_job_id).first()
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    db.close()
+
+    survivor = JobScheduler(session_factory=session_factory, max_workers=5)
+    [(second_job_id, _)] = survivor.claim_jobs()
+    assert second_job_id != first_job_id
+
+    db = session_factory()
+    job = db.query(CollectionJob).filter(CollectionJob.job_id == first_job_id).first()
+    assert job.status == "failed"
+    assert job.lease_owner is None
+    db.close()
+
+
+def test_manual_claim_runs_job_once(session_factory, monkeypatch):
+    _add_jobs(session_factory, "community", 1, 1)
+    scheduler = JobScheduler(session_factory=session_factory, max_workers=2)
+    ran = []
+    monkeypatch.setattr(scheduler, "_run_job", lambda job_id, entity_type: ran.append(job_id))
+
+    scheduler.claim_job("JOB-community-0").result(timeout=5)
+    # Already running: neither a second manual start nor a dispatcher claims it again
+    assert scheduler.claim_job("JOB-community-0") is None
+    assert scheduler.claim_jobs() == []
+    scheduler.stop(wait=True)
+
+    assert ran == ["JOB-community-0"]
+    db = session_factory()
+    job = db.query(CollectionJob).filter(CollectionJob.job_id == "JOB-community-0").first()
+    assert (job.status, job.lease_owner) == ("running", scheduler.worker_id)
+    db.close()
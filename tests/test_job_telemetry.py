@@ -0,0 +1,83 @@
+"""
+Test the buffered collection job telemetry writer.
+
+Tests:
+- Logs and changes are batched into a handful of commits
+- Stage changes flush the previous stage
+- Buffered entries survive a rollback in the collector's session
+"""
+import pytest
+from sqlalchemy import event
+
+from model.collection import CollectionJob, CollectionJobLog, CollectionChange
+from src.collection.job_telemetry import JobTelemetryWriter
+
+
+@pytest.fixture
+def db_session(create_tables):
+    session = create_tables(
+        CollectionJob.__table__, CollectionJobLog.__table__, CollectionChange.__table__,
+        autoflush=False, autocommit=False,
+    )()
+    session.add(CollectionJob(job_id="JOB-1", entity_type="community", job_type="update",
+                              status="running", changes_detected=0))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _count_commits(session):
+    commits = []
+    event.listen(session, "after_commit", lambda s: commits.append(1))
+    return commits
+
+
+def _job(session):
+    return session.query(CollectionJob).filter(CollectionJob.job_id == "JOB-1").one()
+
+
+def test_logs_and_changes_are_batched(db_session):
+    writer = JobTelemetryWriter(db_session, _job(db_session), flush_size=50, flush_interval=3600)
+    commits = _count_commits(db_session)
+
+    for i in range(120):
+        writer.add_log(f"message {i}", "INFO", "saving")
+    for i in range(10):
+        writer.add_change(CollectionChange(job_id="JOB-1", entity_type="community",
+                                           change_type="modified", field_name=f"f{i}"))
+    writer.set_progress(items_found=7)
+    writer.flush()
+
+    assert len(commits) <= 4
+    assert db_session.query(CollectionJobLog).count() == 120
+    assert db_session.query(CollectionChange).count() == 10
+    job = _job(db_session)
+    assert job.changes_detected == 10
+    assert job.items_found == 7
+
+
+def test_stage_change_flushes_previous_stage(db_session):
+    writer = JobTelemetryWriter(db_session, _job(db_session), flush_size=50, flush_interval=3600)
+
+    writer.add_log("searching", "INFO", "searching")
+    writer.add_log("parsing", "INFO", "parsing")
+
+    stages = [s for (s,) in db_session.query(CollectionJobLog.stage).all()]
+    assert stages == ["searching"]
+    assert writer.pending == 1
+
+
+def test_buffer_survives_collector_rollback(db_session):
+    writer = JobTelemetryWriter(db_session, _job(db_session), flush_size=50, flush_interval=3600)
+
+    writer.add_log("before failure", "INFO", "saving")
+    writer.add_change(CollectionChange(job_id="JOB-1", entity_type="community",
+                                       change_type="modified", field_name="name"))
+    # Collector error handling rolls the session back before the flush
+    db_session.rollback()
+    writer.add_log("job failed", "ERROR", "saving")
+    writer.flush()
+
+    assert db_session.query(CollectionJobLog).count() == 2
+    assert db_session.query(CollectionChange).count() == 1
+    assert _job(db_session).changes_detected == 1
@@ -0,0 +1,153 @@
+"""
+Test the vectorized line graph engine against the original pairwise loops.
+
+Tests:
+- Collinear groups match the original greedy merge pass
+- Intersections (after near-duplicate removal) match the original pairwise search, in order
+- Degenerate input (empty, parallel, single segment)
+"""
+import numpy as np
+import pytest
+from scipy.spatial import distance
+
+from services.line_graph import collinear_groups, segment_intersections
+
+
+# ===================================================================
+# Original implementation (LineLotDetector before vectorization)
+# ===================================================================
+
+def legacy_groups(segments, angles, angle_threshold, max_distance):
+    groups = []
+    used = set()
+    for i, (a, angle_a) in enumerate(zip(segments, angles)):
+        if i in used:
+            continue
+        group = [i]
+        for j, (b, angle_b) in enumerate(zip(segments, angles)):
+            if j <= i or j in used:
+                continue
+            angle_diff = abs(angle_a - angle_b)
+            if angle_diff > 180:
+                angle_diff = 360 - angle_diff
+            if angle_diff < angle_threshold:
+                dist = min(
+                    distance.euclidean((a[0], a[1]), (b[0], b[1])),
+                    distance.euclidean((a[0], a[1]), (b[2], b[3])),
+                    distance.euclidean((a[2], a[3]), (b[0], b[1])),
+                    distance.euclidean((a[2], a[3]), (b[2], b[3])),
+                )
+                if dist < max_distance:
+                    group.append(j)
+                    used.add(j)
+        groups.append(group)
+        used.add(i)
+    return groups
+
+
+def legacy_intersection(a, b):
+    x1, y1, x2, y2 = a
+    x3, y3, x4, y4 = b
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if abs(denom) < 1e-10:
+        return None
+    t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+    u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
+    if -0.1 <= t <= 1.1 and -0.1 <= u <= 1.1:
+        return (int(x1 + t * (x2 - x1)), int(y1 + t * (y2 - y1)))
+    return None
+
+
+def legacy_intersections(segments):
+    points = []
+    for i, a in enumerate(segments):
+        for j, b in enumerate(segments):
+            if j <= i:
+                continue
+            point = legacy_intersection(a, b)
+            if point:
+                points.append(point)
+    unique = []
+    for point in points:
+        if all(distance.euclidean(point, existing) >= 10 for existing in unique):
+            unique.append(point)
+    return unique
+
+
+# ===================================================================
+# Inputs
+# ===================================================================
+
+def random_segments(count, size, seed):
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, size, (count, 2))
+    length = rng.integers(20, size // 3, count)
+    theta = rng.uniform(-np.pi, np.pi, count)
+    end = start + np.stack([length * np.cos(theta), length * np.sin(theta)], axis=1).astype(np.int64)
+    return np.concatenate([start, end], axis=1).astype(np.int64)
+
+
+def broken_grid_segments(cells, cell_size, seed):
+    """Street grid drawn as jittered, broken pieces (what HoughLinesP returns for lot outlines)."""
+    rng = np.random.default_rng(seed)
+    extent = cells * cell_size
+    segments = []
+    for k in range(cells + 1):
+        offset = k * cell_size
+        for start in range(0, extent, 60):
+            end = min(start + 60 + int(rng.integers(-8, 8)), extent)
+            jitter = rng.integers(-2, 3, 2)
+            segments.append((start, offset + jitter[0], end, offset + jitter[1]))
+            segments.append((offset + jitter[0], start, offset + jitter[1], end))
+    segments = np.array(segments, dtype=np.int64)
+    flip = rng.random(len(segments)) < 0.5
+    segments[flip] = segments[flip][:, [2, 3, 0, 1]]
+    return segments[rng.permutation(len(segments))]
+
+
+def segment_angles(segments):
+    return np.degrees(np.arctan2(segments[:, 3] - segments[:, 1], segments[:, 2] - segments[:, 0]))
+
+
+INPUTS = [
+    pytest.param(lambda: random_segments(300, 800, seed=1), id="random"),
+    pytest.param(lambda: random_segments(400, 300, seed=2), id="random-dense"),
+    pytest.param(lambda: broken_grid_segments(6, 120, seed=3), id="grid"),
+]
+
+
+# ===================================================================
+# Tests
+# ===================================================================
+
+@pytest.mark.parametrize("make_segments", INPUTS)
+def test_groups_match_original_merge(make_segments):
+    segments = make_segments()
+    angles = segment_angles(segments)
+
+    for angle_threshold, max_distance in [(10.0, 20), (25.0, 45)]:
+        expected = legacy_groups(segments.tolist(), angles.tolist(), angle_threshold, max_distance)
+        assert collinear_groups(segments, angles, angle_threshold, max_distance) == expected
+
+
+@pytest.mark.parametrize("make_segments", INPUTS)
+def test_intersections_match_original_search(make_segments):
+    segments = make_segments()
+
+    expected = legacy_intersections(segments.tolist())
+    assert expected  # inputs actually intersect
+    assert segment_intersections(segments) == expected
+
+
+def test_degenerate_inputs():
+    empty = np.zeros((0, 4), dtype=np.int64)
+    assert collinear_groups(empty, np.zeros(0), 10.0, 20) == []
+    assert segment_intersections(empty) == []
+
+    single = np.array([[0, 0, 100, 0]])
+    assert collinear_groups(single, segment_angles(single), 10.0, 20) == [[0]]
+    assert segment_intersections(single) == []
+
+    parallel = np.array([[0, 0, 100, 0], [0, 50, 100, 50], [0, 100, 100, 100]])
+    assert segment_intersections(parallel) == []
+    assert collinear_groups(parallel, segment_angles(parallel), 10.0, 20) == [[0], [1], [2]]
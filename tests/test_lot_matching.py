@@ -0,0 +1,155 @@
+"""
+Test lot number to boundary matching.
+
+Tests:
+- Greedy matching reproduces the original AutoDetectService loop
+- Vectorized point-in-polygon agrees with the original ray casting
+- Optimal matching assigns more boundaries when greedy choices conflict
+- Optimal matching finds the minimum total score (brute force on small cases)
+- Unknown modes and empty inputs
+"""
+from itertools import permutations
+
+import numpy as np
+import pytest
+from scipy.spatial import distance
+
+from services.lot_matching import GREEDY, OPTIMAL, _Polygons, candidate_scores, match_lot_numbers
+
+
+# ===================================================================
+# Original implementation (AutoDetectService before vectorization)
+# ===================================================================
+
+def legacy_point_in_polygon(point, polygon):
+    x, y = point
+    n = len(polygon)
+    inside = False
+    p1x, p1y = polygon[0]
+    for i in range(1, n + 1):
+        p2x, p2y = polygon[i % n]
+        if y > min(p1y, p2y):
+            if y <= max(p1y, p2y):
+                if x <= max(p1x, p2x):
+                    if p1y != p2y:
+                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+                    if p1x == p2x or x <= xinters:
+                        inside = not inside
+        p1x, p1y = p2x, p2y
+    return inside
+
+
+def legacy_match(polygons, positions, max_distance):
+    used = set()
+    assignment = []
+    for polygon in polygons:
+        centroid = (sum(p[0] for p in polygon) / len(polygon), sum(p[1] for p in polygon) / len(polygon))
+        best_match, best_distance = None, float('inf')
+        for i, position in enumerate(positions):
+            if i in used:
+                continue
+            dist = distance.euclidean(centroid, position)
+            if legacy_point_in_polygon(position, polygon):
+                dist *= 0.1
+            if dist < best_distance and dist < max_distance:
+                best_distance, best_match = dist, i
+        if best_match is not None:
+            used.add(best_match)
+        assignment.append(best_match)
+    return assignment
+
+
+# ===================================================================
+# Inputs
+# ===================================================================
+
+def phase_plan(rows, cols, seed, lot=80):
+    """Irregular lots on a street grid, with jittered, missing and stray lot numbers."""
+    rng = np.random.default_rng(seed)
+    polygons, positions = [], []
+    for r in range(rows):
+        for c in range(cols):
+            x, y = c * lot, r * lot
+            corners = [(x, y), (x + lot // 2, y + int(rng.integers(-6, 6))), (x + lot, y),
+                       (x + lot, y + lot), (x, y + lot)]
+            polygons.append([(int(px + rng.integers(-4, 4)), int(py + rng.integers(-4, 4))) for px, py in corners])
+            if rng.random() < 0.85:
+                positions.append((int(x + lot / 2 + rng.normal(0, lot / 4)), int(y + lot / 2 + rng.normal(0, lot / 4))))
+    for _ in range(rows * cols // 10):
+        positions.append((int(rng.integers(0, cols * lot)), int(rng.integers(0, rows * lot))))
+    order = rng.permutation(len(positions))
+    return polygons, [positions[k] for k in order]
+
+
+# ===================================================================
+# Tests
+# ===================================================================
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("max_distance", [30, 100])
+def test_greedy_matches_original_loop(seed, max_distance):
+    polygons, positions = phase_plan(12, 15, seed)
+    assert match_lot_numbers(polygons, positions, max_distance) == legacy_match(polygons, positions, max_distance)
+
+
+def test_point_in_polygon_matches_ray_casting():
+    rng = np.random.default_rng(7)
+    polygons = [
+        [(0, 0), (100, 0), (100, 100), (0, 100)],
+        [(0, 0), (60, 80), (120, 0), (120, 120), (60, 40), (0, 120)],   # concave
+        [(10, 10), (10, 90), (80, 50)],                                    # vertical edge
+        [(5, 5), (5, 5), (50, 5), (50, 50)],                               # repeated vertex
+    ]
+    packed = _Polygons(polygons)
+    points = rng.integers(-10, 130, (400, 2)).astype(float)
+    points[:40] = rng.integers(0, 3, (40, 2)) * 50  # vertices and edges
+
+    for k, polygon in enumerate(polygons):
+        got = packed.contains(np.full(len(points), k), points)
+        expected = [legacy_point_in_polygon(tuple(p), polygon) for p in points]
+        assert got.tolist() == expected
+
+
+def test_optimal_matches_more_boundaries():
+    # Number 0 sits between both lots but nearer lot A; number 1 is only in
+    # range of lot A. Greedy gives A number 0 and leaves B empty.
+    lot_a = [(0, 0), (100, 0), (100, 100), (0, 100)]
+    lot_b = [(200, 0), (300, 0), (300, 100), (200, 100)]
+    positions = [(140, 50), (50, 150)]
+
+    assert match_lot_numbers([lot_a, lot_b], positions, 120, mode=GREEDY) == [0, None]
+    assert match_lot_numbers([lot_a, lot_b], positions, 120, mode=OPTIMAL) == [1, 0]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_optimal_is_minimum_cost_maximum_matching(seed):
+    polygons, positions = phase_plan(2, 3, seed, lot=60)
+    boundary, number, score = candidate_scores(polygons, positions, 60)
+    scores = {(b, n): s for b, n, s in zip(boundary.tolist(), number.tolist(), score.tolist())}
+
+    def evaluate(assignment):
+        pairs = [(b, n) for b, n in enumerate(assignment) if n is not None]
+        return len(pairs), -sum(scores[p] for p in pairs)
+
+    # Brute force over every injective assignment (with "unmatched" slots)
+    options = list(range(len(positions))) + [None] * len(polygons)
+    best = max(
+        evaluate(candidate)
+        for candidate in set(permutations(options, len(polygons)))
+        if all(n is None or (b, n) in scores for b, n in enumerate(candidate))
+    )
+
+    optimal = match_lot_numbers(polygons, positions, 60, mode=OPTIMAL)
+    greedy = match_lot_numbers(polygons, positions, 60, mode=GREEDY)
+    assert evaluate(optimal) == pytest.approx(best)
+    assert evaluate(optimal) >= evaluate(greedy)
+
+
+def test_unknown_mode_and_empty_inputs():
+    with pytest.raises(ValueError):
+        match_lot_numbers([], [], 100, mode="closest")
+
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    assert match_lot_numbers([], [(5, 5)], 100) == []
+    assert match_lot_numbers([square], [], 100) == [None]
+    assert match_lot_numbers([square], [(5, 5)], 100, mode=OPTIMAL) == [0]
@@ -0,0 +1,174 @@
+"""
+Test the perceptual hash index used for near-duplicate media lookup.
+
+Tests:
+- Multi-index hash queries return the same matches as a linear scan
+- Entity-scoped queries only match that entity's media
+- Snapshots round-trip and catch up with rows written since
+- Committed ORM writes update the index; rolled-back ones do not
+- Entity uploads flag or reject near-duplicates
+"""
+import asyncio
+import io
+import os
+import random
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageFilter
+
+import routes.media.entities as entities
+import src.media_hash_index as media_hash_index
+import src.storage as storage_module
+from config.media_config import MediaConfig
+from model.media import Media, MediaType, ModerationStatus
+from src.media_hash_index import HashEntry, MediaHashIndex, find_duplicate_media, hamming, hash_to_int
+
+
+def flip_bits(value, count, rng):
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def make_media(media_id, image_hash, entity_id=1, entity_type="community"):
+    return Media(
+        id=media_id, public_id=f"MED-{media_id}", filename=f"{media_id}.jpg",
+        original_filename=f"{media_id}.jpg", media_type=MediaType.IMAGE,
+        content_type="image/jpeg", file_size=1, image_hash=image_hash,
+        storage_path=f"{media_id}.jpg", original_url=f"/{media_id}.jpg",
+        entity_type=entity_type, entity_id=entity_id, uploaded_by="USR-test"
+    )
+
+
+def make_photo(seed, blur=0):
+    rng = random.Random(seed)
+    img = Image.new("RGB", (320, 240))
+    for _ in range(12):
+        x, y = rng.randrange(320), rng.randrange(240)
+        img.paste(tuple(rng.randrange(256) for _ in range(3)), (x, y, x + 120, y + 90))
+    if blur:
+        img = img.filter(ImageFilter.GaussianBlur(blur))
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+@pytest.fixture
+def session_factory(create_tables, tmp_path, monkeypatch):
+    factory = create_tables(Media.__table__)
+    monkeypatch.setattr(MediaConfig, "MEDIA_HASH_INDEX_PATH", str(tmp_path / "index.json.gz"))
+    media_hash_index.reset_media_hash_index()
+    yield factory
+    media_hash_index.reset_media_hash_index()
+
+
+def test_query_matches_linear_scan():
+    rng = random.Random(7)
+    index = MediaHashIndex()
+    hashes = {}
+    for media_id in range(1, 3001):
+        # Clusters of near-identical hashes plus unrelated ones
+        value = rng.getrandbits(64) if media_id % 3 else flip_bits(hashes[media_id - 1], rng.randrange(12), rng)
+        hashes[media_id] = value
+        index.upsert(HashEntry(media_id, value, "community", media_id % 5))
+
+    for _ in range(100):
+        query = flip_bits(hashes[rng.randrange(1, 3001)], rng.randrange(6), rng)
+        for max_distance in (0, 5, 10, 14):
+            expected = sorted((hamming(query, h), i) for i, h in hashes.items() if hamming(query, h) <= max_distance)
+            assert index.query(query, max_distance) == expected
+
+
+def test_scoped_query_and_removal():
+    index = MediaHashIndex()
+    index.upsert(HashEntry(1, 0xFF, "community", 1))
+    index.upsert(HashEntry(2, 0xFE, "community", 2))
+    index.upsert(HashEntry(3, 0xFC, "builder", 1))
+
+    assert index.query(0xFF, 2, "community", 1) == [(0, 1)]
+    assert index.query(0xFF, 2) == [(0, 1), (1, 2), (2, 3)]
+    assert index.query(0xFF, 2, exclude_id=1) == [(1, 2), (2, 3)]
+
+    index.remove(1)
+    assert index.query(0xFF, 2, "community", 1) == []
+    assert hash_to_int("00000000000000ff") == 0xFF
+    assert hash_to_int("not-a-hash") is None
+
+
+def test_snapshot_catches_up_with_new_rows(session_factory):
+    db = session_factory()
+    db.add(make_media(1, "00000000000000ff"))
+    db.commit()
+    assert [m.id for m, _ in find_duplicate_media(db, "00000000000000fe", "community", 1)] == [1]
+    media_hash_index.save_media_hash_index()
+    # Written through a per-process temp file, which is renamed into place
+    assert not [n for n in os.listdir(os.path.dirname(MediaConfig.MEDIA_HASH_INDEX_PATH)) if n.endswith(".tmp")]
+
+    # Another process adds a row; this one restarts from the snapshot
+    db.add(make_media(2, "ff00000000000000"))
+    media_hash_index.reset_media_hash_index()
+    db.commit()
+    index = MediaHashIndex.load(MediaConfig.MEDIA_HASH_INDEX_PATH)
+    assert len(index) == 1
+
+    index = media_hash_index.get_media_hash_index(db)
+    assert sorted(index.entries) == [1, 2]
+    db.close()
+
+
+def test_committed_writes_update_index(session_factory):
+    db = session_factory()
+    media_hash_index.get_media_hash_index(db)  # build (empty)
+
+    db.add(make_media(1, "00000000000000ff"))
+    db.commit()
+    db.add(make_media(2, "00000000000000fe"))
+    db.flush()
+    db.rollback()
+
+    assert [m.id for m, d in find_duplicate_media(db, "00000000000000fe", "community", 1)] == [1]
+
+    db.delete(db.get(Media, 1))
+    db.commit()
+    assert find_duplicate_media(db, "00000000000000ff", "community", 1) == []
+    db.close()
+
+
+def test_stale_matches_are_dropped(session_factory):
+    db = session_factory()
+    index = media_hash_index.get_media_hash_index(db)
+    with index.lock:
+        index.upsert(HashEntry(9, 0xFF, "community", 1))  # deleted by another process
+
+    assert find_duplicate_media(db, "00000000000000ff", "community", 1) == []
+    assert 9 not in index.entries
+    db.close()
+
+
+@pytest.mark.parametrize("action", ["flag", "reject"])
+def test_entity_upload_handles_near_duplicates(session_factory, tmp_path, monkeypatch, action):
+    monkeypatch.setattr(MediaConfig, "DUPLICATE_UPLOAD_ACTION", action)
+    monkeypatch.setattr(entities, "storage", storage_module.LocalFileStorage(base_dir=str(tmp_path / "uploads")))
+    db = session_factory()
+
+    def upload(data, name):
+        file = UploadFile(io.BytesIO(data), filename=name, headers={"content-type": "image/jpeg"})
+        return asyncio.run(entities.process_and_save_media(
+            db, file, "community", 1, "gallery", {"public_id": "USR-test"}
+        ))
+
+    first = upload(make_photo(1), "a.jpg")
+    other = upload(make_photo(2), "b.jpg")
+    assert first.moderation_status == other.moderation_status == ModerationStatus.APPROVED
+
+    if action == "reject":
+        with pytest.raises(HTTPException) as exc:
+            upload(make_photo(1, blur=1), "a-copy.jpg")
+        assert exc.value.status_code == 409
+        assert first.public_id in exc.value.detail
+    else:
+        copy = upload(make_photo(1, blur=1), "a-copy.jpg")
+        assert copy.moderation_status == ModerationStatus.FLAGGED
+        assert copy.file_metadata["duplicate_of"] == first.public_id
+    db.close()
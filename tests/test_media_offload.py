@@ -0,0 +1,167 @@
+"""
+Test the non-blocking media upload pipeline.
+
+Tests:
+- Image variants are generated as bytes in a worker process
+- The image is decoded once; its perceptual hash matches existing media (stored orientation)
+- Uploads store the original and every variant and record their URLs
+- WebP/AVIF alternates are stored next to the JPEG variants
+- The event loop keeps serving while an image is processed
+"""
+import asyncio
+import io
+import time
+
+import httpx
+import imagehash
+import pytest
+from fastapi import FastAPI
+from PIL import Image, ImageFile
+
+import routes.media.upload as upload
+import src.storage as storage_module
+from config.db import get_db
+from config.media_config import MediaConfig
+from config.security import get_current_user
+from model.media import Media
+from src.media_offload import process_image_variants, run_cpu
+from src.media_processor import ImageProcessorEnhanced
+
+
+def make_jpeg(width, height):
+    output = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+@pytest.fixture
+def app(create_tables, tmp_path, monkeypatch):
+    SessionLocal = create_tables(Media.__table__)
+
+    def test_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(MediaConfig, "IMAGE_VARIANT_FORMATS", ["JPEG"])
+    monkeypatch.setattr(upload, "storage", storage_module.LocalFileStorage(base_dir=str(tmp_path / "uploads")))
+
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = test_db
+    app.dependency_overrides[get_current_user] = lambda: {"public_id": "USR-test"}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.state.upload_dir = tmp_path / "uploads"
+    return app
+
+
+async def upload_while_pinging(app, image):
+    """Upload an image and return (response, longest /ping round trip in seconds)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        uploading = asyncio.create_task(client.post(
+            "/upload",
+            files={"file": ("house.jpg", image, "image/jpeg")},
+            data={"entity_type": "property", "entity_id": "7", "entity_field": "gallery"},
+        ))
+        longest = 0.0
+        while not uploading.done():
+            start = time.perf_counter()
+            await client.get("/ping")
+            longest = max(longest, time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+        return uploading.result(), longest
+
+
+def test_image_variants_are_generated_in_worker():
+    async def run():
+        return await run_cpu(process_image_variants, make_jpeg(2000, 1000))
+
+    processed = asyncio.run(run())
+
+    assert (processed["width"], processed["height"]) == (2000, 1000)
+    assert Image.open(io.BytesIO(processed["thumbnail"])).size == (150, 150)
+    assert Image.open(io.BytesIO(processed["medium"])).size == (800, 400)
+    assert Image.open(io.BytesIO(processed["large"])).size == (1600, 800)
+
+
+def test_perceptual_hash_from_single_decode_in_stored_orientation(monkeypatch):
+    # Left half dark, right half light, tagged "rotate 90° clockwise" (orientation 6);
+    # large enough that the variants are cut from a quarter-scale draft decode
+    img = Image.new("L", (6400, 4800), 30)
+    img.paste(220, (3200, 0, 6400, 4800))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    output = io.BytesIO()
+    img.convert("RGB").save(output, format="JPEG", quality=90, exif=exif)
+    data = output.getvalue()
+
+    decodes = []
+    load = ImageFile.ImageFile.load
+
+    def counting_load(image):
+        if image.tile:
+            decodes.append(image.size)
+        return load(image)
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", counting_load)
+    processed = ImageProcessorEnhanced.process_image_complete(io.BytesIO(data))
+    monkeypatch.undo()
+
+    assert decodes == [(1600, 1200)]
+    # Same hash as existing media: full decode, stored orientation
+    assert processed["perceptual_hash"] == str(imagehash.average_hash(Image.open(io.BytesIO(data))))
+    # Variants are still cut from the transposed image
+    assert Image.open(processed["large"]).size[0] < Image.open(processed["large"]).size[1]
+
+
+def test_upload_stores_original_and_variants(app):
+    response, _ = asyncio.run(upload_while_pinging(app, make_jpeg(1200, 900)))
+
+    assert response.status_code == 201
+    media = response.json()["media"]
+    assert (media["width"], media["height"]) == (1200, 900)
+    assert media["thumbnailUrl"].endswith("_thumb.jpg")
+    assert media["mediumUrl"].endswith("_medium.jpg")
+    assert media["largeUrl"] is None  # not larger than 1600px
+
+    stored = sorted(p.name for p in (app.state.upload_dir / "gallery").iterdir())
+    stem = media["filename"].rsplit(".", 1)[0]
+    assert stored == sorted([media["filename"], f"{stem}_medium.jpg", f"{stem}_thumb.jpg"])
+
+
+def test_upload_stores_webp_and_avif_alternates(app, monkeypatch):
+    monkeypatch.setattr(MediaConfig, "IMAGE_VARIANT_FORMATS", ["JPEG", "WEBP", "AVIF"])
+    response, _ = asyncio.run(upload_while_pinging(app, make_jpeg(1200, 900)))
+
+    assert response.status_code == 201
+    media = response.json()["media"]
+    stem = media["filename"].rsplit(".", 1)[0]
+    formats = media["metadata"]["variant_formats"]
+    assert set(formats) == {"thumbnail", "medium"}
+    assert formats["medium"]["webp"].endswith(f"{stem}_medium.webp")
+    assert formats["thumbnail"]["avif"].endswith(f"{stem}_thumb.avif")
+
+    stored = app.state.upload_dir / "gallery"
+    assert Image.open(stored / f"{stem}_medium.webp").size == (800, 600)
+    assert Image.open(stored / f"{stem}_thumb.avif").format == "AVIF"
+
+
+def test_event_loop_stays_responsive_during_processing(app):
+    image = make_jpeg(4000, 3000)
+    asyncio.run(run_cpu(process_image_variants, make_jpeg(100, 100)))  # start the worker
+
+    start = time.perf_counter()
+    process_image_variants(image, MediaConfig.IMAGE_VARIANT_FORMATS)
+    processing_time = time.perf_counter() - start
+
+    response, longest_ping = asyncio.run(upload_while_pinging(app, image))
+
+    assert response.status_code == 201
+    assert longest_ping < processing_time / 2
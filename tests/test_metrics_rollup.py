@@ -0,0 +1,144 @@
+"""
+Test the admin dashboard rollups and their response cache.
+
+Tests:
+- Totals, role breakdown, active users and period counts match the source tables
+- Growth series are bucketed by day, week and month
+- Recounting recent days picks up new rows without touching older days;
+  a full rebuild also reflects deletions
+- Missing source tables count as 0
+- Concurrent cache misses for one key share a single computation
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from model.metrics import MetricsDailyRollup
+from src import metrics_rollup
+from src.metrics_rollup import (
+    MetricsCache,
+    compute_admin_stats,
+    compute_growth,
+    refresh_recent_rollups,
+    refresh_rollups,
+)
+
+TODAY = datetime.utcnow().date()
+
+
+def _at(day: date) -> str:
+    return f"{day.isoformat()} 12:00:00"
+
+
+@pytest.fixture
+def db(sqlite_engine, monkeypatch):
+    monkeypatch.setattr(metrics_rollup, "_rollups_built", False)
+    with sqlite_engine.begin() as conn:
+        conn.execute(CreateTable(MetricsDailyRollup.__table__))
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, role VARCHAR(32), created_at TIMESTAMP)"))
+        for table in ("builder_profiles", "communities", "properties"):
+            conn.execute(text(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, created_at TIMESTAMP)"))
+        users = [
+            ("buyer", TODAY), ("buyer", TODAY), ("admin", TODAY - timedelta(days=3)),
+            ("builder", TODAY - timedelta(days=40)), ("sales_rep", TODAY - timedelta(days=40)), (None, TODAY),
+        ]
+        conn.execute(text("INSERT INTO users (role, created_at) VALUES (:role, :created_at)"),
+                     [{"role": role, "created_at": _at(day)} for role, day in users])
+        conn.execute(text("INSERT INTO builder_profiles (created_at) VALUES (:c)"),
+                     [{"c": _at(TODAY)}, {"c": _at(TODAY - timedelta(days=40))}])
+        conn.execute(text("INSERT INTO communities (created_at) VALUES (:c)"), [{"c": _at(TODAY - timedelta(days=3))}])
+        conn.execute(text("INSERT INTO properties (created_at) VALUES (:c)"),
+                     [{"c": _at(TODAY - timedelta(days=n))} for n in (0, 1, 1, 8)])
+    session = sessionmaker(bind=sqlite_engine)()
+    yield session
+    session.close()
+
+
+def test_admin_stats_from_rollups(db):
+    stats = compute_admin_stats(db)
+
+    totals = stats.totals
+    assert (totals.users, totals.builders, totals.communities, totals.properties) == (6, 2, 1, 4)
+    assert (totals.buyers, totals.admins, totals.sales_reps, totals.community_pocs) == (2, 1, 1, 0)
+    assert totals.active_users == 4  # registered in the last 30 days
+    assert (totals.posts, totals.tours, totals.documents) == (0, 0, 0)  # tables do not exist
+    assert stats.period is None
+
+    start = datetime.combine(TODAY - timedelta(days=5), datetime.min.time())
+    stats = compute_admin_stats(db, start, datetime.utcnow())
+    assert (stats.period.new_users, stats.period.new_builders,
+            stats.period.new_communities, stats.period.new_properties) == (4, 1, 1, 3)
+
+
+def test_growth_series(db):
+    refresh_rollups(db)
+    start = TODAY - timedelta(days=10)
+
+    daily = compute_growth(db, start, TODAY, "day")
+    assert [(p.date.date(), p.count) for p in daily.properties] == [
+        (TODAY - timedelta(days=8), 1), (TODAY - timedelta(days=1), 2), (TODAY, 1),
+    ]
+    assert sum(p.count for p in daily.users) == 4
+
+    monthly = compute_growth(db, start, TODAY, "month")
+    assert sum(p.count for p in monthly.properties) == 4
+    assert all(p.date.day == 1 for p in monthly.properties)
+
+    weekly = compute_growth(db, start, TODAY, "week")
+    assert sum(p.count for p in weekly.properties) == 4
+    assert all(p.date.weekday() == 0 for p in weekly.properties)
+
+
+def test_recent_refresh_and_full_rebuild(db):
+    refresh_rollups(db)
+    db.execute(text("INSERT INTO properties (created_at) VALUES (:c)"), {"c": _at(TODAY)})
+    db.execute(text("DELETE FROM properties WHERE created_at = :c"), {"c": _at(TODAY - timedelta(days=8))})
+    db.commit()
+
+    refresh_recent_rollups(db, days=2)
+    # The new row is counted; the deleted 8-day-old row is still in its (untouched) day
+    assert compute_admin_stats(db).totals.properties == 5
+
+    refresh_rollups(db)
+    assert compute_admin_stats(db).totals.properties == 4
+
+
+def test_cache_coalesces_concurrent_misses():
+    cache = MetricsCache(ttl_seconds=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"users": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("stats", compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"users": 1}] * 8
+    assert cache.get_or_compute("stats", compute) == {"users": 1}
+    status = cache.status()
+    assert (status["misses"], status["coalesced"], status["hits"]) == (1, 7, 1)
+
+
+def test_cache_shares_errors_and_retries():
+    cache = MetricsCache(ttl_seconds=60)
+
+    def fail():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("stats", fail)
+    # Failures are not cached
+    assert cache.get_or_compute("stats", lambda: 42) == 42
@@ -0,0 +1,120 @@
+"""
+Test batched prediction in MLSupervisedDetector.
+
+Tests:
+- Batched features (ROI masks, shared edge map) equal the original per-contour features
+- Batched predict returns the same lots, confidences and order as the per-contour loop
+- Threaded feature extraction gives the same matrix
+"""
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("sklearn")
+
+from services.ml_supervised_detector import MLLotCandidate, MLSupervisedDetector, TrainingExample  # noqa: E402
+
+
+def legacy_features(contour, image):
+    """extract_features before batching (full-image mask and edge map per contour)."""
+    area = cv2.contourArea(contour)
+    perimeter = cv2.arcLength(contour, True)
+    x, y, w, h = cv2.boundingRect(contour)
+    aspect_ratio = float(w) / h if h > 0 else 0
+    rect_area = w * h
+    extent = area / rect_area if rect_area > 0 else 0
+    hull_area = cv2.contourArea(cv2.convexHull(contour))
+    solidity = area / hull_area if hull_area > 0 else 0
+    num_vertices = len(cv2.approxPolyDP(contour, 0.02 * perimeter, True))
+    circularity = (4 * np.pi * area) / (perimeter ** 2) if perimeter > 0 else 0
+
+    mask = np.zeros(image.shape[:2], dtype=np.uint8)
+    cv2.drawContours(mask, [contour], -1, 255, -1)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image.copy()
+    edges = cv2.Canny(gray, 50, 150)
+    edge_pixels = cv2.countNonZero(cv2.bitwise_and(edges, edges, mask=mask))
+    edge_density = edge_pixels / area if area > 0 else 0
+    masked_pixels = gray[mask > 0]
+    mean_intensity = np.mean(masked_pixels) if len(masked_pixels) > 0 else 0
+    std_intensity = np.std(masked_pixels) if len(masked_pixels) > 0 else 0
+
+    return np.array([area, perimeter, aspect_ratio, extent, solidity, num_vertices,
+                     circularity, edge_density, mean_intensity, std_intensity], dtype=np.float32)
+
+
+def legacy_predict(detector, contours, image):
+    """predict before batching (one scaler/predict/predict_proba call per contour)."""
+    candidates = []
+    for contour in contours:
+        features = legacy_features(contour, image)
+        scaled = detector.scaler.transform(features.reshape(1, -1))
+        prediction = detector.classifier.predict(scaled)[0]
+        confidence = detector.classifier.predict_proba(scaled)[0][prediction]
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        candidates.append(MLLotCandidate(
+            coordinates=[(int(p[0][0]), int(p[0][1])) for p in approx],
+            area=cv2.contourArea(contour),
+            confidence=float(confidence),
+            features=features,
+            prediction=int(prediction),
+        ))
+    lots = [c for c in candidates if c.prediction == 1]
+    lots.sort(key=lambda x: x.confidence, reverse=True)
+    return lots
+
+
+@pytest.fixture(scope="module")
+def site_plan():
+    """Noisy site plan with lots of varied shapes, some touching the image border."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(200, 255, (600, 800, 3), dtype=np.uint8)
+    contours = []
+    for k in range(60):
+        x, y = int(rng.integers(-20, 760)), int(rng.integers(-20, 560))
+        w, h = int(rng.integers(20, 90)), int(rng.integers(20, 90))
+        points = np.array([[x, y], [x + w, y + int(rng.integers(-5, 5))], [x + w, y + h], [x + w // 3, y + h]],
+                          dtype=np.int32).reshape(-1, 1, 2)
+        cv2.polylines(image, [points], True, (30, 30, 30), 2)
+        contours.append(points)
+    return image, contours
+
+
+@pytest.fixture(scope="module")
+def detector(site_plan):
+    image, contours = site_plan
+    detector = MLSupervisedDetector(n_estimators=20)
+    examples = [
+        TrainingExample(features=legacy_features(contour, image), label=int(k % 3 != 0))
+        for k, contour in enumerate(contours)
+    ]
+    detector.train(examples, save_model=False)
+    return detector
+
+
+def test_batched_features_match_per_contour(site_plan, detector):
+    image, contours = site_plan
+    expected = np.stack([legacy_features(c, image) for c in contours])
+
+    assert np.array_equal(detector.extract_features_batch(contours, image, workers=1), expected)
+    assert np.array_equal(detector.extract_features(contours[0], image), expected[0])
+
+
+def test_threaded_features_match(site_plan, detector):
+    image, contours = site_plan
+    assert np.array_equal(
+        detector.extract_features_batch(contours, image, workers=4),
+        detector.extract_features_batch(contours, image, workers=1),
+    )
+
+
+def test_batched_predict_matches_per_contour_loop(site_plan, detector):
+    image, contours = site_plan
+    expected = legacy_predict(detector, contours, image)
+    lots = detector.predict(contours, image)
+
+    assert expected
+    assert [(l.coordinates, l.area, l.confidence, l.prediction) for l in lots] == [
+        (l.coordinates, l.area, l.confidence, l.prediction) for l in expected
+    ]
+    assert all(np.array_equal(a.features, b.features) for a, b in zip(lots, expected))
+    assert detector.predict([], image) == []
@@ -0,0 +1,172 @@
+"""
+Test the cached, region-parallel OCR engine.
+
+Tests:
+- Text regions are found next to and touching boundary lines; the lines themselves are not regions
+- OCR of packed region canvases maps back to the same tokens as whole-image OCR
+- Tokens are cached by image content and OCR settings, on disk across engine instances
+- Failed OCR is not cached; the disk cache evicts least recently used entries
+"""
+import threading
+
+import numpy as np
+from scipy import ndimage
+
+from services.ocr_engine import (
+    FULL,
+    REGIONS,
+    OCRCache,
+    OCREngine,
+    OCRToken,
+    pack_regions,
+    text_regions,
+    unpack_tokens,
+)
+
+
+def draw_label(image, x, y, chars):
+    """Dark 8x14 'characters' 4px apart, like a printed lot number"""
+    for i in range(chars):
+        image[y:y + 14, x + i * 12:x + i * 12 + 8] = 0
+
+
+def site_plan(with_touching_label=False):
+    image = np.full((900, 1300), 255, dtype=np.uint8)
+    # Lot boundaries
+    for y in range(100, 900, 200):
+        image[y:y + 2, :] = 0
+    for x in range(150, 1300, 250):
+        image[:, x:x + 2] = 0
+    labels = []
+    for row in range(4):
+        for col in range(5):
+            x, y, chars = 40 + col * 250, 150 + row * 200, 1 + (row + col) % 4
+            draw_label(image, x, y, chars)
+            labels.append((x, y, chars))
+    if with_touching_label:
+        draw_label(image, 400, 286, 3)  # bottom edge sits on the y=300 line
+    return image, labels
+
+
+def fake_ocr(calls=None):
+    """'Reads' each cluster of characters as '<chars>x<width>' at confidence 90."""
+    def ocr(image, psm):
+        if calls is not None:
+            calls.append((image.shape, psm))
+        ink = image < 128
+        merged = ndimage.maximum_filter1d(ink, 6, axis=1, mode="constant")
+        labels, _ = ndimage.label(merged)
+        tokens = []
+        for rows, cols in ndimage.find_objects(labels):
+            h, w = rows.stop - rows.start, cols.stop - cols.start
+            if h > 30 or w > 100:
+                continue  # lines, not text
+            x0 = cols.start + 2  # undo the filter's growth
+            width = w - 4 if w > 8 else w
+            tokens.append(OCRToken(f"{(width + 4) // 12}x{width}", 90.0, (x0, rows.start, width, h)))
+        return tokens
+    return ocr
+
+
+def test_text_regions_skip_lines_and_find_touching_labels():
+    image, labels = site_plan(with_touching_label=True)
+    regions = text_regions(image)
+
+    assert len(regions) == len(labels) + 1
+    for x, y, chars in labels + [(400, 286, 3)]:
+        assert any(rx <= x and ry <= y and x + chars * 12 - 4 <= rx + rw and y + 14 <= ry + rh
+                   for rx, ry, rw, rh in regions)
+    assert all(rh <= 40 for _, _, _, rh in regions)
+    assert text_regions(np.full((50, 50), 255, dtype=np.uint8)) == []
+
+
+def test_region_canvases_map_back_to_image():
+    image, labels = site_plan()
+    full = OCREngine(roi_mode=FULL, ocr_fn=fake_ocr()).tokens(image, 6)
+    assert len(full) == len(labels)
+
+    for workers in (1, 3):
+        calls = []
+        engine = OCREngine(roi_mode=REGIONS, workers=workers, ocr_fn=fake_ocr(calls))
+        tokens = engine.tokens(image, 6)
+        assert sorted(tokens, key=lambda t: t.bbox) == sorted(full, key=lambda t: t.bbox)
+        # One tesseract run per canvas
+        assert len(calls) == workers
+
+    regions = text_regions(image)
+    canvases = pack_regions(image, regions, 4)
+    assert sum(len(c.placements) for c in canvases) == len(regions)
+    outside = OCRToken("stray", 50.0, (1, 1, 5, 5))
+    assert unpack_tokens([outside], canvases[0].placements) == []
+
+
+def test_cache_by_image_and_settings(tmp_path):
+    image, _ = site_plan()
+    calls = []
+    engine = OCREngine(cache=OCRCache(tmp_path, 1 << 20), roi_mode=REGIONS, ocr_fn=fake_ocr(calls))
+
+    first = engine.tokens(image, 6)
+    runs = len(calls)
+    assert engine.tokens(image, 6) == first and len(calls) == runs
+
+    preprocessed = []
+
+    def preprocess(img):
+        preprocessed.append(True)
+        return img
+
+    engine.tokens(image, 6, preprocess=preprocess, preprocess_key="clahe")
+    engine.tokens(image, 6, preprocess=preprocess, preprocess_key="clahe")
+    assert len(preprocessed) == 1  # hits skip preprocessing too
+
+    engine.tokens(image, 7)
+    changed = image.copy()
+    changed[5, 5] = 0
+    engine.tokens(changed, 6)
+    assert len(calls) == runs * 4
+
+    # A new engine over the same directory (e.g. another worker) reuses the tokens
+    other_calls = []
+    other = OCREngine(cache=OCRCache(tmp_path, 1 << 20), roi_mode=REGIONS, ocr_fn=fake_ocr(other_calls))
+    assert other.tokens(image, 6) == first and other_calls == []
+
+    # Whole-image OCR is cached separately
+    full = OCREngine(cache=OCRCache(tmp_path, 1 << 20), roi_mode=FULL, ocr_fn=fake_ocr(other_calls))
+    full.tokens(image, 6)
+    assert len(other_calls) == 1
+
+
+def test_failures_not_cached_and_eviction(tmp_path):
+    image, _ = site_plan()
+    attempts = []
+
+    def flaky(img, psm):
+        attempts.append(psm)
+        if len(attempts) == 1:
+            raise RuntimeError("tesseract crashed")
+        return [OCRToken("12", 95.0, (0, 0, 10, 10))]
+
+    engine = OCREngine(cache=OCRCache(tmp_path / "a", 1 << 20), roi_mode=FULL, ocr_fn=flaky)
+    assert engine.tokens(image, 6) == []
+    assert engine.tokens(image, 6) == [OCRToken("12", 95.0, (0, 0, 10, 10))]
+    assert len(attempts) == 2
+
+    cache = OCRCache(tmp_path / "b", max_bytes=1, memory_entries=1)
+    tokens = [OCRToken("7", 80.0, (1, 2, 3, 4))]
+    cache.put("one", tokens)
+    cache.put("two", tokens)
+    assert len(list((tmp_path / "b").glob("*.json"))) == 0
+    assert cache.get("two") == tokens and cache.get("one") is None
+
+
+def test_concurrent_lookups_share_cache(tmp_path):
+    image, _ = site_plan()
+    engine = OCREngine(cache=OCRCache(tmp_path, 1 << 20), roi_mode=REGIONS, workers=2, ocr_fn=fake_ocr())
+    expected = engine.tokens(image, 6)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(engine.tokens(image, 6))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 4
@@ -0,0 +1,106 @@
+"""
+Test keyset (cursor) pagination of list endpoints.
+
+Tests:
+- Following cursors through list_properties visits every row once, in each sort's order,
+  including tied prices/bedrooms and NULL listed_at
+- skip/offset still pages as before and hands out a cursor to continue from
+- Malformed cursors, cursors from another sort, and cursor + offset are rejected with 400
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, Response
+
+from model.property.property import Property
+from routes.property.property import list_properties
+from src.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+SORTS = ["listed_at_desc", "listed_at_asc", "price_asc", "price_desc", "beds_asc", "beds_desc"]
+
+
+@pytest.fixture
+def db(property_tables):
+    session = property_tables()
+
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    for i in range(1, 138):
+        session.add(Property(
+            id=i, title=f"Home {i}", address1=f"{i} Main St", city="Austin" if i % 3 else "Round Rock",
+            state="TX", postal_code="78701", builder_id=1, community_id=1,
+            price=Decimal(rng.choice([350000, 425000, 499999.99, 610000])),  # many ties
+            bedrooms=rng.randint(2, 5),
+            listed_at=None if i % 10 == 0 else start + timedelta(days=rng.randint(0, 20)),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _list(db, **params):
+    response = Response()
+    params = {"skip": 0, "limit": 20, "cursor": None, "search": None, "city": None, "state": None, "min_price": None,
+              "lat": None, "lng": None, "radius_km": None, "bbox": None,
+              "max_price": None, "min_beds": None, "min_baths": None, "builder_id": None,
+              "community_id": None, "has_pool": None, "sort": "listed_at_desc", **params}
+    items = list_properties(response=response, db=db, **params)
+    return [p.id for p in items], response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def _expected(db, sort, city=None):
+    rows = db.query(Property).all()
+    if city:
+        rows = [r for r in rows if r.city == city]
+    field, direction = sort.rsplit("_", 1)
+    attr = {"listed_at": "listed_at", "price": "price", "beds": "bedrooms"}[field]
+    # NULLs sort first ascending, last descending (MySQL/SQLite)
+    key = lambda r: (getattr(r, attr) is not None, getattr(r, attr) or 0, r.id)  # noqa: E731
+    return [r.id for r in sorted(rows, key=key, reverse=direction == "desc")]
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_cursor_walk_matches_full_order(db, sort):
+    for city in (None, "Round Rock"):
+        seen, cursor = [], None
+        while True:
+            ids, cursor = _list(db, sort=sort, limit=17, cursor=cursor, city=city)
+            seen.extend(ids)
+            if cursor is None:
+                break
+        assert seen == _expected(db, sort, city)
+
+
+def test_offset_clients_keep_working(db):
+    expected = _expected(db, "price_desc")
+    ids, cursor = _list(db, sort="price_desc", skip=40, limit=25)
+    assert ids == expected[40:65]
+
+    # The cursor handed to an offset client continues where its page ended
+    ids, _ = _list(db, sort="price_desc", cursor=cursor, limit=25)
+    assert ids == expected[65:90]
+
+    ids, cursor = _list(db, sort="price_desc", skip=130, limit=25)
+    assert ids == expected[130:] and cursor is None
+
+
+def test_invalid_cursors_rejected(db):
+    _, cursor = _list(db, sort="price_asc")
+    for bad in ("not-a-cursor", "e30", cursor[:-3]):
+        with pytest.raises(HTTPException) as exc:
+            _list(db, sort="price_asc", cursor=bad)
+        assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        _list(db, sort="beds_asc", cursor=cursor)
+    with pytest.raises(HTTPException):
+        _list(db, sort="price_asc", cursor=cursor, skip=20)
+
+
+def test_cursor_round_trip():
+    values = [datetime(2025, 3, 4, 5, 6, 7), Decimal("499999.99"), None, 42]
+    cursor = encode_cursor("listed_at_desc", values)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor, "listed_at_desc", 4) == values
@@ -0,0 +1,103 @@
+"""
+Test the bounded password hashing pool.
+
+Tests:
+- Hashes verify, and wrong passwords do not
+- Hashes made at another bcrypt cost or scheme are flagged for rehash on verify
+- Calls beyond max_pending are shed with PasswordHashingBusy, and counted
+- Hash latency and queue wait are recorded
+"""
+import threading
+
+import pytest
+
+from src.password_hashing import PasswordHasher, PasswordHashingBusy, build_password_context
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(build_password_context("bcrypt", bcrypt_rounds=4), workers=2, max_pending=4)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher):
+    hashed = hasher.hash("correct horse")
+
+    assert hashed.startswith("$2b$04$")
+    assert hasher.identify(hashed) == "bcrypt"
+    assert hasher.verify_and_update("correct horse", hashed) == (True, None)
+    assert hasher.verify_and_update("wrong horse", hashed) == (False, None)
+
+
+def test_rehash_when_cost_changes(hasher):
+    old = build_password_context("bcrypt", bcrypt_rounds=5).hash("pw")
+
+    valid, new_hash = hasher.verify_and_update("pw", old)
+
+    assert valid
+    assert new_hash.startswith("$2b$04$")
+    assert hasher.verify_and_update("pw", new_hash) == (True, None)
+    # No rehash for a wrong password
+    assert hasher.verify_and_update("other", old) == (False, None)
+
+
+def test_rehash_when_scheme_changes():
+    pytest.importorskip("argon2")
+    hasher = PasswordHasher(
+        build_password_context("argon2", argon2_time_cost=1, argon2_memory_cost=1024, argon2_parallelism=1),
+        workers=1, max_pending=1,
+    )
+    try:
+        bcrypt_hash = build_password_context("bcrypt", bcrypt_rounds=4).hash("pw")
+        valid, new_hash = hasher.verify_and_update("pw", bcrypt_hash)
+
+        assert valid
+        assert hasher.identify(new_hash) == "argon2"
+        assert hasher.verify_and_update("pw", new_hash) == (True, None)
+    finally:
+        hasher.shutdown()
+
+
+def test_sheds_when_queue_full(hasher):
+    release = threading.Event()
+    # Two calls run (and signal it), two more wait in the queue
+    running = threading.Semaphore(0)
+
+    def slow_hash(password):
+        running.release()
+        release.wait()
+        return password
+
+    threads = [threading.Thread(target=hasher._run, args=(slow_hash, "pw")) for _ in range(hasher.max_pending)]
+    for thread in threads:
+        thread.start()
+    for _ in range(hasher.workers):
+        assert running.acquire(timeout=5)
+    while hasher.status()["pending"] < hasher.max_pending:
+        pass
+
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash("pw")
+
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    status = hasher.status()
+    assert status["pending"] == 0
+    assert status["rejected"] == 1
+    assert status["completed"] == hasher.max_pending
+    assert hasher.verify_and_update("pw", hasher.hash("pw"))[0]
+
+
+def test_metrics_record_latency(hasher):
+    for _ in range(3):
+        hasher.hash("pw")
+
+    status = hasher.status()
+    assert status["scheme"] == "bcrypt"
+    assert status["completed"] == 3
+    assert status["avg_hash_ms"] > 0
+    assert status["max_hash_ms"] >= status["avg_hash_ms"]
+    assert status["max_wait_ms"] >= 0
@@ -0,0 +1,102 @@
+"""
+Test matrix-form few-shot scoring and pattern files.
+
+Tests:
+- Matrix scores and best patterns match the original per-contour loop
+- Pattern selection order and ties follow the original (first pattern wins)
+- Patterns round-trip through .npz files without pickle
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy.spatial import distance
+
+from services.pattern_matrix import PatternMatrix, load_pattern_arrays, save_pattern_arrays
+
+
+def legacy_best_match(descriptor, area, patterns):
+    """FewShotDetector.detect_similar_lots scoring before vectorization."""
+    best_match, best_score = None, 0.0
+    for pattern in patterns:
+        max_similarity = max(
+            float(np.exp(-distance.euclidean(descriptor, example) / 10.0))
+            for example in pattern.shape_descriptors
+        )
+        area_diff = abs(area - pattern.avg_area)
+        area_tolerance = 2 * pattern.area_std if pattern.area_std > 0 else pattern.avg_area * 0.5
+        area_score = 1.0 - min(area_diff / area_tolerance, 1.0)
+        combined_score = max_similarity * 0.7 + area_score * 0.3
+        if combined_score > best_score:
+            best_score, best_match = combined_score, pattern.name
+    return best_match, best_score
+
+
+def make_patterns(rng, count):
+    patterns = []
+    for k in range(count):
+        examples = rng.integers(2, 5)
+        areas = rng.uniform(1000, 8000, examples) if k % 3 else np.full(examples, 3000.0)
+        patterns.append(SimpleNamespace(
+            name=f"pattern-{k}",
+            shape_descriptors=list(rng.normal(0, 4, (examples, 7))),
+            contours=[rng.integers(0, 500, (4, 2)) for _ in range(examples)],
+            avg_area=float(np.mean(areas)),
+            area_std=float(np.std(areas)),
+            avg_vertices=4.0,
+        ))
+    return patterns
+
+
+def test_scores_match_original_loop():
+    rng = np.random.default_rng(3)
+    patterns = make_patterns(rng, 6)
+    descriptors = rng.normal(0, 4, (500, 7))
+    areas = rng.uniform(500, 12000, 500)
+
+    matrix = PatternMatrix.from_patterns(patterns)
+    best, scores = matrix.best_matches(descriptors, areas)
+
+    for i in range(len(descriptors)):
+        name, score = legacy_best_match(descriptors[i], areas[i], patterns)
+        assert scores[i] == pytest.approx(score, abs=1e-12)
+        assert (matrix.names[best[i]] if best[i] >= 0 else None) == name
+
+
+def test_ties_and_no_match():
+    # Two identical patterns: the first one wins
+    example = np.ones(7)
+    matrix = PatternMatrix(["first", "second"], [[example], [example]], [1000.0, 1000.0], [0.0, 0.0])
+
+    best, scores = matrix.best_matches(np.array([example]), np.array([1000.0]))
+    assert best.tolist() == [0] and scores.tolist() == [pytest.approx(1.0)]
+
+    # Far away in shape and area: no pattern scores above 0
+    best, scores = matrix.best_matches(np.full((1, 7), 1e4), np.array([1e6]))
+    assert best.tolist() == [-1] and scores.tolist() == [0.0]
+
+    empty = PatternMatrix([], [], [], [])
+    assert empty.best_matches(np.zeros((2, 7)), np.zeros(2))[0].tolist() == [-1, -1]
+
+
+def test_pattern_npz_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    pattern = make_patterns(rng, 1)[0]
+    metadata = {"training_samples": 3, "area_range": [1000.0, 5000.0]}
+    path = tmp_path / "corner-lot.npz"
+
+    save_pattern_arrays(
+        path, pattern.name, pattern.shape_descriptors, pattern.contours,
+        pattern.avg_area, pattern.area_std, pattern.avg_vertices, metadata,
+    )
+    loaded = load_pattern_arrays(path)
+
+    assert not list(tmp_path.glob("*.tmp"))
+    assert loaded["name"] == pattern.name
+    assert np.array_equal(np.stack(loaded["shape_descriptors"]), np.stack(pattern.shape_descriptors))
+    assert all(np.array_equal(a, b) for a, b in zip(loaded["contours"], pattern.contours))
+    assert len(loaded["contours"]) == len(pattern.contours)
+    assert (loaded["avg_area"], loaded["area_std"], loaded["avg_vertices"]) == (
+        pattern.avg_area, pattern.area_std, pattern.avg_vertices
+    )
+    assert loaded["metadata"] == metadata
@@ -0,0 +1,171 @@
+"""
+Test streaming PDF rasterization and the page cache.
+
+Tests:
+- Pages stream in page order and are only rendered as the consumer asks for them
+- Cached pages are reused for the same file content, page, DPI and clip, and missed otherwise
+- The cache evicts least recently used pages beyond its size limit
+- Several documents render together and every page comes back once
+- Preview DPI fits the longer page side; clip regions match the full render (PyMuPDF)
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+import services.pdf_raster as pdf_raster
+from services.pdf_raster import RasterCache, iter_documents, iter_pages, preview_dpi
+
+# Fake documents: page count from the file contents, pages filled with page index + DPI
+PAGE_SIZE = (612.0, 792.0)
+
+
+@pytest.fixture
+def fake_renderer(monkeypatch):
+    rendered = []
+
+    def page_sizes(path):
+        return [PAGE_SIZE] * int(open(path).read().split()[0])
+
+    def render_page(path, page_index, dpi, clip=None, transform=None, cache_path=None):
+        rendered.append((path, page_index, dpi, clip))
+        image = np.full((dpi // 10, dpi // 20, 3), page_index + dpi % 200, dtype=np.uint8)
+        if clip is not None:
+            image = image[clip[1]:clip[3], clip[0]:clip[2]]
+        if transform is not None:
+            image = transform(image)
+        if cache_path is None:
+            return image
+        pdf_raster._save_npy(pdf_raster.Path(cache_path), image)
+        return None
+
+    monkeypatch.setattr(pdf_raster, "PDF_RASTER_WORKERS", 0)
+    monkeypatch.setattr(pdf_raster, "page_sizes", page_sizes)
+    monkeypatch.setattr(pdf_raster, "render_page", render_page)
+    return rendered
+
+
+def _pdf(tmp_path, name, pages, salt=""):
+    path = tmp_path / name
+    path.write_text(f"{pages} {salt}")
+    return str(path)
+
+
+def invert(image):
+    return 255 - image
+
+
+def test_pages_stream_in_order(tmp_path, fake_renderer):
+    path = _pdf(tmp_path, "plan.pdf", 4)
+    cache = RasterCache(tmp_path / "cache", 1 << 30)
+
+    pages = iter_pages(path, dpi=100, cache=cache)
+    first = next(pages)
+    assert first.page_index == 0 and len(fake_renderer) == 1
+    assert first.image.shape == (10, 5, 3) and first.image[0, 0, 0] == 100
+
+    rest = list(pages)
+    assert [p.page_index for p in rest] == [1, 2, 3]
+    assert [p.image[0, 0, 0] for p in rest] == [101, 102, 103]
+
+    selected = list(iter_pages(path, [3, 9, 1], dpi=120, cache=None))
+    assert [p.page_index for p in selected] == [3, 1]
+    assert not any(p.cached for p in selected)
+
+
+def test_cache_hits_and_misses(tmp_path, fake_renderer):
+    path = _pdf(tmp_path, "plan.pdf", 2)
+    cache = RasterCache(tmp_path / "cache", 1 << 30)
+
+    list(iter_pages(path, dpi=100, cache=cache))
+    assert len(fake_renderer) == 2
+
+    again = list(iter_pages(path, dpi=100, cache=cache))
+    assert len(fake_renderer) == 2 and all(p.cached for p in again)
+    assert [p.image[0, 0, 0] for p in again] == [100, 101]
+
+    # Cached pages are copy-on-write: writable without touching the cache
+    again[0].image[:] = 0
+    assert next(iter_pages(path, [0], dpi=100, cache=cache)).image[0, 0, 0] == 100
+
+    list(iter_pages(path, dpi=150, cache=cache))
+    list(iter_pages(path, [0], dpi=100, clip=(0, 0, 2, 2), cache=cache))
+    list(iter_pages(path, [0], dpi=100, transform=invert, cache=cache))
+    assert len(fake_renderer) == 6
+
+    # Same name, different contents: new hash, so rendered again
+    path = _pdf(tmp_path, "plan.pdf", 2, salt="revised")
+    list(iter_pages(path, [0], dpi=100, cache=cache))
+    assert len(fake_renderer) == 7
+
+    # A copy of the original file under another name hits the cache
+    copy = _pdf(tmp_path, "copy.pdf", 2)
+    assert next(iter_pages(copy, [1], dpi=150, cache=cache)).cached
+
+
+def test_cache_evicts_least_recently_used(tmp_path, fake_renderer):
+    path = _pdf(tmp_path, "plan.pdf", 3)
+    probe = RasterCache(tmp_path / "probe", 1 << 30)
+    list(iter_pages(path, [0], dpi=100, cache=probe))
+    entry_size = next((tmp_path / "probe").glob("*.npy")).stat().st_size
+
+    cache = RasterCache(tmp_path / "cache", 2 * entry_size)
+    for page_index in (0, 1):
+        list(iter_pages(path, [page_index], dpi=100, cache=cache))
+    # Age both entries, then read page 0 so page 1 is the least recently used
+    old = time.time() - 100
+    for entry in (tmp_path / "cache").glob("*.npy"):
+        os.utime(entry, (old, old))
+    assert next(iter_pages(path, [0], dpi=100, cache=cache)).cached
+    list(iter_pages(path, [2], dpi=100, cache=cache))
+
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+    rendered = len(fake_renderer)
+    assert next(iter_pages(path, [0], dpi=100, cache=cache)).cached
+    assert next(iter_pages(path, [2], dpi=100, cache=cache)).cached
+    assert not next(iter_pages(path, [1], dpi=100, cache=cache)).cached
+    assert len(fake_renderer) == rendered + 1
+
+
+def test_documents_render_together(tmp_path, fake_renderer):
+    paths = [_pdf(tmp_path, "a.pdf", 2), _pdf(tmp_path, "b.pdf", 3), _pdf(tmp_path, "c.pdf", 1)]
+    cache = RasterCache(tmp_path / "cache", 1 << 30)
+
+    pages = list(iter_documents(paths, dpi=100, cache=cache))
+    assert sorted((source, page.page_index) for source, page in pages) == [
+        (0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (2, 0)
+    ]
+    assert all(page.image[0, 0, 0] == 100 + page.page_index for _, page in pages)
+
+
+def test_preview_dpi():
+    assert preview_dpi((612, 792), max_side=1600) == int(1600 * 72 / 792)
+    assert preview_dpi((2592, 1728), max_side=1600) == int(1600 * 72 / 2592)
+    assert preview_dpi((72, 72), max_side=1600) == 300
+
+
+def test_clip_matches_full_render(tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    monkeypatch.setattr(pdf_raster, "PDF_RASTER_WORKERS", 0)
+
+    doc = fitz.open()
+    page = doc.new_page(width=400, height=300)
+    page.draw_rect(fitz.Rect(50, 40, 250, 200), color=(0, 0, 0), width=3)
+    page.insert_text((80, 120), "LOT 12", fontsize=20)
+    path = str(tmp_path / "plan.pdf")
+    doc.save(path)
+    doc.close()
+
+    cache = RasterCache(tmp_path / "cache", 1 << 30)
+    full = next(iter_pages(path, dpi=144, cache=cache)).image
+    assert full.shape == (600, 800, 3)
+
+    clip = (100, 80, 500, 400)
+    region = next(iter_pages(path, dpi=144, clip=clip, cache=cache)).image
+    expected = full[80:400, 100:500]
+    assert region.shape == expected.shape
+    assert np.abs(region.astype(int) - expected.astype(int)).mean() < 2
+
+    preview = pdf_raster.render_preview(path, max_side=200, cache=None)
+    assert max(preview.image.shape[:2]) <= 200
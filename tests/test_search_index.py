@@ -0,0 +1,206 @@
+"""
+Test the full-text search index and its use by the list endpoints.
+
+Tests:
+- Name matches outrank body-only matches; every term must match
+- Terms match as prefixes, and misspelled terms are corrected from the index vocabulary
+- Facet counts, totals and the city filter cover all matches, not just the page
+- Upserts replace docs and removals drop them
+- Committed ORM writes update the index; rolled-back writes do not
+- A refresh re-indexes rows changed outside the ORM since the last sync
+- paginate_ranked serves rows in rank order across cursor pages
+- ranked_search_ids returns None (ILIKE fallback) until a kind is built
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from model.profiles.community import Community
+from model.property.property import Property
+from src import search_index
+from src.pagination import paginate_ranked
+from src.search_index import (
+    COMMUNITY,
+    PROPERTY,
+    SearchDoc,
+    SearchIndex,
+    build_search_index,
+    edit_distance,
+    ranked_search_ids,
+    ranking_name,
+    refresh_search_index,
+)
+
+
+DOCS = [
+    SearchDoc(COMMUNITY, 1, "Highlands at Mayfield Ranch", "Hill country views", "Round Rock TX",
+              city="Round Rock", state="TX", price=450000),
+    SearchDoc(COMMUNITY, 2, "Mueller", "Walkable homes near the highlands trail", "Austin TX",
+              city="Austin", state="TX", price=650000),
+    SearchDoc(COMMUNITY, 3, "Travisso", "Lakeside living", "Leander TX", city="Leander", state="TX",
+              price=820000),
+    SearchDoc(COMMUNITY, 4, "Easton Park", "Parks and pools", "Austin TX", city="Austin", state="TX",
+              price=380000),
+    SearchDoc(COMMUNITY, 5, "Whisper Valley", "Geothermal homes", "Austin TX", city="Austin", state="TX"),
+    SearchDoc(PROPERTY, 1, "Highlands plan 2400", "Corner lot", "Round Rock TX", city="Round Rock"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = SearchIndex(str(tmp_path / "search.db"), vocabulary_seconds=0)
+    idx.upsert(DOCS)
+    yield idx
+    idx.close()
+
+
+def _ids(result):
+    return [hit.entity_id for hit in result.hits]
+
+
+def test_name_matches_rank_first(index):
+    assert _ids(index.search(COMMUNITY, "highlands")) == [1, 2]
+    assert _ids(index.search(COMMUNITY, "highlands austin")) == [2]
+    assert _ids(index.search(COMMUNITY, "highlands seattle")) == []
+    # Kinds do not leak into each other
+    assert _ids(index.search(PROPERTY, "highlands")) == [1]
+
+
+def test_prefix_and_typo_matches(index):
+    assert _ids(index.search(COMMUNITY, "highl")) == [1, 2]
+    assert _ids(index.search(COMMUNITY, "Mayf")) == [1]
+
+    result = index.search(COMMUNITY, "higlands")
+    assert _ids(result) == [1, 2]
+    assert result.corrections == {"higlands": ["highlands"]}
+
+    result = index.search(COMMUNITY, "easton austn")
+    assert _ids(result) == [4]
+    assert result.corrections == {"austn": ["austin"]}
+
+    # Too far from any indexed word
+    assert index.search(COMMUNITY, "zzzzzz").total == 0
+
+
+def test_edit_distance():
+    assert edit_distance("austin", "austn", 2) == 1
+    assert edit_distance("highlands", "hihglands", 2) == 1  # transposition
+    assert edit_distance("abc", "xyz", 1) == 2
+
+
+def test_facets_and_filters(index):
+    result = index.search(COMMUNITY, "homes", limit=1)
+    assert result.total == 2 and len(result.hits) == 1
+    assert result.facets["city"] == [{"value": "Austin", "count": 2}]
+    assert result.facets["state"] == [{"value": "TX", "count": 2}]
+    # Whisper Valley has no price, so only Mueller is banded (500k-750k)
+    assert result.facets["price"] == [{"min": 500000, "max": 750000, "count": 1}]
+
+    result = index.search(COMMUNITY, "highlands", city="round rock")
+    assert _ids(result) == [1] and result.total == 1
+
+    result = index.search(COMMUNITY, "highlands", facets=False)
+    assert result.total == 2 and result.facets == {}
+
+
+def test_upsert_replaces_and_remove_drops(index):
+    index.upsert([SearchDoc(COMMUNITY, 3, "Travisso Highlands", "Lakeside living", "Leander TX")])
+    assert index.count(COMMUNITY) == 5
+    assert set(_ids(index.search(COMMUNITY, "highlands"))) == {1, 2, 3}
+
+    index.remove(COMMUNITY, [1, 3])
+    assert _ids(index.search(COMMUNITY, "highlands")) == [2]
+    assert index.count(COMMUNITY) == 3
+
+    index.clear(COMMUNITY)
+    assert index.count(COMMUNITY) == 0 and index.count(PROPERTY) == 1
+
+
+# ===================================================================
+# Database-backed
+# ===================================================================
+
+@pytest.fixture
+def db(property_tables, tmp_path, monkeypatch):
+    session = property_tables()
+
+    idx = SearchIndex(str(tmp_path / "search.db"), vocabulary_seconds=0)
+    monkeypatch.setattr(search_index, "_index", idx)
+    monkeypatch.setattr(search_index, "SEARCH_INDEX_ENABLED", True)
+    yield session
+    session.close()
+    idx.close()
+
+
+def _property(i, title, city="Austin"):
+    return Property(id=i, title=title, address1=f"{i} Main St", city=city, state="TX", postal_code="78701",
+                    builder_id=1, community_id=1, price=Decimal(400000))
+
+
+def test_orm_writes_update_index_on_commit(db):
+    idx = search_index._index
+    db.add(_property(1, "Highlands Corner"))
+    db.add(_property(2, "Mueller Bungalow"))
+    db.commit()
+    assert _ids(idx.search(PROPERTY, "highlands")) == [1]
+
+    home = db.get(Property, 2)
+    home.title = "Mueller Highlands"
+    db.flush()
+    db.rollback()
+    assert _ids(idx.search(PROPERTY, "highlands")) == [1]
+
+    home = db.get(Property, 2)
+    home.title = "Mueller Highlands"
+    db.delete(db.get(Property, 1))
+    db.commit()
+    assert _ids(idx.search(PROPERTY, "highlands")) == [2]
+
+
+def test_ranked_search_ids_falls_back_until_built(db):
+    db.add(Community(id=1, community_id="CMY-1", name="Highlands Ranch", city="Austin", state="TX"))
+    db.commit()
+    assert ranked_search_ids(COMMUNITY, "highlands") is None
+
+    build_search_index(db, search_index._index, [COMMUNITY])
+    assert ranked_search_ids(COMMUNITY, "highlands") == [1]
+    assert ranked_search_ids(PROPERTY, "highlands") is None
+
+
+def test_refresh_picks_up_rows_written_elsewhere(db):
+    idx = search_index._index
+    db.add(_property(1, "Highlands Corner"))
+    db.commit()
+    build_search_index(db, idx, [PROPERTY])
+
+    # Another process's write: no ORM hooks, updated_at from the database clock
+    db.execute(text("UPDATE properties SET title = 'Mueller Highlands', updated_at = CURRENT_TIMESTAMP"))
+    db.commit()
+    assert _ids(idx.search(PROPERTY, "mueller")) == []
+
+    refresh_search_index(db, idx, [PROPERTY])
+    assert _ids(idx.search(PROPERTY, "mueller")) == [1]
+
+
+def test_paginate_ranked_follows_rank_order(db):
+    for i in range(1, 51):
+        db.add(_property(i, f"Home {i}", city="Austin" if i % 2 else "Kyle"))
+    db.commit()
+    ranked = list(range(50, 0, -1)) + [999]  # an id the database no longer has
+    query = db.query(Property).filter(Property.city == "Austin")
+    expected = [i for i in ranked if i % 2 and i != 999]
+
+    sort = ranking_name(PROPERTY, "home")
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate_ranked(query, Property.id, ranked, sort, 7, cursor=cursor)
+        seen += [r.id for r in rows]
+        if cursor is None:
+            break
+    assert seen == expected
+
+    rows, cursor = paginate_ranked(query, Property.id, ranked, sort, 5, offset=10)
+    assert [r.id for r in rows] == expected[10:15]
+    rows, _ = paginate_ranked(query, Property.id, ranked, sort, 5, cursor=cursor)
+    assert [r.id for r in rows] == expected[15:20]
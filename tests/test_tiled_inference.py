@@ -0,0 +1,130 @@
+"""
+Test tiled inference over large site plans.
+
+Tests:
+- Tile windows cover the page with the requested overlap
+- Array tiles are views, not copies
+- Lots cut by tile seams merge back to one detection each, inline and in parallel
+- PDF tiles match the same region of the fully rendered page
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from services.tiled_inference import ArrayTileSource, merge_tiled, run_tiled, tile_windows
+
+
+@dataclass
+class Lot:
+    coordinates: List[Tuple[int, int]]
+    confidence: float
+
+
+def box_lot(x0, y0, x1, y1, confidence=0.9):
+    return Lot([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], confidence)
+
+
+def grid_lots(width, height, size=90, gap=40):
+    return [
+        (x, y, x + size, y + size)
+        for y in range(20, height - size, size + gap)
+        for x in range(20, width - size, size + gap)
+    ]
+
+
+def clipping_detector(lots):
+    """Reports every lot overlapping a tile, clipped to the tile (like a cut-off mask)."""
+    def detect(tile, window):
+        found = []
+        for x0, y0, x1, y1 in lots:
+            cx0, cy0 = max(x0, window.x), max(y0, window.y)
+            cx1, cy1 = min(x1, window.x + window.width - 1), min(y1, window.y + window.height - 1)
+            if cx1 - cx0 > 5 and cy1 - cy0 > 5:
+                found.append(box_lot(cx0, cy0, cx1, cy1))
+        return found
+    return detect
+
+
+def test_windows_cover_page_with_overlap():
+    windows = tile_windows(2500, 1100, tile_size=1024, overlap=256)
+
+    assert {(w.width, w.height) for w in windows} == {(1024, 1024)}
+    xs = sorted({w.x for w in windows})
+    ys = sorted({w.y for w in windows})
+    assert xs == [0, 768, 1476] and ys == [0, 76]
+    assert xs[-1] + 1024 == 2500
+
+    covered = np.zeros((1100, 2500), dtype=bool)
+    for w in windows:
+        covered[w.y:w.y + w.height, w.x:w.x + w.width] = True
+    assert covered.all()
+
+    assert [(w.width, w.height) for w in tile_windows(500, 300, tile_size=1024)] == [(500, 300)]
+    with pytest.raises(ValueError):
+        tile_windows(2000, 2000, tile_size=256, overlap=256)
+
+
+def test_array_tiles_are_views():
+    image = np.zeros((3000, 4000, 3), dtype=np.uint8)
+    source = ArrayTileSource(image)
+    window = tile_windows(4000, 3000)[5]
+
+    tile = source.tile(window)
+    assert tile.shape == (1024, 1024, 3)
+    assert np.shares_memory(tile, image)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_seam_lots_merge_to_one_detection(parallel):
+    width, height = 3000, 2200
+    lots = grid_lots(width, height)
+    source = ArrayTileSource(np.zeros((height, width), dtype=np.uint8))
+
+    if parallel:
+        with ThreadPoolExecutor(4) as executor:
+            detections = run_tiled(source, clipping_detector(lots), 1024, 256, executor=executor, max_in_flight=4)
+    else:
+        detections = run_tiled(source, clipping_detector(lots), 1024, 256)
+
+    # Seams produce partial duplicates...
+    assert len(detections) > len(lots)
+
+    # ...which merge back to exactly one full box per lot
+    merged = merge_tiled(detections)
+    boxes = sorted((min(x for x, _ in l.coordinates), min(y for _, y in l.coordinates),
+                    max(x for x, _ in l.coordinates), max(y for _, y in l.coordinates)) for l in merged)
+    assert boxes == sorted(lots)
+
+
+def test_merge_prefers_higher_confidence_between_full_detections():
+    windows = tile_windows(2000, 1000, tile_size=1024, overlap=256)
+    a = box_lot(900, 100, 980, 180, confidence=0.6)
+    b = box_lot(902, 101, 981, 181, confidence=0.8)
+    separate = box_lot(1500, 100, 1580, 180, confidence=0.5)
+
+    merged = merge_tiled([(windows[0], a), (windows[1], b), (windows[1], separate)])
+    assert merged == [b, separate]
+
+
+def test_pdf_tiles_match_full_render():
+    fitz = pytest.importorskip("fitz")
+    from services.tiled_inference import PDFTileSource
+
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    for i in range(20):
+        page.draw_rect(fitz.Rect(20 + i * 25, 30 + i * 30, 40 + i * 25, 50 + i * 30), color=(0, 0, 0), width=2)
+
+    source = PDFTileSource(page, dpi=150)
+    full = page.get_pixmap(matrix=fitz.Matrix(150 / 72, 150 / 72), alpha=False)
+    full = np.frombuffer(full.samples, dtype=np.uint8).reshape(full.height, full.width, full.n)
+
+    for window in tile_windows(*source.size, tile_size=512, overlap=128):
+        tile = source.tile(window)
+        expected = full[window.y:window.y + window.height, window.x:window.x + window.width]
+        assert tile.shape == (window.height, window.width, 3)
+        assert np.abs(tile.astype(int) - expected.astype(int)).mean() < 2
+    doc.close()
@@ -0,0 +1,91 @@
+"""
+Test turning YOLO segmentation output into lot polygons.
+
+Tests:
+- Images of different shapes batched together come back in their own
+  coordinates (letterbox padding removed before the mask is resized)
+"""
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from services import yolo_detector
+from services.yolo_detector import YOLODetector
+from services.yolo_registry import YOLOModelRegistry
+
+INPUT_SIZE = 640
+
+
+class _Tensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class _Result:
+    def __init__(self, masks, boxes):
+        self.masks = type("Masks", (), {"data": _Tensor(masks)})()
+        self.boxes = type("Boxes", (), {"data": _Tensor(boxes)})()
+
+
+class LetterboxModel:
+    """Segments the white pixels of each image, with masks at the letterboxed input size."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, conf, verbose=False):
+        self.calls.append(len(images))
+        results = []
+        for image in images:
+            height, width = image.shape[:2]
+            gain = min(INPUT_SIZE / height, INPUT_SIZE / width)
+            new_w, new_h = round(width * gain), round(height * gain)
+            left, top = (INPUT_SIZE - new_w) // 2, (INPUT_SIZE - new_h) // 2
+
+            mask = np.zeros((INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+            scaled = cv2.resize(image[:, :, 0], (new_w, new_h), interpolation=cv2.INTER_NEAREST)
+            mask[top:top + new_h, left:left + new_w] = scaled / 255.0
+            results.append(_Result(mask[None], np.array([[0, 0, 1, 1, 0.9, 0]], dtype=np.float32)))
+        return results
+
+
+def _site_plan(width, height, lot):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    x1, y1, x2, y2 = lot
+    image[y1:y2, x1:x2] = 255
+    return image
+
+
+def _bounds(lot_result):
+    xs = [x for x, _ in lot_result.coordinates]
+    ys = [y for _, y in lot_result.coordinates]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def test_mixed_shape_batch_keeps_image_coordinates(monkeypatch):
+    model = LetterboxModel()
+    registry = YOLOModelRegistry(loader=lambda path: model)
+    monkeypatch.setattr(yolo_detector, "YOLO_AVAILABLE", True)
+    monkeypatch.setattr(yolo_detector, "get_yolo_registry", lambda: registry)
+
+    wide_lot, square_lot = (400, 120, 600, 220), (100, 300, 250, 420)
+    images = [_site_plan(1280, 640, wide_lot), _site_plan(640, 640, square_lot)]
+
+    try:
+        results = YOLODetector(min_area=100).detect_from_arrays(images)
+    finally:
+        registry.shutdown()
+
+    assert model.calls == [2]
+    for result, lot in zip(results, [wide_lot, square_lot]):
+        assert result.lots_detected == 1
+        found = _bounds(result.lots[0])
+        assert all(abs(a - b) <= 3 for a, b in zip(found, lot)), (found, lot)
+    assert results[0].image_dimensions == {"width": 1280, "height": 640}
@@ -0,0 +1,101 @@
+"""
+Test the YOLO model registry and micro-batching queue.
+
+Tests:
+- Each weights file is loaded once, even under concurrent first use
+- Concurrent predictions are grouped into batches of at most max_batch
+- Each caller gets its own image's result
+- A failed forward pass fails every request in its batch
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.yolo_registry import MicroBatcher, YOLOModelRegistry
+
+
+class FakeModel:
+    """Stands in for an ultralytics model: one result per input image."""
+
+    def __init__(self, path, delay=0.05):
+        self.path = path
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, images, conf, verbose=False):
+        self.calls.append((list(images), conf))
+        time.sleep(self.delay)
+        return [f"{self.path}:{image}" for image in images]
+
+
+def test_weights_are_loaded_once():
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        time.sleep(0.05)
+        return FakeModel(path)
+
+    registry = YOLOModelRegistry(loader=loader)
+    with ThreadPoolExecutor(8) as pool:
+        models = list(pool.map(lambda i: registry.get_model("a.pt" if i % 2 else "b.pt"), range(16)))
+
+    assert sorted(loads) == ["a.pt", "b.pt"]
+    assert len({id(m) for m in models}) == 2
+    registry.shutdown()
+
+
+def test_concurrent_predictions_share_batches():
+    model = FakeModel("m.pt")
+    batcher = MicroBatcher(model.predict, max_batch=4, max_wait=0.2)
+
+    with ThreadPoolExecutor(10) as pool:
+        results = list(pool.map(lambda i: batcher.predict(i, 0.5 if i else 0.25), range(10)))
+
+    assert results == [f"m.pt:{i}" for i in range(10)]
+    assert all(len(images) <= 4 for images, _ in model.calls)
+    assert len(model.calls) <= 4
+    assert batcher.status()["images"] == 10
+    # A batch runs at the lowest threshold among its requests
+    assert min(conf for _, conf in model.calls) == 0.25
+    batcher.shutdown()
+
+
+def test_single_request_waits_at_most_max_wait():
+    model = FakeModel("m.pt", delay=0)
+    batcher = MicroBatcher(model.predict, max_batch=8, max_wait=0.05)
+
+    start = time.perf_counter()
+    assert batcher.predict("x", 0.25) == "m.pt:x"
+    assert time.perf_counter() - start < 0.5
+    batcher.shutdown()
+
+
+def test_failed_batch_fails_every_request():
+    def predict(images, conf):
+        raise RuntimeError("out of memory")
+
+    batcher = MicroBatcher(predict, max_batch=4, max_wait=0.1)
+    futures = [batcher.submit(i, 0.25) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+
+    # The worker keeps serving after a failure
+    batcher.predict_fn = FakeModel("m.pt", delay=0).predict
+    assert batcher.predict(1, 0.25) == "m.pt:1"
+    batcher.shutdown()
+
+
+def test_registry_batcher_uses_shared_model():
+    registry = YOLOModelRegistry(loader=lambda path: FakeModel(path, delay=0))
+    batcher = registry.get_batcher("a.pt")
+
+    assert registry.get_batcher("a.pt") is batcher
+    assert batcher.predict("img", 0.3) == "a.pt:img"
+    assert registry.get_model("a.pt").calls == [(["img"], 0.3)]
+    assert registry.status()["models"] == ["a.pt"]
+    registry.shutdown()
+    assert all("a.pt" not in thread.name for thread in threading.enumerate())